@@ -0,0 +1,172 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Apply scheduler module
+Debounces configuration changes, so burst of changes is applied at once
+"""
+
+import time
+
+import common
+
+# default debounce window in milliseconds,
+# configuration is applied once no change is notified for that time
+DEFAULT_DEBOUNCE = 100
+# default max time in milliseconds change waits for apply,
+# bounds debouncing of continuous changes
+DEFAULT_MAX_LATENCY = 1000
+
+
+class ApplyScheduler:
+    """
+    Decides when notified configuration changes are to be applied.
+    Changes are applied after debounce window with no further changes
+    or when the oldest pending change waits for max latency,
+    urgent changes are applied immediately.
+    All pending changes are applied at once, with latest configuration version.
+    """
+
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Constructor
+
+        Parameters:
+            clock: time source in seconds
+        """
+        self.clock = clock
+        self.first_change = None
+        self.last_change = None
+        self.urgent = False
+        self.applied_version = None
+
+
+    @staticmethod
+    def get_config():
+        """
+        Get apply scheduling configuration
+
+        Returns:
+            debounce window [s], max latency [s]
+        """
+        cfg = common.CONFIG_STORE.get_global_attr('apply', {})
+        return cfg.get('debounce', DEFAULT_DEBOUNCE) / 1000, \
+            cfg.get('max_latency', DEFAULT_MAX_LATENCY) / 1000
+
+
+    def notify(self, urgent=False):
+        """
+        Notifies configuration change
+
+        Parameters:
+            urgent: apply change without waiting for further changes
+        """
+        now = self.clock()
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.urgent = self.urgent or urgent
+
+
+    def is_pending(self):
+        """
+        Checks for changes waiting for apply
+
+        Returns:
+            True if there are pending changes
+        """
+        return self.first_change is not None
+
+
+    def due_time(self):
+        """
+        Get time pending changes are to be applied at
+
+        Returns:
+            time (clock), None if there are no pending changes
+        """
+        if not self.is_pending():
+            return None
+
+        if self.urgent:
+            return self.last_change
+
+        debounce, max_latency = ApplyScheduler.get_config()
+        return min(self.last_change + debounce, self.first_change + max_latency)
+
+
+    def timeout(self):
+        """
+        Get time left to apply
+
+        Returns:
+            time in seconds, None if there are no pending changes
+        """
+        due_time = self.due_time()
+        if due_time is None:
+            return None
+
+        return max(due_time - self.clock(), 0)
+
+
+    def is_due(self):
+        """
+        Checks are pending changes to be applied now
+
+        Returns:
+            True if pending changes are to be applied
+        """
+        due_time = self.due_time()
+        return due_time is not None and self.clock() >= due_time
+
+
+    def start_apply(self, version):
+        """
+        Marks pending changes as applied with given configuration version
+
+        Parameters:
+            version: configuration version to be applied
+
+        Returns:
+            number of configuration versions coalesced into apply
+        """
+        coalesced = 1
+        if self.applied_version is not None:
+            coalesced = max(version - self.applied_version, 1)
+
+        self.first_change = None
+        self.last_change = None
+        self.urgent = False
+        self.applied_version = version
+
+        return coalesced
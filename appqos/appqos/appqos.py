@@ -45,13 +45,19 @@ import syslog
 import time
 from jsonschema import ValidationError
 
+import apply_scheduler
 import cache_ops
 import caps
 import common
+import config_schema
+import config_sync
 import log
+import monitor
+import pid_tracker
 import power
 from rest import rest_server
 import sstbf
+import tracing
 
 class AppQoS:
     """
@@ -64,6 +70,8 @@ class AppQoS:
 
     def __init__(self):
         self.stop_event = multiprocessing.Event()
+        self.monitor = monitor.Monitor()
+        self.scheduler = apply_scheduler.ApplyScheduler()
 
     def run(self):
         """
@@ -125,11 +133,27 @@ class AppQoS:
                 return
             log.info(f"RDT MBA CTRL {'en' if common.PQOS_API.is_mba_bw_enabled() else 'dis'}abled")
 
-        result = cache_ops.configure_rdt()
+        version = common.CONFIG_STORE.get_config_version()
+        self.scheduler.start_apply(version)
+        common.TRACER.begin('apply', version)
+        start = time.monotonic()
+        result = common.TRACER.call('configure_rdt', cache_ops.configure_rdt)
+        common.STATS_STORE.general_stats_set_apply_duration(time.monotonic() - start)
+        common.TRACER.end(result)
+        common.CONFIG_STORE.set_applied(version, result)
         if result != 0:
             log.error("Failed to apply initial RDT configuration, terminating...")
             return
 
+        # start Pools/Apps monitoring
+        self.monitor.update()
+
+        # start Apps' PIDs tracking
+        tracker = None
+        if common.CONFIG_STORE.get_global_attr('pid_tracking', False):
+            tracker = pid_tracker.PidTracker()
+            tracker.start()
+
         # set CTRL+C sig handler
         signal.signal(signal.SIGINT, self.signal_handler)
 
@@ -137,39 +161,64 @@ class AppQoS:
 
         log.info("Terminating...")
 
+        if tracker is not None:
+            tracker.stop()
+
+        self.monitor.stop()
+
 
     def event_handler(self):
         """
-        Handles config_changed event
+        Handles config_changed event, changes are applied as scheduled by ApplyScheduler
         """
-
-        # rate limiting
-        last_cfg_change_ts = 0
-        min_time_diff = 1 / common.RATE_LIMIT
-
         while not self.stop_event.is_set():
-            if common.CONFIG_STORE.is_config_changed():
+            # sleep until REST API process (or signal handler) notifies us,
+            # pending changes are to be applied or it is time to poll monitoring data
+            timeouts = [timeout for timeout in [self.scheduler.timeout(), self.monitor.timeout()] \
+                if timeout is not None]
+            change = common.CONFIG_STORE.is_config_changed(min(timeouts) if timeouts else None)
+            if self.stop_event.is_set():
+                break
+
+            if change:
+                self.scheduler.notify(change == config_sync.CHANGE_URGENT)
+
+            if self.scheduler.is_due():
+                version = common.CONFIG_STORE.get_config_version()
+                coalesced = self.scheduler.start_apply(version)
+                common.STATS_STORE.general_stats_observe_apply_coalesced(coalesced)
+                log.info(f"Configuration changed, processing new config, version {version}, " \
+                         f"{coalesced} change(s) coalesced...")
+
+                common.TRACER.begin('apply', version)
+                start = time.monotonic()
+                error = None
+                result = common.TRACER.call('configure_rdt', cache_ops.configure_rdt)
+                if result != 0:
+                    error = "Failed to apply RDT configuration"
+                elif caps.sstcp_enabled() and not sstbf.is_sstbf_configured():
+                    result = common.TRACER.call('configure_power', power.configure_power)
+                    if result != 0:
+                        error = "Failed to apply Power Profiles configuration"
 
-                time_diff = time.time() - last_cfg_change_ts
-                if time_diff < min_time_diff:
-                    log.info("Rate Limiter, " \
-                             f"sleeping {round((min_time_diff - time_diff) * 1000)} ms...")
-                    time.sleep(min_time_diff - time_diff)
+                common.STATS_STORE.general_stats_set_apply_duration(time.monotonic() - start)
+                trace = common.TRACER.end(result)
 
-                log.info("Configuration changed, processing new config...")
-                result = cache_ops.configure_rdt()
+                # keep running, next configuration change will be applied
                 if result != 0:
-                    log.error("Failed to apply RDT configuration!")
-                    break
+                    failed = [name for name in tracing.failed_spans(trace) \
+                        if name not in ['configure_rdt', 'configure_power']]
+                    if failed:
+                        error += f", failed: {', '.join(failed)}"
+                    log.error(f"{error}!")
+                    common.CONFIG_STORE.set_applied(version, result, error)
+                else:
+                    common.CONFIG_STORE.set_applied(version, 0)
+                    log.info("New configuration processed")
 
-                if caps.sstcp_enabled() and not sstbf.is_sstbf_configured():
-                    result = power.configure_power()
-                    if result != 0:
-                        log.error("Failed to apply Power Profiles configuration!")
-                        break
+                self.monitor.update()
 
-                last_cfg_change_ts = time.time()
-                log.info("New configuration processed")
+            self.monitor.poll()
 
 
     def signal_handler(self, _signum, _frame):
@@ -179,6 +228,8 @@ class AppQoS:
 
         print("CTRL+C...")
         self.stop_event.set()
+        # wake up main loop
+        common.CONFIG_STORE.notify()
 
 def load_config(config_file):
     """
@@ -219,6 +270,8 @@ def main():
     parser.add_argument('-V', '--verbose', action='store_true', help="Verbose mode")
     parser.add_argument('-a', '--address', metavar="INET_ADDRESS", default=common.DEFAULT_ADDRESS,
                         help="AppQoS inet address")
+    parser.add_argument('--workers', metavar="NUM", default=common.DEFAULT_REST_WORKERS, type=int,
+                        help="Max number of REST API requests handled concurrently")
     cmd_args = parser.parse_args()
 
     # configure syslog output
@@ -227,6 +280,17 @@ def main():
     if cmd_args.verbose:
         log.enable_verbose()
 
+    if cmd_args.workers < 1:
+        log.error("Invalid number of REST API workers, Terminating...")
+        return
+
+    # load and compile JSON schemas, once for both processes
+    try:
+        config_schema.load_validators()
+    except Exception as ex:
+        log.error(f"Failed to load JSON schemas - {ex}")
+        return
+
     # detect supported RDT interfaces
     common.PQOS_API.detect_supported_ifaces()
 
@@ -250,7 +314,8 @@ def main():
 
         # start REST API server
         server = rest_server.Server()
-        result = server.start(cmd_args.address, cmd_args.port[0], cmd_args.verbose)
+        result = server.start(cmd_args.address, cmd_args.port[0], cmd_args.verbose,
+                              cmd_args.workers)
         if result == 0:
             # run main logic
             app_qos.run()
@@ -39,7 +39,254 @@ import caps
 import common
 import log
 import power
-from pid_ops import set_affinity
+from pid_ops import get_tids, set_affinity
+
+
+class RdtState:
+    """
+    Last applied RDT (hardware) configuration.
+    Used to program only COS definitions and core associations
+    that differ from what has already been applied.
+    """
+
+
+    def __init__(self):
+        self.l3ca = {}
+        self.l2ca = {}
+        self.mba = {}
+        self.assoc = {}
+        self.pids = {}
+        self.ops_applied = 0
+        self.ops_skipped = 0
+
+
+    def reset(self):
+        """
+        Forget last applied configuration e.g.: on RDT interface change
+        or RDT reset, when hardware state is no longer known
+        """
+        self.l3ca = {}
+        self.l2ca = {}
+        self.mba = {}
+        self.assoc = {}
+        self.pids = {}
+
+
+    def reset_stats(self):
+        """
+        Reset applied/skipped operations counters
+        """
+        self.ops_applied = 0
+        self.ops_skipped = 0
+
+
+    def changed(self, table, res_ids, value):
+        """
+        Filters out resources on which value is already applied
+
+        Parameters:
+            table: last applied values, resource id to value map
+            res_ids: list of resource ids (sockets, L2 ids, cores, PIDs)
+            value: value to be applied
+
+        Returns:
+            list of resource ids for which value needs to be applied
+        """
+        res_ids_changed = [res_id for res_id in res_ids \
+            if res_id not in table or table[res_id] != value]
+        self.ops_skipped += len(res_ids) - len(res_ids_changed)
+        return res_ids_changed
+
+
+    def applied(self, table, res_ids, value):
+        """
+        Records value applied on resources
+
+        Parameters:
+            table: last applied values, resource id to value map
+            res_ids: list of resource ids (sockets, L2 ids, cores, PIDs)
+            value: applied value
+        """
+        for res_id in res_ids:
+            table[res_id] = value
+        self.ops_applied += len(res_ids)
+
+
+    @staticmethod
+    def invalidate(table, res_ids):
+        """
+        Marks value on resources as unknown e.g.: after failed operation
+
+        Parameters:
+            table: last applied values, resource id to value map
+            res_ids: list of resource ids (sockets, L2 ids, cores, PIDs)
+        """
+        for res_id in res_ids:
+            table.pop(res_id, None)
+
+
+    @staticmethod
+    def cos_table(table, cos):
+        """
+        Get last applied values of COS
+
+        Parameters:
+            table: per COS tables e.g.: self.l3ca
+            cos: Class of Service
+
+        Returns:
+            resource id to value map for COS
+        """
+        return table.setdefault(cos, {})
+
+
+RDT_STATE = RdtState()
+
+
+def alloc_assoc_set(cores, cos):
+    """
+    Assigns cores to COS, skips cores already associated with the COS
+
+    Parameters:
+        cores: list of cores to be assigned to cos
+        cos: Class of Service
+
+    Returns:
+        0 on success
+        -1 otherwise
+    """
+    cores = RDT_STATE.changed(RDT_STATE.assoc, cores, cos)
+    if not cores:
+        return 0
+
+    if common.PQOS_API.alloc_assoc_set(cores, cos) != 0:
+        RDT_STATE.invalidate(RDT_STATE.assoc, cores)
+        return -1
+
+    RDT_STATE.applied(RDT_STATE.assoc, cores, cos)
+    return 0
+
+
+def release(cores):
+    """
+    Assigns cores back to COS#0, skips cores already associated with COS#0
+
+    Parameters:
+        cores: list of cores to be released
+
+    Returns:
+        0 on success
+        -1 otherwise
+    """
+    cores = RDT_STATE.changed(RDT_STATE.assoc, cores, 0)
+    if not cores:
+        return 0
+
+    if common.PQOS_API.release(cores) != 0:
+        RDT_STATE.invalidate(RDT_STATE.assoc, cores)
+        return -1
+
+    RDT_STATE.applied(RDT_STATE.assoc, cores, 0)
+    return 0
+
+
+def alloc_assoc_set_pids(pids, cos):
+    """
+    Assigns PIDs, all their threads, to COS, skips PIDs already associated
+    with the COS. Threads of all PIDs are assigned with a single PqosApi call.
+    Processes may terminate at any time, so if that call fails PIDs are
+    assigned one by one, failures are logged and remaining PIDs are processed.
+
+    Parameters:
+        pids: list of PIDs to be assigned to cos
+        cos: Class of Service
+    """
+    pids_tids = {}
+    for pid in RDT_STATE.changed(RDT_STATE.pids, pids, cos):
+        tids = get_tids(pid)
+        if tids is None:
+            log.error(f"Failed to associate PID {pid} with COS#{cos}")
+            RDT_STATE.invalidate(RDT_STATE.pids, [pid])
+            continue
+        pids_tids[pid] = tids
+
+    if not pids_tids:
+        return
+
+    tids = [tid for pid_tids in pids_tids.values() for tid in pid_tids]
+    if common.PQOS_API.alloc_assoc_set_pids(tids, cos) == 0:
+        RDT_STATE.applied(RDT_STATE.pids, list(pids_tids), cos)
+        return
+
+    # find out which PIDs failed
+    for pid, pid_tids in pids_tids.items():
+        if common.PQOS_API.alloc_assoc_set_pids(pid_tids, cos) != 0:
+            log.error(f"Failed to associate PID {pid} with COS#{cos}")
+            RDT_STATE.invalidate(RDT_STATE.pids, [pid])
+            continue
+
+        RDT_STATE.applied(RDT_STATE.pids, [pid], cos)
+
+
+def release_pids():
+    """
+    Assigns PIDs no longer in any Pool in task mode back to COS#0
+    """
+    task_pids = set()
+    for pool in Pool.pools.values():
+        if pool.get('task_mode', False):
+            task_pids.update(pool['pids'])
+
+    pids = [pid for pid in RDT_STATE.pids if pid not in task_pids]
+    if not pids:
+        return
+
+    RDT_STATE.invalidate(RDT_STATE.pids, pids)
+
+    tids = []
+    for pid in pids:
+        tids.extend(get_tids(pid) or [])
+
+    log.debug(f"PIDs assigned to COS#0 {pids}")
+    if common.PQOS_API.release_pids(tids) != 0:
+        log.error(f"Failed to assign PIDs {pids} to COS#0")
+
+
+def cos_set(state, res_ids, cos_values, set_batch):
+    """
+    Programs COS definitions that differ from last applied ones.
+    Resources with the same set of changed COS definitions are programmed
+    together, with one library call per resource.
+
+    Parameters:
+        state: last applied per COS tables e.g.: RDT_STATE.l3ca
+        res_ids: list of resource ids (sockets, L2 ids)
+        cos_values: COS to value map
+        set_batch: PqosApi batch function, takes resource ids and COS to value map
+
+    Returns:
+        0 on success
+        -1 otherwise
+    """
+    groups = {}
+    for res_id in res_ids:
+        changed = tuple((cos, value) for cos, value in cos_values.items() \
+            if RDT_STATE.changed(RDT_STATE.cos_table(state, cos), [res_id], value))
+        if changed:
+            groups.setdefault(changed, []).append(res_id)
+
+    for changed, group_res_ids in groups.items():
+        cos_table = dict(changed)
+        if set_batch(group_res_ids, cos_table) != 0:
+            for cos in cos_table:
+                RDT_STATE.invalidate(RDT_STATE.cos_table(state, cos), group_res_ids)
+            return -1
+
+        for cos, value in cos_table.items():
+            RDT_STATE.applied(RDT_STATE.cos_table(state, cos), group_res_ids, value)
+
+    return 0
+
 
 class Apps:
     """
@@ -61,15 +308,7 @@ class Apps:
             if 'pids' not in app:
                 continue
 
-            app_cores = app['cores'] if 'cores' in app else []
-            pool_id = common.CONFIG_STORE.app_to_pool(app['id'])
-            pool_cores = common.CONFIG_STORE.get_pool_attr('cores', pool_id)
-
-            # if there are no cores configured for App, or cores configured are
-            # not a subset of Pool cores, revert to all Pool cores
-            if not app_cores or not set(app_cores).issubset(pool_cores):
-                app_cores = pool_cores
-
+            app_cores = Apps.cores_get(app)
             if not app_cores:
                 continue
 
@@ -78,6 +317,32 @@ class Apps:
         return 0
 
 
+    @staticmethod
+    def cores_get(app):
+        """
+        Get cores App's PIDs are to be affined to
+
+        Parameters:
+            app: App configuration
+
+        Returns:
+            list of cores, None if App's Pool is in task mode (PIDs are not affined)
+        """
+        app_cores = app['cores'] if 'cores' in app else []
+        pool_id = common.CONFIG_STORE.app_to_pool(app['id'])
+        if common.CONFIG_STORE.get_pool_attr('task_mode', pool_id):
+            return None
+
+        pool_cores = common.CONFIG_STORE.get_pool_attr('cores', pool_id)
+
+        # if there are no cores configured for App, or cores configured are
+        # not a subset of Pool cores, revert to all Pool cores
+        if not app_cores or not set(app_cores).issubset(pool_cores):
+            app_cores = pool_cores
+
+        return app_cores
+
+
 class Pool:
     # pylint: disable=too-many-public-methods
     """
@@ -225,8 +490,14 @@ class Pool:
         Configure Pool, based on config content.
         """
         config = common.CONFIG_STORE
+
+        # in task mode, Apps' PIDs are associated with Pool's COS,
+        # cores are shared and not associated with Pool's COS
+        task_mode = bool(config.get_pool_attr('task_mode', self.pool))
+        Pool.pools[self.pool]['task_mode'] = task_mode
+
         cores = config.get_pool_attr('cores', self.pool)
-        self.cores_set(cores)
+        self.cores_set([] if task_mode else cores)
 
         if caps.cat_l2_supported():
             l2cbm = config.get_pool_attr('l2cbm', self.pool)
@@ -255,7 +526,7 @@ class Pool:
 
             self.pids_set(pids)
 
-        return Pool.apply(self.pool)
+        return 0
 
 
     def pids_set(self, pids):
@@ -297,8 +568,9 @@ class Pool:
 
         Pool.pools[self.pool]['pids'] = pids
 
-        # set affinity of removed pids to default
-        if removed_pids:
+        # set affinity of removed pids to default,
+        # PIDs of Pool in task mode are not affined
+        if removed_pids and not Pool.pools[self.pool].get('task_mode', False):
             log.debug(f"PIDs to be set to core affinity to 'Default' CPUs {removed_pids}")
 
             # get cores for Default Pool #0
@@ -332,7 +604,7 @@ class Pool:
         Pool.pools[self.pool]['cores'] = cores
 
         # updated RDT configuration
-        common.PQOS_API.alloc_assoc_set(cores, self.pool)
+        alloc_assoc_set(cores, self.pool)
 
         # process list of removed cores
         # pylint: disable=consider-using-dict-items
@@ -352,7 +624,7 @@ class Pool:
         # Finally assign removed cores back to COS0/"Default" Pool
         if removed_cores:
             log.debug(f"Cores assigned to COS#0 {removed_cores}")
-            common.PQOS_API.release(removed_cores)
+            release(removed_cores)
 
         # Reset power profile settings
         if caps.sstcp_enabled() and removed_cores:
@@ -370,44 +642,50 @@ class Pool:
 
 
     @staticmethod
-    def apply(pool_id):
+    def apply(pool_ids):
         # pylint: disable=too-many-return-statements
         # pylint: disable=too-many-branches
         """
-        Apply RDT configuration for Pool
+        Apply RDT configuration for Pools.
+        COS definitions of all Pools are programmed with one libpqos call
+        per socket/L2 cache id for each technology.
 
         Parameters:
-            pool_id: Pool to apply RDT config for
+            pool_ids: list of Pools to apply RDT config for
 
         Returns:
             0 on success
             -1 otherwise
         """
         # configure RDT
-        if pool_id not in Pool.pools:
-            return -1
-
-        pool = Pool(pool_id)
+        for pool_id in pool_ids:
+            if pool_id not in Pool.pools:
+                return -1
 
         l3cdp = common.CONFIG_STORE.get_l3cdp_enabled()
-        l3cbm = None
-        l3cbm_data = None
-        l3cbm_code = None
-        if l3cdp:
-            l3cbm_data = pool.l3cbm_get_data()
-            l3cbm_code = pool.l3cbm_get_code()
-        else:
-            l3cbm = pool.l3cbm_get()
-        l2cbm = pool.l2cbm_get()
-
-        mba = None
         ctrl = common.CONFIG_STORE.get_mba_ctrl_enabled()
-        if ctrl:
-            mba = pool.mba_bw_get()
-        else:
-            mba = pool.mba_get()
 
-        cores = pool.cores_get()
+        # pool id to COS, 1:1 mapping
+        l3ca = {}
+        l2ca = {}
+        mba = {}
+        for pool_id in pool_ids:
+            pool = Pool(pool_id)
+
+            if l3cdp:
+                l3cbm_code = pool.l3cbm_get_code()
+                l3cbm_data = pool.l3cbm_get_data()
+                if l3cbm_code and l3cbm_data:
+                    l3ca[pool_id] = (l3cbm_code, l3cbm_data)
+            elif pool.l3cbm_get():
+                l3ca[pool_id] = pool.l3cbm_get()
+
+            if pool.l2cbm_get():
+                l2ca[pool_id] = pool.l2cbm_get()
+
+            pool_mba = pool.mba_bw_get() if ctrl else pool.mba_get()
+            if pool_mba:
+                mba[pool_id] = pool_mba
 
         # Apply same RDT configuration on all sockets in the system
         sockets = common.PQOS_API.get_sockets()
@@ -415,32 +693,38 @@ class Pool:
             log.error("Failed to get sockets info!")
             return -1
 
-        # pool id to COS, 1:1 mapping
-        if l2cbm:
-            if common.PQOS_API.l2ca_set(common.PQOS_API.get_l2ids(), pool_id, l2cbm) != 0:
-                log.error("Failed to apply L2 CAT configuration!")
+        if l2ca:
+            l2ids = common.PQOS_API.get_l2ids()
+            if l2ids is None:
+                log.error("Failed to get L2 ids info!")
                 return -1
 
-        log.error(f"===> pool_id={pool_id} cbm={l3cbm} code={l3cbm_code} data={l3cbm_data}")
-        if l3cbm:
-            if common.PQOS_API.l3ca_set(sockets, pool_id, mask=l3cbm) != 0:
-                log.error("Failed to apply CAT configuration!")
+            if cos_set(RDT_STATE.l2ca, l2ids, l2ca, common.PQOS_API.l2ca_set_batch) != 0:
+                log.error("Failed to apply L2 CAT configuration!")
                 return -1
-        elif l3cbm_code and l3cbm_data:
-            if common.PQOS_API.l3ca_set(sockets, pool_id, code_mask=l3cbm_code, \
-                                        data_mask=l3cbm_data) != 0:
-                log.error("Failed to apply L3 CDP configuration!")
+
+        if l3ca:
+            if cos_set(RDT_STATE.l3ca, sockets, l3ca, common.PQOS_API.l3ca_set_batch) != 0:
+                log.error(f"Failed to apply {'L3 CDP' if l3cdp else 'CAT'} configuration!")
                 return -1
 
         if mba:
-            if common.PQOS_API.mba_set(sockets, pool_id, mba, ctrl) != 0:
+            def mba_set_batch(sockets, cos_table):
+                return common.PQOS_API.mba_set_batch(sockets, cos_table, ctrl)
+
+            if cos_set(RDT_STATE.mba, sockets, mba, mba_set_batch) != 0:
                 log.error("Failed to apply MBA configuration!")
                 return -1
 
-        if cores:
-            if common.PQOS_API.alloc_assoc_set(cores, pool_id) != 0:
-                log.error("Failed to associate RDT COS!")
-                return -1
+        for pool_id in pool_ids:
+            cores = Pool(pool_id).cores_get()
+            if cores:
+                if alloc_assoc_set(cores, pool_id) != 0:
+                    log.error("Failed to associate RDT COS!")
+                    return -1
+
+            if Pool.pools[pool_id].get('task_mode', False):
+                alloc_assoc_set_pids(Pool(pool_id).pids_get(), pool_id)
 
         return 0
 
@@ -486,6 +770,7 @@ def configure_rdt():
 
         Returns:
             False nothing changed
+            True RDT features reset
         """
 
         l3cdp_cfg = "any"
@@ -520,12 +805,17 @@ def configure_rdt():
 
             log.info(f"RDT MBA BW {'en' if common.PQOS_API.is_mba_bw_enabled() else 'dis'}abled.")
             log.info(f"RDT L3 CDP {'en' if common.PQOS_API.is_l3_cdp_enabled() else 'dis'}abled.")
+            return True
+
+        return False
 
     try:
-        if rdt_interface():
-            recreate_default = True
-        if rdt_reset():
-            recreate_default = True
+        with common.TRACER.span('rdt_interface'):
+            if rdt_interface():
+                recreate_default = True
+        with common.TRACER.span('rdt_reset'):
+            if rdt_reset():
+                recreate_default = True
 
     except Exception as ex:
         log.error(str(ex))
@@ -534,6 +824,10 @@ def configure_rdt():
     if recreate_default:
         # On interface or MBA BW state change it is needed to recreate Default Pool #0
         common.CONFIG_STORE.recreate_default_pool()
+        # hardware state changed, program all COS and associations again
+        RDT_STATE.reset()
+
+    RDT_STATE.reset_stats()
 
     # detect removed pools
     old_pools = Pool.pools.copy()
@@ -558,11 +852,22 @@ def configure_rdt():
 
     # Configure Pools, Intel RDT (CAT, MBA)
     for pool_id in Pool.pools:
-        result = Pool(pool_id).configure()
+        result = common.TRACER.call('pool_configure', Pool(pool_id).configure)
         if result != 0:
             return result
 
+    # Program RDT for all Pools at once
+    result = common.TRACER.call('pool_apply', Pool.apply, list(Pool.pools))
+    if result != 0:
+        return result
+
+    with common.TRACER.span('release_pids'):
+        release_pids()
+
+    log.debug(f"RDT operations applied: {RDT_STATE.ops_applied}, " \
+              f"skipped (already applied): {RDT_STATE.ops_skipped}")
+
     # Configure Apps, core affinity
-    result = Apps().configure()
+    result = common.TRACER.call('apps_configure', Apps().configure)
 
     return result
@@ -41,6 +41,8 @@ import os
 import pqos_api # pylint: disable=cyclic-import
 import config # pylint: disable=cyclic-import
 import stats # pylint: disable=cyclic-import
+import monitor # pylint: disable=cyclic-import
+import tracing
 
 
 CONFIG_FILENAME = "appqos.conf"
@@ -51,12 +53,22 @@ MBA_CAP = "mba"
 SSTBF_CAP = "sstbf"
 POWER_CAP = "power"
 
-RATE_LIMIT = 10 # rate limit of configuration changes in HZ
+
+DEFAULT_REST_WORKERS = 16 # max number of REST API requests handled concurrently
+REST_KEEPALIVE_TIMEOUT = 5 # idle HTTP keep-alive connection timeout in seconds
+REST_WATCH_CONNECTIONS = 64 # max number of watch and wait connections, not limited by workers
+REST_WATCH_STREAMS = 16 # max number of watch event streams
+
+CONFIG_STORE_SIZE = 16 * 1024 * 1024 # max size of serialized configuration in bytes
+METRICS_STORE_SIZE = 16 * 1024 * 1024 # max size of serialized monitoring samples in bytes
+TRACES_SIZE = 4 * 1024 * 1024 # max size of serialized apply traces in bytes
 
 MANAGER = multiprocessing.Manager()
 CONFIG_STORE = config.ConfigStore()
 STATS_STORE = stats.StatsStore()
+METRICS_STORE = monitor.MetricsStore()
 PQOS_API = pqos_api.PqosApi()
+TRACER = tracing.Tracer(TRACES_SIZE)
 
 
 def check_link(path, flags):
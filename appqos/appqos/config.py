@@ -34,16 +34,19 @@
 Module handling config file
 """
 
+from copy import deepcopy
 import json
-from os.path import join, dirname
 import re
-import jsonschema
 
 import caps
 import common
+from config_index import ConfigIndex
+import config_schema
+import config_sync
 import log
 import pid_ops
 import power
+import snapshot
 
 
 class ConfigStore:
@@ -52,12 +55,46 @@ class ConfigStore:
     Class to handle config file operations
     """
 
+    validate_schema = staticmethod(config_schema.validate_schema)
+
 
     def __init__(self):
-        self.namespace = common.MANAGER.Namespace()
-        self.namespace.config = {}
-        self.namespace.path = None
-        self.changed_event = common.MANAGER.Event()
+        # configuration shared (via shared memory) between REST API process and "backend"
+        self.snapshot = snapshot.SharedSnapshot(common.CONFIG_STORE_SIZE)
+        self.snapshot.write({})
+        self.path = None
+
+        # (version, index) of shared configuration, replaced at once as threads share it
+        self.index = None
+
+        # used to notify "backend" about configuration changes,
+        # created before REST API server process is forked so both processes share it
+        self.changed = config_sync.Notifier()
+
+        # status of configuration applied by "backend"
+        self.applied = config_sync.ApplyStatus()
+
+        # used to wake up REST API requests waiting for configuration status change
+        self.status_changed = config_sync.Notifier()
+
+
+    def get_index(self):
+        """
+        Get index of shared configuration,
+        built once per configuration version
+
+        Returns:
+            ConfigIndex
+        """
+        index = self.index
+        if index is not None and index[0] == self.get_config_version():
+            return index[1]
+
+        # version is read first, so index is never older than its version
+        index = (self.get_config_version(), ConfigIndex(self.get_config()))
+        self.index = index
+
+        return index[1]
 
 
     def get_pool_attr(self, attr, pool_id):
@@ -72,15 +109,15 @@ class ConfigStore:
             attribute value or None
         """
 
-        data = self.get_config()
+        index = self.get_index()
 
         if pool_id is not None:
-            for pool in data['pools']:
-                if pool['id'] == pool_id:
-                    return pool.get(attr)
+            pool = index.pools.get(pool_id)
+            if pool is not None:
+                return pool.get(attr)
         else:
             result = []
-            for pool in data['pools']:
+            for pool in index.data['pools']:
                 if attr in pool:
                     if isinstance(pool[attr], list):
                         result.extend(pool[attr])
@@ -104,12 +141,9 @@ class ConfigStore:
             attribute value or None
         """
 
-        data = self.get_config()
-
-        for app in data['apps']:
-            if app['id'] == app_id:
-                if attr in app:
-                    return app[attr]
+        app = self.get_index().apps.get(app_id)
+        if app is not None:
+            return app.get(attr)
 
         return None
 
@@ -172,7 +206,7 @@ class ConfigStore:
         Parameters:
             path: path to config file
         """
-        self.namespace.path = path
+        self.path = path
 
 
     def get_path(self):
@@ -182,7 +216,7 @@ class ConfigStore:
         Returns:
             path: path to config file
         """
-        return self.namespace.path
+        return self.path
 
 
     def reset(self):
@@ -191,7 +225,7 @@ class ConfigStore:
         """
 
         self.from_file(self.get_path())
-        self.process_config()
+        self.process_config(urgent=True)
 
 
     @staticmethod
@@ -270,77 +304,93 @@ class ConfigStore:
         """
 
         # validates config schema
-        schema, resolver = ConfigStore.load_json_schema('appqos.json')
-        jsonschema.validate(data, schema, resolver=resolver)
+        ConfigStore.validate_schema(data, 'appqos.json')
+
+        index = ConfigIndex(data)
 
-        ConfigStore._validate_pools(data)
-        ConfigStore._validate_apps(data)
+        ConfigStore._validate_pools(data, index)
+        ConfigStore._validate_apps(data, index)
         ConfigStore._validate_rdt(data)
         power.validate_power_profiles(data, power_admission_control)
 
 
     @staticmethod
-    def _validate_pools(data):
+    def _validate_pools(data, index):
         """
         Validate Pools configuration
 
         Parameters
             data: configuration (dict)
+            index: configuration index
         """
         if not 'pools' in data:
             return
 
         # verify pools
         cores = set()
-        pool_ids = []
+        pool_ids = set()
 
         for pool in data['pools']:
             # id
             if pool['id'] in pool_ids:
                 raise ValueError(f"Pool {pool['id']}, multiple pools with same id.")
-            pool_ids.append(pool['id'])
+            pool_ids.add(pool['id'])
 
             # pool cores
             for core in pool['cores']:
                 if not common.PQOS_API.check_core(core):
                     raise ValueError(f"Pool {pool['id']}, Invalid core {core}.")
 
-            if cores.intersection(pool['cores']):
-                raise ValueError(f"Pool {pool['id']}, " \
-                    f"Cores {cores.intersection(pool['cores'])} already assigned to another pool.")
+            # in task mode, cores are shared with other pools
+            if pool.get('task_mode', False):
+                if ConfigStore.get_rdt_iface(data) != "os":
+                    raise ValueError(f"Pool {pool['id']}, task mode requires 'os' RDT interface.")
+            else:
+                if cores.intersection(pool['cores']):
+                    raise ValueError(f"Pool {pool['id']}, Cores " \
+                        f"{cores.intersection(pool['cores'])} already assigned to another pool.")
 
-            cores |= set(pool['cores'])
+                cores |= set(pool['cores'])
 
             # check app reference
             if 'apps' in pool:
                 for app_id in pool['apps']:
-                    ConfigStore.get_app(data, app_id)
+                    if app_id not in index.apps:
+                        raise KeyError(f"App {app_id} does not exist.")
 
             # check power profile reference
             if 'power_profile' in pool:
-                ConfigStore.get_power(data, pool['power_profile'])
+                if pool['power_profile'] not in index.power_profiles:
+                    raise KeyError(f"Power profile {pool['power_profile']} does not exists")
 
 
     @staticmethod
-    def _validate_apps(data):
+    def _validate_apps(data, index):
         """
         Validate Apps configuration
 
         Parameters
             data: configuration (dict)
+            index: configuration index
         """
         if not 'apps' in data:
             return
 
+        # app's pool validation, apps assigned to more than one pool
+        for pool in data['pools']:
+            for app_id in pool.get('apps', []):
+                if index.app_to_pool[app_id] != pool['id']:
+                    raise ValueError(f"App {app_id}, Assigned to more than one pool.")
+
         # verify apps
         pids = set()
-        app_ids = []
+        app_ids = set()
 
         for app in data['apps']:
             # id
             if app['id'] in app_ids:
                 raise ValueError(f"App {app['id']}, multiple apps with same id.")
-            app_ids.append(app['id'])
+            app_ids.add(app['id'])
 
             # app's cores validation
             if 'cores' in app:
@@ -349,16 +399,11 @@ class ConfigStore:
                         raise ValueError(f"App {app['id']}, Invalid core {core}.")
 
             # app's pool validation
-            app_pool = None
-            for pool in data['pools']:
-                if 'apps' in pool and app['id'] in pool['apps']:
-                    if app_pool:
-                        raise ValueError(f"App {app['id']}, Assigned to more than one pool.")
-                    app_pool = pool
-
-            if app_pool is None:
+            if app['id'] not in index.app_to_pool:
                 raise ValueError(f"App {app['id']} not assigned to any pool.")
 
+            app_pool = index.pools[index.app_to_pool[app['id']]]
+
             if 'cores' in app:
                 diff_cores = set(app['cores']).difference(app_pool['cores'])
                 if diff_cores:
@@ -482,14 +527,18 @@ class ConfigStore:
             path: path to config file
         """
         self.set_path(path)
-        self.namespace.config = self.load(path)
+        self.snapshot.write(self.load(path))
+        self.status_changed.notify()
 
 
-    def process_config(self):
+    def process_config(self, urgent=False):
         """
         Processes/validates config
+
+        Parameters:
+            urgent: apply configuration without waiting for further changes
         """
-        data = self.get_config()
+        data = deepcopy(self.get_config())
 
         if not self.is_default_pool_defined(data):
             self.add_default_pool(data)
@@ -498,29 +547,7 @@ class ConfigStore:
 
         self.validate(data, power_admission_check_cfg)
 
-        self.set_config(data)
-
-
-    @staticmethod
-    def load_json_schema(filename):
-        """
-        Loads the given schema file
-
-        Parameters:
-            filename: path to JSON schema file
-        Returns:
-            schema: schema
-            resolver: resolver
-        """
-        # find path to schema
-        relative_path = join('schema', filename)
-        absolute_path = join(dirname(__file__), relative_path)
-        # path to all schema files
-        schema_path = 'file:' + str(join(dirname(__file__), 'schema')) + '/'
-        with open(absolute_path, opener=common.check_link, encoding='UTF-8') as schema_file:
-            # add resolver for python to find all schema files
-            schema = json.loads(schema_file.read())
-            return schema, jsonschema.RefResolver(schema_path, schema)
+        self.set_config(data, urgent=urgent)
 
 
     @staticmethod
@@ -539,8 +566,7 @@ class ConfigStore:
             data = json.loads(raw_data.replace('\r\n', '\\r\\n'))
 
             # validates config schema from config file
-            schema, resolver = ConfigStore.load_json_schema('appqos.json')
-            jsonschema.validate(data, schema, resolver=resolver)
+            ConfigStore.validate_schema(data, 'appqos.json')
 
             # convert cbm to int
             for pool in data['pools']:
@@ -572,13 +598,7 @@ class ConfigStore:
         if not pid:
             return None
 
-        data = self.get_config()
-        for app in data['apps']:
-            if not ('id' in app and 'pids' in app):
-                continue
-            if pid in app['pids']:
-                return app['id']
-        return None
+        return self.get_index().pid_to_app.get(pid)
 
 
     def app_to_pool(self, app):
@@ -593,13 +613,8 @@ class ConfigStore:
         """
         if not app:
             return None
-        data = self.get_config()
-        for pool in data['pools']:
-            if not ('id' in pool and 'apps' in pool):
-                continue
-            if app in pool['apps']:
-                return pool['id']
-        return None
+
+        return self.get_index().app_to_pool.get(app)
 
 
     def pid_to_pool(self, pid):
@@ -616,25 +631,71 @@ class ConfigStore:
         return self.app_to_pool(app_id)
 
 
-    def set_config(self, data):
+    def set_config(self, data, version=None, urgent=False):
         """
-        Set shared (via IPC, namespace) configuration
+        Set shared (via shared memory snapshot) configuration
 
         Parameters:
             data: new configuration
+            version: configuration version data is based on,
+                     if provided configuration is set only if not changed since
+            urgent: apply configuration without waiting for further changes
+
+        Returns:
+            new configuration version,
+            None if configuration has changed since given version
+        """
+
+        new_version = self.snapshot.write(data, version)
+        if new_version is not None:
+            self.notify(urgent)
+            self.status_changed.notify()
+
+        return new_version
+
+
+    def update_config(self, data, version):
+        """
+        Set shared configuration if it has not changed since given version.
+        Used by "backend" to store changes it has already applied itself,
+        so only status change is notified.
+
+        Parameters:
+            data: new configuration
+            version: configuration version data is based on
+
+        Returns:
+            new configuration version,
+            None if configuration changed in the meantime
         """
 
-        self.namespace.config = data
-        self.changed_event.set()
+        new_version = self.snapshot.write(data, version)
+        if new_version is not None:
+            self.status_changed.notify()
+
+        return new_version
 
 
     def get_config(self):
         """
-        Get shared (via IPC, namespace) configuration
+        Get shared (via shared memory snapshot) configuration.
+        Configuration is deserialized once per version,
+        returned object must not be modified, use deepcopy.
+
         Returns:
             shared configuration (dict)
         """
-        return self.namespace.config
+        return self.snapshot.read()
+
+
+    def get_config_version(self):
+        """
+        Get shared configuration version
+
+        Returns:
+            configuration version, incremented on every change
+        """
+        return self.snapshot.version()
 
 
     def get_power_profile(self, power_profile_id):
@@ -644,27 +705,74 @@ class ConfigStore:
         Parameters:
             power_profile_id: id of power profile
         """
-        config = self.get_config()
+        profile = self.get_index().power_profiles.get(power_profile_id)
+        if profile is None:
+            raise KeyError(f"Power profile {power_profile_id} does not exists")
+
+        return profile
+
+
+    def notify(self, urgent=False):
+        """
+        Mark shared configuration as changed, wakes up process
+        blocked in is_config_changed
+
+        Parameters:
+            urgent: change is to be applied without waiting for further changes
+        """
+        self.changed.notify(config_sync.CHANGE_URGENT if urgent else config_sync.CHANGE_NORMAL)
 
-        return self.get_power(config, power_profile_id)
 
+    def is_config_changed(self, timeout=None):
+        """
+        Check was shared configuration marked as changed,
+        blocks until change is notified or timeout expires
+
+        Parameters:
+            timeout: time to wait for notification in seconds,
+                     None to wait indefinitely
+
+        Returns:
+            0 if not changed, CHANGE_URGENT if any of changes is urgent,
+            CHANGE_NORMAL otherwise
+        """
+        return self.changed.wait(timeout)
 
-    def is_config_changed(self):
+
+    def set_applied(self, version, result, error=None):
         """
-        Check was shared configuration marked as changed
+        Mark configuration as applied by "backend"
+
+        Parameters:
+            version: applied configuration version
+            result: 0 on success, -1 otherwise
+            error: error message if apply failed
+        """
+        self.applied.set(version, result, error)
+        self.status_changed.notify()
+
+
+    def get_status(self):
+        """
+        Get configuration and applied configuration status
 
         Returns:
-            result
+            status, "id" is incremented on every configuration change and apply
         """
-        try:
-            self.changed_event.wait(0.1)
-            result = self.changed_event.is_set()
-            if result:
-                self.changed_event.clear()
-        except IOError:
-            result = False
+        return self.applied.get(self.get_config_version())
 
-        return result
+
+    def get_generation_status(self, generation):
+        """
+        Get apply status of configuration generation (version)
+
+        Parameters:
+            generation: configuration generation
+
+        Returns:
+            GENERATION_APPLIED, GENERATION_FAILED or GENERATION_PENDING, error message
+        """
+        return self.applied.get_generation(generation)
 
 
     def is_any_pool_defined(self):
@@ -675,32 +783,30 @@ class ConfigStore:
         Returns:
             result
         """
-        config = self.get_config()
-
-        if 'pools' not in config:
-            return False
-
-        for pool in config['pools']:
-            if not pool['id'] == 0:
-                return True
-
-        return False
+        return any(pool_id != 0 for pool_id in self.get_index().pools)
 
 
     def recreate_default_pool(self):
         """
-        Recreate Default pool
+        Recreate Default pool, retried if configuration is changed in the meantime.
+        Change is notified, so new configuration version is applied
+        (and reported as applied) by "backend".
+
+        Returns:
+            new configuration version
         """
-        # not using get_config/set_config pair
-        # not to trigger "changed_event"
-        config = self.namespace.config
+        while True:
+            version = self.get_config_version()
+            config = deepcopy(self.get_config())
 
-        if ConfigStore.is_default_pool_defined(config):
-            ConfigStore.remove_default_pool(config)
+            if ConfigStore.is_default_pool_defined(config):
+                ConfigStore.remove_default_pool(config)
 
-        ConfigStore.add_default_pool(config)
+            ConfigStore.add_default_pool(config)
 
-        self.namespace.config = config
+            new_version = self.set_config(config, version, urgent=True)
+            if new_version is not None:
+                return new_version
 
 
     @staticmethod
@@ -748,9 +854,11 @@ class ConfigStore:
             default_pool['l2cbm'] = common.PQOS_API.get_max_l2_cat_cbm()
         default_pool['name'] = "Default"
 
-        # Use all unallocated cores
+        # Use all unallocated cores, cores of pools in task mode are shared
         default_pool['cores'] = common.PQOS_API.get_cores()
         for pool in data['pools']:
+            if pool.get('task_mode', False):
+                continue
             default_pool['cores'] = \
                 [core for core in default_pool['cores'] if core not in pool['cores']]
 
@@ -771,10 +879,14 @@ class ConfigStore:
                 break
 
 
-    def get_new_pool_id(self, new_pool_data):
+    def get_new_pool_id(self, new_pool_data, data=None):
         """
         Get ID for new Pool
 
+        Parameters:
+            new_pool_data: new Pool
+            data: configuration (dict), shared configuration if not provided
+
         Returns:
             ID for new Pool
         """
@@ -788,12 +900,9 @@ class ConfigStore:
             alloc_type.append(common.CAT_L3_CAP)
         max_cos_id = common.PQOS_API.get_max_cos_id(alloc_type)
 
-        data = self.get_config()
-
-        # put all pool ids into list
-        pool_ids = []
-        for pool in data['pools']:
-            pool_ids.append(pool['id'])
+        # all pool ids
+        index = self.get_index() if data is None else ConfigIndex(data)
+        pool_ids = list(index.pools)
 
         # no pool found in config, return highest id
         if not pool_ids:
@@ -808,21 +917,20 @@ class ConfigStore:
         return None
 
 
-    def get_new_app_id(self):
+    def get_new_app_id(self, data=None):
         """
         Get ID for new App
 
+        Parameters:
+            data: configuration (dict), shared configuration if not provided
+
         Returns:
             ID for new App
         """
 
-        data = self.get_config()
-
-        # put all ids into list
-        app_ids = []
-        for app in data['apps']:
-            app_ids.append(app['id'])
-        app_ids = sorted(app_ids)
+        # all app ids
+        index = self.get_index() if data is None else ConfigIndex(data)
+        app_ids = sorted(index.apps)
         # no app found in config
         if not app_ids:
             return 1
@@ -836,15 +944,19 @@ class ConfigStore:
         return app_ids[-1] + 1
 
 
-    def get_new_power_profile_id(self):
+    def get_new_power_profile_id(self, data=None):
         """
         Get ID for new Power Profile
 
+        Parameters:
+            data: configuration (dict), shared configuration if not provided
+
         Returns:
             ID for new Power Profile
         """
 
-        data = self.get_config()
+        if data is None:
+            data = self.get_config()
 
         # no profile found in config
         if 'power_profiles' not in data:
@@ -0,0 +1,81 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Config index module
+Index of configuration for O(1) lookups
+"""
+
+
+class ConfigIndex:
+    # pylint: disable=too-few-public-methods
+    """
+    Index of configuration, provides O(1) lookups of pools, apps, PIDs and cores.
+    Indexed dicts reference configuration objects (not copies).
+    """
+
+
+    def __init__(self, data):
+        """
+        Constructor, builds index
+
+        Parameters:
+            data: configuration (dict)
+        """
+        self.data = data
+
+        self.pools = {}
+        self.apps = {}
+        self.power_profiles = {}
+
+        self.app_to_pool = {}
+        self.pid_to_app = {}
+        self.core_to_pool = {}
+
+        # in case of duplicates, first entry wins
+        for pool in data.get('pools', []):
+            self.pools.setdefault(pool['id'], pool)
+            for app_id in pool.get('apps', []):
+                self.app_to_pool.setdefault(app_id, pool['id'])
+            for core in pool.get('cores', []):
+                self.core_to_pool.setdefault(core, pool['id'])
+
+        for app in data.get('apps', []):
+            if 'id' not in app:
+                continue
+            self.apps.setdefault(app['id'], app)
+            for pid in app.get('pids', []):
+                self.pid_to_app.setdefault(pid, app['id'])
+
+        for profile in data.get('power_profiles', []):
+            self.power_profiles.setdefault(profile['id'], profile)
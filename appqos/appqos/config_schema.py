@@ -0,0 +1,112 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Config schema module
+Loading of JSON schemas and validation of configuration and REST API requests
+"""
+
+import functools
+import json
+import os
+from os.path import join, dirname
+import jsonschema
+
+import common
+
+
+def load_json_schema(filename):
+    """
+    Loads the given schema file
+
+    Parameters:
+        filename: path to JSON schema file
+    Returns:
+        schema: schema
+        resolver: resolver
+    """
+    # find path to schema
+    relative_path = join('schema', filename)
+    absolute_path = join(dirname(__file__), relative_path)
+    # path to all schema files
+    schema_path = 'file:' + str(join(dirname(__file__), 'schema')) + '/'
+    with open(absolute_path, opener=common.check_link, encoding='UTF-8') as schema_file:
+        # add resolver for python to find all schema files
+        schema = json.loads(schema_file.read())
+        return schema, jsonschema.RefResolver(schema_path, schema)
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(filename):
+    """
+    Gets validator for the given schema file.
+    Schema is loaded, checked and its references resolved once,
+    validator is cached and reused for all subsequent validations
+
+    Parameters:
+        filename: JSON schema file name
+    Returns:
+        validator
+    """
+    schema, resolver = load_json_schema(filename)
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema, resolver=resolver)
+
+
+def load_validators():
+    """
+    Loads validators for all schema files,
+    to be called at startup, before REST API process is forked
+    """
+    schema_dir = join(dirname(__file__), 'schema')
+    for filename in sorted(os.listdir(schema_dir)):
+        if filename.endswith('.json'):
+            get_validator(filename)
+
+
+def validate_schema(data, filename):
+    """
+    Validates data against the given schema file,
+    equivalent of jsonschema.validate with cached validator
+
+    Parameters:
+        data: data to be validated
+        filename: JSON schema file name
+    Raises:
+        jsonschema.ValidationError
+    """
+    validator = get_validator(filename)
+    error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+    if error is not None:
+        raise error
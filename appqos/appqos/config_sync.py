@@ -0,0 +1,241 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Config sync module
+Configuration change notifications and apply status
+shared between REST API process and "backend"
+"""
+
+import ctypes
+import multiprocessing
+import os
+import select
+
+# configuration change notifications, see ConfigStore.is_config_changed
+CHANGE_NORMAL = 1
+CHANGE_URGENT = 2
+
+# max size of configuration apply error message in bytes
+APPLY_ERROR_SIZE = 1024
+
+# configuration generation apply statuses, see ConfigStore.get_generation_status
+GENERATION_APPLIED = 'applied'
+GENERATION_FAILED = 'failed'
+GENERATION_PENDING = 'pending'
+
+
+class Notifier:
+    """
+    Notifications passed between processes via non-blocking pipe.
+    Pending notifications are coalesced by receiver.
+
+    NOTE: Object has to be created before child processes are forked.
+    """
+
+
+    def __init__(self):
+        self.fd_r, self.fd_w = os.pipe()
+        os.set_blocking(self.fd_r, False)
+        os.set_blocking(self.fd_w, False)
+        self.poll = None
+
+
+    def fileno(self):
+        """
+        Get file descriptor readable when notifications are pending
+
+        Returns:
+            file descriptor
+        """
+        return self.fd_r
+
+
+    def notify(self, value=CHANGE_NORMAL):
+        """
+        Send notification, never blocks
+
+        Parameters:
+            value: notification value (1-255)
+        """
+        try:
+            os.write(self.fd_w, bytes([value]))
+        except BlockingIOError:
+            # pipe is full, notification is already pending
+            pass
+
+
+    def consume(self):
+        """
+        Consume all pending notifications, never blocks
+
+        Returns:
+            max value of pending notifications, 0 if none
+        """
+        result = 0
+        while True:
+            try:
+                data = os.read(self.fd_r, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            result = max(result, *data)
+
+        return result
+
+
+    def wait(self, timeout=None):
+        """
+        Wait for notifications and consume them
+
+        Parameters:
+            timeout: time to wait in seconds, None to wait indefinitely
+
+        Returns:
+            max value of pending notifications, 0 if none
+        """
+        if self.poll is None:
+            self.poll = select.poll()
+            self.poll.register(self.fd_r, select.POLLIN)
+
+        try:
+            if not self.poll.poll(None if timeout is None else timeout * 1000):
+                return 0
+            return self.consume()
+        except OSError:
+            return 0
+
+
+class AppliedState(ctypes.Structure):
+    # pylint: disable=too-few-public-methods
+    """
+    Status of configuration applied by "backend", kept in shared memory
+    """
+    _fields_ = [
+        ('applies', ctypes.c_int64),
+        ('version', ctypes.c_int64),
+        ('result', ctypes.c_int64),
+        ('successes', ctypes.c_int64),
+        ('last_applied', ctypes.c_int64),
+        ('error', ctypes.c_char * APPLY_ERROR_SIZE)
+    ]
+
+
+class ApplyStatus:
+    """
+    Status of configuration applied by "backend"
+
+    NOTE: Object has to be created before child processes are forked.
+    """
+
+
+    def __init__(self):
+        # number of applies, last applied configuration version and result,
+        # number of successful applies, last successfully applied version, last error
+        self.state = multiprocessing.Value(AppliedState)
+
+
+    def set(self, version, result, error=None):
+        """
+        Record configuration apply
+
+        Parameters:
+            version: applied configuration version
+            result: 0 on success, -1 otherwise
+            error: error message if apply failed
+        """
+        if result != 0 and not error:
+            error = "Failed to apply configuration"
+
+        error = (error or '').encode('utf-8')[:APPLY_ERROR_SIZE - 1]
+
+        with self.state.get_lock():
+            state = self.state
+            state.applies += 1
+            state.version = version
+            state.result = result
+            if result == 0:
+                state.successes += 1
+                state.last_applied = version
+            state.error = error
+
+
+    def get(self, version):
+        """
+        Get configuration and applied configuration status
+
+        Parameters:
+            version: current configuration version
+
+        Returns:
+            status, "id" is incremented on every configuration change and apply
+        """
+        with self.state.get_lock():
+            state = self.state
+            applies, successes = state.applies, state.successes
+            applied_version, result, last_applied = \
+                state.version, state.result, state.last_applied
+            error = state.error.decode('utf-8', 'replace')
+
+        return {
+            'id': version + applies,
+            'version': version,
+            'applied_version': applied_version if applies else None,
+            'applied': result == 0 if applies else None,
+            'last_applied_generation': last_applied if successes else None,
+            'error': error or None
+        }
+
+
+    def get_generation(self, generation):
+        """
+        Get apply status of configuration generation (version).
+        Generation is applied once it or any later generation is applied successfully,
+        failed if apply of it or later generation failed since last successful apply.
+
+        Parameters:
+            generation: configuration generation
+
+        Returns:
+            GENERATION_APPLIED, GENERATION_FAILED or GENERATION_PENDING, error message
+        """
+        with self.state.get_lock():
+            state = self.state
+            if state.successes and generation <= state.last_applied:
+                return GENERATION_APPLIED, None
+
+            if state.applies and generation <= state.version:
+                return GENERATION_FAILED, state.error.decode('utf-8', 'replace') or None
+
+        return GENERATION_PENDING, None
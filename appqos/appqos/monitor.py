@@ -0,0 +1,325 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Monitoring module
+Periodically polls Intel RDT monitoring data of Pools and Apps
+and keeps recent samples for REST API
+"""
+
+import time
+from collections import deque
+
+import common
+import log
+import snapshot
+
+# default polling interval in milliseconds
+DEFAULT_INTERVAL = 1000
+# default number of samples kept per monitoring group
+DEFAULT_SAMPLES = 60
+
+# monitoring event to reported value
+EVENT_VALUES = {
+    'l3_occup': 'llc',
+    'lmem_bw': 'mbm_local_delta',
+    'tmem_bw': 'mbm_total_delta',
+    'rmem_bw': 'mbm_remote_delta',
+    'perf_ipc': 'ipc'
+}
+
+
+class MetricsStore:
+    """
+    Monitoring samples shared between "backend" and REST API processes
+    """
+
+
+    def __init__(self):
+        self.snapshot = snapshot.SharedSnapshot(common.METRICS_STORE_SIZE)
+
+
+    def set_metrics(self, data):
+        """
+        Publish monitoring samples
+
+        Parameters:
+            data: monitoring samples, {"pools": {id: samples}, "apps": {id: samples}}
+        """
+        self.snapshot.write(data)
+
+
+    def get_version(self):
+        """
+        Get monitoring samples version
+
+        Returns:
+            version, incremented on every publish
+        """
+        return self.snapshot.version()
+
+
+    def get_all_metrics(self):
+        """
+        Get monitoring samples of all Pools and Apps
+
+        Returns:
+            monitoring samples, {"pools": {id: samples}, "apps": {id: samples}},
+            None if nothing published yet
+        """
+        return self.snapshot.read()
+
+
+    def get_metrics(self, group_type, group_id):
+        """
+        Get monitoring samples of Pool or App
+
+        Parameters:
+            group_type: "pools" or "apps"
+            group_id: Pool or App ID
+
+        Returns:
+            monitoring samples, None if not monitored
+        """
+        data = self.snapshot.read()
+        if not data:
+            return None
+
+        # JSON object keys are strings
+        return data[group_type].get(str(group_id))
+
+
+class Monitor:
+    """
+    Monitors Pools (cores) and Apps (PIDs, "os" interface only).
+    All monitoring groups are polled with single libpqos call,
+    called from "backend" main loop.
+    """
+
+
+    def __init__(self):
+        self.groups = {}
+        self.samples = {}
+        self.events = []
+        self.iface = None
+        self.config_version = None
+        self.next_poll = None
+        # number of most recent samples published per group, None if not limited
+        self.published_samples = None
+
+
+    @staticmethod
+    def get_config():
+        """
+        Get monitoring configuration
+
+        Returns:
+            enabled, polling interval [s], number of samples kept
+        """
+        cfg = common.CONFIG_STORE.get_global_attr('monitoring', {})
+        return cfg.get('enabled', False), \
+            cfg.get('interval', DEFAULT_INTERVAL) / 1000, cfg.get('samples', DEFAULT_SAMPLES)
+
+
+    def timeout(self):
+        """
+        Get time left to next poll
+
+        Returns:
+            time in seconds, None if monitoring is not running
+        """
+        if self.next_poll is None:
+            return None
+
+        return max(self.next_poll - time.monotonic(), 0)
+
+
+    def get_targets(self):
+        """
+        Get monitoring groups to be started based on configuration
+
+        Returns:
+            group key to (target type, list of cores or PIDs) map
+        """
+        targets = {}
+        index = common.CONFIG_STORE.get_index()
+
+        for pool_id, pool in index.pools.items():
+            # cores of Pool in task mode are shared, Apps are monitored instead
+            if not pool.get('task_mode', False):
+                targets[('pools', pool_id)] = ('cores', sorted(pool['cores']))
+
+        # PIDs monitoring is supported by "os" interface only
+        if self.iface == "os":
+            for app_id, app in index.apps.items():
+                targets[('apps', app_id)] = ('pids', sorted(app['pids']))
+
+        return targets
+
+
+    def update(self):
+        """
+        Starts/stops monitoring groups on configuration change
+        """
+        self.config_version = common.CONFIG_STORE.get_config_version()
+        enabled, interval, samples = Monitor.get_config()
+        self.published_samples = None
+
+        # libpqos re-initialized, monitoring groups are no longer valid
+        if self.iface != common.PQOS_API.current_iface():
+            self.groups = {}
+            self.iface = common.PQOS_API.current_iface()
+            self.events = common.PQOS_API.get_mon_events()
+
+        if not enabled or not self.events:
+            if enabled:
+                log.info("Monitoring not supported")
+            self.stop()
+            return
+
+        targets = self.get_targets()
+
+        for key in list(self.groups):
+            target, group = self.groups[key]
+            if targets.get(key) != target:
+                common.PQOS_API.mon_stop(group)
+                self.groups.pop(key)
+
+        for key in list(self.samples):
+            if key not in targets:
+                self.samples.pop(key)
+
+        for key, target in targets.items():
+            history = self.samples.get(key)
+            if history is None or history.maxlen != samples:
+                self.samples[key] = deque(history or [], maxlen=samples)
+
+            if key in self.groups:
+                continue
+
+            target_type, ids = target
+            if target_type == 'cores':
+                group = common.PQOS_API.mon_start(ids, self.events)
+            else:
+                group = common.PQOS_API.mon_start_pids(ids, self.events)
+
+            if group is None:
+                log.error(f"Failed to start monitoring of {key[0][:-1]} {key[1]}")
+                continue
+
+            self.groups[key] = (target, group)
+
+        if self.next_poll is None:
+            self.next_poll = time.monotonic() + interval
+
+
+    def poll(self):
+        """
+        Polls monitoring data if polling interval has expired
+        """
+        if self.next_poll is None or time.monotonic() < self.next_poll:
+            return
+
+        # configuration updated without notification e.g.: by PID tracker
+        if self.config_version != common.CONFIG_STORE.get_config_version():
+            self.update()
+            if self.next_poll is None:
+                return
+
+        interval = Monitor.get_config()[1]
+        self.next_poll += interval
+        # do not try to catch up with missed polls
+        if self.next_poll < time.monotonic():
+            self.next_poll = time.monotonic() + interval
+
+        if not self.groups:
+            return
+
+        keys = list(self.groups)
+        groups = [self.groups[key][1] for key in keys]
+        if common.PQOS_API.mon_poll(groups) != 0:
+            log.error("Failed to poll monitoring data")
+            return
+
+        timestamp = time.time()
+        values = [EVENT_VALUES[event] for event in self.events if event in EVENT_VALUES]
+        for key, group in zip(keys, groups):
+            sample = {'timestamp': timestamp}
+            for value in values:
+                sample[value] = getattr(group.values, value)
+            self.samples[key].append(sample)
+
+        self.publish()
+
+
+    def publish(self):
+        """
+        Publishes monitoring samples to REST API process.
+        If samples do not fit shared memory, number of most recent samples
+        published per group is halved until they fit, previous samples
+        are kept published if not even one sample per group fits.
+        """
+        while True:
+            data = {'pools': {}, 'apps': {}}
+            for (group_type, group_id), samples in self.samples.items():
+                samples = list(samples)
+                if self.published_samples is not None:
+                    samples = samples[max(len(samples) - self.published_samples, 0):]
+                data[group_type][str(group_id)] = samples
+
+            try:
+                common.METRICS_STORE.set_metrics(data)
+                return
+            except MemoryError as ex:
+                limit = self.published_samples
+                if limit is None:
+                    limit = max((len(samples) for samples in self.samples.values()), default=0)
+                if limit <= 1:
+                    log.error(f"Failed to publish monitoring samples, {ex}")
+                    return
+
+                self.published_samples = limit // 2
+                log.info("Monitoring samples do not fit shared memory, " \
+                         f"publishing last {self.published_samples} samples per group")
+
+
+    def stop(self):
+        """
+        Stops all monitoring groups
+        """
+        for _, group in self.groups.values():
+            common.PQOS_API.mon_stop(group)
+
+        self.groups = {}
+        self.samples = {}
+        self.next_poll = None
+        common.METRICS_STORE.set_metrics({'pools': {}, 'apps': {}})
@@ -0,0 +1,327 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+OpenMetrics module
+Renders AppQoS stats, configuration and monitoring samples
+in OpenMetrics text format
+"""
+
+import re
+
+import common
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+METRIC_PREFIX = 'appqos_'
+
+# Pool's configuration attribute to metric name and help
+POOL_ATTRS = {
+    'l3cbm': ('pool_l3cbm', "Pool's L3 CAT cache bit mask"),
+    'l3cbm_code': ('pool_l3cbm_code', "Pool's L3 CAT (CDP) code cache bit mask"),
+    'l3cbm_data': ('pool_l3cbm_data', "Pool's L3 CAT (CDP) data cache bit mask"),
+    'l2cbm': ('pool_l2cbm', "Pool's L2 CAT cache bit mask"),
+    'mba': ('pool_mba', "Pool's MBA rate in percents"),
+    'mba_bw': ('pool_mba_bw', "Pool's MBA rate in MBps")
+}
+
+# monitoring value to metric name and help
+MONITORING_VALUES = {
+    'llc': ('monitoring_llc_bytes', "LLC occupancy"),
+    'mbm_local_delta': ('monitoring_mbm_local_bytes', "Local memory bandwidth per interval"),
+    'mbm_total_delta': ('monitoring_mbm_total_bytes', "Total memory bandwidth per interval"),
+    'mbm_remote_delta': ('monitoring_mbm_remote_bytes', "Remote memory bandwidth per interval"),
+    'ipc': ('monitoring_ipc', "Instructions per cycle"),
+    'timestamp': ('monitoring_timestamp_seconds', "Time of last monitoring sample")
+}
+
+
+def metric_name(name):
+    """
+    Converts stat's id to metric name
+
+    Parameters:
+        name: stat's id
+
+    Returns:
+        metric name
+    """
+    return METRIC_PREFIX + re.sub('[^a-zA-Z0-9_]', '_', name)
+
+
+def format_labels(labels):
+    """
+    Formats metric labels
+
+    Parameters:
+        labels: list of (name, value) pairs
+
+    Returns:
+        labels string
+    """
+    if not labels:
+        return ''
+
+    values = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        values.append(f'{name}="{value}"')
+
+    return '{' + ','.join(values) + '}'
+
+
+def format_family(name, metric_type, samples, doc=None):
+    """
+    Formats metric family
+
+    Parameters:
+        name: metric family name
+        metric_type: OpenMetrics type e.g. "counter", "gauge"
+        samples: list of (suffix, labels, value) tuples
+        doc: help text
+
+    Returns:
+        list of lines
+    """
+    lines = [f"# TYPE {name} {metric_type}"]
+    if doc:
+        lines.append(f"# HELP {name} {doc}")
+
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{format_labels(labels)} {value}")
+
+    return lines
+
+
+def split_stats(values):
+    """
+    Groups stats by family, "<family>.<endpoint>" ids are per REST API endpoint stats
+
+    Parameters:
+        values: stat's id to value map
+
+    Returns:
+        family to list of (labels, value) map
+    """
+    families = {}
+    for name, value in values.items():
+        family, _, endpoint = name.partition('.')
+        labels = [('endpoint', endpoint)] if endpoint else []
+        families.setdefault(family, []).append((labels, value))
+
+    return families
+
+
+def render_stats(stats):
+    """
+    Renders stats (StatsStore snapshot)
+
+    Parameters:
+        stats: StatsStore snapshot
+
+    Returns:
+        list of lines
+    """
+    lines = []
+
+    for family, values in split_stats(stats['counters']).items():
+        lines += format_family(metric_name(family), 'counter',
+                               [('_total', labels, value) for labels, value in values])
+
+    for family, values in split_stats(stats['gauges']).items():
+        lines += format_family(metric_name(family), 'gauge',
+                               [('', labels, value) for labels, value in values])
+
+    for family, values in split_stats(stats['histograms']).items():
+        samples = []
+        for labels, hist in values:
+            for upper_bound, count in hist['buckets']:
+                samples.append(('_bucket', labels + [('le', float(upper_bound))], count))
+            samples.append(('_bucket', labels + [('le', '+Inf')], hist['count']))
+            samples.append(('_count', labels, hist['count']))
+            samples.append(('_sum', labels, hist['sum']))
+        lines += format_family(metric_name(family), 'histogram', samples)
+
+    return lines
+
+
+def render_status(status):
+    """
+    Renders configuration status
+
+    Parameters:
+        status: configuration status, ConfigStore.get_status()
+
+    Returns:
+        list of lines
+    """
+    lines = format_family(metric_name('config_version'), 'gauge',
+                          [('', [], status['version'])],
+                          "Configuration version, incremented on every change")
+
+    if status['applied_version'] is not None:
+        lines += format_family(metric_name('config_applied_version'), 'gauge',
+                               [('', [], status['applied_version'])],
+                               "Last applied configuration version")
+        lines += format_family(metric_name('config_applied'), 'gauge',
+                               [('', [], int(status['applied']))],
+                               "Was last configuration applied successfully")
+
+    return lines
+
+
+def render_pools(data):
+    """
+    Renders Pools configuration
+
+    Parameters:
+        data: configuration
+
+    Returns:
+        list of lines
+    """
+    pools = data.get('pools', [])
+    if not pools:
+        return []
+
+    lines = format_family(metric_name('pool'), 'info',
+                          [('_info', [('pool_id', pool['id']), ('name', pool.get('name', ''))], 1)
+                           for pool in pools],
+                          "Pool")
+    lines += format_family(metric_name('pool_cores'), 'gauge',
+                           [('', [('pool_id', pool['id'])], len(pool.get('cores', [])))
+                            for pool in pools],
+                           "Number of Pool's cores")
+
+    for attr, (name, doc) in POOL_ATTRS.items():
+        samples = []
+        for pool in pools:
+            value = pool.get(attr)
+            # "cbm" is deprecated name of "l3cbm"
+            if value is None and attr == 'l3cbm':
+                value = pool.get('cbm')
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = int(value, 16)
+            samples.append(('', [('pool_id', pool['id'])], value))
+
+        if samples:
+            lines += format_family(metric_name(name), 'gauge', samples, doc)
+
+    return lines
+
+
+def render_monitoring(data):
+    """
+    Renders last monitoring sample of Pools and Apps
+
+    Parameters:
+        data: monitoring samples, {"pools": {id: samples}, "apps": {id: samples}}
+
+    Returns:
+        list of lines
+    """
+    if not data:
+        return []
+
+    last = []
+    for group_type, label in [('pools', 'pool_id'), ('apps', 'app_id')]:
+        for group_id, samples in data.get(group_type, {}).items():
+            if samples:
+                last.append(([(label, group_id)], samples[-1]))
+
+    lines = []
+    for value, (name, doc) in MONITORING_VALUES.items():
+        samples = [('', labels, sample[value]) for labels, sample in last if value in sample]
+        if samples:
+            lines += format_family(metric_name(name), 'gauge', samples, doc)
+
+    return lines
+
+
+class Exporter:
+    """
+    Renders metrics for "GET /metrics" in REST API process.
+    Stats are read from shared memory, configuration and monitoring samples
+    from shared snapshots, their rendered text is cached per snapshot version,
+    so scrapes neither call libpqos nor communicate with other processes.
+    """
+
+
+    def __init__(self):
+        # (version, rendered text)
+        self.pools_cache = (None, '')
+        self.monitoring_cache = (None, '')
+
+
+    def _pools(self):
+        """
+        Get rendered Pools configuration, re-rendered on configuration change
+
+        Returns:
+            text
+        """
+        version = common.CONFIG_STORE.get_config_version()
+        if version != self.pools_cache[0]:
+            lines = render_pools(common.CONFIG_STORE.get_config() or {})
+            self.pools_cache = (version, ''.join(line + '\n' for line in lines))
+
+        return self.pools_cache[1]
+
+
+    def _monitoring(self):
+        """
+        Get rendered monitoring samples, re-rendered when new samples are published
+
+        Returns:
+            text
+        """
+        version = common.METRICS_STORE.get_version()
+        if version != self.monitoring_cache[0]:
+            lines = render_monitoring(common.METRICS_STORE.get_all_metrics())
+            self.monitoring_cache = (version, ''.join(line + '\n' for line in lines))
+
+        return self.monitoring_cache[1]
+
+
+    def render(self):
+        """
+        Renders all metrics
+
+        Returns:
+            OpenMetrics text
+        """
+        lines = render_stats(common.STATS_STORE.snapshot())
+        lines += render_status(common.CONFIG_STORE.get_status())
+
+        return ''.join(line + '\n' for line in lines) + self._pools() + \
+            self._monitoring() + '# EOF\n'
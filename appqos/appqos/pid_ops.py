@@ -85,19 +85,109 @@ def is_pid_valid(pid):
     return get_pid_status(pid)[1]
 
 
+def get_tids(pid):
+    """
+    Gets process' thread ids
+
+    Parameters:
+        pid: PID
+
+    Returns:
+        list of thread ids, None if process does not exist
+    """
+    try:
+        return [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+    except (OSError, ValueError):
+        return None
+
+
+def set_pid_affinity(pid, cores):
+    """
+    Sets core affinity of all process' threads
+
+    Parameters:
+    pid: PID to set core affinity for
+    cores: cores to set to
+
+    Returns:
+        result, dict with number of threads updated and error message
+    """
+    result = {'threads': 0, 'error': None}
+    done = set()
+
+    # threads created while affinity is being set may inherit old affinity,
+    # repeat until no new threads appear
+    while True:
+        tids = get_tids(pid)
+        if tids is None:
+            if not done:
+                result['error'] = "No such process"
+            break
+
+        tids = [tid for tid in tids if tid not in done]
+        if not tids:
+            break
+
+        for tid in tids:
+            done.add(tid)
+            try:
+                os.sched_setaffinity(tid, cores)
+                result['threads'] += 1
+            except ProcessLookupError:
+                # thread terminated in the meantime
+                pass
+            except OSError as ex:
+                result['error'] = ex.strerror
+                return result
+
+    return result
+
+
+def set_affinity_psutil(pids, cores):
+    """
+    Sets PIDs' core affinity using psutil,
+    used when /proc task enumeration is not available
+
+    Parameters:
+    pids: PIDs to set core affinity for
+    cores: cores to set to
+
+    Returns:
+        results, PID to result map
+    """
+    results = {}
+    for pid in pids:
+        try:
+            psutil.Process(pid).cpu_affinity(cores)
+            results[pid] = {'threads': 1, 'error': None}
+        except psutil.Error as ex:
+            results[pid] = {'threads': 0, 'error': str(ex)}
+
+    return results
+
+
 def set_affinity(pids, cores):
     """
-    Sets PIDs' core affinity
+    Sets PIDs' core affinity, for all threads of each PID
 
     Parameters:
     pids: PIDs to set core affinity for
     cores: cores to set to
+
+    Returns:
+        results, PID to result map,
+        result is a dict with number of threads updated and error message (None on success)
     """
 
     # set core affinity for each PID,
     # even if operation fails for one PID, continue with other PIDs
-    for pid in pids:
-        try:
-            psutil.Process(pid).cpu_affinity(cores)
-        except psutil.Error:
-            log.error(f"Failed to set {pid} PID affinity")
+    if not hasattr(os, 'sched_setaffinity') or not os.path.isdir('/proc/self/task'):
+        results = set_affinity_psutil(pids, cores)
+    else:
+        results = {pid: set_pid_affinity(pid, cores) for pid in pids}
+
+    for pid, result in results.items():
+        if result['error'] is not None:
+            log.error(f"Failed to set {pid} PID affinity, {result['error']}")
+
+    return results
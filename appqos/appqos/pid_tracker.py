@@ -0,0 +1,471 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+PID tracker module
+Keeps Apps' PIDs up to date, follows processes being forked and exiting
+using Linux process events connector (netlink), with /proc scan fallback
+"""
+
+import os
+import select
+import socket
+import struct
+import threading
+from copy import deepcopy
+
+import cache_ops
+import common
+import log
+from pid_ops import set_affinity
+
+# /proc scan interval, also max time to react to configuration changes
+SCAN_INTERVAL = 1.0
+
+# Linux process events connector
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+# struct nlmsghdr: len, type, flags, seq, pid
+NLMSG_HDR = struct.Struct('=IHHII')
+# struct cn_msg (without data): idx, val, seq, ack, len, flags
+CN_MSG_HDR = struct.Struct('=IIIIHH')
+# struct proc_event (without event data): what, cpu, timestamp_ns
+PROC_EVENT_HDR = struct.Struct('=IIQ')
+# struct fork_proc_event: parent_pid, parent_tgid, child_pid, child_tgid
+PROC_EVENT_FORK_DATA = struct.Struct('=iiii')
+# struct exec_proc_event/exit_proc_event: process_pid, process_tgid
+PROC_EVENT_ID_DATA = struct.Struct('=ii')
+
+
+class ProcConnector:
+    """
+    Linux process events connector client
+    """
+
+
+    def __init__(self):
+        self.sock = None
+
+
+    def open(self):
+        """
+        Opens netlink socket and subscribes to process events,
+        requires CAP_NET_ADMIN
+
+        Raises:
+            OSError on failure
+        """
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, CN_IDX_PROC))
+            self._send_op(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self.close()
+            raise
+
+
+    def close(self):
+        """
+        Unsubscribes from process events and closes netlink socket
+        """
+        if self.sock is None:
+            return
+
+        try:
+            self._send_op(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+
+        self.sock.close()
+        self.sock = None
+
+
+    def _send_op(self, operation):
+        """
+        Sends process events connector operation
+
+        Parameters:
+            operation: PROC_CN_MCAST_LISTEN or PROC_CN_MCAST_IGNORE
+        """
+        data = struct.pack('=I', operation)
+        msg = CN_MSG_HDR.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(data), 0) + data
+        hdr = NLMSG_HDR.pack(NLMSG_HDR.size + len(msg), NLMSG_DONE, 0, 0,
+                             self.sock.getsockname()[0])
+        self.sock.send(hdr + msg)
+
+
+    def receive(self, timeout):
+        """
+        Receives process events
+
+        Parameters:
+            timeout: max time to wait for events, in seconds
+
+        Returns:
+            list of (event, pid, tgid, parent tgid) tuples
+
+        Raises:
+            OSError on failure e.g.: events lost due to receive buffer overrun
+        """
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return []
+
+        return self.parse(self.sock.recv(65536))
+
+
+    @staticmethod
+    def parse(buf):
+        """
+        Parses netlink messages carrying process events
+
+        Parameters:
+            buf: received data
+
+        Returns:
+            list of (event, pid, tgid, parent tgid) tuples,
+            parent tgid is set for fork events only
+        """
+        events = []
+        offset = 0
+
+        while offset + NLMSG_HDR.size <= len(buf):
+            length, msg_type = NLMSG_HDR.unpack_from(buf, offset)[:2]
+            if length < NLMSG_HDR.size or offset + length > len(buf):
+                break
+
+            pos = offset + NLMSG_HDR.size + CN_MSG_HDR.size
+            if msg_type == NLMSG_DONE and pos + PROC_EVENT_HDR.size <= offset + length:
+                what = PROC_EVENT_HDR.unpack_from(buf, pos)[0]
+                pos += PROC_EVENT_HDR.size
+
+                if what == PROC_EVENT_FORK:
+                    _, parent_tgid, child_pid, child_tgid = \
+                        PROC_EVENT_FORK_DATA.unpack_from(buf, pos)
+                    events.append((what, child_pid, child_tgid, parent_tgid))
+                elif what in (PROC_EVENT_EXEC, PROC_EVENT_EXIT):
+                    pid, tgid = PROC_EVENT_ID_DATA.unpack_from(buf, pos)
+                    events.append((what, pid, tgid, None))
+
+            # messages are 4 bytes aligned
+            offset += (length + 3) & ~3
+
+        return events
+
+
+def get_ppid(pid):
+    """
+    Reads parent PID from /proc
+
+    Parameters:
+        pid: PID
+
+    Returns:
+        parent PID, None if process does not exist
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding='ascii', errors='replace') as stat:
+            # process name may contain spaces and brackets, ppid follows state
+            return int(stat.read().rsplit(')', 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def scan_processes():
+    """
+    Scans /proc for running processes
+
+    Returns:
+        process PID to parent PID map
+    """
+    processes = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+
+        ppid = get_ppid(entry)
+        if ppid is not None:
+            processes[int(entry)] = ppid
+
+    return processes
+
+
+class PidTracker:
+    """
+    Tracks Apps' processes.
+    Children forked by Apps' processes are added to Apps, their threads
+    and processes are affined to App cores (and so associated with Pool COS),
+    PIDs of processes that exited are removed from configuration.
+    Runs as a thread in the "backend" process.
+    """
+
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.connector = None
+
+        self.config_version = None
+        # tracked PIDs, PID to App ID map
+        self.pid_to_app = {}
+        # pending configuration changes
+        self.pids_added = {}
+        self.pids_removed = set()
+
+
+    def start(self):
+        """
+        Starts tracker thread
+        """
+        self.connector = ProcConnector()
+        try:
+            self.connector.open()
+            log.info("PID tracking enabled, using process events connector")
+        except OSError as ex:
+            self.connector = None
+            log.info(f"PID tracking enabled, process events connector not available ({ex}), " \
+                     f"scanning /proc every {SCAN_INTERVAL}s")
+
+        self.thread = threading.Thread(target=self.run, name="pid_tracker", daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+        """
+        Stops tracker thread
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        if self.connector is not None:
+            self.connector.close()
+            self.connector = None
+
+
+    def run(self):
+        """
+        Tracker thread main loop
+        """
+        while not self.stop_event.is_set():
+            if self.config_version != common.CONFIG_STORE.get_config_version():
+                self.sync()
+
+            if self.connector is not None:
+                try:
+                    for event in self.connector.receive(SCAN_INTERVAL):
+                        self.process_event(*event)
+                except OSError as ex:
+                    # e.g.: events lost, re-sync with /proc content
+                    log.debug(f"Process events connector, {ex}")
+                    self.scan()
+            else:
+                self.stop_event.wait(SCAN_INTERVAL)
+                self.scan()
+
+            self.flush()
+
+
+    def sync(self):
+        """
+        Reloads tracked PIDs from configuration
+        and picks up children of Apps' processes
+        """
+        self.config_version = common.CONFIG_STORE.get_config_version()
+        index = common.CONFIG_STORE.get_index()
+        self.pid_to_app = dict(index.pid_to_app)
+        self.scan()
+
+
+    def scan(self):
+        """
+        Updates tracked PIDs based on /proc content
+        """
+        processes = scan_processes()
+
+        for pid in list(self.pid_to_app):
+            if pid not in processes:
+                self.untrack(pid)
+
+        # walk process tree from Apps' processes down
+        children = {}
+        for pid, ppid in processes.items():
+            children.setdefault(ppid, []).append(pid)
+
+        pending = list(self.pid_to_app)
+        while pending:
+            pid = pending.pop()
+            for child in children.get(pid, []):
+                if child not in self.pid_to_app:
+                    self.track(child, self.pid_to_app[pid])
+                    pending.append(child)
+
+
+    def process_event(self, event, pid, tgid, parent_tgid):
+        """
+        Handles process event
+
+        Parameters:
+            event: event type
+            pid: PID (thread id) of process
+            tgid: thread group id of process
+            parent_tgid: thread group id of parent, fork events only,
+                         for new thread it is parent of thread's process
+        """
+        if event == PROC_EVENT_FORK:
+            # parent of new thread is parent of its process, not the process it joins
+            owner = parent_tgid if pid == tgid else tgid
+            if owner not in self.pid_to_app:
+                return
+
+            app_id = self.pid_to_app[owner]
+            if pid == tgid:
+                # new process
+                self.track(pid, app_id)
+            else:
+                # new thread of App process
+                self.affine(app_id, [pid])
+
+        elif event == PROC_EVENT_EXIT:
+            # only thread group leader exit ends process
+            if pid == tgid and pid in self.pid_to_app:
+                self.untrack(pid)
+
+
+    def track(self, pid, app_id):
+        """
+        Adds process to App and affines it to App cores
+
+        Parameters:
+            pid: PID
+            app_id: App ID
+        """
+        log.debug(f"PID {pid} added to App {app_id}")
+        self.pid_to_app[pid] = app_id
+        self.pids_removed.discard(pid)
+        self.pids_added.setdefault(app_id, set()).add(pid)
+        self.affine(app_id, [pid])
+
+
+    def untrack(self, pid):
+        """
+        Removes exited process from its App
+
+        Parameters:
+            pid: PID
+        """
+        app_id = self.pid_to_app.pop(pid)
+        log.debug(f"PID {pid} removed from App {app_id}")
+        self.pids_added.get(app_id, set()).discard(pid)
+        self.pids_removed.add(pid)
+
+
+    @staticmethod
+    def affine(app_id, pids):
+        """
+        Affines PIDs to App cores
+
+        Parameters:
+            app_id: App ID
+            pids: PIDs (or thread ids)
+        """
+        try:
+            app = common.CONFIG_STORE.get_index().apps[app_id]
+        except KeyError:
+            return
+
+        cores = cache_ops.Apps.cores_get(app)
+        if cores:
+            set_affinity(pids, cores)
+
+
+    @staticmethod
+    def remove_app(data, app):
+        """
+        Removes App from configuration and from its Pool
+
+        Parameters:
+            data: configuration (dict), modified in place
+            app: App to remove
+        """
+        data['apps'].remove(app)
+        for pool in data.get('pools', []):
+            if app['id'] in pool.get('apps', []):
+                pool['apps'].remove(app['id'])
+
+
+    def flush(self):
+        """
+        Stores pending Apps' PIDs changes in configuration
+        """
+        if not self.pids_added and not self.pids_removed:
+            return
+
+        version = common.CONFIG_STORE.get_config_version()
+        data = deepcopy(common.CONFIG_STORE.get_config())
+
+        changed = False
+        for app in list(data.get('apps', [])):
+            pids = [pid for pid in app['pids'] if pid not in self.pids_removed]
+            pids.extend(sorted(self.pids_added.get(app['id'], set()) - set(pids)))
+
+            # App must have at least one PID, App with no processes left is removed
+            # so its exited PIDs do not fail validation of further changes
+            if not pids:
+                log.info(f"No running processes for App {app['id']}, App removed")
+                self.remove_app(data, app)
+                changed = True
+            elif pids != app['pids']:
+                app['pids'] = pids
+                changed = True
+
+        if changed:
+            new_version = common.CONFIG_STORE.update_config(data, version)
+            if new_version is None:
+                # configuration changed in the meantime, retry on next iteration
+                return
+            # no need to re-sync if nothing else has changed configuration
+            if self.config_version == version:
+                self.config_version = new_version
+
+        self.pids_added = {}
+        self.pids_removed = set()
@@ -39,19 +39,21 @@ import os
 import platform
 
 from pqos import Pqos
-from pqos.error import PqosErrorResource
-from pqos.capability import PqosCap
+from pqos.capability import PqosCap, CPqosMonitor
 from pqos.l3ca import PqosCatL3
 from pqos.l2ca import PqosCatL2
 from pqos.mba import PqosMba
 from pqos.allocation import PqosAlloc
 from pqos.cpuinfo import PqosCpuInfo
+from pqos.monitoring import PqosMon
 
 import common
 import log
 
+from pqos_topology import PqosTopology, PqosTopologyInfo
 
-class PqosApi:
+
+class PqosApi(PqosTopologyInfo):
 # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
     Wrapper for libpqos wrapper.
@@ -59,6 +61,7 @@ class PqosApi:
 
 
     def __init__(self):
+        PqosTopologyInfo.__init__(self)
         self.pqos = Pqos()
         self.cap = None
         self.l3ca = None
@@ -66,6 +69,7 @@ class PqosApi:
         self.mba = None
         self.alloc = None
         self.cpuinfo = None
+        self.mon = None
         self._supported_iface = []
 
         # dict to share interface type and MBA BW status
@@ -119,13 +123,15 @@ class PqosApi:
 
         # attempt to initialize libpqos
         try:
-            self.pqos.init(iface.upper())
+            with common.TRACER.span('pqos.init'):
+                self.pqos.init(iface.upper())
             self.cap = PqosCap()
             self.l3ca = PqosCatL3()
             self.l2ca = PqosCatL2()
             self.mba = PqosMba()
             self.alloc = PqosAlloc()
             self.cpuinfo = PqosCpuInfo()
+            self.mon = PqosMon()
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -133,6 +139,9 @@ class PqosApi:
         # save current interface type in shared dict
         self.shared_dict['current_iface'] = iface
 
+        # Read topology and capabilities once
+        self.refresh_topology()
+
         # Reread MBA BW status from libpqos
         self.refresh_mba_bw_status()
 
@@ -149,7 +158,8 @@ class PqosApi:
             -1 otherwise
         """
         try:
-            supported, enabled = self.cap.is_mba_ctrl_enabled()
+            with common.TRACER.span('pqos.mba_ctrl_enabled'):
+                supported, enabled = self.cap.is_mba_ctrl_enabled()
             # convert None to False
             supported = bool(supported)
 
@@ -163,6 +173,15 @@ class PqosApi:
         return 0
 
 
+    def refresh_topology(self):
+        """
+        Reads CPU topology and capabilities from libpqos
+        and saves results in immutable snapshot
+        """
+        with common.TRACER.span('pqos.topology'):
+            self.topology = PqosTopology.build(self.cpuinfo, self.cap)
+
+
     def current_iface(self):
         """
         Returns current RDT interface
@@ -228,7 +247,8 @@ class PqosApi:
 
         try:
             # call libpqos alloc reset
-            self.alloc.reset(l3_cdp_cfg, l2_cdp_cfg, mba_cfg)
+            with common.TRACER.span('pqos.alloc_reset'):
+                self.alloc.reset(l3_cdp_cfg, l2_cdp_cfg, mba_cfg)
         except Exception as ex:
             log.error("libpqos reset(..) call failed!")
             log.error(str(ex))
@@ -238,6 +258,10 @@ class PqosApi:
         if mba_cfg != "any":
             self.refresh_mba_bw_status()
 
+        # CDP and MBA CTRL change number of COS, reread capabilities
+        if (l3_cdp_cfg, l2_cdp_cfg, mba_cfg) != ("any", "any", "any"):
+            self.refresh_topology()
+
         return 0
 
 
@@ -245,8 +269,10 @@ class PqosApi:
         """
         De-initializes libpqos
         """
-        self.pqos.fini()
+        with common.TRACER.span('pqos.fini'):
+            self.pqos.fini()
         self.shared_dict['current_iface'] = None
+        self.topology = None
 
         return 0
 
@@ -266,7 +292,8 @@ class PqosApi:
             return 0
 
         try:
-            self.alloc.release(cores)
+            with common.TRACER.span('pqos.alloc_release'):
+                self.alloc.release(cores)
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -290,8 +317,8 @@ class PqosApi:
             return 0
 
         try:
-            for core in cores:
-                self.alloc.assoc_set(core, cos)
+            with common.TRACER.span('pqos.alloc_assoc_set'):
+                self.alloc.assoc_set_cores(cores, cos)
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -299,544 +326,242 @@ class PqosApi:
         return 0
 
 
-    def l3ca_set(self, sockets, cos_id, mask=None, code_mask=None, data_mask=None):
+    def alloc_assoc_set_pids(self, pids, cos):
         """
-        Configures L3 CAT for CoS
+        Assigns tasks to CoS, OS interface only.
+        libpqos associates tasks one by one, stops on first failure.
 
         Parameters:
-            sockets: sockets list on which to configure L3 CAT
-            cos_id: Class of Service
-            mask: L3 CAT CBM to set
-            code_mask: L3 CAT code CBM to set
-            data_mask: L3 CAT data CBM to set
+            pids: list of tasks (PIDs, thread ids) to be assigned to cos
+            cos: Class of Service
 
         Returns:
             0 on success
             -1 otherwise
         """
+        if not pids:
+            return 0
+
         try:
-            cos = self.l3ca.COS(cos_id, mask=mask, code_mask=code_mask, data_mask=data_mask)
-            for socket in sockets:
-                self.l3ca.set(socket, [cos])
+            with common.TRACER.span('pqos.alloc_assoc_set_pid'):
+                self.alloc.assoc_set_pids(pids, cos)
         except Exception as ex:
             log.error(str(ex))
             return -1
 
         return 0
 
-    def l2ca_set(self, l2ids, cos_id, ways_mask):
+
+    def release_pids(self, pids):
         """
-        Configures L2 CAT for CoS
+        Release tasks, assigns tasks to CoS#0, OS interface only
 
         Parameters:
-            l2ids: L2 cache identifiers list on which to configure L2 CAT
-            cos_id: Class of Service
-            ways_mask: L2 CAT CBM to set
+            pids: list of tasks (PIDs, thread ids) to be released
 
         Returns:
             0 on success
             -1 otherwise
         """
+        if not pids:
+            return 0
+
         try:
-            cos = self.l2ca.COS(cos_id, ways_mask)
-            for l2id in l2ids:
-                self.l2ca.set(l2id, [cos])
+            with common.TRACER.span('pqos.alloc_release_pid'):
+                self.alloc.release_pid(pids)
         except Exception as ex:
             log.error(str(ex))
             return -1
 
         return 0
 
-    def mba_set(self, sockets, cos_id, mb_max, ctrl=False):
+
+    def l3ca_set_batch(self, sockets, cos_table):
         """
-        Configures MBA rate for CoS
+        Configures L3 CAT for multiple CoS, one libpqos call per socket
 
         Parameters:
             sockets: sockets list on which to configure L3 CAT
-            cos_id: Class of Service
-            mb_max: MBA rate to set
+            cos_table: Class of Service to L3 CAT CBM map,
+                       (code CBM, data CBM) tuple for L3 CDP
 
         Returns:
             0 on success
             -1 otherwise
         """
+        if not cos_table:
+            return 0
+
         try:
-            cos = self.mba.COS(cos_id, mb_max, ctrl)
+            coses = []
+            for cos_id, mask in cos_table.items():
+                if isinstance(mask, tuple):
+                    coses.append(self.l3ca.COS(cos_id, code_mask=mask[0], data_mask=mask[1]))
+                else:
+                    coses.append(self.l3ca.COS(cos_id, mask=mask))
             for socket in sockets:
-                self.mba.set(socket, [cos])
+                with common.TRACER.span('pqos.l3ca_set'):
+                    self.l3ca.set(socket, coses)
         except Exception as ex:
             log.error(str(ex))
             return -1
 
         return 0
 
-
-    def is_mba_supported(self):
-        """
-        Checks for MBA support
-
-        Returns:
-            True if supported
-            False otherwise
-        """
-        try:
-            return bool(self.get_mba_num_cos())
-        except Exception as ex:
-            log.error(str(ex))
-            return False
-
-
-    def is_l3_cat_supported(self):
+    def l2ca_set_batch(self, l2ids, cos_table):
         """
-        Checks for L3 CAT support
-
-        Returns:
-            True if supported
-            False otherwise
-        """
-        try:
-            return bool(self.get_l3ca_num_cos())
-        except Exception as ex:
-            log.error(str(ex))
-            return False
-
-
-    def is_l2_cat_supported(self):
-        """
-        Checks for L2 CAT support
-
-        Returns:
-            True if supported
-            False otherwise
-        """
-        try:
-            self.cap.get_type("l2ca")
-            # L2 CAT capabilities obtained successfully
-            # So L2 CAT is supported
-            return True
-        except PqosErrorResource:
-            # No L2 CAT resources, L2 CAT is not supported
-            return False
-        except Exception as ex:
-            log.error(str(ex))
-            return False
-
-
-    def is_multicore(self):
-        """
-        Checks if system is multicore
-
-        Returns:
-            True if multicore
-            False otherwise
-        """
-        return self.get_num_cores() > 1
-
-
-    def get_num_cores(self):
-        """
-        Gets number of cores in system
-
-        Returns:
-            num of cores
-            None otherwise
-        """
-        try:
-            sockets = self.cpuinfo.get_sockets()
-            return sum((len(self.cpuinfo.get_cores(socket)) for socket in sockets))
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-
-    def check_core(self, core):
-        """
-        Verifies if a specified core is a valid logical core ID.
+        Configures L2 CAT for multiple CoS, one libpqos call per L2 cache id
 
         Parameters:
-            core: core ID
-
-        Returns:
-            True/False a given core number is valid/invalid
-            None otherwise
-        """
-        try:
-            return self.cpuinfo.check_core(core)
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def get_l2ids(self):
-        """
-        Gets list of L2 IDs
-
-        Returns:
-            L2 IDs list,
-            None otherwise
-        """
-
-        try:
-            return self.cpuinfo.get_l2ids()
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def get_sockets(self):
-        """
-        Gets list of sockets
+            l2ids: L2 cache identifiers list on which to configure L2 CAT
+            cos_table: Class of Service to L2 CAT CBM map
 
         Returns:
-            sockets list,
-            None otherwise
-        """
-
-        try:
-            return self.cpuinfo.get_sockets()
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-
-    def get_cores(self):
+            0 on success
+            -1 otherwise
         """
-        Gets list of cores
+        if not cos_table:
+            return 0
 
-        Returns:
-            cores list,
-            None otherwise
-        """
         try:
-            sockets = self.cpuinfo.get_sockets()
-            socket_cores = [self.cpuinfo.get_cores(socket) for socket in sockets]
-            return [core for cores in socket_cores for core in cores]
+            coses = [self.l2ca.COS(cos_id, ways_mask) for cos_id, ways_mask in cos_table.items()]
+            for l2id in l2ids:
+                with common.TRACER.span('pqos.l2ca_set'):
+                    self.l2ca.set(l2id, coses)
         except Exception as ex:
             log.error(str(ex))
-            return None
-
+            return -1
 
-    def get_l3ca_num_cos(self):
-        """
-        Gets number of COS for L3 CAT
+        return 0
 
-        Returns:
-            num of COS for L3 CAT
-            None otherwise
+    def mba_set_batch(self, sockets, cos_table, ctrl=False):
         """
-        try:
-            return self.cap.get_l3ca_cos_num()
-        except Exception as ex:
-            log.error(str(ex))
-            return None
+        Configures MBA rate for multiple CoS, one libpqos call per socket
 
-
-    def get_l2ca_num_cos(self):
-        """
-        Gets number of COS for L2 CAT
+        Parameters:
+            sockets: sockets list on which to configure MBA
+            cos_table: Class of Service to MBA rate map
+            ctrl: MBA CTRL enabled
 
         Returns:
-            num of COS for L2 CAT
-            None otherwise
-        """
-        try:
-            return self.cap.get_l2ca_cos_num()
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-
-    def get_mba_num_cos(self):
+            0 on success
+            -1 otherwise
         """
-        Gets number of COS for MBA
+        if not cos_table:
+            return 0
 
-        Returns:
-            num of COS for MBA
-            None otherwise
-        """
         try:
-            return self.cap.get_mba_cos_num()
+            coses = [self.mba.COS(cos_id, mb_max, ctrl) for cos_id, mb_max in cos_table.items()]
+            for socket in sockets:
+                with common.TRACER.span('pqos.mba_set'):
+                    self.mba.set(socket, coses)
         except Exception as ex:
             log.error(str(ex))
-            return None
-
-
-    def get_max_cos_id(self, alloc_type):
-        """
-        Gets max COS# (id) that can be used to configure set of allocation technologies
-
-        Returns:
-            Available COS# to be used
-            None otherwise
-        """
-        max_cos_l2cat = self.get_l2ca_num_cos()
-        max_cos_cat = self.get_l3ca_num_cos()
-        max_cos_mba = self.get_mba_num_cos()
-        cos_nums = []
-
-        if common.CAT_L2_CAP not in alloc_type and common.CAT_L3_CAP not in alloc_type and\
-        common.MBA_CAP not in alloc_type:
-            return None
-
-        if common.CAT_L2_CAP in alloc_type and not max_cos_l2cat:
-            return None
-
-        if common.CAT_L3_CAP in alloc_type and not max_cos_cat:
-            return None
-
-        if common.MBA_CAP in alloc_type and not max_cos_mba:
-            return None
-
-        if common.CAT_L2_CAP in alloc_type:
-            cos_nums.append(max_cos_l2cat)
-
-        if common.CAT_L3_CAP in alloc_type:
-            cos_nums.append(max_cos_cat)
-
-        if common.MBA_CAP in alloc_type:
-            cos_nums.append(max_cos_mba)
+            return -1
 
-        if not cos_nums:
-            return None
+        return 0
 
-        return min(cos_nums) - 1
 
-    def get_max_l2_cat_cbm(self):
+    def get_mon_events(self):
         """
-        Gets Max L2 CAT CBM
+        Gets supported monitoring events
 
         Returns:
-            Max L2 CAT CBM
-            None otherwise
+            list of supported monitoring events, empty if monitoring is not supported
         """
-
-        if not self.is_l2_cat_supported():
-            return None
+        event_names = {
+            CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP: 'l3_occup',
+            CPqosMonitor.PQOS_MON_EVENT_LMEM_BW: 'lmem_bw',
+            CPqosMonitor.PQOS_MON_EVENT_TMEM_BW: 'tmem_bw',
+            CPqosMonitor.PQOS_MON_EVENT_RMEM_BW: 'rmem_bw',
+            CPqosMonitor.PQOS_PERF_EVENT_IPC: 'perf_ipc'
+        }
 
         try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            return 2**l2ca_caps.num_ways - 1
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def get_max_l3_cat_cbm(self):
-        """
-        Gets Max L3 CAT CBM
-
-        Returns:
-            Max L3 CAT CBM
-            None otherwise
-        """
-
-        if not self.is_l3_cat_supported():
-            return None
+            mon_cap = self.cap.get_type('mon')
+        except Exception:
+            return []
 
-        try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            return 2**l3ca_caps.num_ways - 1
-        except Exception as ex:
-            log.error(str(ex))
-            return None
+        return [event_names[event.type] for event in mon_cap.events \
+            if event.type in event_names]
 
-    def get_l3_cache_size(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L3 cache size (in bytes)
 
-        Returns:
-            L3 cache size in bytes
-            or None on error
+    def mon_start(self, cores, events):
         """
+        Starts monitoring of cores
 
-        if not self.is_l3_cat_supported():
-            return None
-
-        try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            num_ways = l3ca_caps.num_ways
-            way_size = l3ca_caps.way_size
-            return num_ways * way_size
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def get_l3_cache_way_size(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L3 cache way size (in bytes)
+        Parameters:
+            cores: list of cores to be monitored
+            events: list of monitoring events
 
         Returns:
-            L3 cache way size in bytes
-            or None on error
+            monitoring group, None on error
         """
-
-        if not self.is_l3_cat_supported():
-            return None
-
         try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            return l3ca_caps.way_size
+            with common.TRACER.span('pqos.mon_start'):
+                return self.mon.start(cores, events)
         except Exception as ex:
             log.error(str(ex))
             return None
 
-    def get_l3_num_cache_ways(self):
-        # pylint: disable=no-self-use
-        """
-        Gets a number of L3 cache ways
 
-        Returns:
-            a number of L3 cache ways
-            or None on error
+    def mon_start_pids(self, pids, events):
         """
+        Starts monitoring of processes
 
-        if not self.is_l3_cat_supported():
-            return None
-
-        try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            return l3ca_caps.num_ways
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def is_l3_cdp_supported(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L3 CDP support
+        Parameters:
+            pids: list of PIDs to be monitored
+            events: list of monitoring events
 
         Returns:
-            True if L3 CDP is supported, False if it is not supported
-            or None on error
+            monitoring group, None on error
         """
-
-        if not self.is_l3_cat_supported():
-            return None
-
         try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            return l3ca_caps.cdp
+            with common.TRACER.span('pqos.mon_start_pids'):
+                return self.mon.start_pids(pids, events)
         except Exception as ex:
             log.error(str(ex))
             return None
 
-    def is_l3_cdp_enabled(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L3 CDP status
 
-        Returns:
-            True if L3 CDP is enabled, False if it is not enabled
-            or None on error
+    def mon_poll(self, groups):
         """
+        Polls monitoring data of groups, with single libpqos call
 
-        if not self.is_l3_cat_supported():
-            return None
-
-        try:
-            l3ca_caps = self.cap.get_type("l3ca")
-            return l3ca_caps.cdp_on
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def get_l2_cache_size(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L2 cache size (in bytes)
+        Parameters:
+            groups: list of monitoring groups
 
         Returns:
-            L2 cache size in bytes
-            or None on error
+            0 on success
+            -1 otherwise
         """
-
-        if not self.is_l2_cat_supported():
-            return None
-
         try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            num_ways = l2ca_caps.num_ways
-            way_size = l2ca_caps.way_size
-            return num_ways * way_size
+            with common.TRACER.span('pqos.mon_poll'):
+                self.mon.poll(groups)
         except Exception as ex:
             log.error(str(ex))
-            return None
-
-    def get_l2_cache_way_size(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L2 cache way size (in bytes)
-
-        Returns:
-            L2 cache way size in bytes
-            or None on error
-        """
-
-        if not self.is_l2_cat_supported():
-            return None
+            return -1
 
-        try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            return l2ca_caps.way_size
-        except Exception as ex:
-            log.error(str(ex))
-            return None
+        return 0
 
-    def get_l2_num_cache_ways(self):
-        # pylint: disable=no-self-use
-        """
-        Gets a number of L2 cache ways
 
-        Returns:
-            a number of L2 cache ways
-            or None on error
+    @staticmethod
+    def mon_stop(group):
         """
+        Stops monitoring
 
-        if not self.is_l2_cat_supported():
-            return None
-
-        try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            return l2ca_caps.num_ways
-        except Exception as ex:
-            log.error(str(ex))
-            return None
-
-    def is_l2_cdp_supported(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L2 CDP support
+        Parameters:
+            group: monitoring group
 
         Returns:
-            True if L2 CDP is supported, False if it is not supported
-            or None on error
+            0 on success
+            -1 otherwise
         """
-
-        if not self.is_l2_cat_supported():
-            return None
-
         try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            return l2ca_caps.cdp
+            with common.TRACER.span('pqos.mon_stop'):
+                group.stop()
         except Exception as ex:
             log.error(str(ex))
-            return None
-
-    def is_l2_cdp_enabled(self):
-        # pylint: disable=no-self-use
-        """
-        Gets L2 CDP status
-
-        Returns:
-            True if L2 CDP is enabled, False if it is not enabled
-            or None on error
-        """
-
-        if not self.is_l2_cat_supported():
-            return None
+            return -1
 
-        try:
-            l2ca_caps = self.cap.get_type("l2ca")
-            return l2ca_caps.cdp_on
-        except Exception as ex:
-            log.error(str(ex))
-            return None
+        return 0
@@ -0,0 +1,562 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+PQoS topology module.
+Immutable snapshot of CPU topology and allocation capabilities read from libpqos.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from pqos.error import PqosErrorResource
+
+import common
+import log
+
+
+CoreInfo = namedtuple('CoreInfo', ['core', 'socket', 'l3_id', 'l2_id', 'l3cat_id', 'mba_id'])
+CatCaps = namedtuple('CatCaps', ['num_classes', 'num_ways', 'way_size', 'cdp', 'cdp_on'])
+
+
+class PqosTopology(namedtuple('PqosTopology', ['sockets', 'socket_cores', 'cores',
+                                               'valid_cores', 'core_info', 'l2ids',
+                                               'l3ca_num_cos', 'l2ca_num_cos',
+                                               'mba_num_cos', 'l3ca', 'l2ca'])):
+    """
+    Immutable snapshot of CPU topology and allocation capabilities,
+    read from libpqos once per (re)initialization.
+    Fields that could not be read from libpqos are None.
+    """
+    __slots__ = ()
+
+
+    @staticmethod
+    def _read(func, *args):
+        """
+        Calls libpqos wrapper function
+
+        Returns:
+            function result
+            None on error
+        """
+        try:
+            return func(*args)
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
+
+    @staticmethod
+    def _read_cat_caps(cap, cat_type):
+        """
+        Reads CAT capabilities
+
+        Returns:
+            CatCaps
+            None if not supported or on error
+        """
+        try:
+            caps = cap.get_type(cat_type)
+        except PqosErrorResource:
+            # No CAT resources, CAT is not supported
+            return None
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
+        return CatCaps(caps.num_classes, caps.num_ways, caps.way_size, caps.cdp, caps.cdp_on)
+
+
+    @staticmethod
+    def build(cpuinfo, cap):
+        """
+        Reads topology and capabilities from libpqos
+
+        Parameters:
+            cpuinfo: PqosCpuInfo object
+            cap: PqosCap object
+
+        Returns:
+            PqosTopology
+        """
+        read = PqosTopology._read
+
+        sockets = read(cpuinfo.get_sockets)
+        socket_cores = None
+        cores = None
+        valid_cores = None
+        core_info = None
+
+        if sockets is not None:
+            sockets = tuple(sockets)
+            socket_cores = {}
+            for socket in sockets:
+                socket_cores[socket] = read(cpuinfo.get_cores, socket)
+                if socket_cores[socket] is None:
+                    socket_cores = None
+                    break
+                socket_cores[socket] = tuple(socket_cores[socket])
+
+        if socket_cores is not None:
+            cores = tuple(core for socket in sockets for core in socket_cores[socket])
+            valid_cores = frozenset(cores)
+            socket_cores = MappingProxyType(socket_cores)
+
+            core_info = {}
+            for core in cores:
+                info = read(cpuinfo.get_core_info, core)
+                if info is None:
+                    core_info = None
+                    break
+                core_info[core] = CoreInfo(info.core, info.socket, info.l3_id, info.l2_id,
+                                           info.l3cat_id, info.mba_id)
+
+            if core_info is not None:
+                core_info = MappingProxyType(core_info)
+
+        l2ids = read(cpuinfo.get_l2ids)
+        if l2ids is not None:
+            l2ids = tuple(l2ids)
+
+        return PqosTopology(sockets=sockets, socket_cores=socket_cores, cores=cores,
+                            valid_cores=valid_cores, core_info=core_info, l2ids=l2ids,
+                            l3ca_num_cos=read(cap.get_l3ca_cos_num),
+                            l2ca_num_cos=read(cap.get_l2ca_cos_num),
+                            mba_num_cos=read(cap.get_mba_cos_num),
+                            l3ca=PqosTopology._read_cat_caps(cap, "l3ca"),
+                            l2ca=PqosTopology._read_cat_caps(cap, "l2ca"))
+
+
+class PqosTopologyInfo:
+# pylint: disable=too-many-public-methods
+    """
+    Queries of CPU topology and allocation capabilities snapshot.
+    """
+
+
+    def __init__(self):
+        self.topology = None
+
+
+    def is_mba_supported(self):
+        """
+        Checks for MBA support
+
+        Returns:
+            True if supported
+            False otherwise
+        """
+        return bool(self.get_mba_num_cos())
+
+
+    def is_l3_cat_supported(self):
+        """
+        Checks for L3 CAT support
+
+        Returns:
+            True if supported
+            False otherwise
+        """
+        return bool(self.get_l3ca_num_cos())
+
+
+    def is_l2_cat_supported(self):
+        """
+        Checks for L2 CAT support
+
+        Returns:
+            True if supported
+            False otherwise
+        """
+        return self.topology is not None and self.topology.l2ca is not None
+
+
+    def is_multicore(self):
+        """
+        Checks if system is multicore
+
+        Returns:
+            True if multicore
+            False otherwise
+        """
+        return self.get_num_cores() > 1
+
+
+    def get_num_cores(self):
+        """
+        Gets number of cores in system
+
+        Returns:
+            num of cores
+            None otherwise
+        """
+        if self.topology is None or self.topology.cores is None:
+            return None
+
+        return len(self.topology.cores)
+
+
+    def check_core(self, core):
+        """
+        Verifies if a specified core is a valid logical core ID.
+
+        Parameters:
+            core: core ID
+
+        Returns:
+            True/False a given core number is valid/invalid
+            None otherwise
+        """
+        if self.topology is None or self.topology.valid_cores is None:
+            return None
+
+        return core in self.topology.valid_cores
+
+    def get_l2ids(self):
+        """
+        Gets list of L2 IDs
+
+        Returns:
+            L2 IDs list,
+            None otherwise
+        """
+        if self.topology is None or self.topology.l2ids is None:
+            return None
+
+        return list(self.topology.l2ids)
+
+    def get_sockets(self):
+        """
+        Gets list of sockets
+
+        Returns:
+            sockets list,
+            None otherwise
+        """
+        if self.topology is None or self.topology.sockets is None:
+            return None
+
+        return list(self.topology.sockets)
+
+
+    def get_cores(self, socket=None):
+        """
+        Gets list of cores
+
+        Parameters:
+            socket: socket ID, all sockets if None
+
+        Returns:
+            cores list,
+            None otherwise
+        """
+        if self.topology is None or self.topology.cores is None:
+            return None
+
+        if socket is None:
+            return list(self.topology.cores)
+
+        if socket not in self.topology.socket_cores:
+            return None
+
+        return list(self.topology.socket_cores[socket])
+
+
+    def get_core_info(self, core):
+        """
+        Gets core's socket/L2/L3/MBA IDs
+
+        Parameters:
+            core: core ID
+
+        Returns:
+            PqosCoreInfo like object,
+            None otherwise
+        """
+        if self.topology is None or self.topology.core_info is None:
+            return None
+
+        return self.topology.core_info.get(core)
+
+
+    def get_l3ca_num_cos(self):
+        """
+        Gets number of COS for L3 CAT
+
+        Returns:
+            num of COS for L3 CAT
+            None otherwise
+        """
+        if self.topology is None:
+            return None
+
+        return self.topology.l3ca_num_cos
+
+
+    def get_l2ca_num_cos(self):
+        """
+        Gets number of COS for L2 CAT
+
+        Returns:
+            num of COS for L2 CAT
+            None otherwise
+        """
+        if self.topology is None:
+            return None
+
+        return self.topology.l2ca_num_cos
+
+
+    def get_mba_num_cos(self):
+        """
+        Gets number of COS for MBA
+
+        Returns:
+            num of COS for MBA
+            None otherwise
+        """
+        if self.topology is None:
+            return None
+
+        return self.topology.mba_num_cos
+
+
+    def get_max_cos_id(self, alloc_type):
+        """
+        Gets max COS# (id) that can be used to configure set of allocation technologies
+
+        Returns:
+            Available COS# to be used
+            None otherwise
+        """
+        max_cos_l2cat = self.get_l2ca_num_cos()
+        max_cos_cat = self.get_l3ca_num_cos()
+        max_cos_mba = self.get_mba_num_cos()
+        cos_nums = []
+
+        if common.CAT_L2_CAP not in alloc_type and common.CAT_L3_CAP not in alloc_type and\
+        common.MBA_CAP not in alloc_type:
+            return None
+
+        if common.CAT_L2_CAP in alloc_type and not max_cos_l2cat:
+            return None
+
+        if common.CAT_L3_CAP in alloc_type and not max_cos_cat:
+            return None
+
+        if common.MBA_CAP in alloc_type and not max_cos_mba:
+            return None
+
+        if common.CAT_L2_CAP in alloc_type:
+            cos_nums.append(max_cos_l2cat)
+
+        if common.CAT_L3_CAP in alloc_type:
+            cos_nums.append(max_cos_cat)
+
+        if common.MBA_CAP in alloc_type:
+            cos_nums.append(max_cos_mba)
+
+        if not cos_nums:
+            return None
+
+        return min(cos_nums) - 1
+
+    def get_max_l2_cat_cbm(self):
+        """
+        Gets Max L2 CAT CBM
+
+        Returns:
+            Max L2 CAT CBM
+            None otherwise
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        return 2**self.topology.l2ca.num_ways - 1
+
+    def get_max_l3_cat_cbm(self):
+        """
+        Gets Max L3 CAT CBM
+
+        Returns:
+            Max L3 CAT CBM
+            None otherwise
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        return 2**self.topology.l3ca.num_ways - 1
+
+    def get_l3_cache_size(self):
+        """
+        Gets L3 cache size (in bytes)
+
+        Returns:
+            L3 cache size in bytes
+            or None on error
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        l3ca_caps = self.topology.l3ca
+        return l3ca_caps.num_ways * l3ca_caps.way_size
+
+    def get_l3_cache_way_size(self):
+        """
+        Gets L3 cache way size (in bytes)
+
+        Returns:
+            L3 cache way size in bytes
+            or None on error
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        return self.topology.l3ca.way_size
+
+    def get_l3_num_cache_ways(self):
+        """
+        Gets a number of L3 cache ways
+
+        Returns:
+            a number of L3 cache ways
+            or None on error
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        return self.topology.l3ca.num_ways
+
+    def is_l3_cdp_supported(self):
+        """
+        Gets L3 CDP support
+
+        Returns:
+            True if L3 CDP is supported, False if it is not supported
+            or None on error
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        return self.topology.l3ca.cdp
+
+    def is_l3_cdp_enabled(self):
+        """
+        Gets L3 CDP status
+
+        Returns:
+            True if L3 CDP is enabled, False if it is not enabled
+            or None on error
+        """
+
+        if not self.is_l3_cat_supported() or self.topology.l3ca is None:
+            return None
+
+        return self.topology.l3ca.cdp_on
+
+    def get_l2_cache_size(self):
+        """
+        Gets L2 cache size (in bytes)
+
+        Returns:
+            L2 cache size in bytes
+            or None on error
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        l2ca_caps = self.topology.l2ca
+        return l2ca_caps.num_ways * l2ca_caps.way_size
+
+    def get_l2_cache_way_size(self):
+        """
+        Gets L2 cache way size (in bytes)
+
+        Returns:
+            L2 cache way size in bytes
+            or None on error
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        return self.topology.l2ca.way_size
+
+    def get_l2_num_cache_ways(self):
+        """
+        Gets a number of L2 cache ways
+
+        Returns:
+            a number of L2 cache ways
+            or None on error
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        return self.topology.l2ca.num_ways
+
+    def is_l2_cdp_supported(self):
+        """
+        Gets L2 CDP support
+
+        Returns:
+            True if L2 CDP is supported, False if it is not supported
+            or None on error
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        return self.topology.l2ca.cdp
+
+    def is_l2_cdp_enabled(self):
+        """
+        Gets L2 CDP status
+
+        Returns:
+            True if L2 CDP is enabled, False if it is not enabled
+            or None on error
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        return self.topology.l2ca.cdp_on
@@ -45,9 +45,147 @@ import pid_ops
 
 from power import AdmissionControlError
 
-from rest.rest_exceptions import NotFound, BadRequest
+from rest.rest_config import update_config
+from rest.rest_exceptions import NotFound, BadRequest, Conflict
 
 from config import ConfigStore
+from config_index import ConfigIndex
+
+
+def delete_app(data, app_id):
+    """
+    Deletes App from configuration
+    Raises NotFound
+
+    Parameters:
+        data: configuration (dict), modified in place
+        app_id: Id of app to delete
+    """
+    if 'apps' not in data or 'pools' not in data:
+        raise NotFound("No apps or pools in config file")
+
+    index = ConfigIndex(data)
+
+    app = index.apps.get(int(app_id))
+    if app is None:
+        raise NotFound(f"APP {app_id} not found in config")
+
+    # remove app id from pool
+    pool = index.pools.get(index.app_to_pool.get(app['id']))
+    if pool is not None:
+        pool['apps'].remove(app['id'])
+
+    # remove app
+    data['apps'].remove(app)
+
+
+def modify_app(data, app_id, json_data):
+    """
+    Modifies App in configuration (e.g.: moves to different pool)
+    Raises NotFound
+
+    Parameters:
+        data: configuration (dict), modified in place
+        app_id: Id of app to modify
+        json_data: schema validated App changes
+    """
+    if 'apps' not in data or 'pools' not in data:
+        raise NotFound("No apps or pools in config file")
+
+    index = ConfigIndex(data)
+
+    app = index.apps.get(int(app_id))
+    if app is None:
+        raise NotFound(f"APP {app_id} not found in config")
+
+    # move to another pool
+    if 'pool_id' in json_data:
+        pool_id = json_data['pool_id']
+
+        # remove app id from pool
+        pool = index.pools.get(index.app_to_pool.get(app['id']))
+        if pool is not None:
+            pool['apps'].remove(app['id'])
+
+        # add app id to new pool
+        pool = index.pools.get(int(pool_id))
+        if pool is not None:
+            if not 'apps' in pool:
+                pool['apps'] = []
+            pool['apps'].append(app['id'])
+
+    # set new cores
+    if 'cores' in json_data:
+        app['cores'] = json_data['cores']
+
+    # set new name
+    if 'name' in json_data:
+        app['name'] = json_data['name']
+
+    # set new PIDs
+    if 'pids' in json_data:
+        app['pids'] = json_data['pids']
+
+
+def add_app(data, json_data):
+    # pylint: disable=too-many-branches
+    """
+    Adds new App to configuration, App ID is stored in json_data
+    Raises NotFound, BadRequest
+
+    Parameters:
+        data: configuration (dict), modified in place
+        json_data: schema validated new App
+
+    Returns:
+        ID of pool App was added to
+    """
+    if 'pools' not in data:
+        raise NotFound("No pools in config file")
+
+    index = ConfigIndex(data)
+
+    json_data['id'] = common.CONFIG_STORE.get_new_app_id(data)
+
+    if 'pids' in json_data:
+        # validate pids
+        for pid in json_data['pids']:
+            if not pid_ops.is_pid_valid(pid):
+                raise BadRequest(f"New APP not added, invalid PID: {pid}")
+
+    # if pool_id not provided on app creation
+    if 'pool_id' not in json_data or not json_data['pool_id']:
+        json_data['pool_id'] = None
+
+        # if apps cores list is a subset of existing pool cores list,
+        # make existing pool a destination pool for app
+        if 'cores' in json_data and json_data['cores']:
+            for core in json_data['cores']:
+                if not common.PQOS_API.check_core(core):
+                    raise BadRequest(f"New APP not added, invalid core: {core}")
+            pool_ids = {index.core_to_pool.get(core) for core in json_data['cores']}
+            if len(pool_ids) == 1 and None not in pool_ids:
+                json_data['pool_id'] = pool_ids.pop()
+
+        # if it is not, make default pool a destination pool
+        if json_data['pool_id'] is None:
+            json_data['pool_id'] = 0
+            if 'cores' in json_data:
+                json_data.pop('cores')
+
+    pool = index.pools.get(json_data['pool_id'])
+    if pool is None:
+        raise BadRequest(f"New APP not added, Pool {json_data['pool_id']} does not exist.")
+
+    # update pool configuration to include new app
+    if not 'apps' in pool:
+        pool['apps'] = []
+    pool['apps'].append(json_data['id'])
+
+    json_data.pop('pool_id')
+    data['apps'].append(json_data)
+
+    return pool['id']
 
 
 class App(Resource):
@@ -70,17 +208,17 @@ class App(Resource):
             response, status code
         """
 
-        data = common.CONFIG_STORE.get_config()
-        if 'apps' not in data:
+        index = common.CONFIG_STORE.get_index()
+        if 'apps' not in index.data:
             raise NotFound("No apps in config file")
 
-        try:
-            app = common.CONFIG_STORE.get_app(data, int(app_id))
-            app['pool_id'] = common.CONFIG_STORE.app_to_pool(int(app_id))
-        except:
-            # pylint: disable=raise-missing-from
+        if int(app_id) not in index.apps:
             raise NotFound(f"APP {app_id} not found in config")
 
+        # shared configuration must not be modified
+        app = dict(index.apps[int(app_id)])
+        app['pool_id'] = index.app_to_pool.get(int(app_id))
+
         return app, 200
 
 
@@ -89,7 +227,7 @@ class App(Resource):
         """
         Handles HTTP DELETE /apps/<app_id> request.
         Deletes single App
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             app_id: Id of app to delete
@@ -98,41 +236,20 @@ class App(Resource):
             response, status code
         """
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'apps' not in data or 'pools' not in data:
-            raise NotFound("No apps or pools in config file")
-
-        for app in data['apps']:
-            if app['id'] != int(app_id):
-                continue
-
-            # remove app id from pool
-            for pool in data['pools']:
-                if 'apps' not in pool:
-                    continue
-
-                if app['id'] in pool['apps']:
-                    pool['apps'].remove(app['id'])
-                    break
-
-            # remove app
-            data['apps'].remove(app)
-            common.CONFIG_STORE.set_config(data)
-
-            res = {'message': f"APP {app_id} deleted" }
-            return res, 200
+        generation, _ = update_config(lambda data: delete_app(data, app_id))
+        if generation is None:
+            raise Conflict(f"APP {app_id} not deleted, configuration changed in the meantime")
 
-        raise NotFound(f"APP {app_id} not found in config")
+        res = {'message': f"APP {app_id} deleted", 'generation': generation}
+        return res, 200
 
 
     @staticmethod
     def put(app_id):
-        # pylint: disable=too-many-branches
-
         """
         Handles HTTP PUT /apps/<app_id> request.
         Modifies an App (e.g.: moves to different pool)
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             app_id: Id of app to modify
@@ -145,49 +262,12 @@ class App(Resource):
 
         # validate app schema
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_app.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_app.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest(f"Request validation failed - {error}") from error
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'apps' not in data or 'pools' not in data:
-            raise NotFound("No apps or pools in config file")
-
-        # move to another pool
-        for app in data['apps']:
-            if app['id'] != int(app_id):
-                continue
-
-            if 'pool_id' in json_data:
-                pool_id = json_data['pool_id']
-
-                # remove app id from pool
-                for pool in data['pools']:
-                    if 'apps' in pool:
-                        if app['id'] in pool['apps']:
-                            pool['apps'].remove(app['id'])
-                            break
-
-                # add app id to new pool
-                for pool in data['pools']:
-                    if pool['id'] == int(pool_id):
-                        if not 'apps' in pool:
-                            pool['apps'] = []
-                        pool['apps'].append(app['id'])
-                        break
-
-            # set new cores
-            if 'cores' in json_data:
-                app['cores'] = json_data['cores']
-
-            # set new name
-            if 'name' in json_data:
-                app['name'] = json_data['name']
-
-            # set new PIDs
-            if 'pids' in json_data:
-                app['pids'] = json_data['pids']
+        def modify(data):
+            modify_app(data, app_id, json_data)
 
             try:
                 common.CONFIG_STORE.validate(data)
@@ -196,14 +276,45 @@ class App(Resource):
             except Exception as ex:
                 raise BadRequest(f"APP {app_id} not updated, {ex}") from ex
 
-            common.CONFIG_STORE.set_config(data)
-            if 'pool_id' in json_data:
-                common.STATS_STORE.general_stats_inc_apps_moves()
+        generation, _ = update_config(modify)
+        if generation is None:
+            raise Conflict(f"APP {app_id} not updated, configuration changed in the meantime")
 
-            res = {'message': f"APP {app_id} updated"}
-            return res, 200
+        if 'pool_id' in json_data:
+            common.STATS_STORE.general_stats_inc_apps_moves()
 
-        raise NotFound(f"APP {app_id} not found in config")
+        res = {'message': f"APP {app_id} updated", 'generation': generation}
+        return res, 200
+
+
+class AppMetrics(Resource):
+    """
+    Handles /apps/<app_id>/metrics HTTP requests
+    """
+
+
+    @staticmethod
+    def get(app_id):
+        """
+        Handles HTTP GET /apps/<app_id>/metrics request.
+        Retrieve recent monitoring samples of single app
+        Raises NotFound
+
+        Parameters:
+            app_id: Id of app to retrieve samples for
+
+        Returns:
+            response, status code
+        """
+
+        if int(app_id) not in common.CONFIG_STORE.get_index().apps:
+            raise NotFound(f"APP {app_id} not found in config")
+
+        samples = common.METRICS_STORE.get_metrics('apps', int(app_id))
+        if samples is None:
+            raise NotFound(f"APP {app_id} not monitored")
+
+        return samples, 200
 
 
 class Apps(Resource):
@@ -222,25 +333,25 @@ class Apps(Resource):
         Returns:
             response, status code
         """
-        data = common.CONFIG_STORE.get_config()
-        if 'apps' not in data or not data['apps']:
+        index = common.CONFIG_STORE.get_index()
+        if 'apps' not in index.data or not index.data['apps']:
             raise NotFound("No apps in config file")
 
-        apps = data['apps']
+        # shared configuration must not be modified
+        apps = [dict(app) for app in index.data['apps']]
 
         for app in apps:
-            app['pool_id'] = common.CONFIG_STORE.app_to_pool(app['id'])
+            app['pool_id'] = index.app_to_pool.get(app['id'])
 
-        return (data['apps']), 200
+        return apps, 200
 
 
     @staticmethod
     def post():
-        # pylint: disable=too-many-branches
         """
         Handles HTTP POST /apps request.
         Add a new App
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Returns:
             response, status code
@@ -249,69 +360,32 @@ class Apps(Resource):
 
         # validate app schema
         try:
-            schema, resolver = ConfigStore.load_json_schema('add_app.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'add_app.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest(f"Request validation failed - {error}") from error
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-
-        if 'pools' not in data:
-            raise NotFound("No pools in config file")
-
-        json_data['id'] = common.CONFIG_STORE.get_new_app_id()
-
-        if 'pids' in json_data:
-            # validate pids
-            for pid in json_data['pids']:
-                if not pid_ops.is_pid_valid(pid):
-                    raise BadRequest(f"New APP not added, invalid PID: {pid}")
-
-        # if pool_id not provided on app creation
-        if 'pool_id' not in json_data or not json_data['pool_id']:
-            json_data['pool_id'] = None
-
-            # if apps cores list is a subset of existing pool cores list,
-            # make existing pool a destination pool for app
-            if 'cores' in json_data and json_data['cores']:
-                for core in json_data['cores']:
-                    if not common.PQOS_API.check_core(core):
-                        raise BadRequest(f"New APP not added, invalid core: {core}")
-                for pool in data['pools']:
-                    if set(json_data['cores']).issubset(pool['cores']):
-                        json_data['pool_id'] = pool['id']
-                        break
+        def modify(data):
+            # add_app() modifies App data
+            app_data = deepcopy(json_data)
+            pool_id = add_app(data, app_data)
 
-            # if it is not, make default pool a destination pool
-            if json_data['pool_id'] is None:
-                json_data['pool_id'] = 0
-                if 'cores' in json_data:
-                    json_data.pop('cores')
-
-        try:
-            pool = common.CONFIG_STORE.get_pool(data, json_data['pool_id'])
-        except Exception as ex:
-            raise BadRequest(f"New APP not added, {ex}") from ex
-
-        # update pool configuration to include new app
-        if not 'apps' in pool:
-            pool['apps'] = []
-        pool['apps'].append(json_data['id'])
-
-        json_data.pop('pool_id')
-        data['apps'].append(json_data)
+            try:
+                common.CONFIG_STORE.validate(data)
+            except AdmissionControlError:
+                pass
+            except Exception as ex:
+                raise BadRequest(f"New APP not added, {ex}") from ex
 
-        try:
-            common.CONFIG_STORE.validate(data)
-        except AdmissionControlError:
-            pass
-        except Exception as ex:
-            raise BadRequest(f"New APP not added, {ex}") from ex
+            return app_data['id'], pool_id
 
-        common.CONFIG_STORE.set_config(data)
+        generation, result = update_config(modify)
+        if generation is None:
+            raise Conflict("New APP not added, configuration changed in the meantime")
 
+        app_id, pool_id = result
         res = {
-            'id': json_data['id'],
-            'message': f"New APP added to pool {pool['id']}"
+            'id': app_id,
+            'message': f"New APP added to pool {pool_id}",
+            'generation': generation
         }
         return res, 201
@@ -0,0 +1,169 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+REST API module
+Batch of configuration changes
+"""
+
+from copy import deepcopy
+from flask_restful import Resource, request
+
+import jsonschema
+
+import caps
+import common
+
+from rest.rest_exceptions import BadRequest, Conflict, RestError
+from rest.rest_app import add_app, modify_app, delete_app
+from rest.rest_pool import add_pool, modify_pool, delete_pool
+from rest.rest_power import add_power_profile, modify_power_profile, delete_power_profile,\
+    check_allowed
+
+from config import ConfigStore
+
+# target, operation to request data schema and configuration change function
+OPERATIONS = {
+    'app': {
+        'add': ('add_app.json', add_app),
+        'modify': ('modify_app.json', modify_app),
+        'delete': (None, delete_app)
+    },
+    'pool': {
+        'add': ('add_pool.json', add_pool),
+        'modify': ('modify_pool.json', modify_pool),
+        'delete': (None, delete_pool)
+    },
+    'power_profile': {
+        'add': ('add_power.json', check_allowed(add_power_profile)),
+        'modify': ('modify_power.json', check_allowed(modify_power_profile)),
+        'delete': (None, check_allowed(delete_power_profile))
+    }
+}
+
+
+class Batch(Resource):
+    """
+    Handles /batch HTTP requests
+    """
+
+
+    @staticmethod
+    def post():
+        # pylint: disable=too-many-branches
+        """
+        Handles HTTP POST /batch request.
+        Applies list of Apps, Pools and Power Profiles operations to single copy
+        of configuration, validates and commits it at once, so new configuration
+        is applied only once. No operation is applied if any of them fails.
+        Raises NotFound, BadRequest, InternalError, MethodNotAllowed, Conflict
+
+        Returns:
+            response, status code
+        """
+        json_data = request.get_json()
+
+        # validate batch schema
+        try:
+            ConfigStore.validate_schema(json_data, 'batch.json')
+        except (jsonschema.ValidationError, OverflowError) as error:
+            raise BadRequest(f"Request validation failed - {error}") from error
+
+        verify = json_data.get('verify', True)
+        admission_control_check = False
+        apps_moves = 0
+        ids = []
+
+        # configuration is committed only if not changed in the meantime
+        version = common.CONFIG_STORE.get_config_version()
+        data = deepcopy(common.CONFIG_STORE.get_config())
+
+        for idx, operation in enumerate(json_data['operations']):
+            target = operation['target']
+            schema, func = OPERATIONS[target][operation['op']]
+
+            try:
+                if target == 'power_profile' and not caps.sstcp_enabled():
+                    raise BadRequest("Power Profiles not enabled")
+
+                if operation['op'] == 'delete':
+                    func(data, operation['id'])
+                    ids.append(operation['id'])
+                    continue
+
+                op_data = operation['data']
+                try:
+                    ConfigStore.validate_schema(op_data, schema)
+                except (jsonschema.ValidationError, OverflowError) as error:
+                    raise BadRequest(f"Request validation failed - {error}") from error
+
+                # admission control is done once, for whole batch
+                if target != 'app' and op_data.pop('verify', True) and verify:
+                    if target == 'pool':
+                        admission_control_check |= \
+                            'cores' in op_data or 'power_profile' in op_data
+                    else:
+                        admission_control_check |= operation['op'] == 'modify'
+
+                if operation['op'] == 'add':
+                    result = func(data, op_data)
+                    # App's ID is returned in request data, Pool ID is returned
+                    ids.append(op_data['id'] if target == 'app' else result)
+                else:
+                    func(data, operation['id'], op_data)
+                    ids.append(operation['id'])
+                    if target == 'app' and 'pool_id' in op_data:
+                        apps_moves += 1
+
+            except RestError as error:
+                error.description = \
+                    f"Operation {idx} ({operation['op']} {target}) failed, {error.description}"
+                raise error
+
+        try:
+            common.CONFIG_STORE.validate(data, admission_control_check)
+        except Exception as ex:
+            raise BadRequest(f"Batch not applied, {ex}") from ex
+
+        generation = common.CONFIG_STORE.set_config(data, version)
+        if generation is None:
+            raise Conflict("Batch not applied, configuration changed in the meantime")
+
+        for _ in range(apps_moves):
+            common.STATS_STORE.general_stats_inc_apps_moves()
+
+        res = {
+            'ids': ids,
+            'message': f"Batch of {len(ids)} operations applied",
+            'generation': generation
+        }
+        return res, 200
@@ -0,0 +1,72 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+REST API module
+Shared configuration updates
+"""
+
+from copy import deepcopy
+
+import common
+
+
+# number of read-modify-write attempts of single object requests
+CONFIG_UPDATE_RETRIES = 5
+
+
+def update_config(modify):
+    """
+    Read-modify-write of shared configuration. Retried if configuration
+    has been changed in the meantime, e.g. by "backend" itself
+    (PID tracking, Default pool recreation).
+
+    Parameters:
+        modify: function modifying configuration (dict) in place,
+                may raise RestError
+
+    Returns:
+        new configuration version and modify result,
+        None and None if configuration kept changing
+    """
+
+    for _ in range(CONFIG_UPDATE_RETRIES):
+        version = common.CONFIG_STORE.get_config_version()
+        data = deepcopy(common.CONFIG_STORE.get_config())
+        result = modify(data)
+
+        generation = common.CONFIG_STORE.set_config(data, version)
+        if generation is not None:
+            return generation, result
+
+    return None, None
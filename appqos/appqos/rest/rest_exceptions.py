@@ -88,3 +88,23 @@ class MethodNotAllowed(RestError):
 
     def __init__(self, description="Method Not Allowed"):
         RestError.__init__(self, 405, description)
+
+
+class Conflict(RestError):
+    """
+    Conflict exception
+    """
+
+
+    def __init__(self, description="Conflict"):
+        RestError.__init__(self, 409, description)
+
+
+class ServiceUnavailable(RestError):
+    """
+    Service Unavailable exception
+    """
+
+
+    def __init__(self, description="Service Unavailable"):
+        RestError.__init__(self, 503, description)
@@ -35,14 +35,17 @@ REST API module
 Stats, Caps, etc.
 """
 
+from flask import Response
 from flask_restful import Resource, request
 
 import jsonschema
 
 import caps
 import common
+import openmetrics
 import power
 import sstbf
+import tracing
 
 from rest.rest_exceptions import BadRequest, InternalError
 
@@ -73,6 +76,52 @@ class Stats(Resource):
         return res, 200
 
 
+class Metrics(Resource):
+    """
+    Handles /metrics HTTP requests
+    """
+    EXPORTER = openmetrics.Exporter()
+
+
+    @staticmethod
+    def get():
+        """
+        Handles HTTP GET /metrics request.
+        Retrieve stats, configuration and monitoring data in OpenMetrics text format
+
+        Returns:
+            response
+        """
+        return Response(Metrics.EXPORTER.render(), mimetype=openmetrics.CONTENT_TYPE)
+
+
+class Traces(Resource):
+    """
+    Handles /traces HTTP requests
+    """
+
+
+    @staticmethod
+    def get():
+        """
+        Handles HTTP GET /traces request.
+        Retrieve timing traces of last configuration applies,
+        "format=chrome" for Chrome trace event format
+
+        Returns:
+            response, status code
+        """
+        trace_format = request.args.get('format', 'json')
+        if trace_format not in ['json', 'chrome']:
+            raise BadRequest("Invalid format parameter")
+
+        traces = common.TRACER.get_traces()
+        if trace_format == 'chrome':
+            return tracing.to_chrome_trace(traces), 200
+
+        return {'traces': traces}, 200
+
+
 class Caps(Resource):
     """
     Handles /caps HTTP requests
@@ -128,8 +177,7 @@ class Sstbf(Resource):
 
         # validate app schema
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_sstbf.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_sstbf.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest(f"Request validation failed - {error}") from error
 
@@ -161,5 +209,8 @@ class Reset(Resource):
 
         common.CONFIG_STORE.reset()
 
-        res = {'message': "Reset performed. Configuration reloaded."}
+        res = {
+            'message': "Reset performed. Configuration reloaded.",
+            'generation': common.CONFIG_STORE.get_config_version()
+        }
         return res, 200
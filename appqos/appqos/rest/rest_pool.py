@@ -35,7 +35,6 @@ REST API module
 POOLs
 """
 
-from copy import deepcopy
 from flask_restful import Resource, request
 
 import jsonschema
@@ -45,9 +44,162 @@ import common
 import log
 import sstbf
 
-from rest.rest_exceptions import NotFound, BadRequest, InternalError
+from rest.rest_config import update_config
+from rest.rest_exceptions import NotFound, BadRequest, Conflict, InternalError
 
 from config import ConfigStore
+from config_index import ConfigIndex
+
+
+def delete_pool(data, pool_id):
+    """
+    Deletes empty Pool from configuration
+    Raises NotFound, BadRequest
+
+    Parameters:
+        data: configuration (dict), modified in place
+        pool_id: Id of pool to delete
+    """
+    if 'pools' not in data:
+        raise NotFound("No pools in config file")
+
+    if int(pool_id) == 0:
+        raise BadRequest(f"POOL {pool_id} is Default, cannot delete")
+
+    pool = ConfigIndex(data).pools.get(int(pool_id))
+    if pool is None:
+        raise NotFound(f"POOL {pool_id} not found in config")
+
+    if 'apps' in pool and pool['apps']:
+        raise BadRequest(f"POOL {pool_id} is not empty")
+
+    # remove pool
+    data['pools'].remove(pool)
+
+
+def modify_pool(data, pool_id, json_data):
+    # pylint: disable=too-many-branches
+    """
+    Modifies Pool in configuration
+    Raises NotFound, BadRequest
+
+    Parameters:
+        data: configuration (dict), modified in place
+        pool_id: Id of pool to modify
+        json_data: schema validated Pool changes
+    """
+    def check_alloc_tech(pool_id, json_data):
+        if 'l3cbm' in json_data:
+            if not caps.cat_l3_supported():
+                raise BadRequest("System does not support CAT!")
+            if pool_id > common.PQOS_API.get_max_cos_id([common.CAT_L3_CAP]):
+                raise BadRequest(f"Pool {pool_id} does not support CAT")
+
+        if 'mba' in json_data or 'mba_bw' in json_data:
+            if not caps.mba_supported():
+                raise BadRequest("System does not support MBA!")
+            if pool_id > common.PQOS_API.get_max_cos_id([common.MBA_CAP]):
+                raise BadRequest(f"Pool {pool_id} does not support MBA")
+
+        if 'mba_bw' in json_data and not caps.mba_bw_enabled():
+            raise BadRequest("MBA CTRL is not "\
+                             f"{'enabled' if caps.mba_bw_supported() else 'supported'}!")
+
+        if 'mba' in json_data and caps.mba_bw_enabled():
+            raise BadRequest("MBA RATE is disabled! Disable MBA CTRL and try again.")
+
+    if 'pools' not in data:
+        raise NotFound("No pools in config file")
+
+    index = ConfigIndex(data)
+
+    pool = index.pools.get(int(pool_id))
+    if pool is None:
+        raise NotFound(f"POOL {pool_id} not found in config")
+
+    if 'cbm' in json_data:
+        log.warn("cbm property is deprecated, please use l3cbm instead")
+        if 'l3cbm' not in json_data:
+            json_data['l3cbm'] = json_data['cbm']
+        json_data.pop('cbm')
+
+    check_alloc_tech(int(pool_id), json_data)
+
+    # set new cbm
+    for key in ['l2cbm', 'l3cbm', 'l3cbm_code', 'l3cbm_data']:
+        if key not in json_data:
+            continue
+
+        cbm = json_data[key]
+        if not isinstance(cbm, int):
+            cbm = int(cbm, 16)
+
+        pool[key] = cbm
+
+    for feature in ['mba', 'mba_bw', 'cores', 'task_mode']:
+        if feature in json_data:
+            pool[feature] = json_data[feature]
+
+    if 'apps' in pool and pool['apps']:
+        for app_id in pool['apps']:
+            app = index.apps.get(app_id)
+            if app is None or 'cores' not in app:
+                continue
+            if not set(app['cores']).issubset(pool['cores']):
+                app.pop('cores')
+
+    # set new name
+    if 'name' in json_data:
+        pool['name'] = json_data['name']
+
+    # set new power profile
+    # ignore 'power_profile' if SST-BF is enabled
+    if 'power_profile' in json_data and not sstbf.is_sstbf_configured():
+        pool['power_profile'] = json_data['power_profile']
+
+
+def add_pool(data, json_data):
+    """
+    Adds new Pool to configuration
+    Raises InternalError
+
+    Parameters:
+        data: configuration (dict), modified in place
+        json_data: schema validated new Pool
+
+    Returns:
+        ID of new Pool
+    """
+    post_data = json_data.copy()
+
+    if 'cbm' in post_data and 'l3cbm' not in post_data:
+        log.warn("cbm property is deprecated, please use l3cbm instead")
+        post_data['l3cbm'] = post_data['cbm']
+        post_data.pop('cbm')
+
+    post_data['id'] = common.CONFIG_STORE.get_new_pool_id(post_data, data)
+    if post_data['id'] is None:
+        raise InternalError("New POOL not added, maximum number of POOLS"\
+            " reached for requested allocation combination")
+
+    # convert cbm from string to int
+    for key in ['l2cbm', 'l3cbm', 'l3cbm_code', 'l3cbm_data']:
+        if key not in post_data:
+            continue
+
+        cbm = post_data[key]
+        if not isinstance(cbm, int):
+            cbm = int(cbm, 16)
+
+        post_data[key] = cbm
+
+    # ignore 'power_profile' if SST-BF is enabled
+    if sstbf.is_sstbf_configured():
+        post_data.pop('power_profile', None)
+
+    data['pools'].append(post_data)
+
+    return post_data['id']
 
 
 class Pool(Resource):
@@ -70,16 +222,14 @@ class Pool(Resource):
             response, status code
         """
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'pools' not in data:
+        index = common.CONFIG_STORE.get_index()
+        if 'pools' not in index.data:
             raise NotFound("No pools in config file")
 
-        try:
-            pool = common.CONFIG_STORE.get_pool(data, int(pool_id))
-        except:
-            # pylint: disable=raise-missing-from
+        if int(pool_id) not in index.pools:
             raise NotFound(f"POOL {pool_id} not found in config")
-        return pool, 200
+
+        return index.pools[int(pool_id)], 200
 
 
     @staticmethod
@@ -87,7 +237,7 @@ class Pool(Resource):
         """
         Handles HTTP DELETE /pool/<pull_id> request.
         Deletes single Pool
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             pool_id: Id of pool to delete
@@ -96,37 +246,20 @@ class Pool(Resource):
             response, status code
         """
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'pools' not in data:
-            raise NotFound("No pools in config file")
-
-        if int(pool_id) == 0:
-            raise BadRequest(f"POOL {pool_id} is Default, cannot delete")
-
-        for pool in data['pools']:
-            if pool['id'] != int(pool_id):
-                continue
-
-            if 'apps' in pool and pool['apps']:
-                raise BadRequest(f"POOL {pool_id} is not empty")
-
-            # remove app
-            data['pools'].remove(pool)
-            common.CONFIG_STORE.set_config(data)
-
-            res = {'message': f"POOL {pool_id} deleted"}
-            return res, 200
+        generation, _ = update_config(lambda data: delete_pool(data, pool_id))
+        if generation is None:
+            raise Conflict(f"POOL {pool_id} not deleted, configuration changed in the meantime")
 
-        raise NotFound(f"POOL {pool_id} not found in config")
+        res = {'message': f"POOL {pool_id} deleted", 'generation': generation}
+        return res, 200
 
 
     @staticmethod
     def put(pool_id):
-        # pylint: disable=too-many-branches
         """
         Handles HTTP PUT /pools/<pool_id> request.
         Modifies a Pool
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             pool_id: Id of pool
@@ -134,97 +267,61 @@ class Pool(Resource):
         Returns:
             response, status code
         """
-        def check_alloc_tech(pool_id, json_data):
-            if 'l3cbm' in json_data:
-                if not caps.cat_l3_supported():
-                    raise BadRequest("System does not support CAT!")
-                if pool_id > common.PQOS_API.get_max_cos_id([common.CAT_L3_CAP]):
-                    raise BadRequest(f"Pool {pool_id} does not support CAT")
-
-            if 'mba' in json_data or 'mba_bw' in json_data:
-                if not caps.mba_supported():
-                    raise BadRequest("System does not support MBA!")
-                if pool_id > common.PQOS_API.get_max_cos_id([common.MBA_CAP]):
-                    raise BadRequest(f"Pool {pool_id} does not support MBA")
-
-            if 'mba_bw' in json_data and not caps.mba_bw_enabled():
-                raise BadRequest("MBA CTRL is not "\
-                                 f"{'enabled' if caps.mba_bw_supported() else 'supported'}!")
-
-            if 'mba' in json_data and caps.mba_bw_enabled():
-                raise BadRequest("MBA RATE is disabled! Disable MBA CTRL and try again.")
-
         json_data = request.get_json()
 
         # validate app schema
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_pool.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_pool.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
         admission_control_check = json_data.pop('verify', True) and\
             ('cores' in json_data or 'power_profile' in json_data)
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'pools' not in data:
-            raise NotFound("No pools in config file")
-
-        for pool in data['pools']:
-            if pool['id'] != int(pool_id):
-                continue
-
-            if 'cbm' in json_data:
-                log.warn("cbm property is deprecated, please use l3cbm instead")
-                if 'l3cbm' not in json_data:
-                    json_data['l3cbm'] = json_data['cbm']
-                json_data.pop('cbm')
+        def modify(data):
+            modify_pool(data, pool_id, json_data)
 
-            check_alloc_tech(int(pool_id), json_data)
+            try:
+                common.CONFIG_STORE.validate(data, admission_control_check)
+            except Exception as ex:
+                raise BadRequest(f"POOL {pool_id} not updated, {ex}") from ex
 
-            # set new cbm
-            for key in ['l2cbm', 'l3cbm', 'l3cbm_code', 'l3cbm_data']:
-                if key not in json_data:
-                    continue
+        generation, _ = update_config(modify)
+        if generation is None:
+            raise Conflict(f"POOL {pool_id} not updated, configuration changed in the meantime")
 
-                cbm = json_data[key]
-                if not isinstance(cbm, int):
-                    cbm = int(cbm, 16)
+        res = {'message': f"POOL {pool_id} updated", 'generation': generation}
+        return res, 200
 
-                pool[key] = cbm
 
-            for feature in ['mba', 'mba_bw', 'cores']:
-                if feature in json_data:
-                    pool[feature] = json_data[feature]
+class PoolMetrics(Resource):
+    """
+    Handles /pools/<pool_id>/metrics HTTP requests
+    """
 
-            if 'apps' in pool and pool['apps']:
-                for app_id in pool['apps']:
-                    for app in data['apps']:
-                        if app['id'] != app_id or 'cores' not in app:
-                            continue
-                        if not set(app['cores']).issubset(pool['cores']):
-                            app.pop('cores')
 
-            # set new name
-            if 'name' in json_data:
-                pool['name'] = json_data['name']
+    @staticmethod
+    def get(pool_id):
+        """
+        Handles HTTP GET /pools/<pool_id>/metrics request.
+        Retrieve recent monitoring samples of single pool
+        Raises NotFound
 
-            # set new power profile
-            # ignore 'power_profile' if SST-BF is enabled
-            if 'power_profile' in json_data and not sstbf.is_sstbf_configured():
-                pool['power_profile'] = json_data['power_profile']
+        Parameters:
+            pool_id: Id of pool to retrieve samples for
 
-            try:
-                common.CONFIG_STORE.validate(data, admission_control_check)
-            except Exception as ex:
-                raise BadRequest(f"POOL {pool_id} not updated, {ex}") from ex
+        Returns:
+            response, status code
+        """
 
-            common.CONFIG_STORE.set_config(data)
+        if int(pool_id) not in common.CONFIG_STORE.get_index().pools:
+            raise NotFound(f"POOL {pool_id} not found in config")
 
-            res = {'message': f"POOL {pool_id} updated"}
-            return res, 200
+        samples = common.METRICS_STORE.get_metrics('pools', int(pool_id))
+        if samples is None:
+            raise NotFound(f"POOL {pool_id} not monitored")
 
-        raise NotFound(f"POOL {pool_id} not found in config")
+        return samples, 200
 
 
 class Pools(Resource):
@@ -243,7 +340,7 @@ class Pools(Resource):
         Returns:
             response, status code
         """
-        data = common.CONFIG_STORE.get_config().copy()
+        data = common.CONFIG_STORE.get_index().data
         if 'pools' not in data:
             raise NotFound("No pools in config file")
 
@@ -255,7 +352,7 @@ class Pools(Resource):
         """
         Handles HTTP POST /pools request.
         Add a new Pool
-        Raises NotFound, BadRequest, InternalError
+        Raises NotFound, BadRequest, InternalError, Conflict
 
         Returns:
             response, status code
@@ -264,53 +361,30 @@ class Pools(Resource):
 
         # validate pool schema
         try:
-            schema, resolver = ConfigStore.load_json_schema('add_pool.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'add_pool.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
         admission_control_check = json_data.pop('verify', True) and\
             ('cores' in json_data or 'power_profile' in json_data)
 
-        post_data = json_data.copy()
-
-        if 'cbm' in post_data and 'l3cbm' not in post_data:
-            log.warn("cbm property is deprecated, please use l3cbm instead")
-            post_data['l3cbm'] = post_data['cbm']
-            post_data.pop('cbm')
-
-        post_data['id'] = common.CONFIG_STORE.get_new_pool_id(post_data)
-        if post_data['id'] is None:
-            raise InternalError("New POOL not added, maximum number of POOLS"\
-                " reached for requested allocation combination")
-
-        # convert cbm from string to int
-        for key in ['l2cbm', 'l3cbm', 'l3cbm_code', 'l3cbm_data']:
-            if key not in post_data:
-                continue
-
-            cbm = post_data[key]
-            if not isinstance(cbm, int):
-                cbm = int(cbm, 16)
+        def modify(data):
+            pool_id = add_pool(data, json_data)
 
-            post_data[key] = cbm
-
-        # ignore 'power_profile' if SST-BF is enabled
-        if sstbf.is_sstbf_configured():
-            post_data.pop('power_profile', None)
-
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        data['pools'].append(post_data)
+            try:
+                common.CONFIG_STORE.validate(data, admission_control_check)
+            except Exception as ex:
+                raise BadRequest("New POOL not added") from ex
 
-        try:
-            common.CONFIG_STORE.validate(data, admission_control_check)
-        except Exception as ex:
-            raise BadRequest("New POOL not added") from ex
+            return pool_id
 
-        common.CONFIG_STORE.set_config(data)
+        generation, pool_id = update_config(modify)
+        if generation is None:
+            raise Conflict("New POOL not added, configuration changed in the meantime")
 
         res = {
-            'id': post_data['id'],
-            'message': f"New POOL {post_data['id']} added"
+            'id': pool_id,
+            'message': f"New POOL {pool_id} added",
+            'generation': generation
         }
         return res, 201
@@ -40,7 +40,10 @@ from copy import deepcopy
 from flask_restful import Resource, request
 import jsonschema
 
-from rest.rest_exceptions import NotFound, BadRequest, MethodNotAllowed
+from rest.rest_config import update_config
+from rest.rest_exceptions import NotFound, BadRequest, Conflict, MethodNotAllowed
+
+from config_index import ConfigIndex
 
 import sstbf
 
@@ -67,6 +70,74 @@ def check_allowed(func):
     return func_wrapper
 
 
+def delete_power_profile(data, profile_id):
+    """
+    Deletes unused Power Profile from configuration
+    Raises NotFound, BadRequest
+
+    Parameters:
+        data: configuration (dict), modified in place
+        profile_id: Id of power profile to delete
+    """
+    if 'power_profiles' not in data:
+        raise NotFound("No Power Profiles in config file")
+
+    profile = ConfigIndex(data).power_profiles.get(int(profile_id))
+    if profile is None:
+        raise NotFound("POWER PROFILE " + str(profile_id) + " not found in config")
+
+    for pool in data['pools']:
+        if 'power_profile' not in pool:
+            continue
+
+        if pool['power_profile'] == int(profile_id):
+            raise BadRequest(f"POWER PROFILE {profile_id} is in use.")
+
+    # remove profile
+    data['power_profiles'].remove(profile)
+
+
+def modify_power_profile(data, profile_id, json_data):
+    """
+    Modifies Power Profile in configuration
+    Raises NotFound
+
+    Parameters:
+        data: configuration (dict), modified in place
+        profile_id: Id of power profile to modify
+        json_data: schema validated Power Profile changes
+    """
+    if 'power_profiles' not in data:
+        raise NotFound("No Power Profiles in config file")
+
+    profile = ConfigIndex(data).power_profiles.get(int(profile_id))
+    if profile is None:
+        raise NotFound(f"POWER PROFILE {profile_id} not found in config")
+
+    # set new values
+    profile.update(json_data)
+
+
+def add_power_profile(data, json_data):
+    """
+    Adds new Power Profile to configuration, Power Profile ID is stored in json_data
+
+    Parameters:
+        data: configuration (dict), modified in place
+        json_data: schema validated new Power Profile
+
+    Returns:
+        ID of new Power Profile
+    """
+    json_data['id'] = common.CONFIG_STORE.get_new_power_profile_id(data)
+
+    if 'power_profiles' not in data:
+        data['power_profiles'] = []
+    data['power_profiles'].append(json_data)
+
+    return json_data['id']
+
+
 class Power(Resource):
     """
     Handles /power_profiles/<profile_id> HTTP requests
@@ -88,17 +159,14 @@ class Power(Resource):
             response, status code
         """
 
-        data = common.CONFIG_STORE.get_config()
-        if 'power_profiles' not in data:
+        index = common.CONFIG_STORE.get_index()
+        if 'power_profiles' not in index.data:
             raise NotFound("No power profiles in config file")
 
-        for power in data['power_profiles']:
-            if not power['id'] == int(profile_id):
-                continue
-
-            return power, 200
+        if int(profile_id) not in index.power_profiles:
+            raise NotFound("Power profile " + str(profile_id) + " not found in config")
 
-        raise NotFound("Power profile " + str(profile_id) + " not found in config")
+        return index.power_profiles[int(profile_id)], 200
 
 
     @staticmethod
@@ -106,7 +174,7 @@ class Power(Resource):
         """
         Handles HTTP DELETE /power_profiles/<profile_id> request.
         Deletes single Power Profile
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             profile_id: Id of power_profile to delete
@@ -115,39 +183,22 @@ class Power(Resource):
             response, status code
         """
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
+        generation, _ = update_config(lambda data: delete_power_profile(data, profile_id))
+        if generation is None:
+            raise Conflict(f"POWER PROFILE {profile_id} not deleted, " \
+                           "configuration changed in the meantime")
 
-        if 'power_profiles' not in data:
-            raise NotFound("No Power Profiles in config file")
-
-        for profile in data['power_profiles']:
-            if profile['id'] != int(profile_id):
-                continue
-
-            for pool in data['pools']:
-                if 'power_profile' not in pool:
-                    continue
-
-                if pool['power_profile'] == int(profile_id):
-                    raise BadRequest(f"POWER PROFILE {profile_id} is in use.")
-
-            # remove profile
-            data['power_profiles'].remove(profile)
-            common.CONFIG_STORE.set_config(data)
-
-            res = {'message': "POWER PROFILE " + str(profile_id) + " deleted"}
-            return res, 200
-
-        raise NotFound("POWER PROFILE " + str(profile_id) + " not found in config")
+        res = {'message': "POWER PROFILE " + str(profile_id) + " deleted",
+               'generation': generation}
+        return res, 200
 
 
     @staticmethod
     def put(profile_id):
-        # pylint: disable=too-many-branches
         """
         Handles HTTP PUT /power_profiles/<profile_id> request.
         Modifies a Power Profile
-        Raises NotFound, BadRequest
+        Raises NotFound, BadRequest, Conflict
 
         Parameters:
             profile_id: Id of pool
@@ -160,35 +211,28 @@ class Power(Resource):
 
         # validate app schema
         try:
-            schema, resolver = common.CONFIG_STORE.load_json_schema('modify_power.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            common.CONFIG_STORE.validate_schema(json_data, 'modify_power.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
         admission_control_check = json_data.pop('verify', True)
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'power_profiles' not in data:
-            raise NotFound("No Power Profiles in config file")
-
-        for profile in data['power_profiles']:
-            if profile['id'] != int(profile_id):
-                continue
-
-            # set new values
-            profile.update(json_data)
+        def modify(data):
+            modify_power_profile(data, profile_id, json_data)
 
             try:
                 common.CONFIG_STORE.validate(data, admission_control_check)
             except Exception as ex:
                 raise BadRequest(f"POWER PROFILE {profile_id} not updated") from ex
 
-            common.CONFIG_STORE.set_config(data)
+        generation, _ = update_config(modify)
+        if generation is None:
+            raise Conflict(f"POWER PROFILE {profile_id} not updated, " \
+                           "configuration changed in the meantime")
 
-            res = {'message': "POWER PROFILE " + str(profile_id) + " updated"}
-            return res, 200
-
-        raise NotFound(f"POWER PROFILE {profile_id} not found in config")
+        res = {'message': "POWER PROFILE " + str(profile_id) + " updated",
+               'generation': generation}
+        return res, 200
 
 
 class Powers(Resource):
@@ -220,7 +264,7 @@ class Powers(Resource):
         """
         Handles HTTP POST /power_profiles request.
         Add a new Power Profile
-        Raises BadRequest
+        Raises BadRequest, Conflict
 
         Returns:
             response, status code
@@ -230,28 +274,29 @@ class Powers(Resource):
         json_data = request.get_json()
 
         try:
-            schema, resolver = common.CONFIG_STORE.load_json_schema('add_power.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            common.CONFIG_STORE.validate_schema(json_data, 'add_power.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
-        json_data['id'] = common.CONFIG_STORE.get_new_power_profile_id()
+        def modify(data):
+            # add_power_profile() stores Power Profile data in configuration
+            profile_id = add_power_profile(data, deepcopy(json_data))
 
-        data = deepcopy(common.CONFIG_STORE.get_config())
-        if 'power_profiles' not in data:
-            data['power_profiles'] = []
-        data['power_profiles'].append(json_data)
+            try:
+                common.CONFIG_STORE.validate(data, False)
+            except Exception as ex:
+                raise BadRequest("New POWER PROFILE not added") from ex
 
-        try:
-            common.CONFIG_STORE.validate(data, False)
-        except Exception as ex:
-            raise BadRequest("New POWER PROFILE not added") from ex
+            return profile_id
 
-        common.CONFIG_STORE.set_config(data)
+        generation, profile_id = update_config(modify)
+        if generation is None:
+            raise Conflict("New POWER PROFILE not added, configuration changed in the meantime")
 
         res = {
-            'id': json_data['id'],
-            'message': f"New POWER PROFILE {json_data['id']} added"
+            'id': profile_id,
+            'message': f"New POWER PROFILE {profile_id} added",
+            'generation': generation
         }
 
         return res, 201
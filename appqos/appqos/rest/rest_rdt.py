@@ -42,7 +42,7 @@ import jsonschema
 import caps
 import common
 
-from rest.rest_exceptions import BadRequest
+from rest.rest_exceptions import BadRequest, Conflict
 
 from config import ConfigStore
 
@@ -98,7 +98,7 @@ class CapsMbaCtrl(Resource):
     def put():
         """
         Handles PUT /caps/mba_ctrl request.
-        Raises BadRequest, InternalError
+        Raises BadRequest, InternalError, Conflict
 
         Returns:
             response, status code
@@ -107,8 +107,7 @@ class CapsMbaCtrl(Resource):
 
         # validate request
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_mba_ctrl.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_mba_ctrl.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
@@ -118,14 +117,19 @@ class CapsMbaCtrl(Resource):
         if common.CONFIG_STORE.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        version = common.CONFIG_STORE.get_config_version()
+        generation = version
         if common.CONFIG_STORE.get_mba_ctrl_enabled() != json_data['enabled']:
             data = deepcopy(common.CONFIG_STORE.get_config())
 
             CapsMbaCtrl.set_mba_ctrl_enabled(data, json_data['enabled'])
 
-            common.CONFIG_STORE.set_config(data)
+            generation = common.CONFIG_STORE.set_config(data, version, urgent=True)
+            if generation is None:
+                raise Conflict("MBA CTRL status not changed, " \
+                               "configuration changed in the meantime")
 
-        return {'message': "MBA CTRL status changed."}, 200
+        return {'message': "MBA CTRL status changed.", 'generation': generation}, 200
 
     @staticmethod
     def set_mba_ctrl_enabled(data, enabled):
@@ -173,7 +177,7 @@ class CapsRdtIface(Resource):
     def put():
         """
         Handles PUT /caps/rdt_iface request.
-        Raises BadRequest, InternalError
+        Raises BadRequest, InternalError, Conflict
 
         Returns:
             response, status code
@@ -182,8 +186,7 @@ class CapsRdtIface(Resource):
 
         # validate request
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_rdt_iface.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_rdt_iface.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
@@ -193,6 +196,8 @@ class CapsRdtIface(Resource):
         if common.CONFIG_STORE.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        version = common.CONFIG_STORE.get_config_version()
+        generation = version
         if common.CONFIG_STORE.get_rdt_iface() != json_data['interface']:
             data = deepcopy(common.CONFIG_STORE.get_config())
 
@@ -203,9 +208,11 @@ class CapsRdtIface(Resource):
             CapsMbaCtrl.set_mba_ctrl_enabled(data, False)
             CapsL3ca.set_cdp_enabled(data, False)
 
-            common.CONFIG_STORE.set_config(data)
+            generation = common.CONFIG_STORE.set_config(data, version, urgent=True)
+            if generation is None:
+                raise Conflict("RDT Interface not modified, configuration changed in the meantime")
 
-        res = {'message': "RDT Interface modified"}
+        res = {'message': "RDT Interface modified", 'generation': generation}
         return res, 200
 
 
@@ -240,7 +247,7 @@ class CapsL3ca(Resource):
     def put():
         """
         Handles PUT /caps/l3ca request.
-        Raises BadRequest, InternalError
+        Raises BadRequest, InternalError, Conflict
 
         Returns:
             response, status code
@@ -249,8 +256,7 @@ class CapsL3ca(Resource):
 
         # validate request
         try:
-            schema, resolver = ConfigStore.load_json_schema('modify_cdp.json')
-            jsonschema.validate(json_data, schema, resolver=resolver)
+            ConfigStore.validate_schema(json_data, 'modify_cdp.json')
         except (jsonschema.ValidationError, OverflowError) as error:
             raise BadRequest("Request validation failed") from error
 
@@ -260,14 +266,18 @@ class CapsL3ca(Resource):
         if common.CONFIG_STORE.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        version = common.CONFIG_STORE.get_config_version()
+        generation = version
         if common.CONFIG_STORE.get_l3cdp_enabled() != json_data['cdp_enabled']:
             data = deepcopy(common.CONFIG_STORE.get_config())
 
             CapsL3ca.set_cdp_enabled(data, json_data['cdp_enabled'])
 
-            common.CONFIG_STORE.set_config(data)
+            generation = common.CONFIG_STORE.set_config(data, version, urgent=True)
+            if generation is None:
+                raise Conflict("L3 CDP status not changed, configuration changed in the meantime")
 
-        return {'message': "L3 CDP status changed."}, 200
+        return {'message': "L3 CDP status changed.", 'generation': generation}, 200
 
 
     @staticmethod
@@ -42,21 +42,31 @@ import signal
 import ssl
 import sys
 
-from time import sleep
-from flask import Flask
+from functools import wraps
+from time import monotonic, sleep
+from flask import Flask, g, request
 from flask_restful import Api
-from gevent.pywsgi import WSGIServer
-from werkzeug.exceptions import HTTPException
+from gevent import getcurrent
+from gevent.lock import BoundedSemaphore
+from gevent.pywsgi import WSGIServer, WSGIHandler
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
 import caps
 import common
 import log
 
 from rest.rest_power import Power, Powers
-from rest.rest_app import App, Apps
-from rest.rest_pool import Pool, Pools
-from rest.rest_misc import Stats, Caps, Sstbf, Reset
+from rest.rest_app import App, Apps, AppMetrics
+from rest.rest_batch import Batch
+from rest.rest_pool import Pool, Pools, PoolMetrics
+from rest.rest_misc import Stats, Metrics, Traces, Caps, Sstbf, Reset
 from rest.rest_rdt import CapsRdtIface, CapsMba, CapsMbaCtrl, CapsL3ca, CapsL2ca
+from rest.rest_watch import Watch, get_wait_timeout, wait_for_apply
+from rest.rest_watch import acquire_watch_slot, release_watch_slot, WATCH_WORKERS_ENVIRON
+
+# max request size, batch requests may contain multiple operations
+MAX_CONTENT_LENGTH = 2 * 1024
+BATCH_MAX_CONTENT_LENGTH = 64 * 1024
 
 TLS_CERT_FILE = 'ca/appqos.crt'
 TLS_KEY_FILE = 'ca/appqos.key'
@@ -68,6 +78,73 @@ TLS_CIPHERS = [
     'ECDHE-RSA-AES128-GCM-SHA256',
 ]
 
+# serializes configuration changes, reads are handled concurrently
+MUTATION_LOCK = BoundedSemaphore(1)
+
+
+def serialize_mutations(func):
+    """
+    Serializes handling of requests other than GET,
+    waits for configuration apply if requested with "wait" parameter
+    """
+    @wraps(func)
+    def func_wrapper(*args, **kwargs):
+        if request.method in ['GET', 'HEAD', 'OPTIONS']:
+            return func(*args, **kwargs)
+
+        # validated before configuration is changed
+        timeout = get_wait_timeout()
+        if timeout is None:
+            with MUTATION_LOCK:
+                return func(*args, **kwargs)
+
+        acquire_watch_slot()
+        try:
+            with MUTATION_LOCK:
+                response = func(*args, **kwargs)
+
+            # other configuration changes are not blocked while waiting
+            response = wait_for_apply(response, timeout)
+        finally:
+            release_watch_slot()
+
+        # connection no longer occupies a REST worker
+        response.headers['Connection'] = 'close'
+        return response
+    return func_wrapper
+
+
+class RequestHandler(WSGIHandler):
+    """
+    Request handler, closes idle keep-alive connections
+    so they do not occupy workers
+    """
+
+
+    def get_environ(self):
+        environ = WSGIHandler.get_environ(self)
+        # lets waiting requests release their worker
+        environ[WATCH_WORKERS_ENVIRON] = self.server.pool
+        return environ
+
+
+    def handle_one_request(self):
+        result = WSGIHandler.handle_one_request(self)
+        # connection released its worker while waiting, it is not reused for other requests
+        workers = self.server.pool
+        if result is True and workers is not None and getcurrent() not in workers:
+            return None
+        return result
+
+
+    def read_requestline(self):
+        self.socket.settimeout(common.REST_KEEPALIVE_TIMEOUT)
+        try:
+            return WSGIHandler.read_requestline(self)
+        finally:
+            self.socket.settimeout(None)
+
+
 class Server:
     """
     REST API server
@@ -77,9 +154,12 @@ class Server:
     def __init__(self):
         self.process = None
         self.app = Flask(__name__)
-        self.app.config['MAX_CONTENT_LENGTH'] = 2 * 1024
+        self.app.config['MAX_CONTENT_LENGTH'] = BATCH_MAX_CONTENT_LENGTH
+        self.app.before_request(Server.start_request_timer)
+        self.app.before_request(Server.check_content_length)
+        self.app.after_request(Server.record_request_stats)
         self.app.url_map.strict_slashes = False
-        self.api = Api(self.app)
+        self.api = Api(self.app, decorators=[serialize_mutations])
 
         self.http_server = None
 
@@ -100,8 +180,16 @@ class Server:
         # Apps and Pools API
         self.api.add_resource(Apps, '/apps')
         self.api.add_resource(App, '/apps/<int:app_id>')
+        self.api.add_resource(AppMetrics, '/apps/<int:app_id>/metrics')
         self.api.add_resource(Pools, '/pools')
         self.api.add_resource(Pool, '/pools/<int:pool_id>')
+        self.api.add_resource(PoolMetrics, '/pools/<int:pool_id>/metrics')
+
+        # Batch API
+        self.api.add_resource(Batch, '/batch')
+
+        # Watch API
+        self.api.add_resource(Watch, '/watch')
 
         # SST-CP API
         if caps.sstcp_enabled():
@@ -110,6 +198,8 @@ class Server:
 
         # Stats and Capabilities API
         self.api.add_resource(Stats, '/stats')
+        self.api.add_resource(Metrics, '/metrics')
+        self.api.add_resource(Traces, '/traces')
         self.api.add_resource(Caps, '/caps')
 
         # SST-BF API
@@ -137,8 +227,13 @@ class Server:
 
         self.app.register_error_handler(HTTPException, Server.error_handler)
 
+        # per endpoint error counters and latency histograms,
+        # slots must exist before REST API process is forked
+        for endpoint in sorted(self.api.endpoints):
+            common.STATS_STORE.register_endpoint(endpoint)
 
-    def start(self, host, port, _debug=False):
+
+    def start(self, host, port, _debug=False, workers=common.DEFAULT_REST_WORKERS):
         """
         Start REST server
 
@@ -146,6 +241,7 @@ class Server:
             host: address to bind to
             port: port to bind to
             debug(bool): Debug flag
+            workers: max number of requests handled concurrently
 
         Returns:
             0 on success
@@ -172,7 +268,8 @@ class Server:
             log.error(f"CA certificate file, {str(ex)}")
             return -1
 
-        self.http_server = WSGIServer((host, port), self.app, ssl_context=self.context, spawn=1)
+        self.http_server = WSGIServer((host, port), self.app, ssl_context=self.context,
+                                      spawn=workers, handler_class=RequestHandler)
         def handle_gevent_stop(_signum, _frame):
             log.info("Stopping gevent server loop")
             self.http_server.stop()
@@ -198,6 +295,48 @@ class Server:
         self.process.join()
 
 
+    @staticmethod
+    def check_content_length():
+        """
+        Limits size of requests other than batch requests
+        """
+        if request.endpoint != 'batch' and \
+            (request.content_length or 0) > MAX_CONTENT_LENGTH:
+            raise RequestEntityTooLarge()
+
+
+    @staticmethod
+    def start_request_timer():
+        """
+        Stores request start time
+        """
+        g.request_start = monotonic()
+
+
+    @staticmethod
+    def record_request_stats(response):
+        """
+        Records request latency and counts failed requests per endpoint
+
+        Parameters:
+            response: response
+
+        Returns:
+            response
+        """
+        if request.endpoint is None:
+            return response
+
+        start = g.get('request_start')
+        if start is not None:
+            common.STATS_STORE.general_stats_observe_request(request.endpoint,
+                                                             monotonic() - start)
+
+        if response.status_code >= 400:
+            common.STATS_STORE.general_stats_inc_endpoint_err(request.endpoint)
+        return response
+
+
     @staticmethod
     def error_handler(error):
         """
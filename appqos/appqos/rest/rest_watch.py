@@ -0,0 +1,307 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+REST API module
+Watch configuration changes
+"""
+
+import json
+import math
+import time
+
+import gevent
+from flask import Response, request
+from flask_restful import Resource
+from gevent.event import Event
+from gevent.lock import BoundedSemaphore
+from gevent.socket import wait_read
+
+import common
+import config_sync
+
+from rest.rest_exceptions import BadRequest, ServiceUnavailable
+
+# default and max time to wait for change (long-poll) in seconds
+WATCH_TIMEOUT = 30
+WATCH_MAX_TIMEOUT = 300
+# interval of keep-alive comments on idle event stream in seconds
+WATCH_KEEPALIVE_INTERVAL = 15
+# WSGI environ key of the REST workers pool
+WATCH_WORKERS_ENVIRON = 'appqos.workers'
+
+# waiting connections are limited separately from REST workers
+WATCH_SLOTS = BoundedSemaphore(common.REST_WATCH_CONNECTIONS)
+STREAM_SLOTS = BoundedSemaphore(common.REST_WATCH_STREAMS)
+
+
+def acquire_watch_slot(stream=False):
+    """
+    Acquires slot for waiting connection and releases its REST worker,
+    so waiting does not block handling of other requests.
+    Raises ServiceUnavailable if there are too many waiting connections
+
+    Parameters:
+        stream: event stream connection
+    """
+    if not WATCH_SLOTS.acquire(blocking=False):
+        raise ServiceUnavailable("Too many watch connections")
+
+    if stream and not STREAM_SLOTS.acquire(blocking=False):
+        WATCH_SLOTS.release()
+        raise ServiceUnavailable("Too many watch streams")
+
+    workers = request.environ.get(WATCH_WORKERS_ENVIRON)
+    current = gevent.getcurrent()
+    if workers is not None and current in workers:
+        workers.discard(current)
+
+
+def release_watch_slot(stream=False):
+    """
+    Releases slot of waiting connection
+
+    Parameters:
+        stream: event stream connection
+    """
+    if stream:
+        STREAM_SLOTS.release()
+    WATCH_SLOTS.release()
+
+
+class StatusWatcher:
+    """
+    Wakes up requests waiting for configuration status change.
+    Status change notifications (configuration change or apply) are received
+    by single greenlet, so waiting requests do not poll configuration status.
+    """
+
+
+    def __init__(self):
+        self.changed = Event()
+        self.greenlet = None
+
+
+    def run(self):
+        """
+        Receives status change notifications, wakes up waiting requests
+        """
+        notifier = common.CONFIG_STORE.status_changed
+        while True:
+            wait_read(notifier.fileno())
+            notifier.consume()
+            changed, self.changed = self.changed, Event()
+            changed.set()
+
+
+    def next_change(self):
+        """
+        Get event set on next configuration status change,
+        has to be taken before status is read so change is not missed
+
+        Returns:
+            event
+        """
+        if self.greenlet is None or self.greenlet.dead:
+            self.greenlet = gevent.spawn(self.run)
+
+        return self.changed
+
+
+STATUS_WATCHER = StatusWatcher()
+
+
+def wait_for_change(since, timeout):
+    """
+    Waits for configuration change or apply,
+    yields to other requests while waiting
+
+    Parameters:
+        since: last seen status id
+        timeout: time to wait in seconds
+
+    Returns:
+        configuration status
+    """
+    deadline = time.monotonic() + timeout
+
+    while True:
+        changed = STATUS_WATCHER.next_change()
+        status = common.CONFIG_STORE.get_status()
+        remaining = deadline - time.monotonic()
+        if status['id'] > since or remaining <= 0:
+            return status
+
+        changed.wait(remaining)
+
+
+def get_wait_timeout():
+    """
+    Get time to wait for configuration apply requested with "wait" parameter
+
+    Returns:
+        time in seconds, None if not requested
+    """
+    wait = request.args.get('wait')
+    if wait is None:
+        return None
+
+    try:
+        timeout = int(wait)
+    except ValueError as error:
+        raise BadRequest("Invalid wait parameter") from error
+
+    if timeout < 0:
+        raise BadRequest("Invalid wait parameter")
+
+    return min(timeout / 1000, WATCH_MAX_TIMEOUT)
+
+
+def wait_for_generation(generation, timeout):
+    """
+    Waits for configuration generation apply,
+    yields to other requests while waiting
+
+    Parameters:
+        generation: configuration generation
+        timeout: time to wait in seconds
+
+    Returns:
+        generation status, error
+    """
+    deadline = time.monotonic() + timeout
+
+    while True:
+        changed = STATUS_WATCHER.next_change()
+        status, error = common.CONFIG_STORE.get_generation_status(generation)
+        remaining = deadline - time.monotonic()
+        if status != config_sync.GENERATION_PENDING or remaining <= 0:
+            return status, error
+
+        changed.wait(remaining)
+
+
+def wait_for_apply(response, timeout):
+    """
+    Waits for apply of configuration generation returned by mutation request
+
+    Parameters:
+        response: mutation response
+        timeout: time to wait in seconds
+
+    Returns:
+        response with generation status and error,
+        status code 500 if apply failed, 202 if not applied in time
+    """
+    if response.status_code >= 400 or not response.is_json:
+        return response
+
+    res = response.get_json(silent=True)
+    if not isinstance(res, dict) or res.get('generation') is None:
+        return response
+
+    status, error = wait_for_generation(res['generation'], timeout)
+    res.update(status=status, error=error)
+    response.set_data(json.dumps(res))
+
+    if status == config_sync.GENERATION_FAILED:
+        response.status_code = 500
+    elif status == config_sync.GENERATION_PENDING:
+        response.status_code = 202
+
+    return response
+
+
+def event_stream(since):
+    """
+    Generates Server-Sent Events stream of configuration status changes
+
+    Parameters:
+        since: last seen status id
+
+    Returns:
+        event stream generator
+    """
+    while True:
+        status = wait_for_change(since, WATCH_KEEPALIVE_INTERVAL)
+        if status['id'] <= since:
+            # comment, keeps idle connection alive
+            yield ":\n\n"
+            continue
+
+        since = status['id']
+        yield f"id: {since}\nevent: status\ndata: {json.dumps(status)}\n\n"
+
+
+class Watch(Resource):
+    """
+    Handles /watch HTTP requests
+    """
+
+
+    @staticmethod
+    def get():
+        """
+        Handles HTTP GET /watch request.
+        Waits for configuration change or apply (long-poll), returns configuration status.
+        Streams status changes if Server-Sent Events are accepted.
+        Raises BadRequest, ServiceUnavailable
+
+        Returns:
+            response, status code
+        """
+        try:
+            since = int(request.args.get('since',
+                                         request.headers.get('Last-Event-ID', -1)))
+            timeout = float(request.args.get('timeout', WATCH_TIMEOUT))
+        except ValueError as error:
+            raise BadRequest("Invalid since or timeout parameter") from error
+
+        # "nan" and "inf" are parsed by float() as well
+        if not math.isfinite(timeout) or timeout < 0:
+            raise BadRequest("Invalid since or timeout parameter")
+
+        timeout = min(timeout, WATCH_MAX_TIMEOUT)
+
+        # connection is closed after response as it no longer occupies a REST worker
+        if request.accept_mimetypes.best == 'text/event-stream':
+            acquire_watch_slot(stream=True)
+            response = Response(event_stream(since), mimetype='text/event-stream',
+                                headers={'Cache-Control': 'no-cache', 'Connection': 'close'})
+            response.call_on_close(lambda: release_watch_slot(stream=True))
+            return response
+
+        acquire_watch_slot()
+        try:
+            return wait_for_change(since, timeout), 200, {'Connection': 'close'}
+        finally:
+            release_watch_slot()
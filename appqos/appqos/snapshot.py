@@ -0,0 +1,131 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Snapshot module
+Versioned, shared memory storage for data shared between processes
+"""
+
+import json
+import mmap
+import multiprocessing
+import struct
+
+
+class SharedSnapshot:
+    """
+    Immutable, serialized snapshot of data kept in shared (anonymous, mmap'd)
+    memory together with monotonically increasing version counter.
+    Readers deserialize data once per version and cache the result locally.
+
+    NOTE: Object has to be created before child processes are forked.
+    """
+
+    # version, payload length
+    HEADER = struct.Struct('=QQ')
+
+
+    def __init__(self, size):
+        """
+        Constructor
+
+        Parameters:
+            size: max size of serialized data in bytes
+        """
+        self.size = size
+        self.mem = mmap.mmap(-1, self.HEADER.size + size)
+        self.lock = multiprocessing.Lock()
+
+        # local, per process, cache of (version, data),
+        # replaced at once as it is used by multiple threads
+        self.cache = (None, None)
+
+
+    def version(self):
+        """
+        Get current snapshot version
+
+        Returns:
+            version, 0 if no data stored yet
+        """
+        return self.HEADER.unpack_from(self.mem, 0)[0]
+
+
+    def write(self, data, expected_version=None):
+        """
+        Serialize and store new snapshot
+
+        Parameters:
+            data: data to be stored, JSON serializable
+            expected_version: store only if current version matches
+
+        Returns:
+            version of stored snapshot,
+            None if current version does not match expected_version
+        """
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        if len(payload) > self.size:
+            raise MemoryError(f"Snapshot size {len(payload)} exceeds {self.size} bytes")
+
+        with self.lock:
+            if expected_version is not None and self.version() != expected_version:
+                return None
+
+            version = self.version() + 1
+            offset = self.HEADER.size
+            self.mem[offset:offset + len(payload)] = payload
+            self.HEADER.pack_into(self.mem, 0, version, len(payload))
+
+        return version
+
+
+    def read(self):
+        """
+        Get current snapshot, deserialized only when version has changed.
+        Returned object is shared by all readers in process and must not be modified.
+
+        Returns:
+            data, None if no data stored yet
+        """
+        cache = self.cache
+        if self.version() == cache[0]:
+            return cache[1]
+
+        with self.lock:
+            version, length = self.HEADER.unpack_from(self.mem, 0)
+            offset = self.HEADER.size
+            payload = self.mem[offset:offset + length]
+
+        cache = (version, json.loads(payload) if version else None)
+        self.cache = cache
+
+        return cache[1]
@@ -35,12 +35,76 @@ Stats module
 Stats processing helper functions and storage for stats
 """
 
-import common
+import bisect
+import itertools
+import multiprocessing
+
+# number of counter and gauge slots in shared memory
+STATS_SLOTS = 1024
+# number of locks counter slots are spread over
+STATS_LOCK_STRIPES = 8
+# default histogram buckets (upper bounds) in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# number of configuration versions coalesced into single apply histogram buckets
+COALESCED_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class StatsSlots:
+    """
+    Counter and gauge slots of shared memory block and ids registered in them.
+    Histogram takes consecutive counter slots (one per bucket and +Inf bucket)
+    and gauge slot for sum of observed values.
+    """
+
+
+    def __init__(self):
+        self.counters = multiprocessing.RawArray('q', STATS_SLOTS)
+        self.gauges = multiprocessing.RawArray('d', STATS_SLOTS)
+        self.num_counters = 0
+        self.num_gauges = 0
+        self.counter_slots = {}
+        self.gauge_slots = {}
+        # histogram's id to buckets, first bucket counter slot, sum gauge slot
+        self.histograms = {}
+
+
+    def alloc_counters(self, num):
+        """
+        Allocates consecutive counter slots
+
+        Parameters:
+            num: number of slots
+
+        Returns:
+            first slot index
+        """
+        if self.num_counters + num > STATS_SLOTS:
+            raise ValueError("No free stats counter slot")
+
+        self.num_counters += num
+        return self.num_counters - num
+
+
+    def alloc_gauge(self):
+        """
+        Allocates gauge slot
+
+        Returns:
+            slot index
+        """
+        if self.num_gauges >= STATS_SLOTS:
+            raise ValueError("No free stats gauge slot")
+
+        self.num_gauges += 1
+        return self.num_gauges - 1
 
 
 class StatsStore:
     """
-    Storage for stats
+    Storage for stats.
+    Counters, gauges and histograms are kept in fixed slots of shared memory block,
+    so both AppQoS processes update them without IPC.
+    Slots have to be registered before REST API process is started.
     """
 
 
@@ -52,14 +116,154 @@ class StatsStore:
         NUM_APPS_MOVES = 'num_apps_moves'
         NUM_ERR = 'num_err'
         NUM_INV_ACCESS = 'num_invalid_access_attempts'
+        NUM_ENDPOINT_ERR = 'num_endpoint_err'
+
+
+    class Gauge:
+        """
+        Helper class
+        """
+        #pylint: disable=too-few-public-methods
+        APPLY_DURATION = 'apply_duration_seconds'
+
+
+    class Histogram:
+        """
+        Helper class
+        """
+        #pylint: disable=too-few-public-methods
+        APPLY_LATENCY = 'apply_latency_seconds'
+        APPLY_COALESCED = 'apply_coalesced_versions'
+        REQUEST_LATENCY = 'request_latency_seconds'
 
 
     def __init__(self):
-        self.general_stats = common.MANAGER.dict()
+        self.slots = StatsSlots()
+        self.locks = [multiprocessing.Lock() for _ in range(STATS_LOCK_STRIPES)]
+
         for cntr in [self.General.NUM_APPS_MOVES,\
                 self.General.NUM_ERR,\
                 self.General.NUM_INV_ACCESS]:
-            self.general_stats[cntr] = 0
+            self.register_counter(cntr)
+
+        self.register_gauge(self.Gauge.APPLY_DURATION)
+        self.register_histogram(self.Histogram.APPLY_LATENCY)
+        self.register_histogram(self.Histogram.APPLY_COALESCED, COALESCED_BUCKETS)
+
+
+    def register_counter(self, name):
+        """
+        Registers new counter, initialized to 0
+
+        Parameters:
+            name: counter's id
+
+        Returns:
+            slot index
+        """
+        if name not in self.slots.counter_slots:
+            self.slots.counter_slots[name] = self.slots.alloc_counters(1)
+
+        return self.slots.counter_slots[name]
+
+
+    def register_gauge(self, name):
+        """
+        Registers new gauge, initialized to 0
+
+        Parameters:
+            name: gauge's id
+
+        Returns:
+            slot index
+        """
+        if name not in self.slots.gauge_slots:
+            self.slots.gauge_slots[name] = self.slots.alloc_gauge()
+
+        return self.slots.gauge_slots[name]
+
+
+    def register_histogram(self, name, buckets=DEFAULT_BUCKETS):
+        """
+        Registers new histogram, one counter slot per bucket (and +Inf bucket),
+        sum of observed values is kept in gauge slot
+
+        Parameters:
+            name: histogram's id
+            buckets: sorted buckets upper bounds
+        """
+        if name in self.slots.histograms:
+            return
+
+        buckets = tuple(buckets)
+        slot = self.slots.alloc_counters(len(buckets) + 1)
+        self.slots.histograms[name] = (buckets, slot, self.slots.alloc_gauge())
+
+
+    def counter_inc(self, name, value=1):
+        """
+        Increases counter value
+
+        Parameters:
+            name: counter's id
+            value: value to add
+        """
+        slot = self.slots.counter_slots[name]
+        with self.locks[slot % STATS_LOCK_STRIPES]:
+            self.slots.counters[slot] += value
+
+
+    def gauge_set(self, name, value):
+        """
+        Sets gauge value
+
+        Parameters:
+            name: gauge's id
+            value: new value
+        """
+        self.slots.gauges[self.slots.gauge_slots[name]] = value
+
+
+    def observe(self, name, value):
+        """
+        Adds value to histogram
+
+        Parameters:
+            name: histogram's id
+            value: observed value
+        """
+        buckets, slot, sum_slot = self.slots.histograms[name]
+        bucket = slot + bisect.bisect_left(buckets, value)
+        with self.locks[slot % STATS_LOCK_STRIPES]:
+            self.slots.counters[bucket] += 1
+            self.slots.gauges[sum_slot] += value
+
+
+    def snapshot(self):
+        """
+        Reads all counters, gauges and histograms at once
+
+        Returns:
+            dict with counters, gauges and histograms values,
+            histogram buckets are cumulative (upper bound, count) pairs
+        """
+        counters = self.slots.counters[:self.slots.num_counters]
+        gauges = self.slots.gauges[:self.slots.num_gauges]
+
+        histograms = {}
+        for name, (buckets, slot, sum_slot) in self.slots.histograms.items():
+            counts = list(itertools.accumulate(counters[slot:slot + len(buckets) + 1]))
+            histograms[name] = {
+                'buckets': list(zip(buckets, counts)),
+                'count': counts[-1],
+                'sum': gauges[sum_slot]
+            }
+
+        return {
+            'counters': {name: counters[slot] for name, slot in self.slots.counter_slots.items()},
+            'gauges': {name: gauges[slot] for name, slot in self.slots.gauge_slots.items()},
+            'histograms': histograms
+        }
 
 
     def general_stats_inc(self, gen_stats_id):
@@ -69,7 +273,7 @@ class StatsStore:
         Parameters:
             gen_stat_id: stat's id
         """
-        self.general_stats[gen_stats_id] += 1
+        self.counter_inc(gen_stats_id)
 
 
     def general_stats_get(self, get_stats_id=None):
@@ -83,12 +287,12 @@ class StatsStore:
             Single general stat, all general stats, 0 on error
         """
         if get_stats_id is None:
-            return self.general_stats
+            return self.snapshot()['counters']
 
-        if get_stats_id not in self.general_stats:
+        if get_stats_id not in self.slots.counter_slots:
             return 0
 
-        return self.general_stats[get_stats_id]
+        return self.slots.counters[self.slots.counter_slots[get_stats_id]]
 
 
     def general_stats_inc_apps_moves(self):
@@ -105,8 +309,93 @@ class StatsStore:
         self.general_stats_inc(StatsStore.General.NUM_ERR)
 
 
+    def general_stats_inc_endpoint_err(self, endpoint):
+        """
+        Increases REST API endpoint errors stat value by 1, if registered
+
+        Parameters:
+            endpoint: REST API endpoint
+        """
+        name = self.endpoint_err_id(endpoint)
+        if name in self.slots.counter_slots:
+            self.counter_inc(name)
+
+
     def general_stats_inc_num_invalid_access(self):
         """
         Increases num invalid access attempts stat value by 1
         """
         self.general_stats_inc(StatsStore.General.NUM_INV_ACCESS)
+
+
+    def general_stats_set_apply_duration(self, duration):
+        """
+        Sets duration of last configuration apply, adds it to apply latency histogram
+
+        Parameters:
+            duration: duration in seconds
+        """
+        self.gauge_set(StatsStore.Gauge.APPLY_DURATION, duration)
+        self.observe(StatsStore.Histogram.APPLY_LATENCY, duration)
+
+
+    def general_stats_observe_apply_coalesced(self, coalesced):
+        """
+        Adds number of configuration versions coalesced into apply to histogram
+
+        Parameters:
+            coalesced: number of configuration versions
+        """
+        self.observe(StatsStore.Histogram.APPLY_COALESCED, coalesced)
+
+
+    def general_stats_observe_request(self, endpoint, duration):
+        """
+        Adds REST API request duration to endpoint latency histogram, if registered
+
+        Parameters:
+            endpoint: REST API endpoint
+            duration: duration in seconds
+        """
+        name = self.endpoint_latency_id(endpoint)
+        if name in self.slots.histograms:
+            self.observe(name, duration)
+
+
+    def register_endpoint(self, endpoint):
+        """
+        Registers per REST API endpoint error counter and latency histogram
+
+        Parameters:
+            endpoint: REST API endpoint
+        """
+        self.register_counter(self.endpoint_err_id(endpoint))
+        self.register_histogram(self.endpoint_latency_id(endpoint))
+
+
+    @staticmethod
+    def endpoint_err_id(endpoint):
+        """
+        Gets id of REST API endpoint error counter
+
+        Parameters:
+            endpoint: REST API endpoint
+
+        Returns:
+            counter's id
+        """
+        return f"{StatsStore.General.NUM_ENDPOINT_ERR}.{endpoint}"
+
+
+    @staticmethod
+    def endpoint_latency_id(endpoint):
+        """
+        Gets id of REST API endpoint latency histogram
+
+        Parameters:
+            endpoint: REST API endpoint
+
+        Returns:
+            histogram's id
+        """
+        return f"{StatsStore.Histogram.REQUEST_LATENCY}.{endpoint}"
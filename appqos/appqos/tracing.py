@@ -0,0 +1,308 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Tracing module
+Timing of configuration apply phases and libpqos calls,
+last apply traces are kept for REST API
+"""
+
+import time
+from collections import deque
+
+import snapshot
+
+# default number of apply traces kept
+DEFAULT_TRACES = 16
+# max number of spans recorded per trace, summary covers all spans
+MAX_SPANS = 256
+
+
+class Span:
+    """
+    Timed section of trace, used as context manager.
+    Span fails if exception is raised or fail() is called.
+    """
+    __slots__ = ('trace', 'name', 'start', 'error')
+
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+        self.start = None
+        self.error = False
+
+
+    def fail(self):
+        """
+        Marks span as failed
+        """
+        self.error = True
+
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, exc_type, _exc_value, _traceback):
+        self.trace.record(self.name, self.start, time.perf_counter() - self.start,
+                          self.error or exc_type is not None)
+        return False
+
+
+class NullSpan:
+    """
+    Span used when no trace is in progress, records nothing
+    """
+
+
+    def fail(self):
+        """
+        Marks span as failed
+        """
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, _exc_type, _exc_value, _traceback):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Trace:
+    """
+    Trace of single configuration apply
+    """
+    __slots__ = ('name', 'version', 'timestamp', 'start', 'summary', 'spans', 'dropped')
+
+
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        # span's name to [calls, errors, time]
+        self.summary = {}
+        # (name, offset, duration, error)
+        self.spans = []
+        self.dropped = 0
+
+
+    def record(self, name, start, duration, error):
+        """
+        Records finished span
+
+        Parameters:
+            name: span's name
+            start: span's start time (perf_counter)
+            duration: span's duration in seconds
+            error: span failed
+        """
+        stats = self.summary.get(name)
+        if stats is None:
+            stats = self.summary[name] = [0, 0, 0.0]
+        stats[0] += 1
+        stats[1] += error
+        stats[2] += duration
+
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((name, start - self.start, duration, error))
+        else:
+            self.dropped += 1
+
+
+    def finish(self, result):
+        """
+        Finishes trace
+
+        Parameters:
+            result: apply result, 0 on success
+
+        Returns:
+            trace (JSON serializable dict)
+        """
+        return {
+            'name': self.name,
+            'version': self.version,
+            'timestamp': self.timestamp,
+            'duration': time.perf_counter() - self.start,
+            'result': result,
+            'summary': {name: {'calls': calls, 'errors': errors, 'time': total} \
+                for name, (calls, errors, total) in self.summary.items()},
+            'spans': [{'name': name, 'offset': offset, 'duration': duration, 'error': error} \
+                for name, offset, duration, error in self.spans],
+            'spans_dropped': self.dropped
+        }
+
+
+class Tracer:
+    """
+    Records apply traces in "backend" process and
+    shares last traces with REST API process via shared memory snapshot.
+
+    NOTE: Object has to be created before child processes are forked.
+    """
+
+
+    def __init__(self, size, max_traces=DEFAULT_TRACES):
+        """
+        Constructor
+
+        Parameters:
+            size: max size of serialized traces in bytes
+            max_traces: number of traces kept
+        """
+        self.snapshot = snapshot.SharedSnapshot(size)
+        self.traces = deque(maxlen=max_traces)
+        self.current = None
+
+
+    def begin(self, name, version=None):
+        """
+        Starts new trace, spans are recorded until end() is called
+
+        Parameters:
+            name: trace's name
+            version: configuration version
+        """
+        self.current = Trace(name, version)
+
+
+    def end(self, result):
+        """
+        Finishes current trace and publishes last traces
+
+        Parameters:
+            result: apply result, 0 on success
+
+        Returns:
+            finished trace, None if no trace is in progress
+        """
+        if self.current is None:
+            return None
+
+        trace = self.current.finish(result)
+        self.traces.append(trace)
+        self.current = None
+
+        self.snapshot.write(list(self.traces))
+
+        return trace
+
+
+    def span(self, name):
+        """
+        Creates span of current trace
+
+        Parameters:
+            name: span's name
+
+        Returns:
+            span context manager, no-op if no trace is in progress
+        """
+        if self.current is None:
+            return NULL_SPAN
+
+        return Span(self.current, name)
+
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Calls function within span, span fails if function does not return 0
+
+        Parameters:
+            name: span's name
+            func: function to be called
+            args, kwargs: function's arguments
+
+        Returns:
+            function's result
+        """
+        with self.span(name) as span:
+            result = func(*args, **kwargs)
+            if result != 0:
+                span.fail()
+
+        return result
+
+
+    def get_traces(self):
+        """
+        Get last published traces, oldest first
+
+        Returns:
+            list of traces
+        """
+        return self.snapshot.read() or []
+
+
+def failed_spans(trace):
+    """
+    Get names of spans failed in trace
+
+    Parameters:
+        trace: trace
+
+    Returns:
+        list of span names
+    """
+    return [name for name, stats in trace['summary'].items() if stats['errors']]
+
+
+def to_chrome_trace(traces):
+    """
+    Converts traces to Chrome trace event format (chrome://tracing, Perfetto)
+
+    Parameters:
+        traces: list of traces
+
+    Returns:
+        Chrome trace (dict)
+    """
+    events = []
+    for trace in traces:
+        start = trace['timestamp'] * 1000000
+        events.append({'name': trace['name'], 'ph': 'X', 'pid': 1, 'tid': 1,
+                       'ts': start, 'dur': (trace['duration'] or 0) * 1000000,
+                       'args': {'version': trace['version'], 'result': trace['result']}})
+        for span in trace['spans']:
+            events.append({'name': span['name'], 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': start + span['offset'] * 1000000,
+                           'dur': span['duration'] * 1000000,
+                           'args': {'error': span['error']}})
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
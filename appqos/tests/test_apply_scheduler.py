@@ -0,0 +1,135 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for apply_scheduler module
+"""
+
+import mock
+import pytest
+
+from apply_scheduler import *
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch('common.CONFIG_STORE.get_global_attr',
+                    return_value={'debounce': 100, 'max_latency': 500}):
+        yield clock
+
+
+def test_no_changes(clock):
+    scheduler = ApplyScheduler(clock)
+
+    assert not scheduler.is_pending()
+    assert not scheduler.is_due()
+    assert scheduler.timeout() is None
+
+
+def test_debounce(clock):
+    scheduler = ApplyScheduler(clock)
+
+    scheduler.notify()
+    assert scheduler.is_pending()
+    assert not scheduler.is_due()
+    assert scheduler.timeout() == pytest.approx(0.1)
+
+    # next change restarts debounce window
+    clock.now += 0.05
+    scheduler.notify()
+    clock.now += 0.05
+    assert not scheduler.is_due()
+    assert scheduler.timeout() == pytest.approx(0.05)
+
+    clock.now += 0.05
+    assert scheduler.is_due()
+    assert scheduler.timeout() == 0
+
+
+def test_max_latency(clock):
+    scheduler = ApplyScheduler(clock)
+
+    # continuous changes are applied once oldest one waits for max latency
+    for _ in range(7):
+        scheduler.notify()
+        clock.now += 0.0625
+        assert not scheduler.is_due()
+
+    scheduler.notify()
+    clock.now += 0.0625
+    assert scheduler.is_due()
+
+
+def test_urgent(clock):
+    scheduler = ApplyScheduler(clock)
+
+    scheduler.notify()
+    scheduler.notify(urgent=True)
+    assert scheduler.is_due()
+    assert scheduler.timeout() == 0
+
+    scheduler.start_apply(1)
+    scheduler.notify()
+    assert not scheduler.is_due()
+
+
+def test_start_apply(clock):
+    scheduler = ApplyScheduler(clock)
+
+    assert scheduler.start_apply(1) == 1
+    assert not scheduler.is_pending()
+
+    for _ in range(100):
+        scheduler.notify()
+    clock.now += 1
+    assert scheduler.is_due()
+    assert scheduler.start_apply(101) == 100
+    assert not scheduler.is_pending()
+    assert scheduler.timeout() is None
+
+    # configuration not changed since last apply
+    assert scheduler.start_apply(101) == 1
+
+
+def test_get_config():
+    with mock.patch('common.CONFIG_STORE.get_global_attr', return_value={}):
+        assert ApplyScheduler.get_config() == (DEFAULT_DEBOUNCE / 1000,
+                                               DEFAULT_MAX_LATENCY / 1000)
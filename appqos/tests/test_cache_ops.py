@@ -51,6 +51,7 @@ def test_configure_rdt():
     with mock.patch('common.CONFIG_STORE.get_pool_attr', return_value=[1]) as mock_get_pool_attr,\
          mock.patch('cache_ops.Pool.cores_set') as mock_cores_set,\
          mock.patch('cache_ops.Pool.configure', return_value=0) as mock_pool_configure,\
+         mock.patch('cache_ops.Pool.apply', return_value=0) as mock_pool_apply,\
          mock.patch('cache_ops.Apps.configure', return_value=0) as mock_apps_configure,\
          mock.patch('common.PQOS_API.init', return_value=0),\
          mock.patch('common.PQOS_API.enable_mba_bw', return_value=0),\
@@ -60,6 +61,7 @@ def test_configure_rdt():
 
         mock_cores_set.assert_called_once_with([])
         mock_pool_configure.assert_called_once()
+        mock_pool_apply.assert_called_once_with([1])
         mock_apps_configure.assert_called_once()
 
         mock_pool_configure.return_value = -1
@@ -76,6 +78,7 @@ class TestPools(object):
     @pytest.fixture(autouse=True)
     def init(self):
         Pool.pools= {}
+        RDT_STATE.reset()
     ## @endcond
 
 
@@ -107,14 +110,14 @@ class TestPools(object):
              mock.patch('cache_ops.Pool.pids_set') as mock_pids_set,\
              mock.patch('cache_ops.Pool.apply') as mock_apply:
 
-             Pool(1).configure()
+             assert Pool(1).configure() == 0
 
              mock_l3cbm_set.assert_called_once_with(15)
              mock_l2cbm_set.assert_called_once_with(7)
              mock_mba_set.assert_called_once_with(88)
              mock_cores_set.assert_called_once_with([1,2])
              mock_pids_set.assert_called_once_with([11,22])
-             mock_apply.assert_called_once_with(1)
+             mock_apply.assert_not_called()
 
 
     def test_l3cbm_get(self):
@@ -218,6 +221,8 @@ class TestPools(object):
         Pool.pools[1]['cores'] = []
         Pool.pools[2] = {}
         Pool.pools[2]['cores'] = [4, 5, 6]
+        mock_alloc_assoc_set.return_value = 0
+        mock_release.return_value = 0
 
         Pool(1).cores_set([1, 2])
         assert Pool.pools[1]['cores'] == [1, 2]
@@ -225,14 +230,15 @@ class TestPools(object):
 
         Pool(1).cores_set([1, 3])
         assert Pool.pools[1]['cores'] == [1, 3]
-        mock_alloc_assoc_set.assert_any_call([1, 3], 1)
+        # core 1 already associated with COS#1
+        mock_alloc_assoc_set.assert_called_with([3], 1)
         mock_release.assert_called_once_with([2])
 
 
-    @mock.patch('common.PQOS_API.l3ca_set')
+    @mock.patch('common.PQOS_API.l3ca_set_batch')
     @mock.patch('common.PQOS_API.alloc_assoc_set')
     def test_apply_not_configured(self, mock_l3ca_set, mock_alloc_assoc_set):
-        result = Pool.apply(1)
+        result = Pool.apply([1])
 
         assert result == -1
 
@@ -240,13 +246,14 @@ class TestPools(object):
         mock_alloc_assoc_set.assert_not_called()
 
 
-    @mock.patch('common.PQOS_API.mba_set')
-    @mock.patch('common.PQOS_API.l2ca_set')
-    @mock.patch('common.PQOS_API.l3ca_set')
+    @mock.patch('common.PQOS_API.mba_set_batch')
+    @mock.patch('common.PQOS_API.l2ca_set_batch')
+    @mock.patch('common.PQOS_API.l3ca_set_batch')
     @mock.patch('common.PQOS_API.alloc_assoc_set')
     @mock.patch('common.PQOS_API.get_sockets')
     @mock.patch('common.PQOS_API.get_l2ids')
     @mock.patch('common.CONFIG_STORE.get_mba_ctrl_enabled')
+    @mock.patch('common.CONFIG_STORE.get_l3cdp_enabled', mock.MagicMock(return_value=False))
     def test_apply(self, mock_get_mba_ctrl_enabled, mock_get_l2ids, mock_get_socket, \
         mock_alloc_assoc_set, mock_l3ca_set, mock_l2ca_set, mock_mba_set):
         Pool.pools[2] = {}
@@ -269,65 +276,207 @@ class TestPools(object):
         mock_get_l2ids.return_value = [0, 1]
         mock_get_mba_ctrl_enabled.return_value = False
 
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result == 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result == 0
 
-        mock_mba_set.assert_any_call([0, 2], 2, 99, False)
-        mock_mba_set.assert_any_call([0, 2], 1, 11, False)
-        mock_l3ca_set.assert_any_call([0, 2], 2, mask=0xc00)
-        mock_l3ca_set.assert_any_call([0, 2], 1, mask=0x300)
-        mock_l2ca_set.assert_any_call([0, 1], 1, 0xff)
-        mock_l2ca_set.assert_any_call([0, 1], 2, 0xf)
+        mock_mba_set.assert_any_call([0, 2], {2: 99}, False)
+        mock_mba_set.assert_any_call([0, 2], {1: 11}, False)
+        mock_l3ca_set.assert_any_call([0, 2], {2: 0xc00})
+        mock_l3ca_set.assert_any_call([0, 2], {1: 0x300})
+        mock_l2ca_set.assert_any_call([0, 1], {1: 0xff})
+        mock_l2ca_set.assert_any_call([0, 1], {2: 0xf})
         mock_alloc_assoc_set.assert_any_call([1], 2)
         mock_alloc_assoc_set.assert_any_call([2, 3], 1)
 
+        # all Pools programmed with one call per technology
+        RDT_STATE.reset()
+        mock_l3ca_set.reset_mock()
+        mock_mba_set.reset_mock()
+        mock_l2ca_set.reset_mock()
+        result = Pool.apply([2, 1])
+        assert result == 0
+        mock_l3ca_set.assert_called_once_with([0, 2], {2: 0xc00, 1: 0x300})
+        mock_l2ca_set.assert_called_once_with([0, 1], {2: 0xf, 1: 0xff})
+        mock_mba_set.assert_called_once_with([0, 2], {2: 99, 1: 11}, False)
+
         # libpqos fails
+        RDT_STATE.reset()
         mock_get_socket.return_value = None
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
+        RDT_STATE.reset()
         mock_get_socket.return_value = [0,2]
         mock_alloc_assoc_set.return_value = -1
         mock_l3ca_set.return_value = 0
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
+        RDT_STATE.reset()
         mock_alloc_assoc_set.return_value = 0
         mock_l3ca_set.return_value = -1
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
+        RDT_STATE.reset()
         mock_l3ca_set.return_value = 0
         mock_mba_set.return_value = -1
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
+        RDT_STATE.reset()
         mock_l2ca_set.return_value = -1
         mock_mba_set.return_value = 0
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
+        RDT_STATE.reset()
         mock_l2ca_set.return_value = 0
         mock_alloc_assoc_set.return_value = -1
         mock_l3ca_set.return_value = -1
-        result = Pool.apply(2)
+        result = Pool.apply([2])
         assert result != 0
-        result = Pool.apply(1)
+        result = Pool.apply([1])
         assert result != 0
 
 
+    @mock.patch('common.PQOS_API.mba_set_batch', mock.MagicMock(return_value=0))
+    @mock.patch('common.PQOS_API.l2ca_set_batch', mock.MagicMock(return_value=0))
+    @mock.patch('common.PQOS_API.l3ca_set_batch')
+    @mock.patch('common.PQOS_API.alloc_assoc_set')
+    @mock.patch('common.PQOS_API.get_sockets', mock.MagicMock(return_value=[0, 1]))
+    @mock.patch('common.PQOS_API.get_l2ids', mock.MagicMock(return_value=[0, 1]))
+    @mock.patch('common.CONFIG_STORE.get_mba_ctrl_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('common.CONFIG_STORE.get_l3cdp_enabled', mock.MagicMock(return_value=False))
+    def test_apply_unchanged(self, mock_alloc_assoc_set, mock_l3ca_set):
+        Pool.pools[1] = {}
+        Pool.pools[1]['cores'] = [2, 3]
+        Pool.pools[1]['l3cbm'] = 0x300
+        Pool.pools[1]['l2cbm'] = 0xff
+        Pool.pools[1]['mba'] = 11
+
+        Pool.pools[2] = {}
+        Pool.pools[2]['cores'] = [5]
+        Pool.pools[2]['l3cbm'] = 0xc00
+
+        mock_alloc_assoc_set.return_value = 0
+        mock_l3ca_set.return_value = 0
+
+        assert Pool.apply([1, 2]) == 0
+        mock_l3ca_set.assert_called_once_with([0, 1], {1: 0x300, 2: 0xc00})
+        mock_alloc_assoc_set.assert_any_call([2, 3], 1)
+        mock_alloc_assoc_set.assert_any_call([5], 2)
+
+        # nothing changed, nothing programmed
+        mock_alloc_assoc_set.reset_mock()
+        RDT_STATE.reset_stats()
+        assert Pool.apply([1, 2]) == 0
+        mock_l3ca_set.assert_called_once()
+        mock_alloc_assoc_set.assert_not_called()
+        assert RDT_STATE.ops_applied == 0
+        assert RDT_STATE.ops_skipped == 11
+
+        # only changed COS and cores programmed
+        Pool.pools[1]['cores'] = [2, 4]
+        Pool.pools[1]['l3cbm'] = 0xf00
+        assert Pool.apply([1, 2]) == 0
+        mock_l3ca_set.assert_called_with([0, 1], {1: 0xf00})
+        mock_alloc_assoc_set.assert_called_once_with([4], 1)
+
+        # failed operation is retried
+        mock_l3ca_set.return_value = -1
+        Pool.pools[1]['l3cbm'] = 0xf
+        assert Pool.apply([1, 2]) != 0
+        mock_l3ca_set.return_value = 0
+        Pool.pools[1]['l3cbm'] = 0xf00
+        assert Pool.apply([1, 2]) == 0
+        mock_l3ca_set.assert_called_with([0, 1], {1: 0xf00})
+
+        # all programmed again after state reset
+        RDT_STATE.reset()
+        mock_alloc_assoc_set.reset_mock()
+        assert Pool.apply([1]) == 0
+        mock_alloc_assoc_set.assert_called_once_with([2, 4], 1)
+
+
+    @mock.patch('common.PQOS_API.l3ca_set_batch', mock.MagicMock(return_value=0))
+    @mock.patch('common.PQOS_API.get_sockets', mock.MagicMock(return_value=[0]))
+    @mock.patch('common.CONFIG_STORE.get_mba_ctrl_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('common.CONFIG_STORE.get_l3cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('common.PQOS_API.release_pids')
+    @mock.patch('common.PQOS_API.alloc_assoc_set_pids')
+    @mock.patch('common.PQOS_API.alloc_assoc_set')
+    def test_apply_task_mode(self, mock_alloc_assoc_set, mock_assoc_set_pids, mock_release_pids):
+        Pool.pools[3] = {}
+        Pool.pools[3]['cores'] = []
+        Pool.pools[3]['pids'] = [100, 200, 300]
+        Pool.pools[3]['l3cbm'] = 0xf
+        Pool.pools[3]['task_mode'] = True
+
+        tids = {100: [100, 101], 200: [200], 300: None}
+
+        mock_assoc_set_pids.return_value = 0
+        mock_release_pids.return_value = 0
+
+        with mock.patch('cache_ops.get_tids', side_effect=tids.get):
+            assert Pool.apply([3]) == 0
+
+            mock_alloc_assoc_set.assert_not_called()
+            mock_assoc_set_pids.assert_called_once_with([100, 101, 200], 3)
+            assert RDT_STATE.pids == {100: 3, 200: 3}
+
+            # already associated
+            mock_assoc_set_pids.reset_mock()
+            assert Pool.apply([3]) == 0
+            mock_assoc_set_pids.assert_not_called()
+
+            # PID removed from Pool
+            Pool.pools[3]['pids'] = [100]
+            release_pids()
+            mock_release_pids.assert_called_once_with([200])
+            assert RDT_STATE.pids == {100: 3}
+
+
+    @mock.patch('common.PQOS_API.l3ca_set_batch', mock.MagicMock(return_value=0))
+    @mock.patch('common.PQOS_API.get_sockets', mock.MagicMock(return_value=[0]))
+    @mock.patch('common.CONFIG_STORE.get_mba_ctrl_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('common.CONFIG_STORE.get_l3cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('common.PQOS_API.alloc_assoc_set', mock.MagicMock(return_value=0))
+    def test_apply_task_mode_pid_terminated(self):
+        Pool.pools[3] = {}
+        Pool.pools[3]['cores'] = []
+        Pool.pools[3]['pids'] = [100, 200]
+        Pool.pools[3]['l3cbm'] = 0xf
+        Pool.pools[3]['task_mode'] = True
+
+        tids = {100: [100, 101], 200: [200]}
+
+        def assoc_set_pids(pids, _cos):
+            # process 100 terminated
+            return -1 if 100 in pids else 0
+
+        with mock.patch('cache_ops.get_tids', side_effect=tids.get), \
+             mock.patch('common.PQOS_API.alloc_assoc_set_pids',
+                        side_effect=assoc_set_pids) as mock_assoc_set_pids:
+            assert Pool.apply([3]) == 0
+
+            assert mock_assoc_set_pids.call_args_list == \
+                [mock.call([100, 101, 200], 3), mock.call([100, 101], 3), mock.call([200], 3)]
+            assert RDT_STATE.pids == {200: 3}
+
+
     def test_reset(self):
         Pool.pools[2] = {}
         Pool.pools[2]['cores'] = [1]
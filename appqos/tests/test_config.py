@@ -37,6 +37,10 @@ import jsonschema
 import mock
 
 from config import ConfigStore
+from config_index import ConfigIndex
+import config_schema
+from config_sync import CHANGE_NORMAL, CHANGE_URGENT, \
+    GENERATION_APPLIED, GENERATION_FAILED, GENERATION_PENDING
 import caps
 
 from copy import deepcopy
@@ -179,6 +183,37 @@ def test_config_pid_to_pool(mock_get_config, pid, pool_id):
     assert config_store.pid_to_pool(pid) == pool_id
 
 
+def test_config_index():
+    index = ConfigIndex(CONFIG)
+
+    assert sorted(index.pools) == [1, 2, 3]
+    assert sorted(index.apps) == [1, 2, 3]
+    assert index.pools[2]['name'] == "cat"
+    assert index.apps[3]['name'] == "app 3"
+
+    assert index.app_to_pool == {1: 1, 2: 2, 3: 2}
+    assert index.pid_to_app == {1: 1, 2: 2, 3: 2, 4: 3}
+    assert index.core_to_pool == {1: 1, 3: 2, 4: 3}
+    assert not index.power_profiles
+
+
+def test_config_get_index():
+    config_store = ConfigStore()
+    config_store.set_config(CONFIG)
+
+    index = config_store.get_index()
+    assert index.data == CONFIG
+
+    # index rebuilt only on config change
+    assert config_store.get_index() is index
+
+    config_store.set_config(CONFIG_NO_MBA)
+    assert config_store.get_index() is not index
+    assert config_store.get_index().data == CONFIG_NO_MBA
+    # index stored together with its configuration version
+    assert config_store.index == (config_store.get_config_version(), config_store.get_index())
+
+
 @mock.patch('common.PQOS_API.get_cores')
 def test_config_default_pool(mock_get_cores):
     mock_get_cores.return_value = range(16)
@@ -214,6 +249,25 @@ def test_config_default_pool(mock_get_cores):
     assert not config_store.is_default_pool_defined(config)
 
 
+@mock.patch('common.PQOS_API.get_cores', mock.MagicMock(return_value=range(8)))
+@mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=False))
+@mock.patch("caps.cat_l2_supported", mock.MagicMock(return_value=False))
+@mock.patch("caps.mba_supported", mock.MagicMock(return_value=False))
+def test_config_default_pool_task_mode():
+    config = {
+        "pools": [
+            {"id": 1, "cores": [1, 2], "mba": 50},
+            {"id": 2, "cores": [2, 3], "mba": 50, "task_mode": True}
+        ]
+    }
+
+    ConfigStore.add_default_pool(config)
+
+    # cores of pool in task mode are shared with Default pool
+    assert config['pools'][-1]['id'] == 0
+    assert config['pools'][-1]['cores'] == [0, 3, 4, 5, 6, 7]
+
+
 @mock.patch('common.PQOS_API.get_cores', mock.MagicMock(return_value=range(8)))
 @mock.patch('common.PQOS_API.get_max_l3_cat_cbm', mock.MagicMock(return_value=0xDEADBEEF))
 @mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=True))
@@ -371,6 +425,26 @@ def test_config_recreate_default_pool(def_pool_def):
         mock_add_def_pool.assert_called_once()
 
 
+def test_config_recreate_default_pool_changed():
+    config_store = ConfigStore()
+    config_store.set_config({"pools": [], "apps": []})
+    config_store.is_config_changed(0)
+
+    def add_default_pool(data):
+        # configuration changed by REST API in the meantime, only once
+        if not data['apps']:
+            config_store.set_config({"pools": [], "apps": [{"id": 1}]})
+        data['pools'].append({"id": 0})
+
+    with mock.patch('config.ConfigStore.add_default_pool', side_effect=add_default_pool) as func_mock:
+        version = config_store.recreate_default_pool()
+
+    assert func_mock.call_count == 2
+    assert version == config_store.get_config_version()
+    assert config_store.get_config() == {"pools": [{"id": 0}], "apps": [{"id": 1}]}
+    assert config_store.is_config_changed(0) == CHANGE_URGENT
+
+
 CONFIG_POOLS = {
     "pools": [
         {
@@ -427,28 +501,88 @@ def test_config_remove_default_pool():
     assert not ConfigStore.is_default_pool_defined(config)
 
 
-@mock.patch('config.ConfigStore.get_config')
-def test_config_is_any_pool_defined(mock_get_config):
+def test_config_get_validator():
+    validator = config_schema.get_validator('add_app.json')
+
+    # validator is built once and reused
+    assert config_schema.get_validator('add_app.json') is validator
+    assert config_schema.get_validator('add_pool.json') is not validator
+
+
+def test_config_validate_schema():
+    config_schema.load_validators()
+
+    with mock.patch('config_schema.load_json_schema') as mock_load:
+        ConfigStore.validate_schema({"pids": [1], "cores": [1], "name": "app", "pool_id": 1},
+                                    'add_app.json')
+
+        with pytest.raises(jsonschema.exceptions.ValidationError,
+                           match="Additional properties are not allowed"):
+            ConfigStore.validate_schema({"pids": [1], "cores": [1], "name": "app", "pool_id": 1,
+                                         "test": 1}, 'add_app.json')
+
+        # schema files are not re-read on validation
+        mock_load.assert_not_called()
+
+
+@mock.patch('config.ConfigStore.get_config_version', mock.MagicMock(return_value=3))
+def test_config_status():
+    config_store = ConfigStore()
+
+    assert config_store.get_status() == \
+        {'id': 3, 'version': 3, 'applied_version': None, 'applied': None,
+         'last_applied_generation': None, 'error': None}
+
+    config_store.set_applied(2, 0)
+    assert config_store.get_status() == \
+        {'id': 4, 'version': 3, 'applied_version': 2, 'applied': True,
+         'last_applied_generation': 2, 'error': None}
+
+    config_store.set_applied(3, -1)
+    assert config_store.get_status() == \
+        {'id': 5, 'version': 3, 'applied_version': 3, 'applied': False,
+         'last_applied_generation': 2, 'error': "Failed to apply configuration"}
+
+
+def test_config_generation_status():
+    config_store = ConfigStore()
+
+    assert config_store.get_generation_status(3) == (GENERATION_PENDING, None)
+
+    config_store.set_applied(2, 0)
+    assert config_store.get_generation_status(1) == (GENERATION_APPLIED, None)
+    assert config_store.get_generation_status(2) == (GENERATION_APPLIED, None)
+    assert config_store.get_generation_status(3) == (GENERATION_PENDING, None)
+
+    config_store.set_applied(3, -1, "Failed to apply RDT configuration")
+    assert config_store.get_generation_status(2) == (GENERATION_APPLIED, None)
+    assert config_store.get_generation_status(3) == \
+        (GENERATION_FAILED, "Failed to apply RDT configuration")
+    assert config_store.get_generation_status(4) == (GENERATION_PENDING, None)
+
+    # next successful apply supersedes failed generation
+    config_store.set_applied(4, 0)
+    assert config_store.get_generation_status(3) == (GENERATION_APPLIED, None)
+    assert config_store.get_status()['error'] is None
+
+
+def test_config_is_any_pool_defined():
 
     config_store = ConfigStore()
     config = deepcopy(CONFIG_POOLS)
 
-    mock_get_config.return_value = config
+    config_store.set_config(config)
     assert config_store.is_any_pool_defined() == True
 
     for pool in config['pools'][:]:
-        print(pool)
         if not pool['id'] == 0:
             config['pools'].remove(pool)
 
-    print(config)
-
-    mock_get_config.return_value = config
+    config_store.set_config(config)
     assert not config_store.is_any_pool_defined()
 
 
-@mock.patch('config.ConfigStore.get_config')
-def test_config_get_new_pool_id(mock_get_config):
+def test_config_get_new_pool_id():
 
     def get_max_cos_id(alloc_type):
         if 'mba' in alloc_type:
@@ -460,7 +594,7 @@ def test_config_get_new_pool_id(mock_get_config):
     with mock.patch('common.PQOS_API.get_max_cos_id', new=get_max_cos_id):
         config_store = ConfigStore()
 
-        mock_get_config.return_value = CONFIG
+        config_store.set_config(CONFIG)
         assert 9 == config_store.get_new_pool_id({"mba":10})
         assert 9 == config_store.get_new_pool_id({"mba":20, "cbm":"0xf0"})
         assert 31 == config_store.get_new_pool_id({"cbm":"0xff"})
@@ -468,7 +602,7 @@ def test_config_get_new_pool_id(mock_get_config):
         assert 31 == config_store.get_new_pool_id({"l2cbm":"0xff"})
         assert 31 == config_store.get_new_pool_id({"l2cbm":"0xff", "cbm":"0xf0"})
 
-        mock_get_config.return_value = CONFIG_POOLS
+        config_store.set_config(CONFIG_POOLS)
         assert 8 == config_store.get_new_pool_id({"mba":10})
         assert 8 == config_store.get_new_pool_id({"mba":20, "cbm":"0xf0"})
         assert 30 == config_store.get_new_pool_id({"cbm":"0xff"})
@@ -641,6 +775,42 @@ class TestConfigValidate:
             ConfigStore.validate(data)
 
 
+    @mock.patch("common.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    def test_pool_task_mode(self):
+        data = {
+            "pools": [
+                {
+                    "cbm": 0xf0,
+                    "cores": [1, 3],
+                    "id": 1,
+                    "name": "pool 1"
+                },
+                {
+                    "cbm": 0xf,
+                    "id": 10,
+                    "cores": [3],
+                    "name": "pool 10",
+                    "task_mode": True
+                },
+                {
+                    "cbm": 0xf,
+                    "id": 1,
+                    "cores": [3],
+                    "name": "pool 1"
+                }
+            ]
+        }
+
+        with pytest.raises(ValueError, match="Pool 10, task mode requires 'os' RDT interface"):
+            ConfigStore.validate(data)
+
+        # cores shared by pool in task mode
+        data['rdt_iface'] = {"interface": "os"}
+        with pytest.raises(ValueError, match="Pool 1, multiple pools with same id"):
+            ConfigStore.validate(data)
+
+
     @mock.patch("common.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=True))
     def test_pool_invalid_app(self):
@@ -1266,3 +1436,52 @@ def test_get_mba_ctrl_enabled(mock_get_config, cfg, result):
     config_store = ConfigStore()
 
     assert config_store.get_mba_ctrl_enabled() == result
+
+
+def test_config_changed_notify():
+    config_store = ConfigStore()
+
+    # nothing pending
+    assert not config_store.is_config_changed(0)
+
+    # multiple notifications are consumed at once
+    config_store.set_config(deepcopy(CONFIG))
+    config_store.notify()
+    assert config_store.is_config_changed(0)
+    assert not config_store.is_config_changed(0)
+
+
+def test_config_changed_notify_urgent():
+    config_store = ConfigStore()
+
+    config_store.notify()
+    assert config_store.is_config_changed(0) == CHANGE_NORMAL
+
+    # urgent change is reported even if coalesced with normal ones
+    config_store.notify()
+    config_store.set_config(deepcopy(CONFIG), urgent=True)
+    config_store.notify()
+    assert config_store.is_config_changed(0) == CHANGE_URGENT
+    assert not config_store.is_config_changed(0)
+
+
+def test_config_status_changed_notify():
+    config_store = ConfigStore()
+    assert not config_store.status_changed.consume()
+
+    # change notification only, status does not change
+    config_store.notify()
+    assert not config_store.status_changed.consume()
+
+    version = config_store.set_config(deepcopy(CONFIG))
+    assert config_store.status_changed.consume()
+
+    config_store.set_applied(version, 0)
+    assert config_store.status_changed.consume()
+
+    assert config_store.update_config(deepcopy(CONFIG), version)
+    assert config_store.status_changed.consume()
+
+    # configuration changed in the meantime, not updated
+    assert config_store.update_config(deepcopy(CONFIG), version) is None
+    assert not config_store.status_changed.consume()
@@ -0,0 +1,222 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+from collections import deque
+import mock
+import pytest
+
+import common
+from config_index import ConfigIndex
+from monitor import *
+
+
+CONFIG = {
+    "pools": [
+        {"id": 1, "cores": [1, 2], "apps": [1]},
+        {"id": 2, "cores": [3], "task_mode": True, "apps": [2]}
+    ],
+    "apps": [
+        {"id": 1, "cores": [1], "pids": [100]},
+        {"id": 2, "cores": [3], "pids": [200, 201]}
+    ],
+    "monitoring": {"enabled": True, "interval": 100, "samples": 2}
+}
+
+
+@pytest.fixture
+def config_store():
+    with mock.patch('common.CONFIG_STORE.get_index', return_value=ConfigIndex(CONFIG)), \
+         mock.patch('common.CONFIG_STORE.get_config_version', return_value=1), \
+         mock.patch('common.CONFIG_STORE.get_global_attr',
+                    side_effect=lambda attr, default: CONFIG.get(attr, default)):
+        yield
+
+
+@pytest.fixture
+def pqos_api():
+    with mock.patch('common.PQOS_API') as api, \
+         mock.patch('common.METRICS_STORE'):
+        api.current_iface.return_value = "os"
+        api.get_mon_events.return_value = ['l3_occup', 'lmem_bw']
+        api.mon_start.side_effect = lambda cores, events: mock.MagicMock()
+        api.mon_start_pids.side_effect = lambda pids, events: mock.MagicMock()
+        api.mon_poll.return_value = 0
+        yield api
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_update(pqos_api):
+    mon = Monitor()
+    mon.update()
+
+    # Pool 2 is in task mode, its Apps are monitored instead
+    assert set(mon.groups) == {('pools', 1), ('apps', 1), ('apps', 2)}
+    pqos_api.mon_start.assert_called_once_with([1, 2], ['l3_occup', 'lmem_bw'])
+    pqos_api.mon_start_pids.assert_any_call([100], ['l3_occup', 'lmem_bw'])
+    pqos_api.mon_start_pids.assert_any_call([200, 201], ['l3_occup', 'lmem_bw'])
+    assert mon.timeout() <= 0.1
+
+    # unchanged targets, groups are kept running
+    pqos_api.mon_start.reset_mock()
+    mon.update()
+    pqos_api.mon_start.assert_not_called()
+    pqos_api.mon_stop.assert_not_called()
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_update_target_changed(pqos_api):
+    mon = Monitor()
+    mon.update()
+    group = mon.groups[('pools', 1)][1]
+
+    config = {**CONFIG, "pools": [{"id": 1, "cores": [1], "apps": [1]}], "apps": [CONFIG["apps"][0]]}
+    with mock.patch('common.CONFIG_STORE.get_index', return_value=ConfigIndex(config)):
+        mon.update()
+
+    pqos_api.mon_stop.assert_any_call(group)
+    pqos_api.mon_start.assert_called_with([1], ['l3_occup', 'lmem_bw'])
+    assert set(mon.groups) == {('pools', 1), ('apps', 1)}
+    assert set(mon.samples) == {('pools', 1), ('apps', 1)}
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_update_msr(pqos_api):
+    pqos_api.current_iface.return_value = "msr"
+
+    mon = Monitor()
+    mon.update()
+
+    # PIDs are monitored with "os" interface only
+    assert set(mon.groups) == {('pools', 1)}
+    pqos_api.mon_start_pids.assert_not_called()
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_update_disabled(pqos_api):
+    mon = Monitor()
+    mon.update()
+    groups = [group for _, group in mon.groups.values()]
+
+    with mock.patch.dict(CONFIG, {"monitoring": {"enabled": False}}):
+        mon.update()
+
+    for group in groups:
+        pqos_api.mon_stop.assert_any_call(group)
+    assert not mon.groups
+    assert mon.timeout() is None
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_poll(pqos_api):
+    mon = Monitor()
+    mon.update()
+
+    # polling interval has not expired yet
+    mon.poll()
+    pqos_api.mon_poll.assert_not_called()
+
+    for _ in range(3):
+        mon.next_poll = 0
+        mon.poll()
+
+    assert pqos_api.mon_poll.call_count == 3
+
+    # number of kept samples is limited
+    samples = mon.samples[('pools', 1)]
+    assert len(samples) == 2
+    group = mon.groups[('pools', 1)][1]
+    assert samples[-1]['llc'] == group.values.llc
+    assert samples[-1]['mbm_local_delta'] == group.values.mbm_local_delta
+    assert 'ipc' not in samples[-1]
+
+    data = common.METRICS_STORE.set_metrics.call_args[0][0]
+    assert set(data['pools']) == {'1'}
+    assert set(data['apps']) == {'1', '2'}
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_poll_error(pqos_api):
+    pqos_api.mon_poll.return_value = -1
+
+    mon = Monitor()
+    mon.update()
+    mon.next_poll = 0
+    mon.poll()
+
+    assert not mon.samples[('pools', 1)]
+    common.METRICS_STORE.set_metrics.assert_not_called()
+
+
+@pytest.mark.usefixtures("config_store")
+def test_monitor_poll_config_changed(pqos_api):
+    mon = Monitor()
+    mon.update()
+    mon.next_poll = 0
+
+    with mock.patch('common.CONFIG_STORE.get_config_version', return_value=2), \
+         mock.patch.object(mon, 'update') as update_mock:
+        mon.poll()
+        update_mock.assert_called_once()
+
+
+def test_monitor_publish_size():
+    mon = Monitor()
+    sample = {'timestamp': 1650000000.123, 'llc': 123456789, 'mbm_local_delta': 123456789}
+    for group_id in range(64):
+        mon.samples[('pools', group_id)] = deque([sample] * 3600, maxlen=3600)
+        mon.samples[('apps', group_id)] = deque([sample] * 3600, maxlen=3600)
+
+    store = MetricsStore()
+    with mock.patch('common.METRICS_STORE', store):
+        mon.publish()
+
+        # most recent samples that fit shared memory are published
+        assert 0 < mon.published_samples < 3600
+        data = store.get_all_metrics()
+        assert len(data['pools']) == 64
+        assert len(data['apps']) == 64
+        assert len(data['pools']['0']) == mon.published_samples
+
+
+def test_monitor_publish_too_big():
+    mon = Monitor()
+    mon.samples[('pools', 1)] = deque([{'timestamp': 1}] * 2, maxlen=2)
+
+    store = MetricsStore()
+    store.set_metrics({'pools': {}, 'apps': {}})
+    with mock.patch('common.METRICS_STORE', store), \
+         mock.patch.object(store.snapshot, 'size', 8):
+        mon.publish()
+
+    # previous samples are kept
+    assert store.get_version() == 1
+    assert mon.published_samples == 1
@@ -0,0 +1,157 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for openmetrics module
+"""
+
+import mock
+
+from stats import StatsStore
+from openmetrics import *
+
+
+CONFIG = {
+    "pools": [
+        {"id": 1, "name": "cat \"hp\"", "cores": [1, 2], "l3cbm": "0xf0", "mba": 50},
+        {"id": 2, "name": "mba", "cores": [3], "cbm": "0xf", "mba_bw": 1000}
+    ]
+}
+
+
+METRICS = {
+    "pools": {
+        "1": [{"timestamp": 1.0, "llc": 100}, {"timestamp": 2.0, "llc": 200, "ipc": 1.5}],
+        "2": []
+    },
+    "apps": {"3": [{"timestamp": 2.0, "llc": 300}]}
+}
+
+
+def test_format_labels():
+    assert format_labels([]) == ''
+    assert format_labels([('pool_id', 1), ('name', 'a"b\\c\nd')]) == \
+        '{pool_id="1",name="a\\"b\\\\c\\nd"}'
+
+
+def test_render_stats():
+    stats_store = StatsStore()
+    stats_store.register_endpoint("apps")
+    stats_store.general_stats_inc_apps_moves()
+    stats_store.general_stats_inc_endpoint_err("apps")
+    stats_store.general_stats_set_apply_duration(0.02)
+    stats_store.general_stats_observe_request("apps", 10)
+
+    lines = render_stats(stats_store.snapshot())
+
+    assert "# TYPE appqos_num_apps_moves counter" in lines
+    assert "appqos_num_apps_moves_total 1" in lines
+    assert 'appqos_num_endpoint_err_total{endpoint="apps"} 1' in lines
+    assert "# TYPE appqos_apply_duration_seconds gauge" in lines
+    assert "appqos_apply_duration_seconds 0.02" in lines
+
+    assert "# TYPE appqos_apply_latency_seconds histogram" in lines
+    assert 'appqos_apply_latency_seconds_bucket{le="0.01"} 0' in lines
+    assert 'appqos_apply_latency_seconds_bucket{le="0.025"} 1' in lines
+    assert 'appqos_apply_latency_seconds_bucket{le="+Inf"} 1' in lines
+    assert "appqos_apply_latency_seconds_count 1" in lines
+
+    assert 'appqos_request_latency_seconds_bucket{endpoint="apps",le="5.0"} 0' in lines
+    assert 'appqos_request_latency_seconds_bucket{endpoint="apps",le="+Inf"} 1' in lines
+    assert 'appqos_request_latency_seconds_sum{endpoint="apps"} 10.0' in lines
+
+
+def test_render_status():
+    lines = render_status({'id': 5, 'version': 3, 'applied_version': None, 'applied': None})
+    assert "appqos_config_version 3" in lines
+    assert not [line for line in lines if "applied" in line]
+
+    lines = render_status({'id': 5, 'version': 3, 'applied_version': 2, 'applied': False})
+    assert "appqos_config_applied_version 2" in lines
+    assert "appqos_config_applied 0" in lines
+
+
+def test_render_pools():
+    lines = render_pools(CONFIG)
+
+    assert "# TYPE appqos_pool info" in lines
+    assert 'appqos_pool_info{pool_id="1",name="cat \\"hp\\""} 1' in lines
+    assert 'appqos_pool_cores{pool_id="1"} 2' in lines
+    assert 'appqos_pool_l3cbm{pool_id="1"} 240' in lines
+    assert 'appqos_pool_l3cbm{pool_id="2"} 15' in lines
+    assert 'appqos_pool_mba{pool_id="1"} 50' in lines
+    assert 'appqos_pool_mba_bw{pool_id="2"} 1000' in lines
+    assert not [line for line in lines if "l2cbm" in line]
+
+    assert render_pools({}) == []
+
+
+def test_render_monitoring():
+    lines = render_monitoring(METRICS)
+
+    assert 'appqos_monitoring_llc_bytes{pool_id="1"} 200' in lines
+    assert 'appqos_monitoring_llc_bytes{app_id="3"} 300' in lines
+    assert 'appqos_monitoring_ipc{pool_id="1"} 1.5' in lines
+    assert 'appqos_monitoring_timestamp_seconds{pool_id="1"} 2.0' in lines
+    assert not [line for line in lines if 'pool_id="2"' in line]
+
+    assert render_monitoring(None) == []
+
+
+def test_exporter_cache():
+    exporter = Exporter()
+
+    with mock.patch('common.CONFIG_STORE.get_config_version', return_value=1), \
+         mock.patch('common.CONFIG_STORE.get_config', return_value=CONFIG) as get_config, \
+         mock.patch('common.METRICS_STORE.get_version', return_value=7), \
+         mock.patch('common.METRICS_STORE.get_all_metrics', return_value=METRICS) as get_metrics:
+        text = exporter.render()
+        assert exporter.render() == text
+
+        get_config.assert_called_once()
+        get_metrics.assert_called_once()
+
+    assert text.endswith("# EOF\n")
+    assert 'appqos_pool_cores{pool_id="1"} 2\n' in text
+    assert 'appqos_monitoring_llc_bytes{pool_id="1"} 200\n' in text
+
+    with mock.patch('common.CONFIG_STORE.get_config_version', return_value=2), \
+         mock.patch('common.CONFIG_STORE.get_config', return_value={}) as get_config, \
+         mock.patch('common.METRICS_STORE.get_version', return_value=7), \
+         mock.patch('common.METRICS_STORE.get_all_metrics') as get_metrics:
+        text = exporter.render()
+
+        get_config.assert_called_once()
+        get_metrics.assert_not_called()
+
+    assert 'appqos_pool_cores' not in text
+    assert 'appqos_monitoring_llc_bytes{pool_id="1"} 200\n' in text
@@ -45,3 +45,57 @@ def test_is_pid_valid():
         assert False == is_pid_valid(1234)
         get_pid_status_mock.assert_called_with(1234)
 
+
+
+def test_get_tids():
+    with mock.patch('os.listdir', return_value=['12', '10', '11']):
+        assert get_tids(10) == [12, 10, 11]
+
+    with mock.patch('os.listdir', side_effect=FileNotFoundError):
+        assert get_tids(10) is None
+
+
+def test_set_pid_affinity():
+    # new thread appears while affinity is being set
+    with mock.patch('pid_ops.get_tids', side_effect=[[10, 11], [10, 11, 12], [10, 11, 12]]),\
+         mock.patch('os.sched_setaffinity') as mock_setaffinity:
+        assert set_pid_affinity(10, [1, 2]) == {'threads': 3, 'error': None}
+        assert mock_setaffinity.call_count == 3
+        mock_setaffinity.assert_any_call(12, [1, 2])
+
+    # thread terminated
+    with mock.patch('pid_ops.get_tids', side_effect=[[10, 11], [10]]),\
+         mock.patch('os.sched_setaffinity', side_effect=[None, ProcessLookupError]):
+        assert set_pid_affinity(10, [1]) == {'threads': 1, 'error': None}
+
+    with mock.patch('pid_ops.get_tids', return_value=None):
+        assert set_pid_affinity(10, [1])['error'] is not None
+
+    with mock.patch('pid_ops.get_tids', return_value=[10]),\
+         mock.patch('os.sched_setaffinity', side_effect=OSError(22, 'Invalid argument')):
+        assert set_pid_affinity(10, [1]) == {'threads': 0, 'error': 'Invalid argument'}
+
+
+def test_set_affinity():
+    def set_pid_affinity_mock(pid, cores):
+        if pid == 2:
+            return {'threads': 0, 'error': 'No such process'}
+        return {'threads': 1, 'error': None}
+
+    with mock.patch('pid_ops.set_pid_affinity', side_effect=set_pid_affinity_mock) as mock_set,\
+         mock.patch('log.error') as mock_log:
+        results = set_affinity([1, 2, 3], [4])
+        assert results[1] == {'threads': 1, 'error': None}
+        assert results[2] == {'threads': 0, 'error': 'No such process'}
+        mock_set.assert_any_call(3, [4])
+        mock_log.assert_called_once()
+
+
+@mock.patch('os.path.isdir', mock.MagicMock(return_value=False))
+def test_set_affinity_psutil():
+    with mock.patch('psutil.Process') as mock_process:
+        mock_process.return_value.cpu_affinity.side_effect = [None, psutil.NoSuchProcess(2)]
+        results = set_affinity([1, 2], [3])
+        assert results[1] == {'threads': 1, 'error': None}
+        assert results[2]['error'] is not None
+        mock_process.return_value.cpu_affinity.assert_called_with([3])
@@ -0,0 +1,201 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+import struct
+import mock
+import pytest
+
+import common
+from pid_tracker import *
+
+
+def build_msg(what, data):
+    event = PROC_EVENT_HDR.pack(what, 0, 0) + data
+    msg = CN_MSG_HDR.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(event), 0) + event
+    return NLMSG_HDR.pack(NLMSG_HDR.size + len(msg), NLMSG_DONE, 0, 0, 0) + msg
+
+
+def test_proc_connector_parse():
+    buf = build_msg(PROC_EVENT_FORK, PROC_EVENT_FORK_DATA.pack(10, 10, 11, 11)) + \
+          build_msg(PROC_EVENT_FORK, PROC_EVENT_FORK_DATA.pack(10, 10, 12, 10)) + \
+          build_msg(PROC_EVENT_EXEC, PROC_EVENT_ID_DATA.pack(11, 11)) + \
+          build_msg(PROC_EVENT_EXIT, struct.pack('=iiII', 11, 11, 0, 17)) + \
+          build_msg(0x20, PROC_EVENT_ID_DATA.pack(11, 11))
+
+    assert ProcConnector.parse(buf) == [
+        (PROC_EVENT_FORK, 11, 11, 10),
+        (PROC_EVENT_FORK, 12, 10, 10),
+        (PROC_EVENT_EXEC, 11, 11, None),
+        (PROC_EVENT_EXIT, 11, 11, None)
+    ]
+
+    # truncated message
+    assert ProcConnector.parse(buf[:10]) == []
+
+
+def test_get_ppid():
+    stat = "1234 (my (app) x) S 42 1234 1234 0 -1 4194560"
+    with mock.patch('builtins.open', mock.mock_open(read_data=stat)):
+        assert get_ppid(1234) == 42
+
+    with mock.patch('builtins.open', side_effect=FileNotFoundError):
+        assert get_ppid(1234) is None
+
+
+def test_scan_processes():
+    ppids = {'1': 0, '10': 1, '11': 10}
+    with mock.patch('os.listdir', return_value=['1', '10', '11', '12', 'self']),\
+         mock.patch('pid_tracker.get_ppid', side_effect=ppids.get):
+        assert scan_processes() == {1: 0, 10: 1, 11: 10}
+
+
+class TestPidTracker:
+
+    ## @cond
+    @pytest.fixture(autouse=True)
+    def init(self):
+        self.tracker = PidTracker()
+        self.tracker.pid_to_app = {10: 1, 20: 2}
+    ## @endcond
+
+
+    @mock.patch('pid_tracker.PidTracker.affine')
+    def test_process_event(self, mock_affine):
+        # child process
+        self.tracker.process_event(PROC_EVENT_FORK, 11, 11, 10)
+        assert self.tracker.pid_to_app[11] == 1
+        assert self.tracker.pids_added == {1: {11}}
+        mock_affine.assert_called_once_with(1, [11])
+
+        # new thread
+        mock_affine.reset_mock()
+        self.tracker.process_event(PROC_EVENT_FORK, 21, 20, 20)
+        assert 21 not in self.tracker.pid_to_app
+        mock_affine.assert_called_once_with(2, [21])
+
+        # new thread, parent of thread's process is tracked by another App
+        mock_affine.reset_mock()
+        self.tracker.process_event(PROC_EVENT_FORK, 22, 20, 10)
+        assert 22 not in self.tracker.pid_to_app
+        mock_affine.assert_called_once_with(2, [22])
+
+        # new thread of not tracked process, parent is tracked
+        mock_affine.reset_mock()
+        self.tracker.process_event(PROC_EVENT_FORK, 41, 40, 10)
+        assert 41 not in self.tracker.pid_to_app
+        mock_affine.assert_not_called()
+
+        # not tracked parent
+        mock_affine.reset_mock()
+        self.tracker.process_event(PROC_EVENT_FORK, 31, 31, 30)
+        assert 31 not in self.tracker.pid_to_app
+        mock_affine.assert_not_called()
+
+        # thread exit
+        self.tracker.process_event(PROC_EVENT_EXIT, 21, 20, None)
+        assert 20 in self.tracker.pid_to_app
+
+        # process exit
+        self.tracker.process_event(PROC_EVENT_EXIT, 11, 11, None)
+        self.tracker.process_event(PROC_EVENT_EXIT, 20, 20, None)
+        assert self.tracker.pid_to_app == {10: 1}
+        assert self.tracker.pids_added == {1: set()}
+        assert self.tracker.pids_removed == {11, 20}
+
+
+    @mock.patch('pid_tracker.PidTracker.affine')
+    def test_scan(self, mock_affine):
+        processes = {1: 0, 10: 1, 11: 10, 12: 11, 13: 1}
+        with mock.patch('pid_tracker.scan_processes', return_value=processes):
+            self.tracker.scan()
+
+        assert self.tracker.pid_to_app == {10: 1, 11: 1, 12: 1}
+        assert self.tracker.pids_added == {1: {11, 12}}
+        assert self.tracker.pids_removed == {20}
+        mock_affine.assert_any_call(1, [11])
+        mock_affine.assert_any_call(1, [12])
+
+
+    def test_flush(self):
+        config = {
+            "apps": [{"id": 1, "pids": [10]}, {"id": 2, "pids": [20, 21]},
+                     {"id": 3, "pids": [30]}],
+            "pools": [{"id": 1, "apps": [1, 2]}, {"id": 2, "apps": [3]}]
+        }
+        self.tracker.pids_added = {1: {11, 12}}
+        self.tracker.pids_removed = {21, 30}
+
+        with mock.patch('common.CONFIG_STORE.get_config', return_value=config),\
+             mock.patch('common.CONFIG_STORE.get_config_version', return_value=5),\
+             mock.patch('common.CONFIG_STORE.update_config', return_value=6) as mock_update:
+            self.tracker.config_version = 5
+            self.tracker.flush()
+
+            data = mock_update.call_args[0][0]
+            assert mock_update.call_args[0][1] == 5
+            assert data['apps'][0]['pids'] == [10, 11, 12]
+            assert data['apps'][1]['pids'] == [20]
+            # App with no processes left is removed
+            assert [app['id'] for app in data['apps']] == [1, 2]
+            assert data['pools'] == [{"id": 1, "apps": [1, 2]}, {"id": 2, "apps": []}]
+            # config not modified in place
+            assert config['apps'][0]['pids'] == [10]
+
+            assert self.tracker.config_version == 6
+            assert not self.tracker.pids_added
+            assert not self.tracker.pids_removed
+
+            # configuration changed in the meantime
+            self.tracker.pids_removed = {21}
+            mock_update.return_value = None
+            self.tracker.flush()
+            assert self.tracker.pids_removed == {21}
+
+
+    def test_flush_last_exit(self):
+        config = {
+            "apps": [{"id": 1, "pids": [10]}, {"id": 2, "pids": [20]}],
+            "pools": [{"id": 1, "apps": [1, 2]}]
+        }
+
+        # last process of App 2 exits
+        self.tracker.process_event(PROC_EVENT_EXIT, 20, 20, None)
+
+        with mock.patch('common.CONFIG_STORE.get_config', return_value=config),\
+             mock.patch('common.CONFIG_STORE.get_config_version', return_value=5),\
+             mock.patch('common.CONFIG_STORE.update_config', return_value=6) as mock_update:
+            self.tracker.flush()
+
+            data = mock_update.call_args[0][0]
+            assert data == {"apps": [{"id": 1, "pids": [10]}],
+                            "pools": [{"id": 1, "apps": [1]}]}
+            assert self.tracker.pid_to_app == {10: 1}
@@ -32,8 +32,9 @@
 
 import pytest
 import mock
-from pqos.capability import PqosCapabilityL2Ca, PqosCapabilityL3Ca
+from pqos.capability import PqosCapabilityL2Ca, PqosCapabilityL3Ca, CPqosMonitor
 from pqos.error import PqosErrorResource
+from pqos.cpuinfo import PqosCoreInfo
 
 import common
 
@@ -78,62 +79,76 @@ class TestPqosApi(object):
 
         with mock.patch('pqos_api.PqosApi.is_l3_cat_supported', return_value = True):
 
-            class A:
-                def __init__(self):
-                    self.num_ways = 4
-
-            self.Pqos_api.cap.get_type.return_value = A()
+            l3ca_caps = PqosCapabilityL3Ca()
+            l3ca_caps.num_ways = 4
+            self.Pqos_api.cap.get_type.return_value = l3ca_caps
+            self.Pqos_api.refresh_topology()
 
             assert 0xF == self.Pqos_api.get_max_l3_cat_cbm()
-            self.Pqos_api.cap.get_type.assert_called_once_with("l3ca")
+            self.Pqos_api.cap.get_type.assert_any_call("l3ca")
 
             self.Pqos_api.cap.get_type.side_effect = Exception('Test')
+            self.Pqos_api.refresh_topology()
             assert None == self.Pqos_api.get_max_l3_cat_cbm()
 
 
     def test_get_mba_num_cos(self):
         self.Pqos_api.cap.get_mba_cos_num.return_value = 55
+        self.Pqos_api.refresh_topology()
+        assert 55 == self.Pqos_api.get_mba_num_cos()
         assert 55 == self.Pqos_api.get_mba_num_cos()
         self.Pqos_api.cap.get_mba_cos_num.assert_called_once()
 
         self.Pqos_api.cap.get_mba_cos_num.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_mba_num_cos()
 
 
     def test_get_l3ca_num_cos(self):
         self.Pqos_api.cap.get_l3ca_cos_num.return_value = 44
+        self.Pqos_api.refresh_topology()
+        assert 44 == self.Pqos_api.get_l3ca_num_cos()
         assert 44 == self.Pqos_api.get_l3ca_num_cos()
         self.Pqos_api.cap.get_l3ca_cos_num.assert_called_once()
 
         self.Pqos_api.cap.get_l3ca_cos_num.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_l3ca_num_cos()
 
 
     def test_get_sockets(self):
+        assert None == self.Pqos_api.get_sockets()
+
         self.Pqos_api.cpuinfo.get_sockets.return_value = [0, 1]
+        self.Pqos_api.refresh_topology()
+        assert [0, 1] == self.Pqos_api.get_sockets()
         assert [0, 1] == self.Pqos_api.get_sockets()
         self.Pqos_api.cpuinfo.get_sockets.assert_called_once()
 
         self.Pqos_api.cpuinfo.get_sockets.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_sockets()
 
 
     def test_check_core(self):
-        self.Pqos_api.cpuinfo.check_core.return_value = True
-        assert True == self.Pqos_api.check_core(104)
-        self.Pqos_api.cpuinfo.check_core.assert_called_once_with(104)
+        self.Pqos_api.cpuinfo.get_sockets.return_value = [0, 1]
+        self.Pqos_api.cpuinfo.get_cores.side_effect = lambda socket: [socket * 2, socket * 2 + 1]
+        self.Pqos_api.refresh_topology()
 
-        self.Pqos_api.cpuinfo.check_core.return_value = False
-        assert False == self.Pqos_api.check_core(105)
-        self.Pqos_api.cpuinfo.check_core.assert_called_with(105)
+        assert True == self.Pqos_api.check_core(3)
+        assert False == self.Pqos_api.check_core(4)
+        self.Pqos_api.cpuinfo.check_core.assert_not_called()
+        assert 2 == self.Pqos_api.cpuinfo.get_cores.call_count
 
-        self.Pqos_api.cpuinfo.check_core.side_effect = Exception('Test')
-        assert None == self.Pqos_api.check_core(106)
+        self.Pqos_api.cpuinfo.get_cores.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
+        assert None == self.Pqos_api.check_core(3)
 
 
     def test_get_num_cores(self):
         self.Pqos_api.cpuinfo.get_sockets.return_value = [0, 1]
         self.Pqos_api.cpuinfo.get_cores.return_value = list(range(0, 10))
+        self.Pqos_api.refresh_topology()
 
         assert 20 == self.Pqos_api.get_num_cores()
 
@@ -142,13 +157,55 @@ class TestPqosApi(object):
         self.Pqos_api.cpuinfo.get_cores.assert_any_call(1)
 
         self.Pqos_api.cpuinfo.get_sockets.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_num_cores()
-        self.Pqos_api.cpuinfo.get_sockets.mock_reset(side_effect = True)
+        self.Pqos_api.cpuinfo.get_sockets.side_effect = None
 
         self.Pqos_api.cpuinfo.get_cores.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_num_cores()
 
 
+    def test_get_cores(self):
+        self.Pqos_api.cpuinfo.get_sockets.return_value = [0, 1]
+        self.Pqos_api.cpuinfo.get_cores.side_effect = lambda socket: [socket, socket + 2]
+        self.Pqos_api.refresh_topology()
+
+        assert [0, 2, 1, 3] == self.Pqos_api.get_cores()
+        assert [1, 3] == self.Pqos_api.get_cores(1)
+        assert None == self.Pqos_api.get_cores(2)
+
+
+    def test_get_core_info(self):
+        self.Pqos_api.cpuinfo.get_sockets.return_value = [1]
+        self.Pqos_api.cpuinfo.get_cores.return_value = [4]
+        self.Pqos_api.cpuinfo.get_core_info.return_value = PqosCoreInfo(4, 1, 1, 2, 1, 1)
+        self.Pqos_api.refresh_topology()
+
+        info = self.Pqos_api.get_core_info(4)
+        assert info.core == 4
+        assert info.socket == 1
+        assert info.l2_id == 2
+        assert None == self.Pqos_api.get_core_info(5)
+        self.Pqos_api.cpuinfo.get_core_info.assert_called_once_with(4)
+
+
+    def test_topology_immutable(self):
+        self.Pqos_api.cpuinfo.get_sockets.return_value = [0]
+        self.Pqos_api.cpuinfo.get_cores.return_value = [0, 1]
+        self.Pqos_api.refresh_topology()
+
+        with pytest.raises(AttributeError):
+            self.Pqos_api.topology.cores = None
+
+        with pytest.raises(TypeError):
+            self.Pqos_api.topology.socket_cores[1] = (2, 3)
+
+        cores = self.Pqos_api.get_cores()
+        cores.append(2)
+        assert [0, 1] == self.Pqos_api.get_cores()
+
+
     def test_is_multicore(self):
         with mock.patch('pqos_api.PqosApi.get_num_cores', return_value = 1):
             assert False == self.Pqos_api.is_multicore()
@@ -164,8 +221,8 @@ class TestPqosApi(object):
         with mock.patch('pqos_api.PqosApi.get_l3ca_num_cos', return_value = 8):
             assert True == self.Pqos_api.is_l3_cat_supported()
 
-        with mock.patch('pqos_api.PqosApi.get_l3ca_num_cos', side_effect = Exception('Test')):
-            assert 0 == self.Pqos_api.is_l3_cat_supported()
+        with mock.patch('pqos_api.PqosApi.get_l3ca_num_cos', return_value = None):
+            assert False == self.Pqos_api.is_l3_cat_supported()
 
 
     def test_is_mba_supported(self):
@@ -175,55 +232,68 @@ class TestPqosApi(object):
         with mock.patch('pqos_api.PqosApi.get_mba_num_cos', return_value = 8):
             assert True == self.Pqos_api.is_mba_supported()
 
-        with mock.patch('pqos_api.PqosApi.get_mba_num_cos', side_effect = Exception('Test')):
-            assert 0 == self.Pqos_api.is_mba_supported()
+        with mock.patch('pqos_api.PqosApi.get_mba_num_cos', return_value = None):
+            assert False == self.Pqos_api.is_mba_supported()
+
 
+    def test_l3ca_set_batch(self):
+        self.Pqos_api.l3ca.COS.side_effect = lambda cos_id, **kwargs: cos_id
+        assert 0 == self.Pqos_api.l3ca_set_batch([0, 1], {1: 0xff, 2: 0xf00})
+        self.Pqos_api.l3ca.COS.assert_any_call(1, mask=0xff)
+        self.Pqos_api.l3ca.COS.assert_any_call(2, mask=0xf00)
+        assert self.Pqos_api.l3ca.set.call_count == 2
+        self.Pqos_api.l3ca.set.assert_any_call(0, [1, 2])
+        self.Pqos_api.l3ca.set.assert_any_call(1, [1, 2])
 
-    def test_mba_set(self):
-        self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
-        assert 0 == self.Pqos_api.mba_set([0], 1, 44)
-        self.Pqos_api.mba.COS.assert_called_once_with(1, 44, False)
-        self.Pqos_api.mba.set.assert_called_once_with(0, [0xDEADBEEF])
+        # L3 CDP
+        assert 0 == self.Pqos_api.l3ca_set_batch([0], {3: (0xf, 0xf0)})
+        self.Pqos_api.l3ca.COS.assert_any_call(3, code_mask=0xf, data_mask=0xf0)
 
-        self.Pqos_api.mba.set.mock_reset()
-        self.Pqos_api.mba.COS.mock_reset()
-        self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
-        assert 0 == self.Pqos_api.mba_set([0,1], 2, 44)
-        self.Pqos_api.mba.set.assert_any_call(0, [0xDEADBEEF])
-        self.Pqos_api.mba.set.assert_any_call(1, [0xDEADBEEF])
+        # nothing to configure
+        self.Pqos_api.l3ca.set.reset_mock()
+        assert 0 == self.Pqos_api.l3ca_set_batch([0], {})
+        self.Pqos_api.l3ca.set.assert_not_called()
 
         # socket param not a list
-        assert -1 == self.Pqos_api.mba_set(0, 1, 44)
+        assert -1 == self.Pqos_api.l3ca_set_batch(0, {1: 0xff})
 
-        self.Pqos_api.mba.COS.side_effect = Exception('Test')
-        assert -1 == self.Pqos_api.mba_set([0], 1, 44)
-        self.Pqos_api.mba.COS.mock_reset()
-        self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
+        self.Pqos_api.l3ca.set.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.l3ca_set_batch([0], {1: 0xff})
+
+        self.Pqos_api.l3ca.COS.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.l3ca_set_batch([0], {1: 0xff})
 
-        self.Pqos_api.mba.set.side_effect = Exception('Test')
-        assert -1 == self.Pqos_api.mba_set([0], 1, 44)
 
+    def test_l2ca_set_batch(self):
+        self.Pqos_api.l2ca = mock.MagicMock()
+        self.Pqos_api.l2ca.COS.side_effect = lambda cos_id, mask: cos_id
+        assert 0 == self.Pqos_api.l2ca_set_batch([0, 1], {1: 0xf, 2: 0xf0})
+        self.Pqos_api.l2ca.COS.assert_any_call(1, 0xf)
+        self.Pqos_api.l2ca.COS.assert_any_call(2, 0xf0)
+        self.Pqos_api.l2ca.set.assert_any_call(0, [1, 2])
+        self.Pqos_api.l2ca.set.assert_any_call(1, [1, 2])
 
-    def test_l3ca_set(self):
-        self.Pqos_api.l3ca.COS.return_value = 0xDEADBEEF
-        assert 0 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
-        self.Pqos_api.l3ca.COS.assert_called_once_with(1, mask=0xff, code_mask=None, data_mask=None)
-        self.Pqos_api.l3ca.set.assert_called_once_with(0, [0xDEADBEEF])
+        self.Pqos_api.l2ca.set.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.l2ca_set_batch([0], {1: 0xf})
 
-        self.Pqos_api.l3ca.set.mock_reset()
-        assert 0 == self.Pqos_api.l3ca_set([0,1], 1, mask=0xff)
-        self.Pqos_api.l3ca.set.assert_any_call(0, [0xDEADBEEF])
-        self.Pqos_api.l3ca.set.assert_any_call(1, [0xDEADBEEF])
+
+    def test_mba_set_batch(self):
+        self.Pqos_api.mba.COS.side_effect = lambda cos_id, mb_max, ctrl: cos_id
+        assert 0 == self.Pqos_api.mba_set_batch([0, 1], {1: 10, 2: 50}, True)
+        self.Pqos_api.mba.COS.assert_any_call(1, 10, True)
+        self.Pqos_api.mba.COS.assert_any_call(2, 50, True)
+        assert self.Pqos_api.mba.set.call_count == 2
+        self.Pqos_api.mba.set.assert_any_call(0, [1, 2])
+        self.Pqos_api.mba.set.assert_any_call(1, [1, 2])
 
         # socket param not a list
-        assert -1 == self.Pqos_api.l3ca_set(0, 1, 0xff)
+        assert -1 == self.Pqos_api.mba_set_batch(0, {1: 10})
 
-        self.Pqos_api.l3ca.COS.side_effect = Exception('Test')
-        assert -1 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
-        self.Pqos_api.l3ca.COS.mock_reset(side_effect = True)
+        self.Pqos_api.mba.set.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.mba_set_batch([0], {1: 10})
 
-        self.Pqos_api.l3ca.set.side_effect = Exception('Test')
-        assert -1 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
+        self.Pqos_api.mba.COS.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.mba_set_batch([0], {1: 10})
 
 
     @mock.patch("os.system", mock.MagicMock(return_value=0))
@@ -241,9 +311,12 @@ class TestPqosApi(object):
              mock.patch('pqos.mba.PqosMba.__init__', return_value = None) as pqos_mba_init_mock,\
              mock.patch('pqos.allocation.PqosAlloc.__init__', return_value = None) as pqos_alloc_init_mock,\
              mock.patch('pqos.cpuinfo.PqosCpuInfo.__init__', return_value = None) as pqos_cpu_info_init_mock,\
-             mock.patch('pqos_api.PqosApi.supported_iface', return_value = supp_iface):
+             mock.patch('pqos_api.PqosApi.supported_iface', return_value = supp_iface),\
+             mock.patch('pqos_topology.PqosTopology.build') as topology_build_mock:
 
             assert 0 == self.Pqos_api.init(iface)
+            topology_build_mock.assert_called_once()
+            assert self.Pqos_api.topology == topology_build_mock.return_value
 
             pqos_init_mock.assert_called_once_with(iface.upper())
             pqos_cap_init_mock.assert_called_once()
@@ -269,9 +342,11 @@ class TestPqosApi(object):
 
 
     def test_fini(self):
+        self.Pqos_api.refresh_topology()
         with mock.patch('pqos.Pqos.fini') as pqos_fini_mock:
             self.Pqos_api.fini()
             pqos_fini_mock.assert_called_once()
+        assert self.Pqos_api.topology is None
 
 
     def test_release(self):
@@ -291,24 +366,101 @@ class TestPqosApi(object):
 
     def test_alloc_assoc_set(self):
         assert 0 == self.Pqos_api.alloc_assoc_set([], 0)
-        self.Pqos_api.alloc.assoc_set.assert_not_called
+        self.Pqos_api.alloc.assoc_set_cores.assert_not_called()
 
         assert 0 == self.Pqos_api.alloc_assoc_set([1], 2)
-        self.Pqos_api.alloc.assoc_set.assert_called_once_with(1, 2)
+        self.Pqos_api.alloc.assoc_set_cores.assert_called_once_with([1], 2)
 
-        self.Pqos_api.alloc.assoc_set.reset_mock()
+        self.Pqos_api.alloc.assoc_set_cores.reset_mock()
         assert 0 == self.Pqos_api.alloc_assoc_set([2,3,4], 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(2, 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(3, 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(4, 3)
+        self.Pqos_api.alloc.assoc_set_cores.assert_called_once_with([2,3,4], 3)
 
-        self.Pqos_api.alloc.assoc_set.side_effect = Exception('Test')
+        self.Pqos_api.alloc.assoc_set_cores.side_effect = Exception('Test')
         assert -1 == self.Pqos_api.alloc_assoc_set([0,1], 5)
 
 
+    def test_alloc_assoc_set_pids(self):
+        assert 0 == self.Pqos_api.alloc_assoc_set_pids([], 1)
+        self.Pqos_api.alloc.assoc_set_pids.assert_not_called()
+
+        assert 0 == self.Pqos_api.alloc_assoc_set_pids([100, 101], 2)
+        self.Pqos_api.alloc.assoc_set_pids.assert_called_once_with([100, 101], 2)
+
+        self.Pqos_api.alloc.assoc_set_pids.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.alloc_assoc_set_pids([100], 2)
+
+
+    def test_release_pids(self):
+        assert 0 == self.Pqos_api.release_pids([])
+        self.Pqos_api.alloc.release_pid.assert_not_called()
+
+        assert 0 == self.Pqos_api.release_pids([100, 101])
+        self.Pqos_api.alloc.release_pid.assert_called_once_with([100, 101])
+
+        self.Pqos_api.alloc.release_pid.side_effect = Exception('Test')
+        assert -1 == self.Pqos_api.release_pids([100])
+
+
+    def test_get_mon_events(self):
+        events = []
+        for event_type in [CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP,
+                           CPqosMonitor.PQOS_MON_EVENT_LMEM_BW,
+                           CPqosMonitor.PQOS_PERF_EVENT_LLC_MISS]:
+            event = mock.MagicMock()
+            event.type = event_type
+            events.append(event)
+        self.Pqos_api.cap.get_type.return_value.events = events
+
+        assert self.Pqos_api.get_mon_events() == ['l3_occup', 'lmem_bw']
+        self.Pqos_api.cap.get_type.assert_called_once_with('mon')
+
+        self.Pqos_api.cap.get_type.side_effect = PqosErrorResource('Test')
+        assert self.Pqos_api.get_mon_events() == []
+
+
+    def test_mon_start(self):
+        self.Pqos_api.mon = mock.MagicMock()
+        group = mock.MagicMock()
+
+        self.Pqos_api.mon.start.return_value = group
+        assert self.Pqos_api.mon_start([1, 2], ['l3_occup']) == group
+        self.Pqos_api.mon.start.assert_called_once_with([1, 2], ['l3_occup'])
+
+        self.Pqos_api.mon.start_pids.return_value = group
+        assert self.Pqos_api.mon_start_pids([100], ['l3_occup']) == group
+        self.Pqos_api.mon.start_pids.assert_called_once_with([100], ['l3_occup'])
+
+        self.Pqos_api.mon.start.side_effect = Exception('Test')
+        self.Pqos_api.mon.start_pids.side_effect = Exception('Test')
+        assert self.Pqos_api.mon_start([1], ['l3_occup']) is None
+        assert self.Pqos_api.mon_start_pids([100], ['l3_occup']) is None
+
+
+    def test_mon_poll(self):
+        self.Pqos_api.mon = mock.MagicMock()
+        groups = [mock.MagicMock(), mock.MagicMock()]
+
+        assert self.Pqos_api.mon_poll(groups) == 0
+        self.Pqos_api.mon.poll.assert_called_once_with(groups)
+
+        self.Pqos_api.mon.poll.side_effect = Exception('Test')
+        assert self.Pqos_api.mon_poll(groups) == -1
+
+
+    def test_mon_stop(self):
+        group = mock.MagicMock()
+
+        assert self.Pqos_api.mon_stop(group) == 0
+        group.stop.assert_called_once()
+
+        group.stop.side_effect = Exception('Test')
+        assert self.Pqos_api.mon_stop(group) == -1
+
+
     def test_get_max_cos_id(self):
        self.Pqos_api.cap.get_l3ca_cos_num.return_value = 16
        self.Pqos_api.cap.get_mba_cos_num.return_value = 8
+       self.Pqos_api.refresh_topology()
 
        assert 7 == self.Pqos_api.get_max_cos_id([common.CAT_L3_CAP, common.MBA_CAP])
        assert 7 == self.Pqos_api.get_max_cos_id([common.MBA_CAP])
@@ -316,12 +468,14 @@ class TestPqosApi(object):
        assert None == self.Pqos_api.get_max_cos_id([])
 
        self.Pqos_api.cap.get_l3ca_cos_num.return_value = 0
+       self.Pqos_api.refresh_topology()
        assert None == self.Pqos_api.get_max_cos_id([common.CAT_L3_CAP, common.MBA_CAP])
        assert 7 == self.Pqos_api.get_max_cos_id([common.MBA_CAP])
        assert None == self.Pqos_api.get_max_cos_id([common.CAT_L3_CAP])
        assert None == self.Pqos_api.get_max_cos_id([])
 
        self.Pqos_api.cap.get_mba_cos_num.return_value = 0
+       self.Pqos_api.refresh_topology()
        assert None == self.Pqos_api.get_max_cos_id([common.CAT_L3_CAP, common.MBA_CAP])
        assert None == self.Pqos_api.get_max_cos_id([common.MBA_CAP])
        assert None == self.Pqos_api.get_max_cos_id([common.CAT_L3_CAP])
@@ -364,8 +518,11 @@ class TestPqosApi(object):
     def test_enable_mba_bw(self, enabled_mba_bw):
 
         # All OK!
+        self.Pqos_api.cap.get_mba_cos_num.return_value = 8
         assert 0 == self.Pqos_api.enable_mba_bw(enabled_mba_bw)
         self.Pqos_api.alloc.reset.assert_called_once_with("any", "any", "ctrl" if enabled_mba_bw else "default")
+        # capabilities reread after reset
+        assert 8 == self.Pqos_api.get_mba_num_cos()
 
         # Alloc Reset fails
         self.Pqos_api.alloc.reset.side_effect = Exception("test")
@@ -374,27 +531,33 @@ class TestPqosApi(object):
 
     def test_is_l2_cat_supported(self):
         self.Pqos_api.cap.get_type.side_effect = PqosErrorResource('error', 3)
+        self.Pqos_api.refresh_topology()
         assert False == self.Pqos_api.is_l2_cat_supported()
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
 
-        self.Pqos_api.cap.get_type.reset_mock()
         self.Pqos_api.cap.get_type.side_effect = None
-        self.Pqos_api.cap.get_type.return_value = 0
+        self.Pqos_api.cap.get_type.return_value = PqosCapabilityL2Ca()
+        self.Pqos_api.refresh_topology()
         assert True == self.Pqos_api.is_l2_cat_supported()
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
 
         self.Pqos_api.cap.get_type.reset_mock()
+        assert True == self.Pqos_api.is_l2_cat_supported()
+        self.Pqos_api.cap.get_type.assert_not_called()
+
         self.Pqos_api.cap.get_type.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert False == self.Pqos_api.is_l2_cat_supported()
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
 
 
     def test_get_l2ca_num_cos(self):
         self.Pqos_api.cap.get_l2ca_cos_num.return_value = 28
+        self.Pqos_api.refresh_topology()
+        assert 28 == self.Pqos_api.get_l2ca_num_cos()
         assert 28 == self.Pqos_api.get_l2ca_num_cos()
         self.Pqos_api.cap.get_l2ca_cos_num.assert_called_once()
 
         self.Pqos_api.cap.get_l2ca_cos_num.side_effect = Exception('Test')
+        self.Pqos_api.refresh_topology()
         assert None == self.Pqos_api.get_l2ca_num_cos()
 
     def test_get_l3_cache_size(self):
@@ -402,30 +565,33 @@ class TestPqosApi(object):
         l3ca_caps.num_ways = 10
         l3ca_caps.way_size = 1024 * 1024
         self.Pqos_api.cap.get_type.return_value = l3ca_caps
+        self.Pqos_api.refresh_topology()
 
         cache_size = self.Pqos_api.get_l3_cache_size()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l3ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l3ca')
         assert cache_size == 10 * 1024 * 1024
 
     def test_get_l3_cache_way_size(self):
         l3ca_caps = PqosCapabilityL3Ca()
         l3ca_caps.way_size = 8 * 1024 * 1024
         self.Pqos_api.cap.get_type.return_value = l3ca_caps
+        self.Pqos_api.refresh_topology()
 
         cache_way_size = self.Pqos_api.get_l3_cache_way_size()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l3ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l3ca')
         assert cache_way_size == 8 * 1024 * 1024
 
     def test_get_l3_num_cache_ways(self):
         l3ca_caps = PqosCapabilityL3Ca()
         l3ca_caps.num_ways = 30
         self.Pqos_api.cap.get_type.return_value = l3ca_caps
+        self.Pqos_api.refresh_topology()
 
         num_cache_ways = self.Pqos_api.get_l3_num_cache_ways()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l3ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l3ca')
         assert num_cache_ways == 30
 
     @pytest.mark.parametrize("cdp", [True, False, None])
@@ -433,10 +599,11 @@ class TestPqosApi(object):
         l3ca_caps = PqosCapabilityL3Ca()
         l3ca_caps.cdp = cdp
         self.Pqos_api.cap.get_type.return_value = l3ca_caps
+        self.Pqos_api.refresh_topology()
 
         cdp_supported = self.Pqos_api.is_l3_cdp_supported()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l3ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l3ca')
         assert cdp_supported == cdp
 
     @pytest.mark.parametrize("cdp_on", [True, False])
@@ -444,10 +611,11 @@ class TestPqosApi(object):
         l3ca_caps = PqosCapabilityL3Ca()
         l3ca_caps.cdp_on = cdp_on
         self.Pqos_api.cap.get_type.return_value = l3ca_caps
+        self.Pqos_api.refresh_topology()
 
         cdp_enabled = self.Pqos_api.is_l3_cdp_enabled()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l3ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l3ca')
         assert cdp_enabled == cdp_on
 
     def test_l2_cache_size(self):
@@ -455,11 +623,12 @@ class TestPqosApi(object):
         l2ca_caps.num_ways = 20
         l2ca_caps.way_size = 16 * 1024
         self.Pqos_api.cap.get_type.return_value = l2ca_caps
+        self.Pqos_api.refresh_topology()
         self.Pqos_api.is_l2_cat_supported = mock.MagicMock(return_value=True)
 
         cache_size = self.Pqos_api.get_l2_cache_size()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
         assert cache_size == 20 * 16 * 1024
 
         self.Pqos_api.cap.get_type.reset_mock()
@@ -474,11 +643,12 @@ class TestPqosApi(object):
         l2ca_caps = PqosCapabilityL2Ca()
         l2ca_caps.way_size = 128 * 1024
         self.Pqos_api.cap.get_type.return_value = l2ca_caps
+        self.Pqos_api.refresh_topology()
         self.Pqos_api.is_l2_cat_supported = mock.MagicMock(return_value=True)
 
         cache_way_size = self.Pqos_api.get_l2_cache_way_size()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
         assert cache_way_size == 128 * 1024
 
         self.Pqos_api.cap.get_type.reset_mock()
@@ -493,11 +663,12 @@ class TestPqosApi(object):
         l2ca_caps = PqosCapabilityL2Ca()
         l2ca_caps.num_ways = 22
         self.Pqos_api.cap.get_type.return_value = l2ca_caps
+        self.Pqos_api.refresh_topology()
         self.Pqos_api.is_l2_cat_supported = mock.MagicMock(return_value=True)
 
         num_cache_ways = self.Pqos_api.get_l2_num_cache_ways()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
         assert num_cache_ways == 22
 
         self.Pqos_api.cap.get_type.reset_mock()
@@ -513,11 +684,12 @@ class TestPqosApi(object):
         l2ca_caps = PqosCapabilityL2Ca()
         l2ca_caps.cdp = cdp
         self.Pqos_api.cap.get_type.return_value = l2ca_caps
+        self.Pqos_api.refresh_topology()
         self.Pqos_api.is_l2_cat_supported = mock.MagicMock(return_value=True)
 
         cdp_supported = self.Pqos_api.is_l2_cdp_supported()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
         assert cdp_supported == cdp
 
         self.Pqos_api.cap.get_type.reset_mock()
@@ -533,11 +705,12 @@ class TestPqosApi(object):
         l2ca_caps = PqosCapabilityL2Ca()
         l2ca_caps.cdp_on = cdp_on
         self.Pqos_api.cap.get_type.return_value = l2ca_caps
+        self.Pqos_api.refresh_topology()
         self.Pqos_api.is_l2_cat_supported = mock.MagicMock(return_value=True)
 
         cdp_enabled = self.Pqos_api.is_l2_cdp_enabled()
 
-        self.Pqos_api.cap.get_type.assert_called_once_with('l2ca')
+        self.Pqos_api.cap.get_type.assert_any_call('l2ca')
         assert cdp_enabled == cdp_on
 
         self.Pqos_api.cap.get_type.reset_mock()
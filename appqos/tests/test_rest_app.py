@@ -44,6 +44,7 @@ import caps
 import pid_ops
 
 from rest_common import get_config, load_json_schema, REST, CONFIG_EMPTY
+from rest.rest_config import CONFIG_UPDATE_RETRIES
 
 
 class TestApps:
@@ -85,7 +86,7 @@ class TestApps:
             {"pool_id": 2, "name":"hello", "pids": [12]}                                    # no cores
         ])
     def test_post(self, app_config):
-        with mock.patch('common.CONFIG_STORE.set_config') as func_mock,\
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=5) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/apps", app_config)
             func_mock.assert_called_once()
@@ -97,6 +98,27 @@ class TestApps:
 
         assert response.status_code == 201
         assert 'id' in data
+        assert data['generation'] == 5
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("pid_ops.is_pid_valid", mock.MagicMock(return_value=True))
+    @mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    @mock.patch("caps.cat_l2_supported", mock.MagicMock(return_value=True))
+    @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
+    def test_post_retry(self):
+        app_config = {"pool_id": 2, "name": "hello", "pids": [12]}
+        with mock.patch('common.CONFIG_STORE.set_config', side_effect=[None, 5]) as func_mock:
+            response = REST.post("/apps", app_config)
+            assert func_mock.call_count == 2
+            added = func_mock.call_args[0][0]['apps'][-1]
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 201
+        assert data['id'] == added['id']
+        assert data['generation'] == 5
 
 
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
@@ -155,6 +177,45 @@ class TestApps:
         assert response.status_code == 404
 
 
+class TestAppMetrics:
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_get(self):
+        samples = [{"timestamp": 1666100000.5, "llc": 1024, "mbm_local_delta": 2048,
+                    "mbm_total_delta": 4096}]
+
+        with mock.patch('common.METRICS_STORE.get_metrics', return_value=samples) as func_mock:
+            response = REST.get("/apps/2/metrics")
+            func_mock.assert_called_once_with('apps', 2)
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200
+
+        # validate get metrics response schema
+        schema, resolver = load_json_schema('get_metrics_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert data == samples
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.METRICS_STORE.get_metrics", mock.MagicMock(return_value=None))
+    def test_get_not_monitored(self):
+        response = REST.get("/apps/2/metrics")
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 404
+        assert "not monitored" in data["message"]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_get_invalid_id(self):
+        response = REST.get("/apps/5/metrics")
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 404
+        assert "not found in config" in data["message"]
+
+
 class TestApp_2:
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
     def test_get(self):
@@ -195,11 +256,12 @@ class TestApp_2:
 
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
     def test_delete(self):
-        def set_config(data):
+        def set_config(data, version):
             for app in data['apps']:
                 assert app['id'] != 2
             for pool in data['pools']:
                 assert ('apps' not in pool) or (2 not in pool['apps'])
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock:
             response = REST.delete("/apps/2")
@@ -208,6 +270,33 @@ class TestApp_2:
         assert response.status_code == 200
 
 
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.get_config_version", mock.MagicMock(return_value=7))
+    def test_delete_conflict(self):
+        # configuration changed in the meantime e.g.: by PIDs tracker
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=None) as func_mock:
+            response = REST.delete("/apps/2")
+            func_mock.assert_called_with(mock.ANY, 7)
+            assert func_mock.call_count == CONFIG_UPDATE_RETRIES
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 409
+        assert "APP 2 not deleted, configuration changed in the meantime" in data["message"]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.get_config_version", mock.MagicMock(side_effect=[7, 8]))
+    def test_delete_retry(self):
+        # configuration changed once in the meantime, request is retried
+        with mock.patch('common.CONFIG_STORE.set_config', side_effect=[None, 9]) as func_mock:
+            response = REST.delete("/apps/2")
+            func_mock.assert_called_with(mock.ANY, 8)
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 200
+        assert data['generation'] == 9
+
+
     @mock.patch("common.CONFIG_STORE.get_config", mock.MagicMock(return_value=CONFIG_EMPTY))
     def test_delete_empty_config(self):
         with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
@@ -225,12 +314,13 @@ class TestApp_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_pool(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 2:
                     assert 2 in pool['apps']
                 else:
                     assert ('apps' not in pool) or (2 not in pool['apps'])
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock:
             response = REST.put("/apps/2", {"pool_id": 2})
@@ -247,10 +337,11 @@ class TestApp_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_cores(self):
-        def set_config(data):
+        def set_config(data, version):
             for app in data['apps']:
                 if app['id'] == 2:
                     assert app['cores'] == [3]
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock:
             response = REST.put("/apps/2", {"pool_id": 2, "cores": [3]})
@@ -0,0 +1,178 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for rest module BATCH
+"""
+
+import json
+from jsonschema import validate
+import mock
+import pytest
+
+import common
+
+from rest_common import get_config, load_json_schema, REST
+
+
+class TestBatch:
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.get_config_version", mock.MagicMock(return_value=10))
+    @mock.patch("common.CONFIG_STORE.get_new_pool_id", mock.MagicMock(return_value=7))
+    @mock.patch("common.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("common.PQOS_API.get_max_cos_id", mock.MagicMock(return_value=15))
+    @mock.patch("caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    def test_post(self):
+        batch = {"operations": [
+            {"op": "add", "target": "pool", "data": {"name": "new", "cores": [9], "l3cbm": "0xf"}},
+            {"op": "add", "target": "app", "data": {"pool_id": 1, "name": "new", "pids": [5]}},
+            {"op": "add", "target": "app", "data": {"pool_id": 1, "name": "new 2", "pids": [6]}},
+            {"op": "modify", "target": "app", "id": 1, "data": {"pool_id": 2}},
+            {"op": "modify", "target": "pool", "id": 7, "data": {"l3cbm": "0xf0"}},
+            {"op": "delete", "target": "app", "id": 3}
+        ]}
+
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=11) as set_config_mock,\
+             mock.patch('common.CONFIG_STORE.validate') as validate_mock,\
+             mock.patch('common.STATS_STORE.general_stats_inc_apps_moves') as stats_mock,\
+             mock.patch('pid_ops.is_pid_valid', return_value=True):
+            response = REST.post("/batch", batch)
+
+            # validated and committed once
+            validate_mock.assert_called_once()
+            set_config_mock.assert_called_once()
+            stats_mock.assert_called_once()
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200
+
+        # validate response schema
+        schema, resolver = load_json_schema('batch_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert data['ids'] == [7, 4, 5, 1, 7, 3]
+
+        config, version = set_config_mock.call_args[0]
+        assert version == 10
+
+        pools = {pool['id']: pool for pool in config['pools']}
+        assert pools[7]['l3cbm'] == 0xf0
+        assert pools[1]['apps'] == [4, 5]
+        assert pools[2]['apps'] == [2, 1]
+        assert sorted(app['id'] for app in config['apps']) == [1, 2, 4, 5]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @pytest.mark.parametrize("batch", [
+        {"operations": []},                                                           # no operations
+        {"operations": [{"op": "move", "target": "app", "id": 1, "data": {}}]},       # invalid op
+        {"operations": [{"op": "modify", "target": "app", "data": {"pool_id": 2}}]},  # no id
+        {"operations": [{"op": "delete", "target": "app", "id": 1, "data": {}}]},     # data on delete
+        {"operations": [{"op": "modify", "target": "app", "id": 1,
+                         "data": {"unknown": 2}}]}                                    # invalid data
+    ])
+    def test_post_badrequest(self, batch):
+        with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
+            response = REST.post("/batch", batch)
+            func_mock.assert_not_called()
+
+        assert response.status_code == 400
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_post_not_found(self):
+        batch = {"operations": [
+            {"op": "modify", "target": "app", "id": 1, "data": {"pool_id": 2}},
+            {"op": "delete", "target": "pool", "id": 10}
+        ]}
+
+        with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
+            response = REST.post("/batch", batch)
+            func_mock.assert_not_called()
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 404
+        assert "Operation 1 (delete pool) failed" in data["message"]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_post_invalid_config(self):
+        batch = {"operations": [{"op": "modify", "target": "app", "id": 1, "data": {"pool_id": 2}}]}
+
+        with mock.patch('common.CONFIG_STORE.set_config') as set_config_mock,\
+             mock.patch('common.CONFIG_STORE.validate', side_effect=ValueError("Test")):
+            response = REST.post("/batch", batch)
+            set_config_mock.assert_not_called()
+
+        assert response.status_code == 400
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_post_conflict(self):
+        batch = {"operations": [{"op": "modify", "target": "app", "id": 1, "data": {"pool_id": 2}}]}
+
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=None),\
+             mock.patch('common.CONFIG_STORE.validate'):
+            response = REST.post("/batch", batch)
+
+        assert response.status_code == 409
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("caps.sstcp_enabled", mock.MagicMock(return_value=True))
+    @mock.patch("rest.rest_power._get_power_profiles_expert_mode", mock.MagicMock(return_value=False))
+    def test_post_power_not_allowed(self):
+        batch = {"operations": [{"op": "delete", "target": "power_profile", "id": 2}]}
+
+        with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
+            response = REST.post("/batch", batch)
+            func_mock.assert_not_called()
+
+        assert response.status_code == 405
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_content_length(self):
+        # batch requests are allowed to be bigger than other requests
+        app = {"name": "app", "pids": list(range(1, 500))}
+
+        with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
+            response = REST.post("/apps", app)
+            func_mock.assert_not_called()
+        assert response.status_code == 413
+
+        batch = {"operations": [{"op": "modify", "target": "app", "id": 1, "data": app}]}
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=2),\
+             mock.patch('common.CONFIG_STORE.validate'):
+            response = REST.post("/batch", batch)
+        assert response.status_code == 200
@@ -209,12 +209,14 @@ class TestCaps:
     def test_caps_mba_ctrl_put(self, valid_request):
         called = False
 
-        def set_config(data):
+        def set_config(data, version, urgent=False):
             nonlocal called
             called = True
+            assert urgent
             assert 'mba_ctrl' in data
             assert 'enabled' in data['mba_ctrl']
             assert data['mba_ctrl']['enabled'] == valid_request['enabled']
+            return version + 1
 
         def get_mba_ctrl_enabled():
             return not valid_request['enabled']
@@ -278,12 +280,14 @@ class TestCaps:
     def test_caps_rdt_iface_put(self, iface):
         called = False
 
-        def set_config(data):
+        def set_config(data, version, urgent=False):
             nonlocal called
             called = True
+            assert urgent
             assert 'rdt_iface' in data
             assert 'interface' in data['rdt_iface']
             assert data['rdt_iface']['interface'] == iface
+            return version + 1
 
         def get_rdt_iface():
             if iface == "msr":
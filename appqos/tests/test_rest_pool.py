@@ -42,6 +42,7 @@ import pytest
 import common
 
 from rest_common import get_config, get_config_mba_bw, load_json_schema, get_max_cos_id, REST, CONFIG, CONFIG_EMPTY
+from rest.rest_config import CONFIG_UPDATE_RETRIES
 
 
 class TestPools:
@@ -85,6 +86,45 @@ class TestPools:
         assert "not found in config" in data["message"]
 
 
+class TestPoolMetrics:
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_get(self):
+        samples = [{"timestamp": 1666100000.5, "llc": 1024, "mbm_local_delta": 2048,
+                    "mbm_total_delta": 4096, "ipc": 1.5}]
+
+        with mock.patch('common.METRICS_STORE.get_metrics', return_value=samples) as func_mock:
+            response = REST.get("/pools/3/metrics")
+            func_mock.assert_called_once_with('pools', 3)
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200
+
+        # validate get metrics response schema
+        schema, resolver = load_json_schema('get_metrics_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert data == samples
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.METRICS_STORE.get_metrics", mock.MagicMock(return_value=None))
+    def test_get_not_monitored(self):
+        response = REST.get("/pools/3/metrics")
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 404
+        assert "not monitored" in data["message"]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_get_invalid_id(self):
+        response = REST.get("/pools/5/metrics")
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 404
+        assert "not found in config" in data["message"]
+
+
 class TestPool_2:
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
     def test_get(self):
@@ -127,9 +167,10 @@ class TestPool_2:
 
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
     def test_delete(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 assert pool['id'] != 3
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock:
             response = REST.delete("/pools/3")
@@ -174,6 +215,33 @@ class TestPool_2:
         assert "POOL 1 is not empty" in data["message"]
 
 
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.get_config_version", mock.MagicMock(return_value=7))
+    def test_delete_conflict(self):
+        # configuration changed in the meantime e.g.: by PIDs tracker
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=None) as func_mock:
+            response = REST.delete("/pools/3")
+            func_mock.assert_called_with(mock.ANY, 7)
+            assert func_mock.call_count == CONFIG_UPDATE_RETRIES
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 409
+        assert "POOL 3 not deleted, configuration changed in the meantime" in data["message"]
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.get_config_version", mock.MagicMock(side_effect=[7, 8]))
+    def test_delete_retry(self):
+        # configuration changed once in the meantime, request is retried
+        with mock.patch('common.CONFIG_STORE.set_config', side_effect=[None, 9]) as func_mock:
+            response = REST.delete("/pools/3")
+            func_mock.assert_called_with(mock.ANY, 8)
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 200
+        assert data['generation'] == 9
+
+
     @mock.patch("common.CONFIG_STORE.get_config", mock.MagicMock(return_value=CONFIG_EMPTY))
     def test_delete_empty_config(self):
         with mock.patch('common.CONFIG_STORE.set_config') as func_mock:
@@ -204,10 +272,11 @@ class TestPool_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_cbm(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 1:
                     assert pool['l3cbm'] == 0xc
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -225,10 +294,11 @@ class TestPool_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_l2cbm(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 1:
                     assert pool['l2cbm'] == 0xff
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -261,10 +331,11 @@ class TestPool_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_mba(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 1:
                     assert pool['mba'] == 30
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -322,10 +393,11 @@ class TestPool_2:
     @mock.patch("caps.mba_bw_enabled", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_mba_bw(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 2:
                     assert pool['mba_bw'] == 5000
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -370,10 +442,11 @@ class TestPool_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_cores(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 2:
                     assert pool['cores'] == [2, 3, 11]
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -391,10 +464,11 @@ class TestPool_2:
     @mock.patch("caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("power.validate_power_profiles", mock.MagicMock(return_value=True))
     def test_put_name(self):
-        def set_config(data):
+        def set_config(data, version):
             for pool in data['pools']:
                 if pool['id'] == 2:
                     assert pool['name'] == "test"
+            return version + 1
 
         with mock.patch('common.CONFIG_STORE.set_config', side_effect=set_config) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
@@ -459,7 +533,7 @@ class TestPool_2:
         {"name":"hello_mba_cbm", "cores":[14, 18], "mba": 50, "cbm": "0xf0"} # cbm & mba
     ])
     def test_post(self, pool_config):
-        with mock.patch('common.CONFIG_STORE.set_config') as func_mock,\
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=5) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/pools", pool_config)
             func_mock.assert_called_once()
@@ -471,6 +545,7 @@ class TestPool_2:
 
         assert response.status_code == 201
         assert data['id'] == 5
+        assert data['generation'] == 5
 
 
     @mock.patch("common.CONFIG_STORE.get_config", new=get_config_mba_bw)
@@ -488,7 +563,7 @@ class TestPool_2:
         {"name":"hello_mba_cbm", "cores":[14, 18], "mba_bw": 5000, "cbm": "0xf0"} # cbm & mba_bw
     ])
     def test_post_mba_bw(self, pool_config):
-        with mock.patch('common.CONFIG_STORE.set_config') as func_mock,\
+        with mock.patch('common.CONFIG_STORE.set_config', return_value=5) as func_mock,\
              mock.patch('pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/pools", pool_config)
             func_mock.assert_called_once()
@@ -107,9 +107,10 @@ class TestRestPowerProfiles:
             response = Rest().delete("/power_profiles/{}".format(id))
             assert response.status_code == 400
 
-        def mock_set_config(config):
+        def mock_set_config(config, version):
             for profile in config['power_profiles']:
                 assert profile['id'] != unused_profiles_id
+            return version + 1
 
         with mock.patch("common.CONFIG_STORE.set_config", new=mock_set_config):
             response = Rest().delete("/power_profiles/{}".format(unused_profiles_id))
@@ -123,11 +124,12 @@ class TestRestPowerProfiles:
 
         put_profile = CONFIG['power_profiles'][-1]
 
-        def set_config(config):
+        def set_config(config, version):
             for profile in config['power_profiles']:
                 if profile['id'] == put_profile['id']:
                     assert profile != put_profile
                     break
+            return version + 1
 
         with mock.patch("common.CONFIG_STORE.set_config", side_effect=set_config) as mock_set_config,\
             mock.patch("common.CONFIG_STORE.validate"):
@@ -259,13 +261,14 @@ class TestRestPowerProfiles:
         post_profile = {"min_freq": 1000, "max_freq": 2200, "epp": "performance", "name": "test_profile"}
         post_profile_id = 10
 
-        def set_config(config):
+        def set_config(config, version):
             for profile in config['power_profiles']:
                 if profile['id'] == post_profile_id:
                     temp_profile = deepcopy(post_profile)
                     temp_profile.update({"id": post_profile_id})
                     assert profile == temp_profile
                     break
+            return version + 1
 
         with mock.patch("common.CONFIG_STORE.set_config", side_effect=set_config) as mock_set_config,\
             mock.patch("common.CONFIG_STORE.get_new_power_profile_id", return_value=post_profile_id) as mock_get_id,\
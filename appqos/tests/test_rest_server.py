@@ -0,0 +1,111 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for rest module REST server
+"""
+
+import mock
+import pytest
+
+import common
+from rest import rest_server
+
+from rest_common import get_config, REST
+
+
+class TestServer:
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_serialize_mutations(self):
+        with mock.patch("rest.rest_server.MUTATION_LOCK") as lock_mock:
+            response = REST.get("/apps")
+            assert response.status_code == 200
+            lock_mock.__enter__.assert_not_called()
+
+            with mock.patch('common.CONFIG_STORE.set_config', return_value=5):
+                response = REST.delete("/apps/3")
+            assert response.status_code == 200
+            lock_mock.__enter__.assert_called_once()
+            lock_mock.__exit__.assert_called_once()
+
+
+    @mock.patch("rest.rest_server.WSGIServer")
+    @mock.patch("multiprocessing.Process", mock.MagicMock())
+    @mock.patch("builtins.open", mock.mock_open())
+    @mock.patch("signal.signal", mock.MagicMock())
+    @pytest.mark.parametrize("workers", [1, 32])
+    def test_start(self, server_mock, workers):
+        server = rest_server.Server()
+        server.context = mock.MagicMock()
+
+        assert server.start("127.0.0.1", 5000, False, workers) == 0
+
+        _, kwargs = server_mock.call_args
+        assert kwargs['spawn'] == workers
+        assert kwargs['handler_class'] == rest_server.RequestHandler
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_error_handler_endpoint_stats(self):
+        endpoint_err = common.STATS_STORE.endpoint_err_id("app")
+        assert endpoint_err in common.STATS_STORE.general_stats_get()
+
+        app_err = common.STATS_STORE.general_stats_get(endpoint_err)
+
+        response = REST.get("/apps/30")
+        assert response.status_code == 404
+        assert common.STATS_STORE.general_stats_get(endpoint_err) == app_err + 1
+
+        response = REST.get("/apps/1")
+        assert response.status_code == 200
+        assert common.STATS_STORE.general_stats_get(endpoint_err) == app_err + 1
+
+
+    def test_error_handler_num_err(self):
+        num_err = common.STATS_STORE.general_stats_get(common.STATS_STORE.General.NUM_ERR)
+
+        response = REST.get("/inexisting")
+        assert response.status_code == 404
+        assert common.STATS_STORE.general_stats_get(common.STATS_STORE.General.NUM_ERR) == \
+            num_err + 1
+
+
+def test_request_handler_keepalive_timeout():
+    handler = rest_server.RequestHandler.__new__(rest_server.RequestHandler)
+    handler.socket = mock.MagicMock()
+    handler.rfile = mock.MagicMock()
+    handler.rfile.readline.return_value = b"GET /apps HTTP/1.1\r\n"
+
+    assert handler.read_requestline() == "GET /apps HTTP/1.1\r\n"
+    handler.socket.settimeout.assert_has_calls([mock.call(common.REST_KEEPALIVE_TIMEOUT),
+                                                mock.call(None)])
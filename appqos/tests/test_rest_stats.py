@@ -67,3 +67,50 @@ class TestStats:
         assert response.status_code == 200
         assert data["num_apps_moves"] == 1
         assert data["num_err"] == 2
+
+
+class TestMetrics:
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_get(self):
+        response = REST.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith("application/openmetrics-text")
+
+        text = response.data.decode('utf-8')
+        assert text.endswith("# EOF\n")
+        assert "appqos_num_err_total " in text
+        assert 'appqos_num_endpoint_err_total{endpoint="apps"} ' in text
+        assert "appqos_config_version " in text
+        assert 'appqos_pool_cores{pool_id="1"} ' in text
+
+
+class TestTraces:
+    TRACES = [{
+        'name': "apply", 'version': 1, 'timestamp': 10.0, 'duration': 0.5, 'result': 0,
+        'summary': {'phase': {'calls': 1, 'errors': 0, 'time': 0.125}},
+        'spans': [{'name': "phase", 'offset': 0.25, 'duration': 0.125, 'error': False}],
+        'spans_dropped': 0
+    }]
+
+    def test_get(self):
+        with mock.patch("common.TRACER.get_traces", return_value=self.TRACES):
+            response = REST.get("/traces")
+
+        assert response.status_code == 200
+        data = json.loads(response.data.decode('utf-8'))
+        assert data == {'traces': self.TRACES}
+
+
+    def test_get_chrome(self):
+        with mock.patch("common.TRACER.get_traces", return_value=self.TRACES):
+            response = REST.get("/traces?format=chrome")
+
+        assert response.status_code == 200
+        data = json.loads(response.data.decode('utf-8'))
+        assert [event['name'] for event in data['traceEvents']] == ["apply", "phase"]
+
+
+    def test_get_invalid_format(self):
+        response = REST.get("/traces?format=xml")
+        assert response.status_code == 400
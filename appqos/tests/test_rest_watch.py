@@ -0,0 +1,304 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for rest module WATCH
+"""
+
+import json
+import time
+import gevent
+from gevent.pool import Pool
+from jsonschema import validate
+import mock
+import pytest
+
+import common
+import config_sync
+from rest import rest_server, rest_watch
+
+from rest_common import get_config, load_json_schema, REST
+
+
+STATUS = {"id": 5, "version": 3, "applied_version": 3, "applied": True,
+          "last_applied_generation": 3, "error": None}
+
+
+class TestWatch:
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    @pytest.mark.parametrize("url", ["/watch", "/watch?since=4", "/watch?since=3&timeout=10"])
+    def test_get(self, url):
+        response = REST.get(url)
+        data = json.loads(response.data.decode('utf-8'))
+
+        assert response.status_code == 200
+
+        # validate get watch response schema
+        schema, resolver = load_json_schema('get_watch_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert data == STATUS
+
+
+    def test_get_wait(self):
+        changed = dict(STATUS, id=6, applied_version=4, version=4)
+        statuses = [STATUS]
+
+        def set_applied():
+            statuses.append(changed)
+            common.CONFIG_STORE.status_changed.notify()
+
+        with mock.patch("common.CONFIG_STORE.get_status", side_effect=lambda: statuses[-1]):
+            gevent.spawn_later(0.05, set_applied)
+            start = time.monotonic()
+            response = REST.get("/watch?since=5&timeout=10")
+
+        # woken up by notification
+        assert time.monotonic() - start < 5
+        assert response.status_code == 200
+        assert json.loads(response.data.decode('utf-8')) == changed
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_wait_timeout(self):
+        start = time.monotonic()
+        response = REST.get("/watch?since=5&timeout=0.1")
+
+        assert time.monotonic() - start >= 0.1
+        assert response.status_code == 200
+        assert json.loads(response.data.decode('utf-8')) == STATUS
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_timeout(self):
+        response = REST.get("/watch?since=5&timeout=0")
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode('utf-8')) == STATUS
+
+
+    @pytest.mark.parametrize("url", ["/watch?since=abc", "/watch?since=1&timeout=-1",
+                                     "/watch?timeout=x", "/watch?timeout=nan",
+                                     "/watch?timeout=inf", "/watch?timeout=-inf"])
+    def test_get_badrequest(self, url):
+        response = REST.get(url)
+
+        assert response.status_code == 400
+
+
+    @mock.patch("rest.rest_watch.WATCH_KEEPALIVE_INTERVAL", 0)
+    def test_get_event_stream(self):
+        changed = dict(STATUS, id=6, applied_version=4, version=4)
+
+        with mock.patch("common.CONFIG_STORE.get_status",
+                        side_effect=[STATUS, changed, changed]):
+            response = REST.client.get("/watch", headers={'Accept': 'text/event-stream',
+                                                          'Last-Event-ID': '5'})
+            assert response.status_code == 200
+            assert response.mimetype == 'text/event-stream'
+
+            events = response.iter_encoded()
+            assert next(events) == b":\n\n"
+            assert next(events) == f"id: 6\nevent: status\ndata: {json.dumps(changed)}\n\n".encode()
+            response.close()
+
+
+class TestWatchSlots:
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_releases_slot(self):
+        response = REST.get("/watch?since=5&timeout=0")
+
+        assert response.status_code == 200
+        assert response.headers['Connection'] == 'close'
+        assert rest_watch.WATCH_SLOTS.counter == common.REST_WATCH_CONNECTIONS
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_too_many_connections(self):
+        with mock.patch("rest.rest_watch.WATCH_SLOTS", rest_watch.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = REST.get("/watch?since=5&timeout=0")
+
+        assert response.status_code == 503
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_event_stream_too_many_streams(self):
+        with mock.patch("rest.rest_watch.STREAM_SLOTS", rest_watch.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = REST.client.get("/watch", headers={'Accept': 'text/event-stream'})
+
+        assert response.status_code == 503
+        assert rest_watch.WATCH_SLOTS.counter == common.REST_WATCH_CONNECTIONS
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    @mock.patch("rest.rest_watch.WATCH_KEEPALIVE_INTERVAL", 0)
+    def test_get_event_stream_releases_slot(self):
+        response = REST.client.get("/watch", headers={'Accept': 'text/event-stream'})
+        assert response.status_code == 200
+        assert rest_watch.STREAM_SLOTS.counter == common.REST_WATCH_STREAMS - 1
+
+        response.close()
+        assert rest_watch.STREAM_SLOTS.counter == common.REST_WATCH_STREAMS
+        assert rest_watch.WATCH_SLOTS.counter == common.REST_WATCH_CONNECTIONS
+
+
+    @mock.patch("common.CONFIG_STORE.get_status", mock.MagicMock(return_value=STATUS))
+    def test_get_releases_worker(self):
+        workers = Pool(1)
+
+        def handle():
+            return REST.client.get("/watch?since=5&timeout=0",
+                                   environ_overrides={rest_watch.WATCH_WORKERS_ENVIRON: workers})
+
+        worker = workers.spawn(handle)
+        response = worker.get()
+
+        assert response.status_code == 200
+        assert worker not in workers
+        assert workers.free_count() == 1
+
+
+class TestWaitForApply:
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.set_config", mock.MagicMock(return_value=4))
+    def test_delete_applied(self):
+        statuses = [(config_sync.GENERATION_PENDING, None)]
+
+        def set_applied():
+            statuses.append((config_sync.GENERATION_APPLIED, None))
+            common.CONFIG_STORE.status_changed.notify()
+
+        with mock.patch("common.CONFIG_STORE.get_generation_status",
+                        side_effect=lambda generation: statuses[-1]) as func_mock:
+            gevent.spawn_later(0.05, set_applied)
+            response = REST.delete("/apps/2?wait=10000")
+            func_mock.assert_called_with(4)
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200
+        assert response.headers['Connection'] == 'close'
+        assert data['generation'] == 4
+        assert data['status'] == config_sync.GENERATION_APPLIED
+        assert data['error'] is None
+        assert rest_watch.WATCH_SLOTS.counter == common.REST_WATCH_CONNECTIONS
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.set_config", mock.MagicMock(return_value=4))
+    def test_delete_wait_unlocked(self):
+        statuses = [(config_sync.GENERATION_PENDING, None)]
+
+        def mutate():
+            # other configuration change is not blocked by waiting request
+            response = REST.delete("/apps/1")
+            statuses.append((config_sync.GENERATION_APPLIED, response.status_code))
+            common.CONFIG_STORE.status_changed.notify()
+
+        def get_generation_status(generation):
+            assert not rest_server.MUTATION_LOCK.locked()
+            if len(statuses) == 1:
+                gevent.spawn(mutate)
+            return statuses[-1][0], None
+
+        with mock.patch("common.CONFIG_STORE.get_generation_status",
+                        side_effect=get_generation_status), \
+             mock.patch("rest.rest_server.MUTATION_LOCK", rest_server.BoundedSemaphore(1)):
+            response = REST.delete("/apps/2?wait=10000")
+
+        assert response.status_code == 200
+        assert statuses[-1] == (config_sync.GENERATION_APPLIED, 200)
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.set_config", mock.MagicMock(return_value=4))
+    @mock.patch("common.CONFIG_STORE.get_generation_status",
+                mock.MagicMock(return_value=(config_sync.GENERATION_FAILED, "Failed")))
+    def test_delete_failed(self):
+        response = REST.delete("/apps/2?wait=1000")
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 500
+        assert data['generation'] == 4
+        assert data['status'] == config_sync.GENERATION_FAILED
+        assert data['error'] == "Failed"
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.set_config", mock.MagicMock(return_value=4))
+    @mock.patch("common.CONFIG_STORE.get_generation_status",
+                mock.MagicMock(return_value=(config_sync.GENERATION_PENDING, None)))
+    def test_delete_pending(self):
+        response = REST.delete("/apps/2?wait=0")
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 202
+        assert data['generation'] == 4
+        assert data['status'] == config_sync.GENERATION_PENDING
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    def test_delete_too_many_connections(self):
+        with mock.patch("common.CONFIG_STORE.set_config") as func_mock, \
+             mock.patch("rest.rest_watch.WATCH_SLOTS", rest_watch.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = REST.delete("/apps/2?wait=1000")
+            func_mock.assert_not_called()
+
+        assert response.status_code == 503
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @pytest.mark.parametrize("url", ["/apps/2?wait=abc", "/apps/2?wait=-1"])
+    def test_delete_badrequest(self, url):
+        with mock.patch("common.CONFIG_STORE.set_config") as func_mock:
+            response = REST.delete(url)
+            func_mock.assert_not_called()
+
+        assert response.status_code == 400
+
+
+    @mock.patch("common.CONFIG_STORE.get_config", new=get_config)
+    @mock.patch("common.CONFIG_STORE.set_config", mock.MagicMock(return_value=4))
+    def test_delete_no_wait(self):
+        with mock.patch("common.CONFIG_STORE.get_generation_status") as func_mock:
+            response = REST.delete("/apps/2")
+            func_mock.assert_not_called()
+
+        data = json.loads(response.data.decode('utf-8'))
+        assert response.status_code == 200
+        assert data['generation'] == 4
+        assert 'status' not in data
@@ -0,0 +1,127 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+import multiprocessing
+import threading
+import pytest
+
+from snapshot import SharedSnapshot
+
+
+class TestSharedSnapshot:
+
+    def test_empty(self):
+        store = SharedSnapshot(1024)
+
+        assert store.version() == 0
+        assert store.read() is None
+
+
+    def test_write_read(self):
+        store = SharedSnapshot(1024)
+
+        assert store.write({"pools": [{"id": 0, "cores": [1, 2]}]}) == 1
+        assert store.write({"pools": [{"id": 1, "cores": [3]}]}) == 2
+
+        assert store.version() == 2
+        assert store.read() == {"pools": [{"id": 1, "cores": [3]}]}
+
+
+    def test_read_cached(self):
+        store = SharedSnapshot(1024)
+        store.write({"apps": []})
+
+        data = store.read()
+        # same version, no deserialization
+        assert store.read() is data
+
+        store.write({"apps": []})
+        assert store.read() is not data
+
+
+    def test_write_expected_version(self):
+        store = SharedSnapshot(1024)
+        store.write({"apps": []})
+
+        assert store.write({"apps": [1]}, expected_version=1) == 2
+        # changed in the meantime
+        assert store.write({"apps": [2]}, expected_version=1) is None
+        assert store.read() == {"apps": [1]}
+
+
+    def test_write_too_big(self):
+        store = SharedSnapshot(16)
+
+        with pytest.raises(MemoryError):
+            store.write({"name": "x" * 16})
+
+        assert store.version() == 0
+
+
+    def test_shared(self):
+        store = SharedSnapshot(1024)
+        store.write({"id": 1})
+
+        def writer():
+            store.write({"id": 2})
+
+        process = multiprocessing.Process(target=writer)
+        process.start()
+        process.join()
+
+        assert store.version() == 2
+        assert store.read() == {"id": 2}
+
+
+    def test_read_threads(self):
+        store = SharedSnapshot(1024)
+        store.write({"id": 1})
+        errors = []
+
+        def reader():
+            for _ in range(2000):
+                version, data = store.cache
+                # cached data always matches its version
+                if data is not None and data["id"] != version:
+                    errors.append((version, data))
+                store.read()
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(2, 500):
+            store.write({"id": i})
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert store.read() == {"id": 499}
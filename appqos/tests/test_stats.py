@@ -30,6 +30,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ################################################################################
 
+import multiprocessing
 import pytest
 import mock
 import common
@@ -106,3 +107,110 @@ class TestStats(object):
 
         gen_stats = stats_store.general_stats_get("inexisting_stats")
         assert not gen_stats
+
+
+    def test_stats_register_counter(self):
+        stats_store = StatsStore()
+
+        slot = stats_store.register_counter("new_counter")
+        assert stats_store.register_counter("new_counter") == slot
+        assert stats_store.general_stats_get("new_counter") == 0
+
+        stats_store.counter_inc("new_counter", 3)
+        assert stats_store.general_stats_get("new_counter") == 3
+        assert stats_store.general_stats_get(StatsStore.General.NUM_ERR) == 0
+
+
+    def test_stats_register_full(self):
+        stats_store = StatsStore()
+
+        for i in range(STATS_SLOTS - stats_store.slots.num_counters):
+            stats_store.register_counter(f"counter_{i}")
+
+        with pytest.raises(ValueError):
+            stats_store.register_counter("one_too_many")
+
+        with pytest.raises(ValueError):
+            stats_store.register_histogram("one_too_many")
+
+
+    def test_stats_histogram(self):
+        stats_store = StatsStore()
+        stats_store.register_histogram("new_histogram", [1, 2, 5])
+
+        for value in [0.5, 1, 1.5, 3, 10]:
+            stats_store.observe("new_histogram", value)
+
+        hist = stats_store.snapshot()['histograms']["new_histogram"]
+        assert hist['buckets'] == [(1, 2), (2, 3), (5, 4)]
+        assert hist['count'] == 5
+        assert hist['sum'] == 16
+
+        snapshot = stats_store.snapshot()
+        assert "new_histogram" not in snapshot['counters']
+        assert "new_histogram" not in snapshot['gauges']
+
+
+    def test_stats_observe_request(self):
+        stats_store = StatsStore()
+        stats_store.register_endpoint("apps")
+
+        stats_store.general_stats_observe_request("apps", 0.002)
+        stats_store.general_stats_observe_request("pools", 0.002)
+
+        histograms = stats_store.snapshot()['histograms']
+        assert histograms[StatsStore.endpoint_latency_id("apps")]['count'] == 1
+        assert StatsStore.endpoint_latency_id("pools") not in histograms
+
+
+    def test_stats_inc_unregistered(self):
+        stats_store = StatsStore()
+
+        with pytest.raises(KeyError):
+            stats_store.counter_inc("unregistered")
+
+
+    def test_stats_gauge(self):
+        stats_store = StatsStore()
+
+        stats_store.general_stats_set_apply_duration(0.25)
+        snapshot = stats_store.snapshot()
+        assert snapshot['gauges'][StatsStore.Gauge.APPLY_DURATION] == 0.25
+
+        stats_store.register_gauge("new_gauge")
+        stats_store.gauge_set("new_gauge", 1.5)
+        snapshot = stats_store.snapshot()
+        assert snapshot['gauges']["new_gauge"] == 1.5
+        assert snapshot['gauges'][StatsStore.Gauge.APPLY_DURATION] == 0.25
+
+
+    def test_stats_inc_num_err_endpoint(self):
+        stats_store = StatsStore()
+        stats_store.register_endpoint("apps")
+
+        stats_store.general_stats_inc_endpoint_err("apps")
+        stats_store.general_stats_inc_endpoint_err("pools")
+
+        gen_stats = stats_store.general_stats_get()
+        assert gen_stats['num_err'] == 0
+        assert gen_stats[StatsStore.endpoint_err_id("apps")] == 1
+        assert StatsStore.endpoint_err_id("pools") not in gen_stats
+
+
+    def test_stats_inc_multiprocess(self):
+        stats_store = StatsStore()
+
+        INC_CNT = 500
+
+        def inc():
+            for _ in range(INC_CNT):
+                stats_store.general_stats_inc_apps_moves()
+
+        processes = [multiprocessing.Process(target=inc) for _ in range(4)]
+        for process in processes:
+            process.start()
+        inc()
+        for process in processes:
+            process.join()
+
+        assert stats_store.general_stats_get(StatsStore.General.NUM_APPS_MOVES) == 5 * INC_CNT
@@ -0,0 +1,149 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for tracing module
+"""
+
+import mock
+import pytest
+
+import common
+from pqos_api import PqosApi
+from tracing import *
+
+
+def test_tracer_no_trace():
+    tracer = Tracer(1024 * 1024)
+
+    with tracer.span("span") as span:
+        span.fail()
+
+    assert tracer.span("span") is NULL_SPAN
+    assert tracer.end(0) is None
+    assert tracer.get_traces() == []
+
+
+def test_tracer_trace():
+    tracer = Tracer(1024 * 1024)
+
+    tracer.begin("apply", 3)
+    with tracer.span("phase"):
+        pass
+    with tracer.span("phase") as span:
+        span.fail()
+    with pytest.raises(ValueError):
+        with tracer.span("call"):
+            raise ValueError()
+    assert tracer.call("func", lambda value: value, -1) == -1
+    assert tracer.call("func", lambda value: value, 0) == 0
+    assert tracer.end(-1) == tracer.get_traces()[0]
+
+    traces = tracer.get_traces()
+    assert len(traces) == 1
+
+    trace = traces[0]
+    assert trace['name'] == "apply"
+    assert trace['version'] == 3
+    assert trace['result'] == -1
+    assert trace['duration'] >= 0
+    assert trace['summary']['phase']['calls'] == 2
+    assert trace['summary']['phase']['errors'] == 1
+    assert trace['summary']['call'] == {'calls': 1, 'errors': 1,
+                                        'time': trace['summary']['call']['time']}
+    assert trace['summary']['func']['calls'] == 2
+    assert trace['summary']['func']['errors'] == 1
+    assert [span['name'] for span in trace['spans']] == \
+        ["phase", "phase", "call", "func", "func"]
+    assert trace['spans'][1]['error']
+    assert trace['spans'][1]['offset'] >= trace['spans'][0]['offset']
+    assert sorted(failed_spans(trace)) == ["call", "func", "phase"]
+
+
+def test_tracer_max_traces():
+    tracer = Tracer(1024 * 1024, max_traces=2)
+
+    for version in range(3):
+        tracer.begin("apply", version)
+        tracer.end(0)
+
+    assert [trace['version'] for trace in tracer.get_traces()] == [1, 2]
+
+
+def test_tracer_max_spans():
+    tracer = Tracer(1024 * 1024)
+
+    tracer.begin("apply")
+    for _ in range(MAX_SPANS + 10):
+        with tracer.span("span"):
+            pass
+    tracer.end(0)
+
+    trace = tracer.get_traces()[0]
+    assert len(trace['spans']) == MAX_SPANS
+    assert trace['spans_dropped'] == 10
+    assert trace['summary']['span']['calls'] == MAX_SPANS + 10
+
+
+def test_to_chrome_trace():
+    traces = [{
+        'name': "apply", 'version': 1, 'timestamp': 10.0, 'duration': 0.5, 'result': 0,
+        'spans': [{'name': "phase", 'offset': 0.25, 'duration': 0.125, 'error': False}]
+    }]
+
+    events = to_chrome_trace(traces)['traceEvents']
+
+    assert events[0]['name'] == "apply"
+    assert events[0]['ph'] == "X"
+    assert events[0]['ts'] == 10000000
+    assert events[0]['dur'] == 500000
+    assert events[1]['name'] == "phase"
+    assert events[1]['ts'] == 10250000
+    assert events[1]['dur'] == 125000
+
+
+def test_pqos_api_call_span():
+    tracer = Tracer(1024 * 1024)
+    api = PqosApi()
+    api.alloc = mock.MagicMock()
+    api.alloc.assoc_set_cores.side_effect = Exception("failed")
+
+    with mock.patch('common.TRACER', tracer):
+        tracer.begin("apply")
+        assert api.alloc_assoc_set([1], 1) == -1
+        assert api.release([1]) == 0
+        tracer.end(-1)
+
+    summary = tracer.get_traces()[0]['summary']
+    assert summary['pqos.alloc_assoc_set']['errors'] == 1
+    assert summary['pqos.alloc_release'] == {'calls': 1, 'errors': 0,
+                                             'time': summary['pqos.alloc_release']['time']}
@@ -0,0 +1,112 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+import argparse
+import asyncio
+
+from pqos.aio import AsyncMonitor, COALESCE, DROP
+from pqos.monitoring import PqosMon
+
+from monitoring import PqosContextManager, get_supported_events, bytes_to_kb, bytes_to_mb
+
+
+async def monitor_cores(cores, events, interval, policy):
+    """
+    Monitors cores asynchronously and prints monitoring data.
+
+    Parameters:
+        cores: a list of cores to be monitored
+        events: a list of monitoring events
+        interval: sampling interval in seconds
+        policy: backpressure policy
+    """
+
+    mon = PqosMon()
+    groups = [mon.start([core], events) for core in cores]
+
+    try:
+        async with AsyncMonitor(groups) as monitor:
+            async for sample in monitor.samples(interval=interval, policy=policy):
+                print(f'SAMPLE {sample.seq} (skipped {sample.skipped})')
+                print('    CORE    LLC[KB]    MBL[MB]    MBR[MB]')
+                for core, values in zip(cores, sample.values):
+                    llc = bytes_to_kb(values.llc)
+                    mbl = bytes_to_mb(values.mbm_local_delta)
+                    mbr = bytes_to_mb(values.mbm_remote_delta)
+                    print(f'{core:8}{llc:11.1f}{mbl:11.1f}{mbr:11.1f}')
+    finally:
+        for group in groups:
+            group.stop()
+
+
+def parse_args():
+    """
+    Parses command line arguments.
+
+    Returns:
+        an object with parsed command line arguments
+    """
+
+    description = 'PQoS Library Python wrapper - asyncio monitoring example'
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-I', dest='interface', action='store_const',
+                        const='OS', default='MSR',
+                        help='select library OS interface')
+    parser.add_argument('-i', '--interval', type=float, default=1.0,
+                        help='sampling interval in seconds')
+    parser.add_argument('--drop', dest='policy', action='store_const',
+                        const=DROP, default=COALESCE,
+                        help='drop samples not consumed in time '
+                             '(by default they are coalesced)')
+    parser.add_argument('cores', metavar='CORE', type=int, nargs='+',
+                        help='a core to be monitored')
+
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    "Main function that runs the example."
+
+    args = parse_args()
+
+    with PqosContextManager(args.interface):
+        events = get_supported_events()
+
+        try:
+            asyncio.run(monitor_cores(args.cores, events, args.interval, args.policy))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
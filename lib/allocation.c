@@ -1089,17 +1089,21 @@ hw_alloc_assoc_write(const unsigned lcore, const unsigned class_id)
         return PQOS_RETVAL_OK;
 }
 
-int
-hw_alloc_assoc_set(const unsigned lcore, const unsigned class_id)
+/**
+ * @brief Checks if \a class_id is supported by any allocation technology
+ *
+ * @param [in] class_id class of service
+ *
+ * @return Operations status
+ * @retval PQOS_RETVAL_OK when class_id is in range
+ * @retval PQOS_RETVAL_PARAM when class_id is out of bounds
+ */
+static int
+hw_alloc_assoc_check_cos(const unsigned class_id)
 {
         int ret = PQOS_RETVAL_OK;
         unsigned num_l2_cos = 0, num_l3_cos = 0, num_mba_cos = 0;
         const struct pqos_cap *cap = _pqos_get_cap();
-        const struct pqos_cpuinfo *cpu = _pqos_get_cpu();
-
-        ret = pqos_cpu_check_core(cpu, lcore);
-        if (ret != PQOS_RETVAL_OK)
-                return PQOS_RETVAL_PARAM;
 
         ret = pqos_l3ca_get_cos_num(cap, &num_l3_cos);
         if (ret != PQOS_RETVAL_OK && ret != PQOS_RETVAL_RESOURCE)
@@ -1118,11 +1122,59 @@ hw_alloc_assoc_set(const unsigned lcore, const unsigned class_id)
                 /* class_id is out of bounds */
                 return PQOS_RETVAL_PARAM;
 
+        return PQOS_RETVAL_OK;
+}
+
+int
+hw_alloc_assoc_set(const unsigned lcore, const unsigned class_id)
+{
+        int ret = PQOS_RETVAL_OK;
+        const struct pqos_cpuinfo *cpu = _pqos_get_cpu();
+
+        ret = pqos_cpu_check_core(cpu, lcore);
+        if (ret != PQOS_RETVAL_OK)
+                return PQOS_RETVAL_PARAM;
+
+        ret = hw_alloc_assoc_check_cos(class_id);
+        if (ret != PQOS_RETVAL_OK)
+                return ret;
+
         ret = hw_alloc_assoc_write(lcore, class_id);
 
         return ret;
 }
 
+int
+hw_alloc_assoc_set_cores(const unsigned *core_array,
+                         const unsigned core_num,
+                         const unsigned class_id)
+{
+        int ret = PQOS_RETVAL_OK;
+        unsigned i;
+        const struct pqos_cpuinfo *cpu = _pqos_get_cpu();
+
+        ASSERT(core_num > 0 && core_array != NULL);
+
+        for (i = 0; i < core_num; i++) {
+                ret = pqos_cpu_check_core(cpu, core_array[i]);
+                if (ret != PQOS_RETVAL_OK)
+                        return PQOS_RETVAL_PARAM;
+        }
+
+        ret = hw_alloc_assoc_check_cos(class_id);
+        if (ret != PQOS_RETVAL_OK)
+                return ret;
+
+        /* association is held in per core register */
+        for (i = 0; i < core_num; i++) {
+                ret = hw_alloc_assoc_write(core_array[i], class_id);
+                if (ret != PQOS_RETVAL_OK)
+                        return ret;
+        }
+
+        return ret;
+}
+
 int
 hw_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
 {
@@ -1160,6 +1212,26 @@ hw_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
         return ret;
 }
 
+int
+hw_alloc_assoc_get_cores(const unsigned *core_array,
+                         const unsigned core_num,
+                         unsigned *class_ids)
+{
+        int ret = PQOS_RETVAL_OK;
+        unsigned i;
+
+        ASSERT(core_num > 0 && core_array != NULL && class_ids != NULL);
+
+        /* association is held in per core register */
+        for (i = 0; i < core_num; i++) {
+                ret = hw_alloc_assoc_get(core_array[i], &class_ids[i]);
+                if (ret != PQOS_RETVAL_OK)
+                        return ret;
+        }
+
+        return ret;
+}
+
 int
 hw_alloc_assign(const unsigned technology,
                 const unsigned *core_array,
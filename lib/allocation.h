@@ -133,6 +133,20 @@ PQOS_LOCAL int hw_alloc_assoc_unused(const unsigned technology,
 PQOS_LOCAL int hw_alloc_assoc_set(const unsigned lcore,
                                   const unsigned class_id);
 
+/**
+ * @brief Hardware interface to associate cores in \a core_array
+ *        with given class of service
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [in] class_id class of service
+ *
+ * @return Operations status
+ */
+PQOS_LOCAL int hw_alloc_assoc_set_cores(const unsigned *core_array,
+                                        const unsigned core_num,
+                                        const unsigned class_id);
+
 /**
  * @brief Hardware interface to read association
  *        of \a lcore with class of service
@@ -145,6 +159,21 @@ PQOS_LOCAL int hw_alloc_assoc_set(const unsigned lcore,
  */
 PQOS_LOCAL int hw_alloc_assoc_get(const unsigned lcore, unsigned *class_id);
 
+/**
+ * @brief Hardware interface to read association
+ *        of cores in \a core_array with classes of service
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [out] class_ids classes of service of the cores
+ *
+ * @return Operations status
+ * @retval PQOS_RETVAL_OK on success
+ */
+PQOS_LOCAL int hw_alloc_assoc_get_cores(const unsigned *core_array,
+                                        const unsigned core_num,
+                                        unsigned *class_ids);
+
 /**
  * @brief Hardware interface to assign first available
  *        COS to cores in \a core_array
@@ -91,8 +91,16 @@ static struct pqos_api {
 
         /** Associates lcore with given class of service */
         int (*alloc_assoc_set)(const unsigned lcore, const unsigned class_id);
+        /** Associates cores with given class of service */
+        int (*alloc_assoc_set_cores)(const unsigned *core_array,
+                                     const unsigned core_num,
+                                     const unsigned class_id);
         /** Reads association of lcore with class of service */
         int (*alloc_assoc_get)(const unsigned lcore, unsigned *class_id);
+        /** Reads association of cores with classes of service */
+        int (*alloc_assoc_get_cores)(const unsigned *core_array,
+                                     const unsigned core_num,
+                                     unsigned *class_ids);
         /** Associate task with given class of service */
         int (*alloc_assoc_set_pid)(const pid_t task, const unsigned class_id);
         /** Read association of task with class of service */
@@ -179,7 +187,9 @@ api_init(int interface, enum pqos_vendor vendor)
                 api.mon_start = hw_mon_start;
                 api.mon_stop = hw_mon_stop;
                 api.alloc_assoc_set = hw_alloc_assoc_set;
+                api.alloc_assoc_set_cores = hw_alloc_assoc_set_cores;
                 api.alloc_assoc_get = hw_alloc_assoc_get;
+                api.alloc_assoc_get_cores = hw_alloc_assoc_get_cores;
                 api.alloc_assign = hw_alloc_assign;
                 api.alloc_release = hw_alloc_release;
                 api.alloc_reset = hw_alloc_reset;
@@ -208,7 +218,9 @@ api_init(int interface, enum pqos_vendor vendor)
                 api.mon_remove_pids = os_mon_remove_pids;
                 api.mon_stop = os_mon_stop;
                 api.alloc_assoc_set = os_alloc_assoc_set;
+                api.alloc_assoc_set_cores = os_alloc_assoc_set_cores;
                 api.alloc_assoc_get = os_alloc_assoc_get;
+                api.alloc_assoc_get_cores = os_alloc_assoc_get_cores;
                 api.alloc_assoc_set_pid = os_alloc_assoc_set_pid;
                 api.alloc_assoc_get_pid = os_alloc_assoc_get_pid;
                 api.alloc_assign = os_alloc_assign;
@@ -271,6 +283,17 @@ pqos_alloc_assoc_set(const unsigned lcore, const unsigned class_id)
         return API_CALL(alloc_assoc_set, lcore, class_id);
 }
 
+int
+pqos_alloc_assoc_set_cores(const unsigned *core_array,
+                           const unsigned core_num,
+                           const unsigned class_id)
+{
+        if (core_num == 0 || core_array == NULL)
+                return PQOS_RETVAL_PARAM;
+
+        return API_CALL(alloc_assoc_set_cores, core_array, core_num, class_id);
+}
+
 int
 pqos_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
 {
@@ -280,6 +303,18 @@ pqos_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
         return API_CALL(alloc_assoc_get, lcore, class_id);
 }
 
+int
+pqos_alloc_assoc_get_cores(const unsigned *core_array,
+                           const unsigned core_num,
+                           unsigned *class_ids)
+{
+        if (core_num == 0 || core_array == NULL || class_ids == NULL)
+                return PQOS_RETVAL_PARAM;
+
+        return API_CALL(alloc_assoc_get_cores, core_array, core_num,
+                        class_ids);
+}
+
 int
 pqos_alloc_assoc_set_pid(const pid_t task, const unsigned class_id)
 {
@@ -342,6 +342,97 @@ os_alloc_assoc_set_exit:
         return ret;
 }
 
+int
+os_alloc_assoc_set_cores(const unsigned *core_array,
+                         const unsigned core_num,
+                         const unsigned class_id)
+{
+        int ret;
+        unsigned grps;
+        unsigned i;
+        struct resctrl_cpumask mask;
+        struct {
+                int ret;
+                char name[256];
+        } *mon_group = NULL;
+        const struct pqos_cap *cap = _pqos_get_cap();
+        const struct pqos_cpuinfo *cpu = _pqos_get_cpu();
+
+        ASSERT(core_num > 0 && core_array != NULL);
+
+        for (i = 0; i < core_num; i++) {
+                ret = pqos_cpu_check_core(cpu, core_array[i]);
+                if (ret != PQOS_RETVAL_OK)
+                        return PQOS_RETVAL_PARAM;
+        }
+
+        ret = resctrl_alloc_get_grps_num(cap, &grps);
+        if (ret != PQOS_RETVAL_OK)
+                return ret;
+
+        if (class_id >= grps)
+                /* class_id is out of bounds */
+                return PQOS_RETVAL_PARAM;
+
+        mon_group = calloc(core_num, sizeof(*mon_group));
+        if (mon_group == NULL)
+                return PQOS_RETVAL_RESOURCE;
+
+        ret = resctrl_lock_exclusive();
+        if (ret != PQOS_RETVAL_OK)
+                goto os_alloc_assoc_set_cores_free;
+
+        /*
+         * When cores are moved to different COS we need to update monitoring
+         * groups. Obtain monitoring group names
+         */
+        for (i = 0; i < core_num; i++) {
+                mon_group[i].ret =
+                    resctrl_mon_assoc_get(core_array[i], mon_group[i].name,
+                                          sizeof(mon_group[i].name));
+                if (mon_group[i].ret != PQOS_RETVAL_OK &&
+                    mon_group[i].ret != PQOS_RETVAL_RESOURCE)
+                        LOG_WARN("Failed to obtain monitoring group assignment "
+                                 "for core %u\n",
+                                 core_array[i]);
+        }
+
+        /* Single write of COS cpumask for all cores */
+        ret = resctrl_alloc_cpumask_read(class_id, &mask);
+        if (ret != PQOS_RETVAL_OK)
+                goto os_alloc_assoc_set_cores_exit;
+
+        for (i = 0; i < core_num; i++)
+                resctrl_cpumask_set(core_array[i], &mask);
+
+        ret = resctrl_alloc_cpumask_write(class_id, &mask);
+        if (ret != PQOS_RETVAL_OK)
+                goto os_alloc_assoc_set_cores_exit;
+
+        /* Core monitoring was started assign it back to monitoring group */
+        for (i = 0; i < core_num; i++) {
+                int ret_mon;
+
+                if (mon_group[i].ret != PQOS_RETVAL_OK)
+                        continue;
+
+                ret_mon =
+                    resctrl_mon_assoc_set(core_array[i], mon_group[i].name);
+                if (ret_mon != PQOS_RETVAL_OK)
+                        LOG_WARN("Could not assign core %u back to monitoring "
+                                 "group\n",
+                                 core_array[i]);
+        }
+
+os_alloc_assoc_set_cores_exit:
+        resctrl_lock_release();
+
+os_alloc_assoc_set_cores_free:
+        free(mon_group);
+
+        return ret;
+}
+
 int
 os_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
 {
@@ -365,6 +456,67 @@ os_alloc_assoc_get(const unsigned lcore, unsigned *class_id)
         return ret;
 }
 
+int
+os_alloc_assoc_get_cores(const unsigned *core_array,
+                         const unsigned core_num,
+                         unsigned *class_ids)
+{
+        int ret;
+        unsigned grps;
+        unsigned i, j;
+        struct resctrl_cpumask mask;
+        const struct pqos_cap *cap = _pqos_get_cap();
+        const struct pqos_cpuinfo *cpu = _pqos_get_cpu();
+
+        ASSERT(core_num > 0 && core_array != NULL && class_ids != NULL);
+
+        for (i = 0; i < core_num; i++) {
+                ret = pqos_cpu_check_core(cpu, core_array[i]);
+                if (ret != PQOS_RETVAL_OK)
+                        return PQOS_RETVAL_PARAM;
+        }
+
+        ret = resctrl_alloc_get_grps_num(cap, &grps);
+        if (ret != PQOS_RETVAL_OK)
+                return ret;
+
+        /* mark cores as not associated */
+        for (i = 0; i < core_num; i++)
+                class_ids[i] = grps;
+
+        ret = resctrl_lock_shared();
+        if (ret != PQOS_RETVAL_OK)
+                return ret;
+
+        /* Single read of each COS cpumask for all cores */
+        for (j = 0; j < grps; j++) {
+                ret = resctrl_alloc_cpumask_read(j, &mask);
+                if (ret != PQOS_RETVAL_OK)
+                        goto os_alloc_assoc_get_cores_exit;
+
+                for (i = 0; i < core_num; i++) {
+                        if (class_ids[i] != grps)
+                                continue;
+                        if (resctrl_cpumask_get(core_array[i], &mask))
+                                class_ids[i] = j;
+                }
+        }
+
+        for (i = 0; i < core_num; i++) {
+                if (class_ids[i] != grps)
+                        continue;
+                LOG_ERROR("Failed to read COS association of core %u\n",
+                          core_array[i]);
+                ret = PQOS_RETVAL_ERROR;
+                break;
+        }
+
+os_alloc_assoc_get_cores_exit:
+        resctrl_lock_release();
+
+        return ret;
+}
+
 unsigned *
 os_pid_get_pid_assoc(const unsigned class_id, unsigned *count)
 {
@@ -367,6 +367,20 @@ PQOS_LOCAL int os_mba_get_amd(const unsigned mba_id,
 PQOS_LOCAL int os_alloc_assoc_set(const unsigned lcore,
                                   const unsigned class_id);
 
+/**
+ * @brief OS interface to associate cores in \a core_array
+ *        with given class of service
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [in] class_id class of service
+ *
+ * @return Operations status
+ */
+PQOS_LOCAL int os_alloc_assoc_set_cores(const unsigned *core_array,
+                                        const unsigned core_num,
+                                        const unsigned class_id);
+
 /**
  * @brief OS interface to read association
  *        of \a lcore with class of service
@@ -379,6 +393,21 @@ PQOS_LOCAL int os_alloc_assoc_set(const unsigned lcore,
  */
 PQOS_LOCAL int os_alloc_assoc_get(const unsigned lcore, unsigned *class_id);
 
+/**
+ * @brief OS interface to read association
+ *        of cores in \a core_array with classes of service
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [out] class_ids classes of service of the cores
+ *
+ * @return Operations status
+ * @retval PQOS_RETVAL_OK on success
+ */
+PQOS_LOCAL int os_alloc_assoc_get_cores(const unsigned *core_array,
+                                        const unsigned core_num,
+                                        unsigned *class_ids);
+
 /**
  * @brief Retrieves task id's from resctrl task file for a given COS
  *
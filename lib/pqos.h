@@ -642,6 +642,23 @@ int pqos_mon_poll(struct pqos_mon_data **groups, const unsigned num_groups);
  */
 int pqos_alloc_assoc_set(const unsigned lcore, const unsigned class_id);
 
+/**
+ * @brief Associates cores in \a core_array with given class of service
+ *
+ * Equivalent of calling pqos_alloc_assoc_set() for each core, except that
+ * with OS interface the resctrl cpus file of the class is written once.
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [in] class_id class of service
+ *
+ * @return Operations status
+ * @retval PQOS_RETVAL_OK on success
+ */
+int pqos_alloc_assoc_set_cores(const unsigned *core_array,
+                               const unsigned core_num,
+                               const unsigned class_id);
+
 /**
  * @brief Reads association of \a lcore with class of service
  *
@@ -653,6 +670,24 @@ int pqos_alloc_assoc_set(const unsigned lcore, const unsigned class_id);
  */
 int pqos_alloc_assoc_get(const unsigned lcore, unsigned *class_id);
 
+/**
+ * @brief Reads association of cores in \a core_array with classes of service
+ *
+ * Equivalent of calling pqos_alloc_assoc_get() for each core, except that
+ * with OS interface resctrl cpus file of each class is read once.
+ *
+ * @param [in] core_array list of core ids
+ * @param [in] core_num number of core ids in the \a core_array
+ * @param [out] class_ids classes of service of the cores, table of
+ *              \a core_num elements
+ *
+ * @return Operations status
+ * @retval PQOS_RETVAL_OK on success
+ */
+int pqos_alloc_assoc_get_cores(const unsigned *core_array,
+                               const unsigned core_num,
+                               unsigned *class_ids);
+
 /**
  * @brief OS interface to associate \a task
  *        with given class of service
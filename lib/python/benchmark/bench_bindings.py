@@ -0,0 +1,171 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Micro-benchmark of per-call overhead of PQoS library bindings.
+Compares the previous calling convention (library loaded on each Pqos()
+construction, return types assigned before each call, C library looked up
+on each free) with prototyped functions from the binding layer.
+It does not require PQoS library to be initialized.
+"""
+
+from __future__ import absolute_import, division, print_function
+import argparse
+import array
+import ctypes
+import ctypes.util
+import timeit
+
+from pqos import Pqos
+from pqos.common import UINT_TYPECODE
+from pqos.cpuinfo import PqosCpuInfo, PqosCoreInfo, CPqosCoreInfo, CPqosCpuInfo
+from pqos.native import LIBPQOS_NAME
+
+
+def build_cpuinfo(num_cores):
+    """
+    Builds CPU information structure with given number of cores.
+
+    Returns:
+        a buffer holding the structure and a pointer to it
+    """
+
+    core_infos = (CPqosCoreInfo * num_cores)(
+        *[CPqosCoreInfo(lcore=core, socket=core % 2, l3_id=core % 2,
+                        l2_id=core // 2, l3cat_id=core % 2, mba_id=core % 2)
+          for core in range(num_cores)])
+    cpuinfo = CPqosCpuInfo(mem_size=ctypes.sizeof(CPqosCpuInfo) + ctypes.sizeof(core_infos),
+                           num_cores=num_cores)
+
+    buf = (ctypes.c_char * cpuinfo.mem_size)()
+    ctypes.memmove(buf, ctypes.addressof(cpuinfo), ctypes.sizeof(cpuinfo))
+    ctypes.memmove(ctypes.byref(buf, ctypes.sizeof(cpuinfo)),
+                   ctypes.addressof(core_infos), ctypes.sizeof(core_infos))
+
+    return buf, ctypes.cast(buf, ctypes.POINTER(CPqosCpuInfo))
+
+
+def legacy_free_memory(ptr):
+    "Previous free_memory(), C library looked up on each call."
+
+    libc = ctypes.cdll.LoadLibrary(ctypes.util.find_library('c'))
+    libc.free(ptr)
+
+
+class LegacyPqos(object):
+    "Previous Pqos() construction, PQoS library loaded on each call."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.lib = ctypes.CDLL(LIBPQOS_NAME)
+
+
+class LegacyCpuInfo(PqosCpuInfo):
+    """
+    PqosCpuInfo with previous calling convention: PQoS library without
+    function prototypes, return types assigned before each call.
+    """
+    # pylint: disable=super-init-not-called
+
+    def __init__(self, p_cpu):
+        self.pqos = LegacyPqos()
+        self.p_cpu = p_cpu
+
+    def _call_func_array(self, func, arg=None, use_arg=False, as_array=False):
+        count = ctypes.c_uint(0)
+        func.restype = ctypes.POINTER(ctypes.c_uint)
+
+        args = (self.p_cpu, arg) if use_arg else (self.p_cpu,)
+        p_items = func(*args, ctypes.byref(count))
+        items = [p_items[i] for i in range(count.value)] if p_items else []
+        if p_items:
+            legacy_free_memory(p_items)
+
+        return array.array(UINT_TYPECODE, items) if as_array else items
+
+    def get_core_info(self, core):
+        restype = ctypes.POINTER(CPqosCoreInfo)
+        self.pqos.lib.pqos_cpu_get_core_info.restype = restype
+        info = self.pqos.lib.pqos_cpu_get_core_info(self.p_cpu, core).contents
+
+        return PqosCoreInfo(info.lcore, info.socket, info.l3_id, info.l2_id,
+                            info.l3cat_id, info.mba_id)
+
+
+def run(iterations, num_cores):
+    """
+    Runs the benchmark and prints per-call time.
+
+    Parameters:
+        iterations: number of calls per measurement
+        num_cores: number of cores in CPU information structure
+    """
+
+    _buf, p_cpu = build_cpuinfo(num_cores)
+
+    legacy = LegacyCpuInfo(p_cpu)
+
+    cpu = PqosCpuInfo.__new__(PqosCpuInfo)
+    cpu.pqos = Pqos()
+    cpu.p_cpu = p_cpu
+
+    cases = [
+        ('Pqos()', LegacyPqos, Pqos),
+        ('get_sockets()', legacy.get_sockets, cpu.get_sockets),
+        ('check_core()', lambda: legacy.check_core(1), lambda: cpu.check_core(1)),
+        ('get_core_info()', lambda: legacy.get_core_info(1), lambda: cpu.get_core_info(1)),
+    ]
+
+    print(f'{"call":<20}{"before [us]":>14}{"after [us]":>14}{"speedup":>10}')
+    for name, before_func, after_func in cases:
+        before = min(timeit.repeat(before_func, number=iterations, repeat=3))
+        after = min(timeit.repeat(after_func, number=iterations, repeat=3))
+        before_us = before / iterations * 1e6
+        after_us = after / iterations * 1e6
+        print(f'{name:<20}{before_us:>14.2f}{after_us:>14.2f}{before / after:>9.1f}x')
+
+
+def main():
+    "Main entry point."
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--iterations', type=int, default=10000,
+                        help='number of calls per measurement')
+    parser.add_argument('-c', '--cores', type=int, default=64,
+                        help='number of cores in CPU information structure')
+    args = parser.parse_args()
+
+    run(args.iterations, args.cores)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines AsyncMonitor, asyncio front end for monitoring.
+Monitoring data is polled on a dedicated executor thread, at fixed
+(drift-free) intervals, without blocking the event loop.
+"""
+
+from __future__ import absolute_import, division, print_function
+import asyncio
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pqos.monitoring import PollSet
+
+
+# backpressure policies, applied when max_pending samples are not consumed
+DROP = 'drop'           # new samples are dropped
+COALESCE = 'coalesce'   # new sample is merged with the last pending one
+
+# CPqosEventValues fields accumulated when samples are coalesced
+DELTA_FIELDS = ('mbm_local_delta', 'mbm_total_delta', 'mbm_remote_delta',
+                'ipc_retired_delta', 'ipc_unhalted_delta', 'llc_misses_delta')
+
+
+MonSample = namedtuple('MonSample', ['seq', 'deadline', 'timestamp', 'skipped', 'values'])
+MonSample.__doc__ = """
+Monitoring sample.
+
+Fields:
+    seq: sequence number of the poll
+    deadline: scheduled poll time (event loop monotonic clock)
+    timestamp: poll completion time (event loop monotonic clock)
+    skipped: number of polls dropped, coalesced into this sample or missed
+             since the previous sample
+    values: array of CPqosEventValues, one element per monitoring group
+"""
+
+
+def coalesce_samples(prev, sample):
+    """
+    Merges two consecutive samples, delta values are accumulated,
+    other values are taken from the newer sample.
+
+    Parameters:
+        prev: older sample
+        sample: newer sample
+
+    Returns:
+        merged sample
+    """
+
+    for prev_values, values in zip(prev.values, sample.values):
+        for field in DELTA_FIELDS:
+            setattr(values, field, getattr(values, field) + getattr(prev_values, field))
+        if values.ipc_unhalted_delta:
+            values.ipc = values.ipc_retired_delta / values.ipc_unhalted_delta
+
+    return sample._replace(skipped=prev.skipped + sample.skipped + 1)
+
+
+class _SampleChannel(object):
+    "Bounded channel of samples between poller and consumer."
+
+    def __init__(self, max_pending, policy):
+        self.max_pending = max_pending
+        self.policy = policy
+        self.pending = deque()
+        self.skipped = 0
+        self.error = None
+        self.event = asyncio.Event()
+
+    def put(self, sample):
+        "Adds sample, applies backpressure policy if channel is full."
+
+        sample = sample._replace(skipped=self.skipped)
+        self.skipped = 0
+
+        if len(self.pending) >= self.max_pending:
+            if self.policy == DROP:
+                self.skipped = sample.skipped + 1
+                return
+            sample = coalesce_samples(self.pending.pop(), sample)
+
+        self.pending.append(sample)
+        self.event.set()
+
+    def put_error(self, error):
+        "Passes poller error to the consumer."
+
+        self.error = error
+        self.event.set()
+
+    async def get(self):
+        "Gets the oldest pending sample, waits if there is none."
+
+        while not self.pending:
+            if self.error is not None:
+                raise self.error
+            self.event.clear()
+            await self.event.wait()
+
+        return self.pending.popleft()
+
+
+class AsyncMonitor(object):
+    """
+    Asyncio front end for monitoring of a fixed set of monitoring groups.
+    Only one poll is run at a time, on a dedicated executor thread.
+    """
+
+    def __init__(self, groups, executor=None):
+        """
+        Initializes asynchronous monitor.
+
+        Parameters:
+            groups: a list of CPqosMonData monitoring objects
+            executor: executor to run polls in or None, if None is given,
+                      a dedicated single thread executor is used
+                      (default None)
+        """
+
+        self.poll_set = PollSet(groups)
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pqos-mon')
+        self.executor = executor
+
+    def _poll(self):
+        "Polls monitoring data, returns a copy of event values."
+
+        self.poll_set.poll()
+        values = self.poll_set.values
+        return type(values).from_buffer_copy(values)
+
+    async def poll(self):
+        """
+        Polls monitoring data of all groups.
+
+        Returns:
+            array of CPqosEventValues, one element per monitoring group
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._poll)
+
+    async def samples(self, interval, max_pending=1, policy=COALESCE):
+        """
+        Polls monitoring data periodically.
+        Polls are scheduled against monotonic deadlines (start + n * interval),
+        deadlines missed because of a slow poll are skipped.
+
+        Usage:
+            async for sample in monitor.samples(interval=1.0):
+                ...
+
+        Parameters:
+            interval: sampling interval in seconds
+            max_pending: max number of samples waiting for the consumer
+                         (default 1)
+            policy: backpressure policy applied when max_pending samples
+                    are waiting, available options: 'coalesce' (new sample
+                    is merged with the last pending one, delta values are
+                    accumulated) and 'drop' (new sample is dropped)
+                    (default 'coalesce')
+
+        Returns:
+            asynchronous iterator of MonSample
+        """
+
+        if interval <= 0:
+            raise ValueError('Sampling interval must be positive')
+
+        if max_pending < 1:
+            raise ValueError('max_pending must be at least 1')
+
+        if policy not in (DROP, COALESCE):
+            raise ValueError(f'Unknown backpressure policy: {policy}.'
+                             ' Available options: drop, coalesce')
+
+        channel = _SampleChannel(max_pending, policy)
+        poller = asyncio.ensure_future(self._run_poller(interval, channel))
+
+        try:
+            while True:
+                yield await channel.get()
+        finally:
+            poller.cancel()
+            try:
+                await poller
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_poller(self, interval, channel):
+        "Polls monitoring data at deadlines and passes samples to the channel."
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + interval
+        seq = 0
+
+        try:
+            while True:
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                values = await loop.run_in_executor(self.executor, self._poll)
+                channel.put(MonSample(seq=seq, deadline=deadline, timestamp=loop.time(),
+                                      skipped=0, values=values))
+                seq += 1
+
+                # next deadline, skip deadlines missed by a slow poll
+                deadline += interval
+                now = loop.time()
+                if deadline <= now:
+                    missed = int((now - deadline) // interval) + 1
+                    deadline += missed * interval
+                    seq += missed
+                    channel.skipped += missed
+        except asyncio.CancelledError:  # pylint: disable=try-except-raise
+            # not a poll error, Exception subclass before Python 3.8
+            raise
+        except Exception as ex:  # pylint: disable=broad-except
+            channel.put_error(ex)
+
+    def close(self):
+        """
+        Shuts down the executor, if created by the monitor.
+        """
+
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
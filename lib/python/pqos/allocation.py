@@ -39,7 +39,7 @@ from __future__ import absolute_import, division, print_function
 import ctypes
 
 from pqos.capability import pqos_get_type_enum
-from pqos.common import pqos_handle_error, free_memory
+from pqos.common import pqos_handle_error, free_memory, copy_uint_array
 from pqos.pqos import Pqos
 
 
@@ -121,6 +121,64 @@ class PqosAlloc(object):
         pqos_handle_error('pqos_alloc_assoc_get', ret)
         return class_id.value
 
+    def assoc_set_cores(self, cores, class_id):
+        """
+        Associates logical cores with a given class of service
+        in a single library call.
+
+        Parameters:
+            cores: a list of logical core numbers
+            class_id: class of service
+        """
+
+        if not cores:
+            return
+
+        core_array = _get_list_of_cores(cores)
+        ret = self.pqos.lib.pqos_alloc_assoc_set_cores(core_array, len(cores),
+                                                       class_id)
+        pqos_handle_error('pqos_alloc_assoc_set_cores', ret)
+
+    def assoc_set_map(self, assoc):
+        """
+        Associates logical cores with classes of service. Cores are grouped
+        per class of service, each class of service is associated with
+        a single library call.
+
+        Parameters:
+            assoc: a dictionary, logical core number to class of service map
+        """
+
+        cores_per_cos = {}
+        for core, class_id in assoc.items():
+            cores_per_cos.setdefault(class_id, []).append(core)
+
+        for class_id, cores in cores_per_cos.items():
+            self.assoc_set_cores(cores, class_id)
+
+    def assoc_get_cores(self, cores):
+        """
+        Reads association of logical cores with classes of service
+        in a single library call.
+
+        Parameters:
+            cores: a list of logical core numbers
+
+        Returns:
+            a dictionary, logical core number to class of service map
+        """
+
+        if not cores:
+            return {}
+
+        core_array = _get_list_of_cores(cores)
+        class_ids = (ctypes.c_uint * len(cores))()
+        ret = self.pqos.lib.pqos_alloc_assoc_get_cores(core_array, len(cores),
+                                                       class_ids)
+        pqos_handle_error('pqos_alloc_assoc_get_cores', ret)
+
+        return dict(zip(cores, class_ids))
+
     def assoc_set_pid(self, pid, class_id):
         """
         OS interface to associate a task with a given class of service.
@@ -133,6 +191,34 @@ class PqosAlloc(object):
         ret = self.pqos.lib.pqos_alloc_assoc_set_pid(pid, class_id)
         pqos_handle_error('pqos_alloc_assoc_set_pid', ret)
 
+    def assoc_set_pids(self, pids, class_id):
+        """
+        OS interface to associate tasks with a given class of service.
+
+        Association with the default class of service #0 is done
+        with a single pqos_alloc_release_pid() call. libpqos has no bulk
+        association function for other classes of service, so
+        pqos_alloc_assoc_set_pid() is called (and a resctrl "tasks" file
+        is written) for each task separately. Association stops at the
+        first task that fails, e.g. has terminated.
+
+        Parameters:
+            pids: a list of process (task) IDs
+            class_id: class of service
+        """
+
+        if not pids:
+            return
+
+        if class_id == 0:
+            self.release_pid(pids)
+            return
+
+        assoc_set_pid = self.pqos.lib.pqos_alloc_assoc_set_pid
+        for pid in pids:
+            ret = assoc_set_pid(pid, class_id)
+            pqos_handle_error('pqos_alloc_assoc_set_pid', ret)
+
     def assoc_get_pid(self, pid):
         """
         OS interface to read association of a task with class of service.
@@ -238,13 +324,15 @@ class PqosAlloc(object):
         ret = self.pqos.lib.pqos_alloc_release_pid(pid_array, pid_array_len)
         pqos_handle_error('pqos_alloc_release_pid', ret)
 
-    def get_pids(self, class_id):
+    def get_pids(self, class_id, as_array=False):
         """
         Retrieves process IDs from resctrl task file for
         a given class of service.
 
         Parameters:
             class_id: class of service
+            as_array: if True then array.array is returned instead of a list
+                      (default False)
 
         Returns:
             a list of process IDs
@@ -253,15 +341,13 @@ class PqosAlloc(object):
         count = ctypes.c_uint(0)
         count_ref = ctypes.byref(count)
 
-        restype = ctypes.POINTER(ctypes.c_uint)
-        self.pqos.lib.pqos_pid_get_pid_assoc.restype = restype
         p_pids = self.pqos.lib.pqos_pid_get_pid_assoc(class_id, count_ref)
 
         if p_pids:
-            pids = [p_pids[i] for i in range(count.value)]
+            pids = copy_uint_array(p_pids, count.value, as_array)
             free_memory(p_pids)
         else:
-            pids = []
+            pids = copy_uint_array(None, 0, as_array)
 
         return pids
 
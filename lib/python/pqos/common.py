@@ -35,10 +35,11 @@ Common module which defines functions used in other modules.
 """
 
 from __future__ import absolute_import, division, print_function
+import array
 import ctypes
-import ctypes.util
 
 from pqos.error import ERRORS, PqosError
+from pqos.native import load_libc
 
 
 def pqos_handle_error(func_name, retval, expected=0):
@@ -140,13 +141,36 @@ def convert_to_cos(ctypes_cos, cls):
 
     return cls(class_id, mask, code_mask, data_mask)
 
-def free_memory(ptr):
-    "Releases memory allocated by the library."
+# array.array type code matching C unsigned int
+UINT_TYPECODE = next(code for code in 'IL'
+                     if array.array(code).itemsize == ctypes.sizeof(ctypes.c_uint))
+
+
+def copy_uint_array(p_items, count, as_array=False):
+    """
+    Copies C array of unsigned integers without Python-level loop.
+    The memory pointed to by p_items is not released.
+
+    Parameters:
+        p_items: a pointer to the first element of the array
+        count: number of elements
+        as_array: if True then array.array is returned (copied with a single
+                  memmove), otherwise a list (default False)
 
-    libc_path = ctypes.util.find_library('c')
+    Returns:
+        a list or array.array of integers
+    """
+
+    if not as_array:
+        return p_items[:count] if count else []
+
+    items = array.array(UINT_TYPECODE, bytes(count * ctypes.sizeof(ctypes.c_uint)))
+    if count:
+        ctypes.memmove(items.buffer_info()[0], p_items, count * items.itemsize)
+    return items
 
-    if not libc_path:
-        raise Exception('Cannot find libc')
 
-    libc = ctypes.cdll.LoadLibrary(libc_path)
-    libc.free(ptr)
+def free_memory(ptr):
+    "Releases memory allocated by the library."
+
+    load_libc().free(ptr)
@@ -38,7 +38,7 @@ like number of cores, L2/L3 cache ID etc.
 from __future__ import absolute_import, division, print_function
 import ctypes
 
-from pqos.common import pqos_handle_error, free_memory
+from pqos.common import pqos_handle_error, free_memory, copy_uint_array
 from pqos.error import PqosError
 from pqos.pqos import Pqos
 
@@ -116,11 +116,7 @@ def _get_array_items(count, p_items):
         a list of elements
     """
 
-    if not count:
-        return []
-
-    items = [p_items[i] for i in range(count)]
-    return items
+    return copy_uint_array(p_items, count)
 
 
 class PqosCpuInfo(object):
@@ -133,7 +129,7 @@ class PqosCpuInfo(object):
         ret = self.pqos.lib.pqos_cap_get(None, ctypes.byref(self.p_cpu))
         pqos_handle_error('pqos_cap_get', ret)
 
-    def _call_func_array(self, func, arg=None, use_arg=False):
+    def _call_func_array(self, func, arg=None, use_arg=False, as_array=False):
         """
         Calls a function from PQoS library and returns the result as a list of
         integers.
@@ -142,14 +138,14 @@ class PqosCpuInfo(object):
             func: a function from PQoS library
             arg: a function argument
             use_arg: if True then func will be invoked with arg as an argument
+            as_array: if True then array.array is returned instead of a list
 
         Returns:
-            a list of integers
+            a list (or array.array) of integers
         """
 
         count = ctypes.c_uint(0)
         count_ref = ctypes.byref(count)
-        func.restype = ctypes.POINTER(ctypes.c_uint)
 
         if use_arg:
             p_items = func(self.p_cpu, arg, count_ref)
@@ -157,9 +153,9 @@ class PqosCpuInfo(object):
             p_items = func(self.p_cpu, count_ref)
 
         if not p_items:
-            return []
+            return copy_uint_array(None, 0, as_array)
 
-        items = [p_items[i] for i in range(count.value)] if count.value else []
+        items = copy_uint_array(p_items, count.value, as_array)
         free_memory(p_items)
         return items
 
@@ -189,10 +185,7 @@ class PqosCpuInfo(object):
         Returns:
             CPU vendor
         """
-        func = self.pqos.lib.pqos_get_vendor
-        func.restype = ctypes.c_int
-
-        vendor = func(self.p_cpu)
+        vendor = self.pqos.lib.pqos_get_vendor(self.p_cpu)
 
         if vendor == CPqosCpuInfo.PQOS_VENDOR_INTEL:
             return "INTEL"
@@ -201,53 +194,67 @@ class PqosCpuInfo(object):
 
         return "UNKNOWN"
 
-    def get_sockets(self):
+    def get_sockets(self, as_array=False):
         """
         Retrieves socket IDs from CPU info structure.
 
+        Parameters:
+            as_array: if True then array.array is returned instead of a list
+                      (default False)
+
         Returns:
             a list of socket IDs
         """
 
-        return self._call_func_array(self.pqos.lib.pqos_cpu_get_sockets)
+        return self._call_func_array(self.pqos.lib.pqos_cpu_get_sockets,
+                                     as_array=as_array)
 
-    def get_l2ids(self):
+    def get_l2ids(self, as_array=False):
         """
         Retrieves L2 IDs from CPU info structure.
 
+        Parameters:
+            as_array: if True then array.array is returned instead of a list
+                      (default False)
+
         Returns:
             a list of L2 IDs
         """
 
-        return self._call_func_array(self.pqos.lib.pqos_cpu_get_l2ids)
+        return self._call_func_array(self.pqos.lib.pqos_cpu_get_l2ids,
+                                     as_array=as_array)
 
-    def get_cores_l3id(self, l3_id):
+    def get_cores_l3id(self, l3_id, as_array=False):
         """
         Creates a list of cores belonging to a given L3 cluster.
 
         Parameters:
             l3_id: L3 cluster ID
+            as_array: if True then array.array is returned instead of a list
+                      (default False)
 
         Returns:
             a list of cores
         """
 
         return self._call_func_array(self.pqos.lib.pqos_cpu_get_cores_l3id,
-                                     l3_id, use_arg=True)
+                                     l3_id, use_arg=True, as_array=as_array)
 
-    def get_cores(self, socket):
+    def get_cores(self, socket, as_array=False):
         """
         Retrieves core IDs from CPU info structure for a socket.
 
         Parameters:
             socket: socket ID
+            as_array: if True then array.array is returned instead of a list
+                      (default False)
 
         Returns:
             a list of cores
         """
 
         return self._call_func_array(self.pqos.lib.pqos_cpu_get_cores,
-                                     socket, use_arg=True)
+                                     socket, use_arg=True, as_array=as_array)
 
     def get_core_info(self, core):
         """
@@ -260,14 +267,12 @@ class PqosCpuInfo(object):
             core information
         """
 
-        restype = ctypes.POINTER(CPqosCoreInfo)
-        self.pqos.lib.pqos_cpu_get_core_info.restype = restype
         p_coreinfo = self.pqos.lib.pqos_cpu_get_core_info(self.p_cpu, core)
 
         if not p_coreinfo:
             raise PqosError('Core information not found')
 
-        coreinfo_struct = p_coreinfo.contents
+        coreinfo_struct = CPqosCoreInfo.from_address(p_coreinfo)
         coreinfo = PqosCoreInfo(core=coreinfo_struct.lcore,
                                 socket=coreinfo_struct.socket,
                                 l3_id=coreinfo_struct.l3_id,
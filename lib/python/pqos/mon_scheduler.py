@@ -0,0 +1,374 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines MonScheduler which time-slices a bounded number of
+monitoring groups (RMIDs) across an arbitrary number of logical groups.
+"""
+
+from __future__ import absolute_import, division, print_function
+import math
+import time
+from collections import OrderedDict, deque, namedtuple
+
+from pqos.error import PqosError
+from pqos.monitoring import PqosMon, PollSet
+
+
+# monitoring event to CPqosEventValues field
+EVENT_FIELDS = OrderedDict([
+    ('l3_occup', 'llc'),
+    ('lmem_bw', 'mbm_local_delta'),
+    ('tmem_bw', 'mbm_total_delta'),
+    ('rmem_bw', 'mbm_remote_delta'),
+    ('perf_llc_miss', 'llc_misses_delta'),
+    ('perf_ipc', 'ipc'),
+])
+
+# LLC occupancy needs time to converge after RMID is assigned
+WARMUP_FIELDS = frozenset(['llc'])
+
+
+MonEstimate = namedtuple('MonEstimate', ['values', 'timestamp', 'staleness',
+                                         'confidence', 'samples'])
+MonEstimate.__doc__ = """
+Monitoring estimate of a logical group.
+
+Fields:
+    values: CPqosEventValues field name to value (mean of slice samples)
+    timestamp: time of the end of the monitoring slice
+    staleness: time elapsed since timestamp
+    confidence: 0.0 - 1.0, ratio of valid samples in the slice, scaled down
+                when the estimate is older than a full rotation cycle
+    samples: number of samples the estimate is based on
+"""
+
+
+class MonScheduler(object):
+    """
+    Monitoring scheduler.
+    At most max_groups monitoring groups are started at a time. Logical
+    groups are monitored in round-robin slices of slice_polls polls, after
+    each slice active groups are stopped and next logical groups are started.
+    First warmup_polls samples of LLC occupancy in each slice are discarded.
+    When all logical groups fit in max_groups there is no rotation,
+    groups keep running and only their first slice is warmed up.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, events, max_groups, *, slice_polls=5, warmup_polls=2,
+                 mon=None, clock=time.monotonic):
+        """
+        Initializes monitoring scheduler.
+
+        Parameters:
+            events: a list of events, available options: 'l3_occup',
+                    'lmem_bw', 'tmem_bw', 'rmem_bw', 'perf_llc_miss',
+                    'perf_ipc'
+            max_groups: max number of monitoring groups (RMIDs) started
+                        at a time
+            slice_polls: number of polls logical group is monitored for
+                         in one slice (default 5)
+            warmup_polls: number of LLC occupancy samples discarded at
+                          the beginning of a slice (default 2)
+            mon: PqosMon object or None (default None)
+            clock: function returning current time in seconds
+                   (default time.monotonic)
+        """
+
+        if max_groups < 1:
+            raise ValueError('max_groups must be at least 1')
+
+        if warmup_polls < 0 or slice_polls <= warmup_polls:
+            raise ValueError('slice_polls must be greater than warmup_polls')
+
+        self.events = list(events)
+        self.fields = [EVENT_FIELDS[event] for event in self.events
+                       if event in EVENT_FIELDS]
+        self.max_groups = max_groups
+        self.slice_polls = slice_polls
+        self.warmup_polls = warmup_polls
+        self.mon = mon if mon is not None else PqosMon()
+        self.clock = clock
+
+        self._targets = OrderedDict()  # key -> (target type, ids)
+        self._queue = deque()          # keys in round-robin order
+        self._active = OrderedDict()   # key -> CPqosMonData
+        self._poll_set = None
+        self._samples = {}             # key -> list of samples in slice
+        self._warm = set()             # keys of groups running for a slice
+        self._slice_polls_done = 0
+        self._slice_start = None
+        self._slice_duration = None
+        self._estimates = {}           # key -> (values, timestamp, samples)
+
+    def add_cores(self, key, cores):
+        """
+        Adds logical group monitoring a list of cores.
+
+        Parameters:
+            key: logical group key
+            cores: a list of core IDs
+        """
+
+        self._add(key, ('cores', tuple(cores)))
+
+    def add_pids(self, key, pids):
+        """
+        Adds logical group monitoring a list of processes.
+
+        Parameters:
+            key: logical group key
+            pids: a list of process IDs
+        """
+
+        self._add(key, ('pids', tuple(pids)))
+
+    def _add(self, key, target):
+        "Adds or updates logical group."
+
+        if key in self._targets:
+            if self._targets[key] == target:
+                return
+            self.remove(key)
+
+        self._targets[key] = target
+        self._queue.append(key)
+
+    def remove(self, key):
+        """
+        Removes logical group, stops its monitoring group if active.
+
+        Parameters:
+            key: logical group key
+        """
+
+        if key not in self._targets:
+            return
+
+        if key in self._active:
+            self._stop_group(self._active.pop(key))
+            self._samples.pop(key, None)
+            self._warm.discard(key)
+            self._build_poll_set()
+
+        self._targets.pop(key)
+        self._queue.remove(key)
+        self._estimates.pop(key, None)
+
+    def keys(self):
+        """
+        Gets keys of logical groups.
+
+        Returns:
+            a list of logical group keys
+        """
+
+        return list(self._targets)
+
+    def active(self):
+        """
+        Gets keys of logical groups currently monitored.
+
+        Returns:
+            a list of logical group keys
+        """
+
+        return list(self._active)
+
+    def poll(self):
+        """
+        Polls active monitoring groups, rotates them at the end of a slice.
+        Should be called periodically, at the sampling interval.
+        """
+
+        if not self._active:
+            self._rotate()
+            if not self._active:
+                return
+
+        self._poll_set.poll()
+
+        for key, values in zip(self._active, self._poll_set.values):
+            self._samples[key].append([getattr(values, field) for field in self.fields])
+
+        self._slice_polls_done += 1
+        if self._slice_polls_done >= self.slice_polls:
+            self._finish_slice()
+            self._rotate()
+
+    def get_estimates(self):
+        """
+        Gets estimates of all logical groups monitored at least once.
+
+        Returns:
+            logical group key to MonEstimate map
+        """
+
+        now = self.clock()
+        cycle = self._cycle_duration()
+        estimates = {}
+
+        for key, (values, timestamp, samples) in self._estimates.items():
+            staleness = max(now - timestamp, 0.0)
+            confidence = samples / self._expected_samples()
+            if cycle is not None and staleness > cycle:
+                confidence *= cycle / staleness
+            estimates[key] = MonEstimate(values=values, timestamp=timestamp,
+                                         staleness=staleness,
+                                         confidence=min(confidence, 1.0),
+                                         samples=samples)
+
+        return estimates
+
+    def stop(self):
+        """
+        Stops all active monitoring groups.
+        """
+
+        for group in self._active.values():
+            self._stop_group(group)
+
+        self._active = OrderedDict()
+        self._poll_set = None
+        self._samples = {}
+        self._warm = set()
+        self._slice_polls_done = 0
+
+    def _expected_samples(self):
+        "Number of valid samples in a complete slice."
+
+        if any(field in WARMUP_FIELDS for field in self.fields):
+            return self.slice_polls - self.warmup_polls
+
+        return self.slice_polls
+
+    def _cycle_duration(self):
+        "Time needed to monitor all logical groups once, None if unknown."
+
+        if self._slice_duration is None or not self._targets:
+            return None
+
+        slices = math.ceil(len(self._targets) / self.max_groups)
+        return slices * self._slice_duration
+
+    def _finish_slice(self):
+        "Computes estimates of logical groups monitored in the slice."
+
+        now = self.clock()
+        if self._slice_start is not None:
+            self._slice_duration = now - self._slice_start
+
+        for key, samples in self._samples.items():
+            values = {}
+            valid = len(samples)
+            for i, field in enumerate(self.fields):
+                column = [sample[i] for sample in samples]
+                if field in WARMUP_FIELDS and key not in self._warm:
+                    column = column[self.warmup_polls:]
+                    valid = min(valid, len(column))
+                if column:
+                    values[field] = sum(column) / len(column)
+
+            if valid:
+                self._estimates[key] = (values, now, valid)
+
+    def _rotate(self):
+        "Stops active monitoring groups and starts next logical groups."
+
+        if len(self._targets) <= self.max_groups:
+            self._continue()
+            return
+
+        self.stop()
+
+        for _ in range(len(self._queue)):
+            if len(self._active) >= self.max_groups:
+                break
+
+            key = self._queue.popleft()
+            self._queue.append(key)
+
+            group = self._start_group(self._targets[key])
+            if group is None:
+                continue
+
+            self._active[key] = group
+            self._samples[key] = []
+
+        self._build_poll_set()
+        self._slice_start = self.clock()
+
+    def _continue(self):
+        "Keeps active monitoring groups running, starts inactive ones."
+
+        # groups were running for the whole slice, warm-up is done
+        self._warm.update(self._active)
+
+        for key, target in self._targets.items():
+            if key in self._active:
+                continue
+
+            group = self._start_group(target)
+            if group is not None:
+                self._active[key] = group
+
+        self._samples = {key: [] for key in self._active}
+        self._slice_polls_done = 0
+        self._build_poll_set()
+        self._slice_start = self.clock()
+
+    def _build_poll_set(self):
+        "Builds poll set of active monitoring groups."
+
+        self._poll_set = PollSet(self._active.values()) if self._active else None
+
+    def _start_group(self, target):
+        "Starts monitoring group, returns None on error."
+
+        target_type, ids = target
+
+        try:
+            if target_type == 'cores':
+                return self.mon.start(list(ids), self.events)
+            return self.mon.start_pids(list(ids), self.events)
+        except PqosError:
+            return None
+
+    @staticmethod
+    def _stop_group(group):
+        "Stops monitoring group, errors are ignored."
+
+        try:
+            group.stop()
+        except PqosError:
+            pass
@@ -240,3 +240,83 @@ class PqosMon:
         groups_arr = (ctypes.POINTER(CPqosMonData) * num_groups)(*refs)
         ret = self.pqos.lib.pqos_mon_poll(groups_arr, num_groups)
         pqos_handle_error('pqos_mon_poll', ret)
+
+
+class PollSet(object):
+    """
+    Fixed set of monitoring groups polled together.
+    Pointer array passed to PQoS library is built once and, after each poll,
+    event values of all groups are copied into one contiguous array
+    of CPqosEventValues structures, so values can be read without
+    per-field Python objects, e.g. as a NumPy structured array view.
+    """
+
+    def __init__(self, groups):
+        """
+        Initializes poll set.
+
+        Parameters:
+            groups: a list of CPqosMonData monitoring objects, groups
+                    are kept referenced as long as the poll set exists
+        """
+
+        self.pqos = Pqos()
+        self.groups = tuple(groups)
+
+        num_groups = len(self.groups)
+        refs = [group.get_ref() for group in self.groups]
+        self._groups_arr = (ctypes.POINTER(CPqosMonData) * num_groups)(*refs)
+
+        # contiguous storage for event values of all groups
+        self.values = (CPqosEventValues * num_groups)()
+
+        # pairs of byte views (destination, source) of event values,
+        # slice assignment copies values without per-call ctypes overhead
+        values_size = ctypes.sizeof(CPqosEventValues)
+        values_offset = CPqosMonData.values.offset
+        values_end = values_offset + values_size
+        values_view = memoryview(self.values).cast('B')
+        self._copy_views = [(values_view[i * values_size:(i + 1) * values_size],
+                             memoryview(group).cast('B')[values_offset:values_end])
+                            for i, group in enumerate(self.groups)]
+
+    def __len__(self):
+        return len(self.groups)
+
+    def poll(self):
+        """
+        Polls monitoring data of all groups and updates event values.
+        """
+
+        if not self.groups:
+            return
+
+        ret = self.pqos.lib.pqos_mon_poll(self._groups_arr, len(self.groups))
+        pqos_handle_error('pqos_mon_poll', ret)
+
+        for dst_view, src_view in self._copy_views:
+            dst_view[:] = src_view
+
+    def memoryview(self):
+        """
+        Gets a memory view of event values of all groups.
+
+        Returns:
+            memoryview over contiguous CPqosEventValues array
+        """
+
+        return memoryview(self.values)
+
+    def as_numpy(self):
+        """
+        Gets event values of all groups as NumPy structured array,
+        the array is a view, updated in place on each poll.
+        Requires NumPy.
+
+        Returns:
+            NumPy structured array, one element per group
+        """
+
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        return numpy.ctypeslib.as_array(self.values)
@@ -0,0 +1,171 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Binding layer for PQoS library.
+It loads PQoS library and C library once per process and declares argument
+and return types of all PQoS library functions used by this package.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+import ctypes.util
+import functools
+
+
+LIBPQOS_NAME = 'libpqos.so.4'
+
+_UINT = ctypes.c_uint
+_INT = ctypes.c_int
+_ENUM = ctypes.c_int
+_PID = ctypes.c_int
+_PTR = ctypes.c_void_p
+_UINT_ARRAY = ctypes.POINTER(ctypes.c_uint)
+
+# Function prototypes: name -> (restype, argtypes)
+# Pointers to PQoS structures are declared as void pointers, so arrays,
+# pointers and byref() references can be passed to the functions.
+PROTOTYPES = {
+    # initialization
+    'pqos_init': (_INT, [_PTR]),
+    'pqos_fini': (_INT, []),
+
+    # capabilities
+    'pqos_cap_get': (_INT, [_PTR, _PTR]),
+    'pqos_cap_get_type': (_INT, [_PTR, _ENUM, _PTR]),
+    'pqos_l3ca_get_cos_num': (_INT, [_PTR, _PTR]),
+    'pqos_l2ca_get_cos_num': (_INT, [_PTR, _PTR]),
+    'pqos_mba_get_cos_num': (_INT, [_PTR, _PTR]),
+    'pqos_l3ca_cdp_enabled': (_INT, [_PTR, _PTR, _PTR]),
+    'pqos_l2ca_cdp_enabled': (_INT, [_PTR, _PTR, _PTR]),
+    'pqos_mba_ctrl_enabled': (_INT, [_PTR, _PTR, _PTR]),
+
+    # CPU information
+    'pqos_get_vendor': (_ENUM, [_PTR]),
+    'pqos_cpu_get_sockets': (_UINT_ARRAY, [_PTR, _PTR]),
+    'pqos_cpu_get_l2ids': (_UINT_ARRAY, [_PTR, _PTR]),
+    'pqos_cpu_get_cores_l3id': (_UINT_ARRAY, [_PTR, _UINT, _PTR]),
+    'pqos_cpu_get_cores': (_UINT_ARRAY, [_PTR, _UINT, _PTR]),
+    'pqos_cpu_get_core_info': (_PTR, [_PTR, _UINT]),
+    'pqos_cpu_get_one_core': (_INT, [_PTR, _UINT, _PTR]),
+    'pqos_cpu_get_one_by_l2id': (_INT, [_PTR, _UINT, _PTR]),
+    'pqos_cpu_check_core': (_INT, [_PTR, _UINT]),
+    'pqos_cpu_get_socketid': (_INT, [_PTR, _UINT, _PTR]),
+    'pqos_cpu_get_clusterid': (_INT, [_PTR, _UINT, _PTR]),
+
+    # allocation
+    'pqos_alloc_assoc_set': (_INT, [_UINT, _UINT]),
+    'pqos_alloc_assoc_get': (_INT, [_UINT, _PTR]),
+    'pqos_alloc_assoc_set_cores': (_INT, [_PTR, _UINT, _UINT]),
+    'pqos_alloc_assoc_get_cores': (_INT, [_PTR, _UINT, _PTR]),
+    'pqos_alloc_assoc_set_pid': (_INT, [_PID, _UINT]),
+    'pqos_alloc_assoc_get_pid': (_INT, [_PID, _PTR]),
+    'pqos_alloc_assign': (_INT, [_UINT, _PTR, _UINT, _PTR]),
+    'pqos_alloc_release': (_INT, [_PTR, _UINT]),
+    'pqos_alloc_assign_pid': (_INT, [_UINT, _PTR, _UINT, _PTR]),
+    'pqos_alloc_release_pid': (_INT, [_PTR, _UINT]),
+    'pqos_alloc_reset': (_INT, [_ENUM, _ENUM, _ENUM]),
+    'pqos_pid_get_pid_assoc': (_UINT_ARRAY, [_UINT, _PTR]),
+    'pqos_l3ca_set': (_INT, [_UINT, _UINT, _PTR]),
+    'pqos_l3ca_get': (_INT, [_UINT, _UINT, _PTR, _PTR]),
+    'pqos_l3ca_get_min_cbm_bits': (_INT, [_PTR]),
+    'pqos_l2ca_set': (_INT, [_UINT, _UINT, _PTR]),
+    'pqos_l2ca_get': (_INT, [_UINT, _UINT, _PTR, _PTR]),
+    'pqos_l2ca_get_min_cbm_bits': (_INT, [_PTR]),
+    'pqos_mba_set': (_INT, [_UINT, _UINT, _PTR, _PTR]),
+    'pqos_mba_get': (_INT, [_UINT, _UINT, _PTR, _PTR]),
+
+    # monitoring
+    'pqos_mon_reset': (_INT, []),
+    'pqos_mon_assoc_get': (_INT, [_UINT, _PTR]),
+    'pqos_mon_start': (_INT, [_UINT, _PTR, _ENUM, _PTR, _PTR]),
+    'pqos_mon_start_pids': (_INT, [_UINT, _PTR, _ENUM, _PTR, _PTR]),
+    'pqos_mon_add_pids': (_INT, [_UINT, _PTR, _PTR]),
+    'pqos_mon_remove_pids': (_INT, [_UINT, _PTR, _PTR]),
+    'pqos_mon_stop': (_INT, [_PTR]),
+    'pqos_mon_poll': (_INT, [_PTR, _UINT]),
+}
+
+
+def declare_prototypes(lib, prototypes):
+    """
+    Sets argument and return types of library functions.
+    Functions not exported by the library are skipped.
+
+    Parameters:
+        lib: ctypes library object
+        prototypes: a dictionary of function prototypes
+    """
+
+    for name, (restype, argtypes) in prototypes.items():
+        try:
+            func = getattr(lib, name)
+        except AttributeError:
+            continue
+
+        func.restype = restype
+        func.argtypes = argtypes
+
+
+@functools.lru_cache(maxsize=None)
+def load_libpqos():
+    """
+    Loads PQoS library and declares function prototypes,
+    the library is loaded only once.
+
+    Returns:
+        PQoS library object
+    """
+
+    lib = ctypes.cdll.LoadLibrary(LIBPQOS_NAME)
+    declare_prototypes(lib, PROTOTYPES)
+    return lib
+
+
+@functools.lru_cache(maxsize=None)
+def load_libc():
+    """
+    Loads C library, the library is loaded only once.
+
+    Returns:
+        C library object
+    """
+
+    libc_path = ctypes.util.find_library('c')
+
+    if not libc_path:
+        raise Exception('Cannot find libc')
+
+    libc = ctypes.cdll.LoadLibrary(libc_path)
+    libc.free.restype = None
+    libc.free.argtypes = [_PTR]
+    return libc
@@ -41,6 +41,7 @@ import ctypes
 import sys
 
 from pqos.common import pqos_handle_error
+from pqos.native import load_libpqos
 
 
 class CPqosConfig(ctypes.Structure):
@@ -112,7 +113,8 @@ class Pqos(object):
     def __init__(self):
         "Finds PQoS library and constructs a new object."
 
-        self.lib = ctypes.cdll.LoadLibrary('libpqos.so.4')
+        # PQoS library is loaded only once, even if __init__ is called again
+        self.lib = load_libpqos()
 
     def init(self, interface, log_file=None, log_callback=None,
              log_context=None, verbose='default'):
@@ -0,0 +1,217 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for aio module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import asyncio
+import threading
+import unittest
+
+from unittest.mock import MagicMock
+
+from pqos.test.mock_pqos import mock_pqos_lib
+
+from pqos.aio import AsyncMonitor, DROP, COALESCE, _SampleChannel
+from pqos.error import PqosError
+from pqos.monitoring import CPqosMonData
+
+
+def build_poll_mock(threads=None):
+    """
+    Builds pqos_mon_poll() mock, each poll increments LLC occupancy
+    and sets local memory bandwidth delta to 1.
+    """
+
+    def pqos_mon_poll_mock(groups_arr, num_groups):
+        "Mock pqos_mon_poll()."
+
+        if threads is not None:
+            threads.add(threading.current_thread().name)
+
+        for i in range(num_groups):
+            values = groups_arr[i].contents.values
+            values.llc += 1
+            values.mbm_local_delta = 1
+        return 0
+
+    return MagicMock(side_effect=pqos_mon_poll_mock)
+
+
+def run(coro):
+    "Runs coroutine in a new event loop."
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def collect(monitor, count, consumer_delay=0, **kwargs):
+    "Collects given number of samples."
+
+    samples = []
+    agen = monitor.samples(**kwargs)
+    try:
+        async for sample in agen:
+            samples.append(sample)
+            if len(samples) == count:
+                break
+            if consumer_delay:
+                await asyncio.sleep(consumer_delay)
+    finally:
+        await agen.aclose()
+
+    return samples
+
+
+class TestAsyncMonitor(unittest.TestCase):
+    "Tests for AsyncMonitor class."
+
+    @mock_pqos_lib
+    def test_poll(self, lib):
+        "Tests poll() method, poll is run on executor thread."
+
+        threads = set()
+        lib.pqos_mon_poll = build_poll_mock(threads)
+
+        monitor = AsyncMonitor([CPqosMonData(), CPqosMonData()])
+        values = run(monitor.poll())
+        monitor.close()
+
+        self.assertEqual([value.llc for value in values], [1, 1])
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.current_thread().name, threads)
+
+    @mock_pqos_lib
+    def test_samples(self, lib):
+        "Tests samples() method, deadlines do not drift."
+
+        lib.pqos_mon_poll = build_poll_mock()
+
+        monitor = AsyncMonitor([CPqosMonData()])
+        samples = run(collect(monitor, 5, interval=0.01))
+        monitor.close()
+
+        self.assertEqual([sample.values[0].llc for sample in samples], [1, 2, 3, 4, 5])
+
+        # deadlines are multiples of interval from the first one, missed
+        # deadlines (if any) are skipped and counted
+        first = samples[0].deadline - samples[0].seq * 0.01
+        for prev, sample in zip(samples, samples[1:]):
+            self.assertEqual(sample.seq, prev.seq + 1 + sample.skipped)
+        for sample in samples:
+            self.assertAlmostEqual(sample.deadline, first + sample.seq * 0.01, places=9)
+            self.assertGreaterEqual(sample.timestamp, sample.deadline)
+
+        # samples are copies
+        self.assertIsNot(samples[0].values, samples[1].values)
+
+    @mock_pqos_lib
+    def test_samples_drop(self, lib):
+        "Tests samples() method with slow consumer and drop policy."
+
+        lib.pqos_mon_poll = build_poll_mock()
+
+        monitor = AsyncMonitor([CPqosMonData()])
+        samples = run(collect(monitor, 3, consumer_delay=0.05, interval=0.01,
+                              policy=DROP))
+        monitor.close()
+
+        self.assertGreater(samples[2].skipped, 0)
+        # dropped samples are lost
+        self.assertEqual(samples[2].values[0].mbm_local_delta, 1)
+        self.assertGreater(samples[2].seq, samples[1].seq + 1)
+
+    @mock_pqos_lib
+    def test_samples_coalesce(self, lib):
+        "Tests samples() method with slow consumer and coalesce policy."
+
+        lib.pqos_mon_poll = build_poll_mock()
+
+        monitor = AsyncMonitor([CPqosMonData()])
+        samples = run(collect(monitor, 3, consumer_delay=0.05, interval=0.01,
+                              policy=COALESCE))
+        monitor.close()
+
+        self.assertGreater(samples[2].skipped, 0)
+        # delta values of coalesced samples are accumulated
+        self.assertEqual(samples[2].values[0].mbm_local_delta, samples[2].skipped + 1)
+        self.assertLessEqual(samples[2].values[0].llc, samples[2].seq + 1)
+
+    @mock_pqos_lib
+    def test_samples_error(self, lib):
+        "Tests samples() method, poll error is raised to the consumer."
+
+        lib.pqos_mon_poll = MagicMock(return_value=1)
+
+        monitor = AsyncMonitor([CPqosMonData()])
+        with self.assertRaises(PqosError):
+            run(collect(monitor, 1, interval=0.01))
+        monitor.close()
+
+    @mock_pqos_lib
+    def test_poller_cancel(self, lib):
+        "Tests poller cancellation is not passed to the consumer as an error."
+
+        lib.pqos_mon_poll = build_poll_mock()
+
+        async def cancel_poller(monitor):
+            channel = _SampleChannel(1, COALESCE)
+            # pylint: disable=protected-access
+            poller = asyncio.ensure_future(monitor._run_poller(0.01, channel))
+            await asyncio.sleep(0.02)
+            poller.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await poller
+            return channel
+
+        monitor = AsyncMonitor([CPqosMonData()])
+        channel = run(cancel_poller(monitor))
+        monitor.close()
+
+        self.assertIsNone(channel.error)
+
+    def test_samples_invalid_params(self):
+        "Tests samples() method with invalid parameters."
+
+        monitor = AsyncMonitor([])
+
+        for kwargs in [{'interval': 0}, {'interval': 1, 'max_pending': 0},
+                       {'interval': 1, 'policy': 'invalid'}]:
+            with self.assertRaises(ValueError):
+                run(collect(monitor, 1, **kwargs))
+
+        monitor.close()
@@ -35,6 +35,7 @@ Unit tests for allocation module.
 """
 
 from __future__ import absolute_import, division, print_function
+import array
 import ctypes
 import unittest
 
@@ -81,6 +82,84 @@ class TestPqosAlloc(unittest.TestCase):
         lib.pqos_alloc_assoc_get.assert_called_once()
         self.assertEqual(class_id, 5)
 
+    @mock_pqos_lib
+    def test_assoc_set_cores(self, lib):
+        "Tests assoc_set_cores() method."
+
+        def pqos_alloc_assoc_set_cores_m(core_array, core_array_len, class_id):
+            "Mock pqos_alloc_assoc_set_cores()."
+
+            self.assertEqual(core_array_len, 3)
+            self.assertEqual(list(core_array), [1, 4, 5])
+            self.assertEqual(class_id, 3)
+            return 0
+
+        lib.pqos_alloc_assoc_set = MagicMock(return_value=0)
+        func_mock = MagicMock(side_effect=pqos_alloc_assoc_set_cores_m)
+        lib.pqos_alloc_assoc_set_cores = func_mock
+
+        alloc = PqosAlloc()
+        alloc.assoc_set_cores([1, 4, 5], 3)
+
+        lib.pqos_alloc_assoc_set_cores.assert_called_once()
+        lib.pqos_alloc_assoc_set.assert_not_called()
+
+    @mock_pqos_lib
+    def test_assoc_set_cores_empty(self, lib):
+        "Tests assoc_set_cores() method with no cores."
+        # pylint: disable=no-self-use
+
+        lib.pqos_alloc_assoc_set_cores = MagicMock(return_value=0)
+
+        alloc = PqosAlloc()
+        alloc.assoc_set_cores([], 3)
+
+        lib.pqos_alloc_assoc_set_cores.assert_not_called()
+
+    @mock_pqos_lib
+    def test_assoc_set_map(self, lib):
+        "Tests assoc_set_map() method."
+
+        calls = []
+
+        def pqos_alloc_assoc_set_cores_m(core_array, core_array_len, class_id):
+            "Mock pqos_alloc_assoc_set_cores()."
+
+            self.assertEqual(core_array_len, len(core_array))
+            calls.append((list(core_array), class_id))
+            return 0
+
+        func_mock = MagicMock(side_effect=pqos_alloc_assoc_set_cores_m)
+        lib.pqos_alloc_assoc_set_cores = func_mock
+
+        alloc = PqosAlloc()
+        alloc.assoc_set_map({0: 0, 1: 2, 2: 0, 3: 2, 4: 1})
+
+        # one call per class of service
+        self.assertEqual(sorted(calls), [([0, 2], 0), ([1, 3], 2), ([4], 1)])
+
+    @mock_pqos_lib
+    def test_assoc_get_cores(self, lib):
+        "Tests assoc_get_cores() method."
+
+        def pqos_alloc_assoc_get_cores_m(core_array, core_array_len,
+                                         class_ids):
+            "Mock pqos_alloc_assoc_get_cores()."
+
+            self.assertEqual(core_array_len, 4)
+            for i in range(core_array_len):
+                class_ids[i] = core_array[i] % 3
+            return 0
+
+        func_mock = MagicMock(side_effect=pqos_alloc_assoc_get_cores_m)
+        lib.pqos_alloc_assoc_get_cores = func_mock
+
+        alloc = PqosAlloc()
+        assoc = alloc.assoc_get_cores([0, 1, 2, 5])
+
+        lib.pqos_alloc_assoc_get_cores.assert_called_once()
+        self.assertEqual(assoc, {0: 0, 1: 1, 2: 2, 5: 2})
+
     @mock_pqos_lib
     def test_assoc_set_pid(self, lib):
         "Tests assoc_set_pid() method."
@@ -93,6 +172,26 @@ class TestPqosAlloc(unittest.TestCase):
 
         lib.pqos_alloc_assoc_set_pid.assert_called_once_with(2, 1)
 
+    @mock_pqos_lib
+    def test_assoc_set_pids(self, lib):
+        "Tests assoc_set_pids() method."
+        # pylint: disable=no-self-use
+
+        lib.pqos_alloc_assoc_set_pid = MagicMock(return_value=0)
+        lib.pqos_alloc_release_pid = MagicMock(return_value=0)
+
+        alloc = PqosAlloc()
+        alloc.assoc_set_pids([100, 101], 2)
+
+        self.assertEqual(lib.pqos_alloc_assoc_set_pid.call_count, 2)
+        lib.pqos_alloc_assoc_set_pid.assert_any_call(100, 2)
+        lib.pqos_alloc_assoc_set_pid.assert_any_call(101, 2)
+
+        # default class of service, single library call
+        alloc.assoc_set_pids([100, 101], 0)
+        lib.pqos_alloc_release_pid.assert_called_once()
+        self.assertEqual(lib.pqos_alloc_assoc_set_pid.call_count, 2)
+
     @mock_pqos_lib
     def test_assoc_get_pid(self, lib):
         "Tests assoc_get_pid() method."
@@ -248,6 +347,44 @@ class TestPqosAlloc(unittest.TestCase):
         self.assertEqual(pids[2], 3000)
         self.assertEqual(pids[3], 5600)
 
+    @mock_pqos_lib
+    def test_get_pids_as_array(self, lib):
+        "Tests get_pids() method with array return mode."
+
+        pids_uint = [ctypes.c_uint(pid) for pid in [1000, 1500, 3000, 5600]]
+        pid_array = ctypes_build_array(pids_uint)
+
+        def pqos_pid_get_pid_assoc_m(_class_id, count_ref):
+            "Mock pqos_pid_get_pid_assoc()."
+
+            ctypes_ref_set_uint(count_ref, len(pid_array))
+            return ctypes.cast(pid_array, ctypes.POINTER(ctypes.c_uint))
+
+        lib.pqos_pid_get_pid_assoc = MagicMock(side_effect=pqos_pid_get_pid_assoc_m)
+
+        alloc = PqosAlloc()
+
+        with patch('pqos.allocation.free_memory'):
+            pids = alloc.get_pids(7, as_array=True)
+
+        self.assertIsInstance(pids, array.array)
+        self.assertEqual(pids.tolist(), [1000, 1500, 3000, 5600])
+
+    @mock_pqos_lib
+    def test_get_pids_empty_as_array(self, lib):
+        "Tests get_pids() method with array return mode and no PIDs."
+
+        lib.pqos_pid_get_pid_assoc = MagicMock(return_value=None)
+
+        alloc = PqosAlloc()
+
+        with patch('pqos.allocation.free_memory') as free_memory_mock:
+            pids = alloc.get_pids(7, as_array=True)
+            free_memory_mock.assert_not_called()
+
+        self.assertIsInstance(pids, array.array)
+        self.assertEqual(len(pids), 0)
+
     @mock_pqos_lib
     def test_reset(self, lib):
         "Tests reset() method."
@@ -35,6 +35,7 @@ Unit tests for CPU information module.
 """
 
 from __future__ import absolute_import, division, print_function
+import array
 import ctypes
 import unittest
 
@@ -186,6 +187,31 @@ class TestPqosCpuInfo(unittest.TestCase):
         self.assertEqual(sockets[2], 2)
         self.assertEqual(sockets[3], 3)
 
+    @mock_pqos_lib
+    def test_get_sockets_as_array(self, lib):
+        "Tests get_sockets() method with array return mode."
+
+        sockets_mock = [ctypes.c_uint(socket) for socket in [0, 1, 2, 3]]
+        sockets_arr = ctypes_build_array(sockets_mock)
+
+        def pqos_cpu_get_sockets_m(_p_cpu, count_ref):
+            "Mock pqos_cpu_get_sockets()."
+
+            ctypes_ref_set_int(count_ref, len(sockets_arr))
+            return ctypes.cast(sockets_arr, ctypes.POINTER(ctypes.c_uint))
+
+        lib.pqos_cap_get = MagicMock(return_value=0)
+        lib.pqos_cpu_get_sockets = MagicMock(side_effect=pqos_cpu_get_sockets_m)
+
+        cpu = PqosCpuInfo()
+
+        with patch('pqos.cpuinfo.free_memory') as free_memory_mock:
+            sockets = cpu.get_sockets(as_array=True)
+            free_memory_mock.assert_called_once()
+
+        self.assertIsInstance(sockets, array.array)
+        self.assertEqual(sockets.tolist(), [0, 1, 2, 3])
+
     @mock_pqos_lib
     def test_get_l2ids(self, lib):
         "Tests get_l2ids() method."
@@ -281,7 +307,7 @@ class TestPqosCpuInfo(unittest.TestCase):
             "Mock pqos_cpu_get_core_info()."
 
             self.assertEqual(core, 1)
-            return ctypes.pointer(coreinfo_mock)
+            return ctypes.addressof(coreinfo_mock)
 
         lib.pqos_cap_get = MagicMock(return_value=0)
         lib.pqos_cpu_get_core_info = MagicMock(side_effect=pqos_get_core_info_m)
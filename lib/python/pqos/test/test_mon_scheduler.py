@@ -0,0 +1,305 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for mon_scheduler module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import unittest
+
+from unittest.mock import MagicMock
+
+from pqos.test.mock_pqos import mock_pqos_lib
+
+from pqos.error import PqosErrorResource
+from pqos.monitoring import CPqosMonData
+from pqos.mon_scheduler import MonScheduler
+
+
+class FakeClock(object):
+    "Clock advanced manually."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_mon(started):
+    """
+    Builds PqosMon mock, started groups are recorded
+    as (target type, ids, group) tuples.
+    """
+
+    def start_mock(ids, _events):
+        group = CPqosMonData()
+        started.append(('cores', ids, group))
+        return group
+
+    def start_pids_mock(ids, _events):
+        group = CPqosMonData()
+        started.append(('pids', ids, group))
+        return group
+
+    mon = MagicMock()
+    mon.start = MagicMock(side_effect=start_mock)
+    mon.start_pids = MagicMock(side_effect=start_pids_mock)
+    return mon
+
+
+def build_poll_mock(clock, llc_step=100, mbm_delta=10):
+    """
+    Builds pqos_mon_poll() mock, each poll advances the clock by 1s,
+    LLC occupancy grows by llc_step per poll of the same poll set (slice).
+    """
+
+    polls = {}
+
+    def pqos_mon_poll_mock(groups_arr, num_groups):
+        "Mock pqos_mon_poll()."
+
+        clock.now += 1
+        count = polls.get(id(groups_arr), 0) + 1
+        polls[id(groups_arr)] = count
+        for i in range(num_groups):
+            group = groups_arr[i].contents
+            group.values.llc = llc_step * count
+            group.values.mbm_local_delta = mbm_delta
+        return 0
+
+    return MagicMock(side_effect=pqos_mon_poll_mock)
+
+
+class TestMonScheduler(unittest.TestCase):
+    "Tests for MonScheduler class."
+
+    def test_invalid_params(self):
+        "Tests invalid scheduler parameters."
+
+        mon = MagicMock()
+
+        with self.assertRaises(ValueError):
+            MonScheduler(['l3_occup'], 0, mon=mon)
+
+        with self.assertRaises(ValueError):
+            MonScheduler(['l3_occup'], 2, slice_polls=2, warmup_polls=2, mon=mon)
+
+        with self.assertRaises(ValueError):
+            MonScheduler(['l3_occup'], 2, warmup_polls=-1, mon=mon)
+
+    @mock_pqos_lib
+    def test_rotation(self, lib):
+        "Tests round-robin rotation of logical groups."
+
+        clock = FakeClock()
+        started = []
+        lib.pqos_mon_poll = build_poll_mock(clock)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        sched = MonScheduler(['l3_occup'], 2, slice_polls=3, warmup_polls=1,
+                             mon=build_mon(started), clock=clock)
+        for core in range(5):
+            sched.add_cores(f'core{core}', [core])
+
+        sched.poll()
+        self.assertEqual(sched.active(), ['core0', 'core1'])
+        sched.poll()
+        sched.poll()
+        self.assertEqual(sched.active(), ['core2', 'core3'])
+        self.assertEqual(lib.pqos_mon_stop.call_count, 2)
+
+        for _ in range(3):
+            sched.poll()
+        self.assertEqual(sched.active(), ['core4', 'core0'])
+
+        self.assertEqual([ids for _, ids, _ in started],
+                         [[0], [1], [2], [3], [4], [0]])
+
+        # never more than max_groups started at a time
+        self.assertEqual(len(started) - lib.pqos_mon_stop.call_count, 2)
+
+    @mock_pqos_lib
+    def test_no_rotation(self, lib):
+        "Tests logical groups fitting in max_groups are kept running."
+
+        clock = FakeClock()
+        started = []
+        lib.pqos_mon_poll = build_poll_mock(clock)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        sched = MonScheduler(['l3_occup'], 3, slice_polls=3, warmup_polls=1,
+                             mon=build_mon(started), clock=clock)
+        sched.add_cores('a', [0])
+        sched.add_cores('b', [1])
+
+        for _ in range(3):
+            sched.poll()
+        self.assertEqual(sched.get_estimates()['a'].samples, 2)
+
+        # no warm-up in the next slice
+        for _ in range(3):
+            sched.poll()
+        self.assertEqual(sched.get_estimates()['a'].samples, 3)
+        self.assertEqual(sched.active(), ['a', 'b'])
+        lib.pqos_mon_stop.assert_not_called()
+
+        # new logical group is started at the end of slice,
+        # others keep running
+        sched.add_cores('c', [2])
+        for _ in range(3):
+            sched.poll()
+        self.assertEqual(sched.active(), ['a', 'b', 'c'])
+        for _ in range(3):
+            sched.poll()
+        lib.pqos_mon_stop.assert_not_called()
+        self.assertEqual([ids for _, ids, _ in started], [[0], [1], [2]])
+        self.assertEqual(sched.get_estimates()['c'].samples, 2)
+
+        # too many logical groups, rotation starts
+        sched.add_cores('d', [3])
+        for _ in range(3):
+            sched.poll()
+        self.assertEqual(lib.pqos_mon_stop.call_count, 3)
+
+    @mock_pqos_lib
+    def test_estimates(self, lib):
+        "Tests estimates, warm-up samples of LLC occupancy are discarded."
+
+        clock = FakeClock()
+        lib.pqos_mon_poll = build_poll_mock(clock, llc_step=100, mbm_delta=10)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        sched = MonScheduler(['l3_occup', 'lmem_bw'], 1, slice_polls=3,
+                             warmup_polls=1, mon=build_mon([]), clock=clock)
+        sched.add_cores('a', [0])
+        sched.add_pids('b', [1000])
+
+        for _ in range(3):
+            sched.poll()
+
+        estimates = sched.get_estimates()
+        self.assertEqual(list(estimates), ['a'])
+
+        estimate = estimates['a']
+        # samples 200 and 300 used, 100 discarded
+        self.assertEqual(estimate.values['llc'], 250)
+        self.assertEqual(estimate.values['mbm_local_delta'], 10)
+        self.assertEqual(estimate.samples, 2)
+        self.assertEqual(estimate.staleness, 0)
+        self.assertEqual(estimate.confidence, 1.0)
+
+        for _ in range(3):
+            sched.poll()
+
+        estimates = sched.get_estimates()
+        self.assertEqual(sorted(estimates), ['a', 'b'])
+        self.assertEqual(estimates['a'].staleness, 3)
+        self.assertEqual(estimates['a'].confidence, 1.0)
+
+    @mock_pqos_lib
+    def test_confidence_stale(self, lib):
+        "Tests confidence of estimates older than a rotation cycle."
+
+        clock = FakeClock()
+        lib.pqos_mon_poll = build_poll_mock(clock)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        sched = MonScheduler(['l3_occup'], 2, slice_polls=2, warmup_polls=1,
+                             mon=build_mon([]), clock=clock)
+        sched.add_cores('a', [0])
+
+        sched.poll()
+        sched.poll()
+
+        # slice lasts 2s, single slice per cycle
+        clock.now += 2
+        self.assertEqual(sched.get_estimates()['a'].confidence, 1.0)
+        clock.now += 6
+        self.assertEqual(sched.get_estimates()['a'].staleness, 8)
+        self.assertEqual(sched.get_estimates()['a'].confidence, 0.25)
+
+    @mock_pqos_lib
+    def test_start_error(self, lib):
+        "Tests logical groups failing to start are skipped."
+
+        clock = FakeClock()
+        lib.pqos_mon_poll = build_poll_mock(clock)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        started = []
+        mon = build_mon(started)
+        start_mock = mon.start.side_effect
+
+        def start_error_mock(ids, events):
+            if ids == [1]:
+                raise PqosErrorResource('pqos_mon_start returned 3', 3)
+            return start_mock(ids, events)
+
+        mon.start.side_effect = start_error_mock
+
+        sched = MonScheduler(['l3_occup'], 2, slice_polls=2, warmup_polls=1,
+                             mon=mon, clock=clock)
+        for core in range(3):
+            sched.add_cores(f'core{core}', [core])
+
+        sched.poll()
+        self.assertEqual(sched.active(), ['core0', 'core2'])
+
+    @mock_pqos_lib
+    def test_remove(self, lib):
+        "Tests removing active logical group."
+
+        clock = FakeClock()
+        lib.pqos_mon_poll = build_poll_mock(clock)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        sched = MonScheduler(['l3_occup'], 2, slice_polls=3, warmup_polls=1,
+                             mon=build_mon([]), clock=clock)
+        sched.add_cores('a', [0])
+        sched.add_cores('b', [1])
+
+        sched.poll()
+        sched.remove('a')
+
+        lib.pqos_mon_stop.assert_called_once()
+        self.assertEqual(sched.active(), ['b'])
+        self.assertEqual(sched.keys(), ['b'])
+
+        sched.poll()
+        sched.poll()
+        self.assertEqual(list(sched.get_estimates()), ['b'])
+
+        sched.stop()
+        self.assertEqual(sched.active(), [])
@@ -44,7 +44,13 @@ from pqos.test.helper import ctypes_ref_set_uint
 from pqos.test.mock_pqos import mock_pqos_lib
 
 from pqos.capability import CPqosMonitor
-from pqos.monitoring import PqosMon, CPqosEventValues, CPqosMonData
+from pqos.error import PqosError
+from pqos.monitoring import PqosMon, PollSet, CPqosEventValues, CPqosMonData
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class TestPqosMon(unittest.TestCase):
@@ -283,3 +289,99 @@ class TestCPqosMonData(unittest.TestCase):
         group_mock.remove_pids([555, 444, 321, 121])
 
         lib.pqos_mon_remove_pids.assert_called_once()
+
+
+class TestPollSet(unittest.TestCase):
+    "Tests for PollSet class."
+
+    @staticmethod
+    def build_poll_mock(llc_values):
+        "Builds pqos_mon_poll() mock setting LLC occupancy of each group."
+
+        calls = []
+
+        def pqos_mon_poll_mock(groups_arr, num_groups):
+            "Mock pqos_mon_poll()."
+
+            calls.append(groups_arr)
+            for i in range(num_groups):
+                groups_arr[i].contents.values.llc = llc_values[i]
+                groups_arr[i].contents.values.ipc = 0.5 * i
+            return 0
+
+        return MagicMock(side_effect=pqos_mon_poll_mock), calls
+
+    @mock_pqos_lib
+    def test_poll(self, lib):
+        "Tests poll() method."
+
+        groups = [CPqosMonData(), CPqosMonData(), CPqosMonData()]
+        lib.pqos_mon_poll, calls = self.build_poll_mock([100, 200, 300])
+
+        poll_set = PollSet(groups)
+        self.assertEqual(len(poll_set), 3)
+
+        poll_set.poll()
+
+        self.assertEqual([values.llc for values in poll_set.values], [100, 200, 300])
+        self.assertEqual(poll_set.values[2].ipc, 1.0)
+        self.assertEqual(groups[1].values.llc, 200)
+
+        # pointer array is built only once
+        poll_set.poll()
+        self.assertEqual(lib.pqos_mon_poll.call_count, 2)
+        self.assertIs(calls[0], calls[1])
+
+    @mock_pqos_lib
+    def test_poll_error(self, lib):
+        "Tests poll() method, PQoS library returns an error."
+
+        lib.pqos_mon_poll = MagicMock(return_value=1)
+
+        poll_set = PollSet([CPqosMonData()])
+
+        with self.assertRaises(PqosError):
+            poll_set.poll()
+
+    @mock_pqos_lib
+    def test_poll_empty(self, lib):
+        "Tests poll() method for an empty poll set."
+
+        lib.pqos_mon_poll = MagicMock(return_value=0)
+
+        poll_set = PollSet([])
+
+        self.assertIsNone(poll_set.poll())
+        lib.pqos_mon_poll.assert_not_called()
+
+    @mock_pqos_lib
+    def test_memoryview(self, lib):
+        "Tests memoryview() method."
+
+        lib.pqos_mon_poll, _calls = self.build_poll_mock([100, 200])
+
+        poll_set = PollSet([CPqosMonData(), CPqosMonData()])
+        view = poll_set.memoryview()
+
+        self.assertEqual(view.nbytes, 2 * ctypes.sizeof(CPqosEventValues))
+
+        poll_set.poll()
+
+        # view is updated in place
+        llc = ctypes.c_uint64.from_buffer(view.cast('B'), ctypes.sizeof(CPqosEventValues))
+        self.assertEqual(llc.value, 200)
+
+    @unittest.skipIf(numpy is None, 'NumPy not installed')
+    @mock_pqos_lib
+    def test_as_numpy(self, lib):
+        "Tests as_numpy() method."
+
+        lib.pqos_mon_poll, _calls = self.build_poll_mock([100, 200])
+
+        poll_set = PollSet([CPqosMonData(), CPqosMonData()])
+        values = poll_set.as_numpy()
+
+        poll_set.poll()
+
+        self.assertEqual(values['llc'].tolist(), [100, 200])
+        self.assertEqual(values['ipc'].tolist(), [0.0, 0.5])
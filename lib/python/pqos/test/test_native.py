@@ -0,0 +1,109 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2022 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for native module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from pqos import Pqos
+from pqos.common import free_memory
+from pqos.native import PROTOTYPES, declare_prototypes, load_libc, load_libpqos
+
+
+class TestNative(unittest.TestCase):
+    "Tests for native module."
+
+    def test_load_libpqos_once(self):
+        "Tests if PQoS library is loaded only once."
+
+        lib = load_libpqos()
+
+        with patch('ctypes.cdll.LoadLibrary') as load_library_mock:
+            self.assertIs(load_libpqos(), lib)
+            pqos = Pqos()
+            Pqos()
+            load_library_mock.assert_not_called()
+
+        self.assertIs(pqos.lib, lib)
+
+    def test_load_libpqos_prototypes(self):
+        "Tests if function prototypes are declared when library is loaded."
+
+        lib = load_libpqos()
+
+        self.assertEqual(lib.pqos_cpu_check_core.argtypes,
+                         [ctypes.c_void_p, ctypes.c_uint])
+        self.assertIs(lib.pqos_cpu_check_core.restype, ctypes.c_int)
+        self.assertIs(lib.pqos_cpu_get_sockets.restype,
+                      ctypes.POINTER(ctypes.c_uint))
+
+    def test_declare_prototypes(self):
+        "Tests declare_prototypes() function."
+
+        lib = MagicMock(spec=['func_a'])
+        prototypes = {
+            'func_a': (ctypes.c_int, [ctypes.c_uint]),
+            'func_b': (ctypes.c_int, []),
+        }
+
+        declare_prototypes(lib, prototypes)
+
+        self.assertIs(lib.func_a.restype, ctypes.c_int)
+        self.assertEqual(lib.func_a.argtypes, [ctypes.c_uint])
+
+    def test_prototypes_match_library(self):
+        "Tests if all declared functions are exported by PQoS library."
+
+        lib = load_libpqos()
+
+        for name in PROTOTYPES:
+            self.assertTrue(hasattr(lib, name), name)
+
+    def test_free_memory(self):
+        "Tests if free_memory() uses C library loaded once."
+
+        libc = load_libc()
+        libc.malloc.restype = ctypes.c_void_p
+        libc.malloc.argtypes = [ctypes.c_size_t]
+        ptr = libc.malloc(16)
+
+        with patch('ctypes.util.find_library') as find_library_mock:
+            free_memory(ptr)
+            find_library_mock.assert_not_called()
+
+        self.assertIs(load_libc(), libc)
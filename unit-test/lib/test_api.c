@@ -159,6 +159,71 @@ test_pqos_alloc_assoc_set_os(void **state __attribute__((unused)))
 }
 #endif
 
+/* ======== pqos_alloc_assoc_set_cores ======== */
+
+static void
+test_pqos_alloc_assoc_set_cores_init(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+
+        wrap_check_init(1, PQOS_RETVAL_INIT);
+
+        ret = pqos_alloc_assoc_set_cores(core_array, 2, 1);
+        assert_int_equal(ret, PQOS_RETVAL_INIT);
+}
+
+static void
+test_pqos_alloc_assoc_set_cores_param(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+
+        ret = pqos_alloc_assoc_set_cores(core_array, 0, 1);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+
+        ret = pqos_alloc_assoc_set_cores(NULL, 2, 1);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+}
+
+/* Check if msr API is called */
+static void
+test_pqos_alloc_assoc_set_cores_hw(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+
+        wrap_check_init(1, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_hw_alloc_assoc_set_cores, core_array, core_array);
+        expect_value(__wrap_hw_alloc_assoc_set_cores, core_num, 2);
+        expect_value(__wrap_hw_alloc_assoc_set_cores, class_id, 1);
+        will_return(__wrap_hw_alloc_assoc_set_cores, PQOS_RETVAL_OK);
+
+        ret = pqos_alloc_assoc_set_cores(core_array, 2, 1);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+}
+
+#ifdef __linux__
+/* Check if os API is called */
+static void
+test_pqos_alloc_assoc_set_cores_os(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+
+        wrap_check_init(1, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_os_alloc_assoc_set_cores, core_array, core_array);
+        expect_value(__wrap_os_alloc_assoc_set_cores, core_num, 2);
+        expect_value(__wrap_os_alloc_assoc_set_cores, class_id, 1);
+        will_return(__wrap_os_alloc_assoc_set_cores, PQOS_RETVAL_OK);
+
+        ret = pqos_alloc_assoc_set_cores(core_array, 2, 1);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+}
+#endif
+
 /* ======== pqos_alloc_assoc_get ======== */
 
 static void
@@ -219,6 +284,84 @@ test_pqos_alloc_assoc_get_os(void **state __attribute__((unused)))
         assert_int_equal(id, 5);
 }
 
+/* ======== pqos_alloc_assoc_get_cores ======== */
+
+static void
+test_pqos_alloc_assoc_get_cores_init(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+        unsigned class_ids[2];
+
+        wrap_check_init(1, PQOS_RETVAL_INIT);
+
+        ret = pqos_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_INIT);
+}
+
+static void
+test_pqos_alloc_assoc_get_cores_param(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+        unsigned class_ids[2];
+
+        ret = pqos_alloc_assoc_get_cores(core_array, 0, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+
+        ret = pqos_alloc_assoc_get_cores(NULL, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+
+        ret = pqos_alloc_assoc_get_cores(core_array, 2, NULL);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+}
+
+static void
+test_pqos_alloc_assoc_get_cores_hw(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+        unsigned class_ids[2];
+
+        wrap_check_init(1, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_hw_alloc_assoc_get_cores, core_array, core_array);
+        expect_value(__wrap_hw_alloc_assoc_get_cores, core_num, 2);
+        expect_value(__wrap_hw_alloc_assoc_get_cores, class_ids, class_ids);
+        will_return(__wrap_hw_alloc_assoc_get_cores, PQOS_RETVAL_OK);
+        will_return(__wrap_hw_alloc_assoc_get_cores, 3);
+        will_return(__wrap_hw_alloc_assoc_get_cores, 5);
+
+        ret = pqos_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+        assert_int_equal(class_ids[0], 3);
+        assert_int_equal(class_ids[1], 5);
+}
+
+#ifdef __linux__
+static void
+test_pqos_alloc_assoc_get_cores_os(void **state __attribute__((unused)))
+{
+        int ret;
+        unsigned core_array[2] = {0, 1};
+        unsigned class_ids[2];
+
+        wrap_check_init(1, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_os_alloc_assoc_get_cores, core_array, core_array);
+        expect_value(__wrap_os_alloc_assoc_get_cores, core_num, 2);
+        expect_value(__wrap_os_alloc_assoc_get_cores, class_ids, class_ids);
+        will_return(__wrap_os_alloc_assoc_get_cores, PQOS_RETVAL_OK);
+        will_return(__wrap_os_alloc_assoc_get_cores, 3);
+        will_return(__wrap_os_alloc_assoc_get_cores, 5);
+
+        ret = pqos_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+        assert_int_equal(class_ids[0], 3);
+        assert_int_equal(class_ids[1], 5);
+}
+#endif
+
 /* ======== pqos_alloc_assoc_set_pid ======== */
 
 static void
@@ -2600,6 +2743,8 @@ main(void)
 
         const struct CMUnitTest tests_init[] = {
             cmocka_unit_test(test_pqos_alloc_assoc_set_init),
+            cmocka_unit_test(test_pqos_alloc_assoc_set_cores_init),
+            cmocka_unit_test(test_pqos_alloc_assoc_get_cores_init),
             cmocka_unit_test(test_pqos_alloc_assoc_get_init),
             cmocka_unit_test(test_pqos_alloc_assoc_set_pid_init),
             cmocka_unit_test(test_pqos_alloc_assoc_get_pid_init),
@@ -2638,6 +2783,8 @@ main(void)
             cmocka_unit_test(test_pqos_alloc_assign_param_core_null),
             cmocka_unit_test(test_pqos_alloc_assign_param_core_num),
             cmocka_unit_test(test_pqos_alloc_assign_param_id_null),
+            cmocka_unit_test(test_pqos_alloc_assoc_set_cores_param),
+            cmocka_unit_test(test_pqos_alloc_assoc_get_cores_param),
             cmocka_unit_test(test_pqos_alloc_release_param),
             cmocka_unit_test(test_pqos_alloc_assign_pid_param),
             cmocka_unit_test(test_pqos_alloc_release_pid_param),
@@ -2665,6 +2812,8 @@ main(void)
 
         const struct CMUnitTest tests_hw[] = {
             cmocka_unit_test(test_pqos_alloc_assoc_set_hw),
+            cmocka_unit_test(test_pqos_alloc_assoc_set_cores_hw),
+            cmocka_unit_test(test_pqos_alloc_assoc_get_cores_hw),
             cmocka_unit_test(test_pqos_alloc_assoc_get_hw),
             cmocka_unit_test(test_pqos_alloc_assoc_set_pid_hw),
             cmocka_unit_test(test_pqos_alloc_assoc_get_pid_hw),
@@ -2700,6 +2849,8 @@ main(void)
 #ifdef __linux__
         const struct CMUnitTest tests_os[] = {
             cmocka_unit_test(test_pqos_alloc_assoc_set_os),
+            cmocka_unit_test(test_pqos_alloc_assoc_set_cores_os),
+            cmocka_unit_test(test_pqos_alloc_assoc_get_cores_os),
             cmocka_unit_test(test_pqos_alloc_assoc_get_os),
             cmocka_unit_test(test_pqos_alloc_assoc_set_pid_os),
             cmocka_unit_test(test_pqos_alloc_assoc_get_pid_os),
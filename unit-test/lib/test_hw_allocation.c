@@ -810,6 +810,50 @@ test_hw_alloc_assoc_set_unsupported(void **state)
         assert_int_equal(ret, PQOS_RETVAL_PARAM);
 }
 
+/* ======== hw_alloc_assoc_set_cores ======== */
+
+static void
+test_hw_alloc_assoc_set_cores(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned class_id = 1;
+        unsigned core_array[] = {1, 2};
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        expect_value(hw_alloc_assoc_write, lcore, 1);
+        expect_value(hw_alloc_assoc_write, class_id, class_id);
+        will_return(hw_alloc_assoc_write, PQOS_RETVAL_OK);
+        expect_value(hw_alloc_assoc_write, lcore, 2);
+        expect_value(hw_alloc_assoc_write, class_id, class_id);
+        will_return(hw_alloc_assoc_write, PQOS_RETVAL_OK);
+
+        ret = hw_alloc_assoc_set_cores(core_array, 2, class_id);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+}
+
+static void
+test_hw_alloc_assoc_set_cores_param(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned class_id = 1;
+        unsigned core_array[] = {1, 2};
+        unsigned core_array_invalid[] = {1, 1000};
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        /* no core is associated if any of them is invalid */
+        ret = hw_alloc_assoc_set_cores(core_array_invalid, 2, class_id);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+
+        ret = hw_alloc_assoc_set_cores(core_array, 2, 100);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+}
+
 /* ======== hw_alloc_assoc_get ======== */
 
 static void
@@ -847,6 +891,32 @@ test_hw_alloc_assoc_get_param(void **state)
         assert_int_equal(ret, PQOS_RETVAL_PARAM);
 }
 
+/* ======== hw_alloc_assoc_get_cores ======== */
+
+static void
+test_hw_alloc_assoc_get_cores(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned core_array[] = {1, 2};
+        unsigned class_ids[2];
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        expect_value(hw_alloc_assoc_read, lcore, 1);
+        will_return(hw_alloc_assoc_read, 3);
+        will_return(hw_alloc_assoc_read, PQOS_RETVAL_OK);
+        expect_value(hw_alloc_assoc_read, lcore, 2);
+        will_return(hw_alloc_assoc_read, 2);
+        will_return(hw_alloc_assoc_read, PQOS_RETVAL_OK);
+
+        ret = hw_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+        assert_int_equal(class_ids[0], 3);
+        assert_int_equal(class_ids[1], 2);
+}
+
 static void
 test_hw_alloc_assoc_get_unsupported(void **state)
 {
@@ -1350,7 +1420,10 @@ main(void)
             cmocka_unit_test(test_hw_l3ca_get_param),
             cmocka_unit_test(test_hw_alloc_assoc_set),
             cmocka_unit_test(test_hw_alloc_assoc_set_param),
+            cmocka_unit_test(test_hw_alloc_assoc_set_cores),
+            cmocka_unit_test(test_hw_alloc_assoc_set_cores_param),
             cmocka_unit_test(test_hw_alloc_assoc_get),
+            cmocka_unit_test(test_hw_alloc_assoc_get_cores),
             cmocka_unit_test(test_hw_alloc_assoc_get_param),
             cmocka_unit_test(test_hw_alloc_reset_unsupported_l2ca),
             cmocka_unit_test(test_hw_alloc_reset_unsupported_mba),
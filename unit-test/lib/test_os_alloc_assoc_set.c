@@ -110,6 +110,96 @@ test_os_alloc_assoc_set_param(void **state)
         assert_int_equal(ret, PQOS_RETVAL_PARAM);
 }
 
+/* ======== os_alloc_assoc_set_cores ======== */
+
+static void
+test_os_alloc_assoc_set_cores(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned class_id = 1;
+        unsigned core_array[] = {1, 2};
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        will_return(__wrap_resctrl_lock_exclusive, PQOS_RETVAL_OK);
+        will_return(__wrap_resctrl_lock_release, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_resctrl_mon_assoc_get, lcore, 1);
+        will_return(__wrap_resctrl_mon_assoc_get, PQOS_RETVAL_RESOURCE);
+        expect_value(__wrap_resctrl_mon_assoc_get, lcore, 2);
+        will_return(__wrap_resctrl_mon_assoc_get, PQOS_RETVAL_RESOURCE);
+
+        /* cpumask is written once for all cores */
+        expect_value(__wrap_resctrl_alloc_cpumask_read, class_id, class_id);
+        will_return(__wrap_resctrl_alloc_cpumask_read, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_resctrl_cpumask_set, lcore, 1);
+        expect_value(__wrap_resctrl_cpumask_set, lcore, 2);
+
+        expect_value(__wrap_resctrl_alloc_cpumask_write, class_id, class_id);
+        will_return(__wrap_resctrl_alloc_cpumask_write, PQOS_RETVAL_OK);
+
+        ret = os_alloc_assoc_set_cores(core_array, 2, class_id);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+}
+
+static void
+test_os_alloc_assoc_set_cores_active_mon(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned class_id = 1;
+        unsigned core_array[] = {1, 2};
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        will_return(__wrap_resctrl_lock_exclusive, PQOS_RETVAL_OK);
+        will_return(__wrap_resctrl_lock_release, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_resctrl_mon_assoc_get, lcore, 1);
+        will_return(__wrap_resctrl_mon_assoc_get, PQOS_RETVAL_OK);
+        expect_value(__wrap_resctrl_mon_assoc_get, lcore, 2);
+        will_return(__wrap_resctrl_mon_assoc_get, PQOS_RETVAL_RESOURCE);
+
+        expect_value(__wrap_resctrl_alloc_cpumask_read, class_id, class_id);
+        will_return(__wrap_resctrl_alloc_cpumask_read, PQOS_RETVAL_OK);
+
+        expect_value(__wrap_resctrl_cpumask_set, lcore, 1);
+        expect_value(__wrap_resctrl_cpumask_set, lcore, 2);
+
+        expect_value(__wrap_resctrl_alloc_cpumask_write, class_id, class_id);
+        will_return(__wrap_resctrl_alloc_cpumask_write, PQOS_RETVAL_OK);
+
+        /* only core 1 was monitored */
+        expect_value(__wrap_resctrl_mon_assoc_set, lcore, 1);
+        will_return(__wrap_resctrl_mon_assoc_set, PQOS_RETVAL_OK);
+
+        ret = os_alloc_assoc_set_cores(core_array, 2, class_id);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+}
+
+static void
+test_os_alloc_assoc_set_cores_param(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned class_id = 1;
+        unsigned core_array[] = {1, 2};
+        unsigned core_array_invalid[] = {1, 1000};
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        ret = os_alloc_assoc_set_cores(core_array_invalid, 2, class_id);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+
+        ret = os_alloc_assoc_set_cores(core_array, 2, 100);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+}
+
 /* ======== os_alloc_assoc_set_pid ======== */
 
 static void
@@ -194,6 +284,9 @@ main(void)
             cmocka_unit_test(test_os_alloc_assoc_set),
             cmocka_unit_test(test_os_alloc_assoc_set_param),
             cmocka_unit_test(test_os_alloc_assoc_set_active_mon),
+            cmocka_unit_test(test_os_alloc_assoc_set_cores),
+            cmocka_unit_test(test_os_alloc_assoc_set_cores_param),
+            cmocka_unit_test(test_os_alloc_assoc_set_cores_active_mon),
             cmocka_unit_test(test_os_alloc_assoc_set_pid),
             cmocka_unit_test(test_os_alloc_assoc_set_pid_param),
             cmocka_unit_test(test_os_alloc_assoc_set_pid_active_mon)};
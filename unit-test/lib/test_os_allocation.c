@@ -175,6 +175,62 @@ test_os_alloc_assign(void **state)
         assert_int_equal(class_id, 2);
 }
 
+/* ======== os_alloc_assoc_get_cores ======== */
+
+static void
+test_os_alloc_assoc_get_cores(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned core_array[] = {1, 2};
+        unsigned class_ids[2];
+        unsigned grps;
+        unsigned i;
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        ret = resctrl_alloc_get_grps_num(data->cap, &grps);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+
+        will_return(__wrap_resctrl_lock_shared, PQOS_RETVAL_OK);
+        will_return(__wrap_resctrl_lock_release, PQOS_RETVAL_OK);
+
+        /* cpumask of each COS is read once */
+        for (i = 0; i < grps; i++) {
+                expect_value(__wrap_resctrl_alloc_cpumask_read, class_id, i);
+                will_return(__wrap_resctrl_alloc_cpumask_read, PQOS_RETVAL_OK);
+        }
+
+        /* core 2 in COS 0, core 1 in COS 1 */
+        expect_value(__wrap_resctrl_cpumask_get, lcore, 1);
+        will_return(__wrap_resctrl_cpumask_get, 0);
+        expect_value(__wrap_resctrl_cpumask_get, lcore, 2);
+        will_return(__wrap_resctrl_cpumask_get, 1);
+        expect_value(__wrap_resctrl_cpumask_get, lcore, 1);
+        will_return(__wrap_resctrl_cpumask_get, 1);
+
+        ret = os_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_OK);
+        assert_int_equal(class_ids[0], 1);
+        assert_int_equal(class_ids[1], 0);
+}
+
+static void
+test_os_alloc_assoc_get_cores_param(void **state)
+{
+        struct test_data *data = (struct test_data *)*state;
+        int ret;
+        unsigned core_array[] = {1, 1000};
+        unsigned class_ids[2];
+
+        will_return_maybe(__wrap__pqos_get_cap, data->cap);
+        will_return_maybe(__wrap__pqos_get_cpu, data->cpu);
+
+        ret = os_alloc_assoc_get_cores(core_array, 2, class_ids);
+        assert_int_equal(ret, PQOS_RETVAL_PARAM);
+}
+
 /* ======== os_alloc_release ======== */
 
 static void
@@ -1541,6 +1597,8 @@ main(void)
         const struct CMUnitTest tests_all[] = {
             cmocka_unit_test(test_os_alloc_assoc_get),
             cmocka_unit_test(test_os_alloc_assoc_get_param),
+            cmocka_unit_test(test_os_alloc_assoc_get_cores),
+            cmocka_unit_test(test_os_alloc_assoc_get_cores_param),
             cmocka_unit_test(test_os_alloc_assign),
             cmocka_unit_test(test_os_alloc_release),
             cmocka_unit_test(test_os_alloc_release_param),
@@ -41,6 +41,12 @@ int __wrap_hw_alloc_assign(const unsigned technology,
                            const unsigned *core_array,
                            const unsigned core_num,
                            unsigned *class_id);
+int __wrap_hw_alloc_assoc_get_cores(const unsigned *core_array,
+                                    const unsigned core_num,
+                                    unsigned *class_ids);
+int __wrap_hw_alloc_assoc_set_cores(const unsigned *core_array,
+                                    const unsigned core_num,
+                                    const unsigned class_id);
 int __wrap_hw_alloc_release(const unsigned *core_array,
                             const unsigned core_num);
 int __wrap_hw_alloc_reset(const enum pqos_cdp_config l3_cdp_cfg,
@@ -102,6 +102,38 @@ __wrap_os_alloc_assign(const unsigned technology,
         return ret;
 }
 
+int
+__wrap_os_alloc_assoc_get_cores(const unsigned *core_array,
+                                const unsigned core_num,
+                                unsigned *class_ids)
+{
+        int ret;
+        unsigned i;
+
+        check_expected_ptr(core_array);
+        check_expected(core_num);
+        check_expected_ptr(class_ids);
+
+        ret = mock_type(int);
+        if (ret == PQOS_RETVAL_OK)
+                for (i = 0; i < core_num; i++)
+                        class_ids[i] = mock_type(int);
+
+        return ret;
+}
+
+int
+__wrap_os_alloc_assoc_set_cores(const unsigned *core_array,
+                                const unsigned core_num,
+                                const unsigned class_id)
+{
+        check_expected_ptr(core_array);
+        check_expected(core_num);
+        check_expected(class_id);
+
+        return mock_type(int);
+}
+
 int
 __wrap_os_alloc_release(const unsigned *core_array, const unsigned core_num)
 {
@@ -43,6 +43,12 @@ int __wrap_os_alloc_assign(const unsigned technology,
                            const unsigned *core_array,
                            const unsigned core_num,
                            unsigned *class_id);
+int __wrap_os_alloc_assoc_get_cores(const unsigned *core_array,
+                                    const unsigned core_num,
+                                    unsigned *class_ids);
+int __wrap_os_alloc_assoc_set_cores(const unsigned *core_array,
+                                    const unsigned core_num,
+                                    const unsigned class_id);
 int __wrap_os_alloc_release(const unsigned *core_array,
                             const unsigned core_num);
 int __wrap_os_alloc_assign_pid(const unsigned technology,